@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import re
+
+from ansible.module_utils._text import to_native
+from ansible.plugins.action import ActionBase
+from ansible_collections.zollo.windows.plugins.module_utils.ipv4_index import DhcpScopeIndex
+
+# options merged into each entry of leases, as done by the module
+LEASE_OPTIONS = ('type', 'ip', 'scope_id', 'mac', 'state')
+
+
+def validate_leases(args, index):
+    ''' Returns a list of errors for the single lease or leases list in args '''
+    if args.get('leases'):
+        items = [dict((k, item.get(k) if item.get(k) is not None else args.get(k)) for k in LEASE_OPTIONS)
+                 for item in args['leases']]
+    else:
+        items = [dict((k, args.get(k)) for k in LEASE_OPTIONS)]
+
+    errors = []
+    seen = {}
+    for item in items:
+        if (item.get('state') or 'present') != 'present':
+            continue
+        keys = [('ip', item.get('ip'))]
+        if item.get('mac'):
+            keys.append(('mac', re.sub(r'[-:.]', '', item['mac']).upper()))
+        for key, value in keys:
+            if not value:
+                continue
+            if (key, value) in seen:
+                errors.append("%s %s is requested by more than one lease" % (key, item[key]))
+            seen[(key, value)] = True
+        if index is not None and item.get('ip'):
+            try:
+                errors.extend(index.validate_lease(item['ip'], item.get('scope_id'), item.get('type') or 'reservation'))
+            except ValueError as e:
+                errors.append(to_native(e))
+    return errors
+
+
+class ActionModule(ActionBase):
+    '''Validates requested leases against known scopes before running the module.'''
+
+    def run(self, tmp=None, task_vars=None):
+        result = super(ActionModule, self).run(tmp, task_vars)
+        del tmp
+
+        module_args = self._task.args.copy()
+        known_scopes = module_args.pop('known_scopes', None)
+        try:
+            index = DhcpScopeIndex(known_scopes) if known_scopes else None
+        except (KeyError, ValueError) as e:
+            result.update(failed=True, msg="Invalid known_scopes: %s" % to_native(e))
+            return result
+
+        errors = validate_leases(module_args, index)
+        if errors:
+            result.update(failed=True, msg="Invalid lease request: %s" % '; '.join(errors), errors=errors)
+            return result
+
+        result.update(self._execute_module(module_name=self._task.action, module_args=module_args, task_vars=task_vars))
+        return result
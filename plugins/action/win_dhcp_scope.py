@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+from ansible.module_utils._text import to_native
+from ansible.plugins.action import ActionBase
+from ansible_collections.zollo.windows.plugins.module_utils.ipv4_index import DhcpScopeIndex
+
+
+def validate_scope(args, index):
+    ''' Returns a list of errors for the scope requested in args '''
+    if (args.get('state') or 'present') != 'present' or not (args.get('pool_start') and args.get('pool_end')):
+        return []
+
+    subnet_mask = args.get('subnet_mask') or args.get('subnet_length')
+    try:
+        if subnet_mask is None:
+            # the pool of an existing scope can change without a mask, take it from known_scopes
+            known = [s for s in index.scope_for(args['pool_start'])
+                     if s.get('name') == args.get('name') or s['scope_id'] == args.get('scope_id')]
+            if not known:
+                return []
+            subnet_mask = known[0]['subnet_mask']
+        return index.validate_scope(args.get('name'), args['pool_start'], args['pool_end'],
+                                    subnet_mask, args.get('exclusion_list'))
+    except (KeyError, ValueError) as e:
+        return [to_native(e)]
+
+
+class ActionModule(ActionBase):
+    '''Validates the scope pool and exclusions before running the module.'''
+
+    def run(self, tmp=None, task_vars=None):
+        result = super(ActionModule, self).run(tmp, task_vars)
+        del tmp
+
+        module_args = self._task.args.copy()
+        try:
+            index = DhcpScopeIndex(module_args.pop('known_scopes', None) or [])
+        except (KeyError, ValueError) as e:
+            result.update(failed=True, msg="Invalid known_scopes: %s" % to_native(e))
+            return result
+
+        errors = validate_scope(module_args, index)
+        if errors:
+            result.update(failed=True, msg="Invalid scope request: %s" % '; '.join(errors), errors=errors)
+            return result
+
+        result.update(self._execute_module(module_name=self._task.action, module_args=module_args, task_vars=task_vars))
+        return result
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import hashlib
+import json
+
+from ansible.module_utils._text import to_bytes, to_native
+from ansible.plugins.action import ActionBase
+from ansible.plugins.loader import cache_loader
+
+# options consumed by the action plugin, never sent to the DNS server
+CACHE_OPTIONS = ('cache', 'cache_plugin', 'cache_connection', 'cache_timeout', 'cache_prefix')
+# the zone key holding the cached data of each type
+CACHE_KEYS = {'all': 'dns_records', 'summary': 'summary'}
+
+
+def cache_key(host, module_args):
+    ''' Returns the cache key of a query, known_serials is not part of the query '''
+    query = dict((k, v) for k, v in module_args.items() if k not in ('known_serials', 'throttle'))
+    return hashlib.sha1(to_bytes(json.dumps([host, query], sort_keys=True))).hexdigest()
+
+
+def merge_zones(zones, cached, key, zone_errors=None):
+    '''Fills the unchanged zones from the cached zones.
+
+    Returns the zones to cache, keyed by name, only zones with a serial and
+    without an error are cached.
+    '''
+    failed = set(e.get('zone') for e in zone_errors or [])
+    entries = {}
+    for zone in zones:
+        previous = cached.get(zone['name'])
+        if zone.get('unchanged') and previous is not None:
+            zone[key] = previous.get(key)
+        if zone.get('serial') is not None and zone['name'] not in failed:
+            if not zone.get('unchanged') or previous is not None:
+                entries[zone['name']] = {'serial': zone['serial'], key: zone.get(key)}
+    return entries
+
+
+class ActionModule(ActionBase):
+    '''Keeps the records of unchanged zones in a controller side cache.'''
+
+    def run(self, tmp=None, task_vars=None):
+        result = super(ActionModule, self).run(tmp, task_vars)
+        del tmp
+
+        module_args = self._task.args.copy()
+        options = dict((k, module_args.pop(k, None)) for k in CACHE_OPTIONS)
+        if not options['cache']:
+            result.update(self._execute_module(module_name=self._task.action, module_args=module_args, task_vars=task_vars))
+            return result
+
+        key = CACHE_KEYS.get(module_args.get('type') or 'all')
+        if key is None:
+            result.update(failed=True, msg="cache requires type=all or type=summary")
+            return result
+
+        try:
+            cache = cache_loader.get(options['cache_plugin'] or 'ansible.builtin.jsonfile',
+                                     _uri=options['cache_connection'],
+                                     _timeout=options['cache_timeout'] or 0,
+                                     _prefix=options['cache_prefix'] or 'zollo_windows_dns_')
+        except Exception as e:
+            result.update(failed=True, msg="Unable to load the cache plugin: %s" % to_native(e))
+            return result
+        if cache is None:
+            result.update(failed=True, msg="Unable to find the cache plugin %s" % options['cache_plugin'])
+            return result
+
+        query_key = cache_key(self._play_context.remote_addr or task_vars.get('inventory_hostname'), module_args)
+        cached = cache.get(query_key) if cache.contains(query_key) else {}
+
+        known_serials = dict((name, zone['serial']) for name, zone in cached.items())
+        known_serials.update(module_args.get('known_serials') or {})
+        module_args['known_serials'] = known_serials
+
+        result.update(self._execute_module(module_name=self._task.action, module_args=module_args, task_vars=task_vars))
+        # a skipped or check mode run returns no zones, keep the cached zones
+        if result.get('failed') or result.get('skipped') or self._play_context.check_mode or 'zones' not in result:
+            return result
+
+        entries = merge_zones(result['zones'] or [], cached, key, result.get('zone_errors'))
+        cache.set(query_key, entries)
+        return result
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import hashlib
+import json
+import time
+
+from ansible.module_utils._text import to_bytes, to_native
+from ansible.module_utils.parsing.convert_bool import boolean
+from ansible.plugins.action import ActionBase
+from ansible.plugins.loader import cache_loader
+
+# options consumed by the action plugin, never sent to the host
+CACHE_OPTIONS = ('cache', 'cache_plugin', 'cache_connection', 'cache_timeout', 'cache_prefix')
+# options that select the domain controllers, the credential does not, force_discover
+# refreshes the entry of the same query
+QUERY_OPTIONS = ('domain_name', 'domain_server', 'site', 'discover', 'next_closest_site', 'filter', 'identity', 'service')
+RESULT_KEYS = ('domain_controller', 'domain_controllers')
+
+
+def cache_key(host, module_args):
+    '''Returns the cache key of a query.
+
+    Hosts share a key when the domain and, for discovery, the site are set,
+    otherwise discovery depends on the host and the key includes it.
+    '''
+    query = dict((k, module_args.get(k)) for k in QUERY_OPTIONS)
+    query['service'] = sorted(query['service'] or [])
+    discovered = query['discover'] is not False and not query['filter'] and not query['identity']
+    if not (query['domain_name'] or query['domain_server']) or (discovered and not query['site']):
+        query['host'] = host
+    return hashlib.sha1(to_bytes(json.dumps(query, sort_keys=True))).hexdigest()
+
+
+def cached_result(entry, timeout, now=None):
+    ''' Returns the cached result when it is younger than timeout seconds, 0 never expires '''
+    if not entry or 'time' not in entry:
+        return None
+    now = time.time() if now is None else now
+    if timeout and now - entry['time'] >= timeout:
+        return None
+    return entry['result']
+
+
+class ActionModule(ActionBase):
+    '''Reuses the domain controllers found by a previous task for the same domain and site.'''
+
+    def run(self, tmp=None, task_vars=None):
+        result = super(ActionModule, self).run(tmp, task_vars)
+        del tmp
+
+        module_args = self._task.args.copy()
+        options = dict((k, module_args.pop(k, None)) for k in CACHE_OPTIONS)
+        if not options['cache']:
+            result.update(self._execute_module(module_name=self._task.action, module_args=module_args, task_vars=task_vars))
+            return result
+
+        timeout = 3600 if options['cache_timeout'] is None else options['cache_timeout']
+        try:
+            cache = cache_loader.get(options['cache_plugin'] or 'ansible.builtin.jsonfile',
+                                     _uri=options['cache_connection'],
+                                     _timeout=timeout,
+                                     _prefix=options['cache_prefix'] or 'zollo_windows_domain_')
+        except Exception as e:
+            result.update(failed=True, msg="Unable to load the cache plugin: %s" % to_native(e))
+            return result
+        if cache is None:
+            result.update(failed=True, msg="Unable to find the cache plugin %s" % options['cache_plugin'])
+            return result
+
+        query_key = cache_key(task_vars.get('inventory_hostname'), module_args)
+        if not boolean(module_args.get('force_discover', False), strict=False):
+            # the memory cache plugin does not expire entries, the age is checked here
+            cached = cached_result(cache.get(query_key) if cache.contains(query_key) else None, timeout)
+            if cached is not None:
+                result.update(cached, changed=False, cached=True)
+                return result
+
+        result.update(self._execute_module(module_name=self._task.action, module_args=module_args, task_vars=task_vars))
+        if result.get('failed'):
+            return result
+
+        result['cached'] = False
+        if result.get('domain_controller'):
+            cache.set(query_key, {'time': time.time(), 'result': dict((k, result.get(k)) for k in RESULT_KEYS)})
+        return result
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+name: dns_ptr_audit
+short_description: Checks the consistency of forward and reverse DNS records
+author: Joe Zollo (@joezollo)
+description:
+  - Compares the A and AAAA records of the forward zones with the PTR records
+    of the reverse zones returned by C(zollo.windows.win_dns_info).
+  - The records are indexed by address once, the audit takes linear time in
+    the number of records.
+  - Reports the addresses without a PTR record, the PTR records without an
+    A or AAAA record, the addresses whose PTR records name none of their
+    forward names, and the reverse zones missing for addresses that have no
+    reverse zone.
+options:
+  _input:
+    description:
+      - The C(zones) of a C(type=all) result, with records in either output
+        format, or the C(records) of a C(type=record) result.
+    type: list
+    elements: dict
+    required: true
+  reverse_zones:
+    description:
+      - Names of reverse zones that exist but are not part of the input,
+        such as reverse zones hosted on another server.
+    type: list
+    elements: str
+'''
+
+EXAMPLES = r'''
+- name: Gather all primary zones and their records
+  zollo.windows.win_dns_info:
+    type: all
+    zone_type: primary
+    output_format: columnar
+  register: dns
+
+- name: Audit forward and reverse records
+  ansible.builtin.set_fact:
+    ptr_audit: "{{ dns.zones | zollo.windows.dns_ptr_audit }}"
+
+- name: List the addresses without a PTR record
+  ansible.builtin.debug:
+    msg: "{{ ptr_audit.missing_ptr | map(attribute='ip') | list }}"
+'''
+
+RETURN = r'''
+_value:
+  description: The audit report, every list is sorted by address.
+  type: dict
+  contains:
+    missing_ptr:
+      description:
+        - The addresses of A and AAAA records without a PTR record.
+        - C(reverse_zone) is the reverse zone expected to hold the PTR record,
+          C(null) when no reverse zone covers the address.
+      type: list
+      elements: dict
+      sample:
+        - ip: 10.0.1.10
+          names: [ web01.contoso.com ]
+          reverse_zone: 1.0.10.in-addr.arpa
+    orphan_ptr:
+      description: The PTR records of addresses without an A or AAAA record.
+      type: list
+      elements: dict
+      sample:
+        - ip: 10.0.1.99
+          ptr: [ old01.contoso.com ]
+    mismatched:
+      description: The addresses whose PTR records name none of their A or AAAA record names.
+      type: list
+      elements: dict
+      sample:
+        - ip: 10.0.1.20
+          names: [ app01.contoso.com ]
+          ptr: [ app01-old.contoso.com ]
+    missing_reverse_zones:
+      description:
+        - The reverse zones missing for the addresses of A and AAAA records,
+          a /24 zone for IPv4 and a /64 zone for IPv6.
+      type: list
+      elements: dict
+      sample:
+        - zone: 2.0.10.in-addr.arpa
+          subnet: 10.0.2.0/24
+          addresses: 12
+'''
+
+import ipaddress
+
+from ansible.errors import AnsibleFilterError
+from ansible.module_utils._text import to_text
+from ansible.module_utils.six import string_types
+from ansible_collections.zollo.windows.plugins.filter.dns_rows import dns_rows
+
+REVERSE_SUFFIXES = ('in-addr.arpa', 'ip6.arpa')
+
+
+def _normalize(name):
+    return to_text(name).rstrip('.').lower()
+
+
+def _owner(record, zone):
+    ''' Returns the owner name of a record, the zone apex is named @ '''
+    name = record.get('name')
+    if zone is None:
+        fqdn = _normalize(record.get('fqdn') or '')
+        return fqdn[2:] if fqdn.startswith('@.') else fqdn
+    if not name or name == '@':
+        return zone
+    return '%s.%s' % (_normalize(name), zone)
+
+
+def reverse_name_to_ip(name):
+    ''' Converts a full in-addr.arpa or ip6.arpa owner name to an address, None otherwise '''
+    labels = _normalize(name).split('.')
+    try:
+        if labels[-2:] == ['in-addr', 'arpa'] and len(labels) == 6:
+            return ipaddress.ip_address(u'.'.join(reversed(labels[:4])))
+        if labels[-2:] == ['ip6', 'arpa'] and len(labels) == 34:
+            nibbles = ''.join(reversed(labels[:32]))
+            return ipaddress.ip_address(u':'.join(nibbles[i:i + 4] for i in range(0, 32, 4)))
+    except ValueError:
+        pass
+    return None
+
+
+def _covering_zone(address, reverse_zones):
+    labels = address.reverse_pointer.split('.')
+    for i in range(len(labels) - 2):
+        candidate = '.'.join(labels[i:])
+        if candidate in reverse_zones:
+            return candidate
+    return None
+
+
+def _expected_zone(address):
+    ''' Returns the /24 or /64 reverse zone and subnet of an address '''
+    prefix = 24 if address.version == 4 else 64
+    network = ipaddress.ip_network(u'%s/%d' % (address, prefix), strict=False)
+    labels = address.reverse_pointer.split('.')
+    skip = 1 if address.version == 4 else 16
+    return '.'.join(labels[skip:]), str(network)
+
+
+def _iter_records(data):
+    ''' Yields (owner, type, data) for a list of zones or a list of records '''
+    for item in data:
+        if not isinstance(item, dict):
+            raise AnsibleFilterError("dns_ptr_audit expects a list of zones or records, got %s" % type(item).__name__)
+        if 'fqdn' in item or 'dns_records' not in item:
+            if 'type' in item and 'fqdn' in item:
+                yield _owner(item, None), item['type'].lower(), item.get('data')
+            continue
+        zone = _normalize(item['name'])
+        for record in dns_rows(item.get('dns_records')):
+            yield _owner(record, zone), record['type'].lower(), record.get('data')
+
+
+def dns_ptr_audit(data, reverse_zones=None):
+    ''' Reports missing, orphan and mismatched PTR records and missing reverse zones '''
+    if not isinstance(data, list):
+        raise AnsibleFilterError("dns_ptr_audit expects a list of zones or records")
+
+    zones = set(_normalize(z) for z in reverse_zones or [])
+    for item in data:
+        if isinstance(item, dict) and 'dns_records' in item and _normalize(item.get('name', '')).endswith(REVERSE_SUFFIXES):
+            zones.add(_normalize(item['name']))
+
+    # one pass over the records, both directions indexed by address
+    forward = {}
+    reverse = {}
+    for owner, record_type, value in _iter_records(data):
+        if record_type in ('a', 'aaaa') and isinstance(value, string_types):
+            try:
+                address = ipaddress.ip_address(to_text(value))
+            except ValueError:
+                continue
+            forward.setdefault(address, set()).add(owner)
+        elif record_type == 'ptr' and isinstance(value, string_types):
+            address = reverse_name_to_ip(owner)
+            if address is not None:
+                reverse.setdefault(address, set()).add(_normalize(value))
+
+    report = {'missing_ptr': [], 'orphan_ptr': [], 'mismatched': [], 'missing_reverse_zones': []}
+    missing_zones = {}
+    for address, names in forward.items():
+        targets = reverse.get(address)
+        if targets is None:
+            zone = _covering_zone(address, zones)
+            report['missing_ptr'].append((address, {'ip': str(address), 'names': sorted(names), 'reverse_zone': zone}))
+            if zone is None:
+                expected, subnet = _expected_zone(address)
+                entry = missing_zones.setdefault(expected, {'zone': expected, 'subnet': subnet, 'addresses': 0})
+                entry['addresses'] += 1
+        elif not names & targets:
+            report['mismatched'].append((address, {'ip': str(address), 'names': sorted(names), 'ptr': sorted(targets)}))
+    for address, targets in reverse.items():
+        if address not in forward:
+            report['orphan_ptr'].append((address, {'ip': str(address), 'ptr': sorted(targets)}))
+
+    def sort_key(pair):
+        return pair[0].version, int(pair[0])
+
+    for key in ('missing_ptr', 'orphan_ptr', 'mismatched'):
+        report[key] = [entry for dummy, entry in sorted(report[key], key=sort_key)]
+    subnets = [(ipaddress.ip_network(to_text(e['subnet'])), e) for e in missing_zones.values()]
+    report['missing_reverse_zones'] = [e for n, e in sorted(subnets, key=lambda p: (p[0].version, int(p[0].network_address)))]
+    return report
+
+
+class FilterModule(object):
+
+    def filters(self):
+        return {
+            'dns_ptr_audit': dns_ptr_audit,
+        }
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+name: dns_rows
+short_description: Turns columnar DNS records into record dicts
+author: Joe Zollo (@joezollo)
+description:
+  - Turns the records returned by C(zollo.windows.win_dns_info) with
+    C(output_format=columnar) into the record dicts of the default output
+    format.
+  - The dicts are built lazily, one record at a time, as the result is
+    iterated or indexed.
+  - A list of record dicts is returned unchanged.
+options:
+  _input:
+    description:
+      - The C(records) of a C(type=record) result or the C(dns_records) of a
+        zone.
+    type: raw
+    required: true
+'''
+
+EXAMPLES = r'''
+- name: Gather the records of all primary zones in columnar format
+  zollo.windows.win_dns_info:
+    type: record
+    zone_type: primary
+    output_format: columnar
+  register: dns
+
+- name: Print the fqdn of every A record
+  ansible.builtin.debug:
+    msg: "{{ dns.records | zollo.windows.dns_rows | selectattr('type', 'equalto', 'a') | map(attribute='fqdn') | list }}"
+'''
+
+RETURN = r'''
+_value:
+  description:
+    - The records, as dicts with the C(name), C(fqdn), C(type), C(ttl) and
+      C(data) keys.
+  type: list
+  elements: dict
+'''
+
+try:
+    from collections.abc import Mapping, Sequence
+except ImportError:
+    from collections import Mapping, Sequence
+
+from ansible.errors import AnsibleFilterError
+
+
+class DnsRows(Sequence):
+    ''' A read only sequence of record dicts backed by the columns '''
+
+    def __init__(self, columns):
+        self._zones = columns['zones']
+        self._types = columns['types']
+        self._zone = columns.get('zone')
+        self._name = columns['name']
+        self._type = columns['type']
+        self._ttl = columns['ttl']
+        self._data = columns['data']
+        if len(set(len(c) for c in (self._name, self._type, self._ttl, self._data, self._zone or self._name))) != 1:
+            raise AnsibleFilterError("dns_rows columns have different lengths")
+
+    def __len__(self):
+        return len(self._name)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("record index out of range")
+        zone = self._zones[self._zone[index] if self._zone is not None else 0]
+        name = self._name[index]
+        record = {
+            'name': name,
+            'fqdn': '%s.%s' % (name, zone),
+            'type': self._types[self._type[index]],
+            'ttl': self._ttl[index],
+        }
+        if self._data[index] is not None:
+            record['data'] = self._data[index]
+        return record
+
+
+def dns_rows(value):
+    ''' Returns a lazy sequence of record dicts for columnar win_dns_info records '''
+    if value is None:
+        return []
+    if not isinstance(value, Mapping):
+        return value
+    try:
+        return DnsRows(value)
+    except KeyError as e:
+        raise AnsibleFilterError("dns_rows expects columnar records, the %s column is missing" % e.args[0])
+
+
+class FilterModule(object):
+
+    def filters(self):
+        return {
+            'dns_rows': dns_rows,
+        }
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+name: dns_zone_file
+short_description: Parses the content of a Windows DNS server zone file
+author: Joe Zollo (@joezollo)
+description:
+  - Parses the content of a BIND style zone file, such as a
+    C(%windir%\System32\dns\<zone>.dns) file, and returns its records.
+  - Records use the same dict shape as the records of C(zollo.windows.win_dns_info).
+  - Use the C(zollo.windows.dns_zone_file) lookup to read a file on the
+    controller as a stream.
+options:
+  _input:
+    description:
+      - The content of the zone file.
+    type: str
+    required: true
+  zone:
+    description:
+      - The name of the zone.
+    type: str
+    required: true
+  record_types:
+    description:
+      - Only return records of these types, case insensitive.
+    type: list
+    elements: str
+'''
+
+EXAMPLES = r'''
+- name: Read the zone file of a file backed zone
+  ansible.windows.slurp:
+    src: C:\Windows\System32\dns\legacy.contoso.com.dns
+  register: zone_file
+
+- name: Parse the MX records of the zone
+  ansible.builtin.set_fact:
+    mail_records: "{{ zone_file.content | b64decode | zollo.windows.dns_zone_file('legacy.contoso.com', record_types=['MX']) }}"
+'''
+
+RETURN = r'''
+_value:
+  description:
+    - The records of the zone file, in file order.
+  type: list
+  elements: dict
+'''
+
+from ansible.errors import AnsibleFilterError
+from ansible.module_utils._text import to_native, to_text
+from ansible_collections.zollo.windows.plugins.module_utils.dns_zone_file import iter_zone_file
+
+
+def dns_zone_file(data, zone, record_types=None):
+    ''' Parses zone file content into win_dns_info shaped records '''
+    try:
+        return list(iter_zone_file(to_text(data).splitlines(), zone, record_types))
+    except ValueError as e:
+        raise AnsibleFilterError("Unable to parse the zone file of %s: %s" % (zone, to_native(e)))
+
+
+class FilterModule(object):
+
+    def filters(self):
+        return {
+            'dns_zone_file': dns_zone_file,
+        }
@@ -0,0 +1,408 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+name: ad_computers
+plugin_type: inventory
+short_description: Builds an inventory from Active Directory computer objects
+author: Joe Zollo (@joezollo)
+requirements:
+  - ldap3
+description:
+  - Builds hosts and groups from the computer objects of an Active Directory
+    domain, read over LDAP from the controller with a paged search.
+  - Hosts are grouped by OU path, by operating system and by site.
+  - When the inventory cache is enabled, the first run loads every computer
+    and stores the highest USN of the domain controller. The next runs only
+    read the computers with a higher C(uSNChanged) and merge them into the
+    cached computers, deleted computers and computers moved out of
+    l(search_base) are removed.
+  - The USN is specific to a domain controller, when another domain
+    controller answers, or after l(full_refresh_interval), every computer is
+    loaded again.
+  - The inventory file name must end with C(ad_computers.yml) or
+    C(ad_computers.yaml).
+extends_documentation_fragment:
+  - inventory_cache
+  - constructed
+options:
+  plugin:
+    description:
+      - The name of this plugin, it should always be set to
+        C(zollo.windows.ad_computers) for this plugin to recognize it as its own.
+    type: str
+    required: true
+    choices: [ zollo.windows.ad_computers ]
+  domain_server:
+    description:
+      - The domain controller, or the DNS name of the domain, to read the
+        computers from.
+    type: str
+    required: true
+  domain_username:
+    description:
+      - The username to bind with, such as C(user@contoso.com) with
+        l(auth=simple) or C(CONTOSO\\user) with l(auth=ntlm).
+      - If not set, the bind is anonymous.
+    type: str
+  domain_password:
+    description:
+      - The password for l(domain_username).
+    type: str
+  auth:
+    description:
+      - The bind method.
+    type: str
+    default: simple
+    choices: [ simple, ntlm ]
+  port:
+    description:
+      - The LDAP port, defaults to C(636) with l(use_ssl) and to C(389)
+        otherwise.
+    type: int
+  use_ssl:
+    description:
+      - Connects with LDAPS.
+    type: bool
+    default: false
+  validate_certs:
+    description:
+      - Validates the certificate of the domain controller with l(use_ssl).
+    type: bool
+    default: true
+  search_base:
+    description:
+      - The distinguished name to search for computers under.
+      - If not set, the default naming context of the domain is searched.
+    type: str
+  ldap_filter:
+    description:
+      - An LDAP filter the computers must also match, such as
+        C((operatingSystem=Windows Server*)).
+    type: str
+  page_size:
+    description:
+      - The number of computers of each LDAP page.
+    type: int
+    default: 500
+  hostnames:
+    description:
+      - A list of LDAP attributes used to name hosts, the first non-empty
+        value is used.
+    type: list
+    elements: str
+    default: [ dNSHostName, name ]
+  attributes:
+    description:
+      - Other LDAP attributes to read, set as host variables named
+        C(ad_) followed by the lower cased attribute name.
+    type: list
+    elements: str
+    default: []
+  site_attribute:
+    description:
+      - The LDAP attribute holding the site of a computer.
+      - Active Directory only sets C(msDS-SiteName) on domain controllers,
+        set this to the attribute holding the site of other computers, such
+        as C(location).
+    type: str
+    default: msDS-SiteName
+  group_prefix:
+    description:
+      - Prefix added to every group created by this plugin.
+    type: str
+    default: ad_
+  full_refresh_interval:
+    description:
+      - The number of seconds after a full load when the next run loads every
+        computer again instead of the changed computers.
+    type: int
+    default: 86400
+'''
+
+EXAMPLES = r'''
+# ad_computers.yml
+plugin: zollo.windows.ad_computers
+domain_server: contoso.com
+domain_username: svc-ansible@contoso.com
+domain_password: "{{ lookup('env', 'AD_PASSWORD') }}"
+use_ssl: true
+
+# ad_computers.yml with incremental refreshes and constructed groups
+plugin: zollo.windows.ad_computers
+domain_server: dc01.contoso.com
+domain_username: CONTOSO\svc-ansible
+domain_password: "{{ lookup('env', 'AD_PASSWORD') }}"
+auth: ntlm
+search_base: OU=Servers,DC=contoso,DC=com
+ldap_filter: (operatingSystem=Windows Server*)
+attributes:
+  - description
+cache: true
+cache_plugin: ansible.builtin.jsonfile
+cache_connection: /var/cache/ansible/ad_computers
+keyed_groups:
+  - key: ad_description
+    prefix: desc
+'''
+
+import re
+import ssl
+import time
+import uuid
+
+from ansible.errors import AnsibleParserError
+from ansible.module_utils._text import to_native, to_text
+from ansible.plugins.inventory import BaseInventoryPlugin, Cacheable, Constructable
+
+try:
+    import ldap3
+    from ldap3.core.exceptions import LDAPException
+    from ldap3.protocol.controls import build_control
+    HAS_LDAP3 = True
+except ImportError:
+    HAS_LDAP3 = False
+
+# attributes read for every computer, the options add to them
+COMPUTER_ATTRIBUTES = ('dNSHostName', 'name', 'objectGUID', 'operatingSystem', 'operatingSystemVersion',
+                       'userAccountControl', 'uSNChanged')
+# returns deleted objects, their tombstones keep objectGUID and uSNChanged
+SHOW_DELETED_OID = '1.2.840.113556.1.4.417'
+ACCOUNTDISABLE = 0x2
+
+
+def ou_path(dn):
+    ''' Returns the OU names of a distinguished name, from the top of the domain down '''
+    rdns = re.split(r'(?<!\\),', dn)
+    return [rdn.split('=', 1)[1].strip() for rdn in reversed(rdns[1:]) if rdn.strip().upper().startswith('OU=')]
+
+
+def _values(entry, attribute):
+    return [to_text(v, errors='surrogate_or_strict') for v in entry['raw_attributes'].get(attribute) or []]
+
+
+def _value(entry, attribute):
+    values = _values(entry, attribute)
+    return values[0] if values else None
+
+
+def entry_guid(entry):
+    raw = entry['raw_attributes'].get('objectGUID')
+    return str(uuid.UUID(bytes_le=bytes(raw[0]))) if raw else None
+
+
+def computer_from_entry(entry, site_attribute=None, attributes=()):
+    ''' Converts a search result entry to the compact dict stored in the cache '''
+    uac = _value(entry, 'userAccountControl')
+    computer = {
+        'guid': entry_guid(entry),
+        'distinguished_name': entry['dn'],
+        'dns_host_name': _value(entry, 'dNSHostName'),
+        'name': _value(entry, 'name'),
+        'operating_system': _value(entry, 'operatingSystem'),
+        'operating_system_version': _value(entry, 'operatingSystemVersion'),
+        'enabled': not int(uac) & ACCOUNTDISABLE if uac else None,
+        'site': _value(entry, site_attribute) if site_attribute else None,
+        'attributes': {},
+    }
+    for attribute in attributes:
+        values = _values(entry, attribute)
+        computer['attributes'][attribute] = values[0] if len(values) == 1 else values or None
+    return computer
+
+
+class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
+
+    NAME = 'zollo.windows.ad_computers'
+
+    def verify_file(self, path):
+        if super(InventoryModule, self).verify_file(path):
+            return path.endswith(('ad_computers.yml', 'ad_computers.yaml'))
+        return False
+
+    def _connect(self):
+        use_ssl = self.get_option('use_ssl')
+        tls = None
+        if use_ssl:
+            tls = ldap3.Tls(validate=ssl.CERT_REQUIRED if self.get_option('validate_certs') else ssl.CERT_NONE)
+        server = ldap3.Server(self.get_option('domain_server'), port=self.get_option('port') or (636 if use_ssl else 389),
+                              use_ssl=use_ssl, tls=tls, get_info=ldap3.DSA)
+        if not self.get_option('domain_username'):
+            authentication = ldap3.ANONYMOUS
+        elif self.get_option('auth') == 'ntlm':
+            authentication = ldap3.NTLM
+        else:
+            authentication = ldap3.SIMPLE
+        return ldap3.Connection(server, user=self.get_option('domain_username'), password=self.get_option('domain_password'),
+                                authentication=authentication, auto_bind=True, read_only=True, raise_exceptions=True)
+
+    def _search(self, connection, base, ldap_filter, attributes, controls=None):
+        ''' Yields the entries of a paged search '''
+        for entry in connection.extend.standard.paged_search(base, ldap_filter, ldap3.SUBTREE, attributes=list(attributes),
+                                                             paged_size=self.get_option('page_size'), controls=controls,
+                                                             generator=True):
+            if entry.get('type') == 'searchResEntry':
+                yield entry
+
+    def _computer_filter(self):
+        extra = self.get_option('ldap_filter') or ''
+        if extra and not extra.startswith('('):
+            extra = '(%s)' % extra
+        return '(&(objectClass=computer)(!(isDeleted=TRUE))%s)' % extra
+
+    def _load(self, connection, state, root):
+        '''Returns the computers and whether every computer was loaded.
+
+        When state holds a load from the same domain controller, only the
+        computers changed since its USN are read.
+        '''
+        search_base = self.get_option('search_base') or root['naming_context']
+        site_attribute = self.get_option('site_attribute')
+        attributes = list(self.get_option('attributes') or [])
+        attributes += [h for h in self.get_option('hostnames') if h not in COMPUTER_ATTRIBUTES and h not in attributes]
+        read = list(COMPUTER_ATTRIBUTES) + [a for a in attributes + [site_attribute] if a]
+        query = [search_base, self._computer_filter(), site_attribute, sorted(attributes)]
+
+        incremental = (state and state.get('server') == root['server'] and state.get('query') == query and
+                       time.time() - state.get('loaded', 0) < self.get_option('full_refresh_interval'))
+        if not incremental:
+            computers = {}
+            for entry in self._search(connection, search_base, self._computer_filter(), read):
+                computer = computer_from_entry(entry, site_attribute, attributes)
+                computers[computer['guid']] = computer
+            return query, computers, True
+
+        computers = dict(state['computers'])
+        changed = '(uSNChanged>=%d)' % (state['usn'] + 1)
+        seen = set()
+        for entry in self._search(connection, search_base, '(&%s%s)' % (self._computer_filter(), changed), read):
+            computer = computer_from_entry(entry, site_attribute, attributes)
+            computers[computer['guid']] = computer
+            seen.add(computer['guid'])
+
+        # changed computers that no longer match are deleted, moved or filtered out
+        controls = [build_control(SHOW_DELETED_OID, True, None)]
+        for entry in self._search(connection, root['naming_context'], '(&(objectClass=computer)%s)' % changed,
+                                  ['objectGUID'], controls):
+            guid = entry_guid(entry)
+            if guid not in seen:
+                computers.pop(guid, None)
+        return query, computers, False
+
+    def _refresh(self, state):
+        ''' Loads the computers, returns the state to cache '''
+        try:
+            connection = self._connect()
+        except LDAPException as e:
+            raise AnsibleParserError("Unable to connect to %s: %s" % (self.get_option('domain_server'), to_native(e)))
+        try:
+            # the USN is read before the search, changes made during the search are read again next time
+            info = connection.server.info
+            other = info.other if info else {}
+            root = {
+                'server': (other.get('dsServiceName') or [None])[0],
+                'naming_context': (other.get('defaultNamingContext') or [None])[0],
+                'usn': int((other.get('highestCommittedUSN') or [0])[0]),
+            }
+            if not root['naming_context'] and not self.get_option('search_base'):
+                raise AnsibleParserError("Unable to read the default naming context of %s, set search_base"
+                                         % self.get_option('domain_server'))
+            query, computers, full = self._load(connection, state, root)
+        except LDAPException as e:
+            raise AnsibleParserError("Unable to read the computers from %s: %s" % (self.get_option('domain_server'), to_native(e)))
+        finally:
+            connection.unbind()
+
+        return {
+            'server': root['server'],
+            'query': query,
+            'usn': root['usn'],
+            'loaded': time.time() if full else state['loaded'],
+            'computers': computers,
+        }
+
+    def _group(self, name):
+        return self.inventory.add_group(self._sanitize_group_name(self.get_option('group_prefix') + name.lower()))
+
+    def _get_hostname(self, computer):
+        known = {'dNSHostName': computer['dns_host_name'], 'name': computer['name']}
+        for key in self.get_option('hostnames'):
+            value = known.get(key) or computer['attributes'].get(key)
+            if value:
+                return value
+        return None
+
+    def _populate(self, computers):
+        strict = self.get_option('strict')
+        for computer in computers.values():
+            hostname = self._get_hostname(computer)
+            if not hostname:
+                continue
+
+            host = self.inventory.add_host(hostname)
+            path = ou_path(computer['distinguished_name'])
+            host_vars = {
+                'ad_guid': computer['guid'],
+                'ad_distinguished_name': computer['distinguished_name'],
+                'ad_dns_host_name': computer['dns_host_name'],
+                'ad_name': computer['name'],
+                'ad_operating_system': computer['operating_system'],
+                'ad_operating_system_version': computer['operating_system_version'],
+                'ad_enabled': computer['enabled'],
+                'ad_site': computer['site'],
+                'ad_ou_path': path,
+            }
+            for key, value in computer['attributes'].items():
+                host_vars['ad_' + key.lower()] = value
+            for key, value in host_vars.items():
+                self.inventory.set_variable(host, key, value)
+
+            # one group per OU level, each level is a child group of its parent
+            parent = None
+            for i in range(len(path)):
+                group = self._group('ou_' + '_'.join(path[:i + 1]))
+                if parent:
+                    self.inventory.add_child(parent, group)
+                parent = group
+            if parent:
+                self.inventory.add_child(parent, host)
+            if computer['operating_system']:
+                self.inventory.add_child(self._group('os_' + computer['operating_system']), host)
+            if computer['site']:
+                self.inventory.add_child(self._group('site_' + computer['site']), host)
+
+            self._set_composite_vars(self.get_option('compose'), host_vars, host, strict=strict)
+            self._add_host_to_composed_groups(self.get_option('groups'), host_vars, host, strict=strict)
+            self._add_host_to_keyed_groups(self.get_option('keyed_groups'), host_vars, host, strict=strict)
+
+    def parse(self, inventory, loader, path, cache=True):
+        super(InventoryModule, self).parse(inventory, loader, path, cache)
+        self._read_config_data(path)
+
+        if not HAS_LDAP3:
+            raise AnsibleParserError("The ad_computers inventory plugin requires the ldap3 Python library")
+
+        cache_key = self.get_cache_key(path)
+        user_cache_setting = self.get_option('cache')
+        attempt_to_read_cache = user_cache_setting and cache
+
+        state = None
+        if attempt_to_read_cache:
+            try:
+                state = self._cache[cache_key]
+            except KeyError:
+                pass
+
+        # the cached computers are the base of an incremental refresh, every run reads the changes
+        state = self._refresh(state)
+        if user_cache_setting:
+            self._cache[cache_key] = state
+
+        self._populate(state['computers'])
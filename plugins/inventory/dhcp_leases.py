@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+name: dhcp_leases
+plugin_type: inventory
+short_description: Builds an inventory from Windows Server DHCP leases
+author: Joe Zollo (@joezollo)
+description:
+  - Builds hosts and groups from a JSON export of DHCP leases/reservations,
+    in the format returned by the C(zollo.windows.win_dhcp_info) module.
+  - The export is read as a stream, one lease at a time, so the whole
+    document is never held in memory.
+  - Hosts are grouped by scope, by address state and by reservation vs. lease.
+  - Results can be stored in the inventory cache, subsequent runs within the
+    cache timeout do not read the export again unless it was modified.
+  - The inventory file name must end with C(dhcp_leases.yml) or
+    C(dhcp_leases.yaml).
+extends_documentation_fragment:
+  - inventory_cache
+  - constructed
+options:
+  plugin:
+    description:
+      - The name of this plugin, it should always be set to
+        C(zollo.windows.dhcp_leases) for this plugin to recognize it as its own.
+    type: str
+    required: true
+    choices: [ zollo.windows.dhcp_leases ]
+  path:
+    description:
+      - Path to the JSON export.
+      - The export is either the registered result of C(win_dhcp_info), an
+        object with a C(leases) list, or a bare list of leases.
+      - Relative paths are relative to the inventory file.
+    type: path
+    required: true
+  hostnames:
+    description:
+      - A list of lease keys used to name hosts, the first non-empty value
+        is used.
+      - Leases without any of these values are skipped.
+    type: list
+    elements: str
+    default: [ name, ip_address ]
+  group_prefix:
+    description:
+      - Prefix added to every group created by this plugin.
+    type: str
+    default: dhcp_
+  set_ansible_host:
+    description:
+      - Sets C(ansible_host) to the IP address of the lease.
+    type: bool
+    default: true
+'''
+
+EXAMPLES = r'''
+# dhcp_leases.yml
+plugin: zollo.windows.dhcp_leases
+path: /var/lib/ansible/dhcp01_leases.json
+
+# dhcp_leases.yml with caching and constructed groups
+plugin: zollo.windows.dhcp_leases
+path: exports/dhcp.json
+cache: true
+cache_plugin: ansible.builtin.jsonfile
+cache_connection: /tmp/ansible_dhcp_cache
+cache_timeout: 3600
+hostnames:
+  - name
+keyed_groups:
+  - key: dhcp_description
+    prefix: desc
+'''
+
+import json
+import os
+
+from ansible.errors import AnsibleParserError
+from ansible.module_utils._text import to_native
+from ansible.plugins.inventory import BaseInventoryPlugin, Cacheable, Constructable
+
+# keys kept from each lease, everything else in the export is dropped
+LEASE_KEYS = ('address_state', 'client_id', 'description', 'ip_address', 'name', 'scope_id')
+
+
+class _JsonLeaseReader(object):
+    '''Reads the items of a JSON array one at a time from a file object.
+
+    The array is either the document itself or the value of a top level
+    key. Other top level values are decoded and discarded.
+    '''
+
+    def __init__(self, stream, key, chunk_size=65536):
+        self.stream = stream
+        self.key = key
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        if self.eof:
+            return False
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # drop what has already been consumed
+        if self.pos > self.chunk_size:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        self.buf += chunk
+        return True
+
+    def _peek(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, chars):
+        char = self._peek()
+        if char not in chars:
+            raise ValueError("expected one of %r at offset %d, found %r" % (chars, self.pos, char))
+        self.pos += 1
+        return char
+
+    def _decode(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except ValueError:
+                if not self._fill():
+                    raise
+                continue
+            # a value ending at the buffer edge may be a truncated number
+            if end == len(self.buf) and not isinstance(value, (dict, list, str)) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def _iter_array(self):
+        if self._peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self._decode()
+            if self._expect(',]') == ']':
+                return
+
+    def __iter__(self):
+        first = self._expect('[{')
+        if first == '[':
+            for item in self._iter_array():
+                yield item
+            return
+
+        if self._peek() == '}':
+            return
+        while True:
+            key = self._decode()
+            self._expect(':')
+            if key == self.key:
+                self._expect('[')
+                for item in self._iter_array():
+                    yield item
+            else:
+                self._decode()
+            if self._expect(',}') == '}':
+                return
+
+
+def iter_leases(stream):
+    ''' Yields compact lease dicts from a win_dhcp_info shaped JSON stream '''
+    for item in _JsonLeaseReader(stream, 'leases'):
+        if isinstance(item, dict):
+            yield dict((k, item.get(k)) for k in LEASE_KEYS)
+
+
+class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
+
+    NAME = 'zollo.windows.dhcp_leases'
+
+    def verify_file(self, path):
+        if super(InventoryModule, self).verify_file(path):
+            return path.endswith(('dhcp_leases.yml', 'dhcp_leases.yaml'))
+        return False
+
+    def _get_export_path(self, path):
+        export_path = self.get_option('path')
+        if not os.path.isabs(export_path):
+            export_path = os.path.join(os.path.dirname(path), export_path)
+        return export_path
+
+    def _load_export(self, export_path):
+        ''' Yields the leases of the export as they are read '''
+        try:
+            with open(export_path, 'r') as stream:
+                for lease in iter_leases(stream):
+                    yield lease
+        except (IOError, OSError, ValueError) as e:
+            raise AnsibleParserError("Unable to read DHCP export %s: %s" % (export_path, to_native(e)))
+
+    def _group(self, name):
+        return self.inventory.add_group(self._sanitize_group_name(self.get_option('group_prefix') + name))
+
+    def _get_hostname(self, lease):
+        for key in self.get_option('hostnames'):
+            if lease.get(key):
+                return lease[key]
+        return None
+
+    def _populate(self, leases):
+        strict = self.get_option('strict')
+        for lease in leases:
+            hostname = self._get_hostname(lease)
+            if not hostname:
+                continue
+
+            host = self.inventory.add_host(hostname)
+            host_vars = {
+                'dhcp_ip_address': lease.get('ip_address'),
+                'dhcp_mac': lease.get('client_id'),
+                'dhcp_description': lease.get('description'),
+                'dhcp_scope_id': lease.get('scope_id'),
+                'dhcp_address_state': lease.get('address_state'),
+            }
+            for key, value in host_vars.items():
+                self.inventory.set_variable(host, key, value)
+            if self.get_option('set_ansible_host') and lease.get('ip_address'):
+                self.inventory.set_variable(host, 'ansible_host', lease['ip_address'])
+
+            state = lease.get('address_state') or 'unknown'
+            if lease.get('scope_id'):
+                self.inventory.add_child(self._group('scope_' + lease['scope_id']), host)
+            self.inventory.add_child(self._group('state_' + state.lower()), host)
+            if 'reservation' in state.lower():
+                self.inventory.add_child(self._group('reservations'), host)
+            else:
+                self.inventory.add_child(self._group('leases'), host)
+
+            self._set_composite_vars(self.get_option('compose'), host_vars, host, strict=strict)
+            self._add_host_to_composed_groups(self.get_option('groups'), host_vars, host, strict=strict)
+            self._add_host_to_keyed_groups(self.get_option('keyed_groups'), host_vars, host, strict=strict)
+
+    def parse(self, inventory, loader, path, cache=True):
+        super(InventoryModule, self).parse(inventory, loader, path, cache)
+        self._read_config_data(path)
+
+        export_path = self._get_export_path(path)
+        try:
+            export_mtime = os.path.getmtime(export_path)
+        except OSError as e:
+            raise AnsibleParserError("Unable to read DHCP export %s: %s" % (export_path, to_native(e)))
+
+        cache_key = self.get_cache_key(path)
+        user_cache_setting = self.get_option('cache')
+        attempt_to_read_cache = user_cache_setting and cache
+        cache_needs_update = user_cache_setting and not cache
+
+        leases = None
+        if attempt_to_read_cache:
+            try:
+                cached = self._cache[cache_key]
+            except KeyError:
+                cache_needs_update = True
+            else:
+                # a newer export invalidates the cache
+                if cached.get('mtime') == export_mtime:
+                    leases = cached['leases']
+                else:
+                    cache_needs_update = True
+
+        if leases is None:
+            leases = self._load_export(export_path)
+            # only the cache needs every lease in memory, otherwise they are streamed
+            if cache_needs_update:
+                leases = list(leases)
+
+        if cache_needs_update:
+            self._cache[cache_key] = {'mtime': export_mtime, 'leases': leases}
+
+        self._populate(leases)
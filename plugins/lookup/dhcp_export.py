@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+name: dhcp_export
+short_description: Reads scopes and leases from a Windows Server DHCP XML export
+author: Joe Zollo (@joezollo)
+description:
+  - Reads an C(Export-DhcpServer -Leases) XML file, as written by
+    C(zollo.windows.win_dhcp_info) with C(export_path), and returns the
+    scopes or leases it contains.
+  - The export is parsed as a stream and every element is released once it
+    has been read, memory use does not grow with the number of leases.
+  - Scopes and leases use the same dict shape as C(win_dhcp_info).
+  - Reservations without a lease are returned with the address state
+    C(InactiveReservation).
+options:
+  _terms:
+    description:
+      - Paths to XML exports on the controller.
+    type: list
+    elements: path
+    required: true
+  type:
+    description:
+      - The type of object to return.
+      - C(lease) returns leases and reservations, C(reservation) only
+        reservations.
+    type: str
+    default: lease
+    choices: [ scope, lease, reservation ]
+  scope_id:
+    description:
+      - Only return objects of this scope.
+    type: str
+  address_state:
+    description:
+      - Only return leases in one of these address states, case insensitive.
+    type: list
+    elements: str
+  ip:
+    description:
+      - Only return the lease with this IPv4 address.
+    type: str
+  mac:
+    description:
+      - Only return the lease with this client ID, separators and case are
+        ignored.
+    type: str
+notes:
+  - When the C(defusedxml) Python library is installed it is used to parse
+    the export.
+'''
+
+EXAMPLES = r'''
+- name: Read the active leases of a scope from the export
+  ansible.builtin.set_fact:
+    leases: "{{ lookup('zollo.windows.dhcp_export', 'exports/dhcp.xml', scope_id='10.0.1.0', address_state=['Active'], wantlist=True) }}"
+
+- name: Read every scope of the export
+  ansible.builtin.debug:
+    msg: "{{ item.name }} {{ item.start_range }}-{{ item.end_range }}"
+  loop: "{{ query('zollo.windows.dhcp_export', 'exports/dhcp.xml', type='scope') }}"
+
+- name: Find a reservation by MAC address
+  ansible.builtin.debug:
+    msg: "{{ query('zollo.windows.dhcp_export', 'exports/dhcp.xml', type='reservation', mac='00:0a:1b:2c:3d:4f') }}"
+'''
+
+RETURN = r'''
+_raw:
+  description:
+    - The scopes or leases of the exports, in document order.
+  type: list
+  elements: dict
+'''
+
+import re
+
+from ansible.errors import AnsibleLookupError
+from ansible.module_utils._text import to_native
+from ansible.plugins.lookup import LookupBase
+
+try:
+    from defusedxml.ElementTree import iterparse
+except ImportError:
+    from xml.etree.ElementTree import iterparse
+
+
+def _tag(elem):
+    return elem.tag.rsplit('}', 1)[-1]
+
+
+def _children(elem):
+    return dict((_tag(child), child.text) for child in elem)
+
+
+def _client_id_key(client_id):
+    return re.sub(r'[-:.]', '', client_id or '').upper()
+
+
+def _lease_duration(value):
+    ''' Splits a [d.]hh:mm:ss timespan like the module lease_duration '''
+    days, hours = 0, 0
+    if value:
+        clock = value
+        if '.' in value.split(':', 1)[0]:
+            days, clock = value.split('.', 1)
+        hours = clock.split(':', 1)[0]
+    return {'days': int(days), 'hours': int(hours)}
+
+
+def _scope_object(values):
+    return {
+        'name': values.get('Name'),
+        'scope_id': values.get('ScopeId'),
+        'subnet_mask': values.get('SubnetMask'),
+        'address_state': values.get('State'),
+        'start_range': values.get('StartRange'),
+        'end_range': values.get('EndRange'),
+        'lease_duration': _lease_duration(values.get('LeaseDuration')),
+    }
+
+
+def _lease_object(values, scope_id, address_state=None):
+    return {
+        'client_id': values.get('ClientId'),
+        'address_state': address_state or values.get('AddressState'),
+        'ip_address': values.get('IPAddress'),
+        'scope_id': values.get('ScopeId') or scope_id,
+        'name': values.get('Name') or values.get('HostName'),
+        'description': values.get('Description'),
+    }
+
+
+def iter_export(stream):
+    '''Yields ('scope', dict) and ('lease', dict) tuples from an export.
+
+    Scope properties are the text children of each IPv4 scope, the
+    reservations of a scope are held to mark the leases they own and every
+    Scope/Lease/Reservation element is removed from the tree once read.
+    '''
+    stack = []
+    scope = None
+    reservations = None
+    scope_values = None
+    for event, elem in iterparse(stream, events=('start', 'end')):
+        tag = _tag(elem)
+        if event == 'start':
+            # IPv6 scopes share the element names and are skipped
+            if tag == 'Scope' and [_tag(e) for e in stack[-2:]] == ['IPv4', 'Scopes']:
+                scope, scope_values, reservations = elem, {}, {}
+            stack.append(elem)
+            continue
+
+        stack.pop()
+        parent = stack[-1] if stack else None
+
+        if scope is not None and parent is scope and len(elem) == 0:
+            scope_values[tag] = elem.text
+        elif tag == 'Reservation' and scope is not None:
+            values = _children(elem)
+            reservations[values.get('IPAddress')] = values
+        elif tag == 'Lease' and scope is not None:
+            values = _children(elem)
+            reservation = reservations.pop(values.get('IPAddress'), None)
+            if reservation is not None:
+                for key in ('Name', 'Description'):
+                    if reservation.get(key) is not None:
+                        values[key] = reservation[key]
+                if 'reservation' not in (values.get('AddressState') or '').lower():
+                    values['AddressState'] = (values.get('AddressState') or 'Active') + 'Reservation'
+            yield 'lease', _lease_object(values, scope_values.get('ScopeId'))
+        elif elem is scope:
+            yield 'scope', _scope_object(scope_values)
+            # reservations never leased by a client
+            for values in reservations.values():
+                yield 'lease', _lease_object(values, scope_values.get('ScopeId'), 'InactiveReservation')
+            scope = scope_values = reservations = None
+
+        if tag in ('Lease', 'Reservation', 'Scope') and parent is not None:
+            elem.clear()
+            parent.remove(elem)
+
+
+class LookupModule(LookupBase):
+
+    def _matches(self, kind, item):
+        if kind != ('scope' if self._type == 'scope' else 'lease'):
+            return False
+        if self._scope_id and item.get('scope_id') != self._scope_id:
+            return False
+        if kind == 'scope':
+            return True
+        state = item.get('address_state') or ''
+        if self._type == 'reservation' and 'reservation' not in state.lower():
+            return False
+        if self._states and state.lower() not in self._states:
+            return False
+        if self._ip and item.get('ip_address') != self._ip:
+            return False
+        if self._mac and _client_id_key(item.get('client_id')) != self._mac:
+            return False
+        return True
+
+    def run(self, terms, variables=None, **kwargs):
+        self.set_options(var_options=variables, direct=kwargs)
+        self._type = self.get_option('type')
+        self._scope_id = self.get_option('scope_id')
+        self._states = set(s.lower() for s in self.get_option('address_state') or [])
+        self._ip = self.get_option('ip')
+        self._mac = _client_id_key(self.get_option('mac')) if self.get_option('mac') else None
+
+        ret = []
+        for term in terms:
+            path = self.find_file_in_search_path(variables, 'files', term)
+            if not path:
+                raise AnsibleLookupError("Unable to find the DHCP export %s" % term)
+            try:
+                with open(path, 'rb') as stream:
+                    for kind, item in iter_export(stream):
+                        if self._matches(kind, item):
+                            ret.append(item)
+            except (IOError, OSError, SyntaxError) as e:
+                # ParseError is a SyntaxError subclass
+                raise AnsibleLookupError("Unable to read the DHCP export %s: %s" % (path, to_native(e)))
+        return ret
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+name: dns_transfer
+short_description: Reads the records of DNS zones with a zone transfer
+author: Joe Zollo (@joezollo)
+description:
+  - Reads DNS zones from a DNS server with a zone transfer (AXFR) from the
+    controller, instead of enumerating them over WinRM.
+  - When l(state_dir) is set, the serial and records of each zone are stored
+    and the next read asks for an incremental transfer (IXFR). Only the
+    changes since the stored serial are transferred, an unchanged zone
+    transfers a single record.
+  - Records use the same dict shape as the records of
+    C(zollo.windows.win_dns_info).
+  - The C(zollo.windows.dns_transfer_info) module reads zones the same way
+    as a task.
+options:
+  _terms:
+    description:
+      - The names of the zones to read.
+    type: list
+    elements: str
+    required: true
+  server:
+    description:
+      - The DNS server to transfer the zones from.
+    type: str
+    required: true
+  port:
+    description:
+      - The TCP port of the DNS server.
+    type: int
+    default: 53
+  timeout:
+    description:
+      - The timeout of each network operation, in seconds.
+    type: int
+    default: 10
+  state_dir:
+    description:
+      - A directory on the controller where the serial and records of each
+        zone are stored after a transfer.
+      - When not set, every read is a full transfer.
+    type: path
+notes:
+  - The Windows DNS server only allows zone transfers to the servers listed
+    on the Zone Transfers tab of the zone, the controller must be allowed.
+  - TSIG signed transfers are not supported.
+'''
+
+EXAMPLES = r'''
+- name: Read the records of a zone
+  ansible.builtin.debug:
+    msg: "{{ query('zollo.windows.dns_transfer', 'contoso.com', server='dns01.contoso.com') }}"
+
+- name: Read two zones, only the changes are transferred after the first run
+  ansible.builtin.set_fact:
+    records: "{{ query('zollo.windows.dns_transfer', 'contoso.com', '1.0.10.in-addr.arpa', server='10.0.1.2', state_dir='~/.ansible/dns_transfer') }}"
+'''
+
+RETURN = r'''
+_raw:
+  description:
+    - The records of the zones, in transfer order for each zone.
+  type: list
+  elements: dict
+'''
+
+from ansible.errors import AnsibleLookupError
+from ansible.module_utils._text import to_native
+from ansible.plugins.lookup import LookupBase
+from ansible_collections.zollo.windows.plugins.module_utils.dns_transfer import (
+    ZoneTransferError, load_state, save_state, state_file, transfer_zone)
+
+
+class LookupModule(LookupBase):
+
+    def run(self, terms, variables=None, **kwargs):
+        self.set_options(var_options=variables, direct=kwargs)
+        server = self.get_option('server')
+        state_dir = self.get_option('state_dir')
+
+        ret = []
+        for zone in terms:
+            path = state_file(state_dir, server, zone) if state_dir else None
+            try:
+                result = transfer_zone(server, zone, load_state(path), self.get_option('port'), self.get_option('timeout'))
+                if path and result['mode'] != 'unchanged':
+                    save_state(path, result)
+            except (ZoneTransferError, IOError, OSError, ValueError) as e:
+                raise AnsibleLookupError("Unable to transfer the zone %s from %s: %s" % (zone, server, to_native(e)))
+            ret.extend(result['records'])
+        return ret
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+name: dns_zone_file
+short_description: Reads the records of a Windows DNS server zone file
+author: Joe Zollo (@joezollo)
+description:
+  - Reads a BIND style zone file, such as a C(%windir%\System32\dns\<zone>.dns)
+    file fetched from a Windows DNS server, and returns its records.
+  - The file is parsed as a stream, one record at a time.
+  - Records use the same dict shape as the records of C(zollo.windows.win_dns_info).
+  - The C($ORIGIN) and C($TTL) directives, multi-line records in parentheses
+    and the aging timestamps of dynamic records are supported. The A, AAAA,
+    CNAME, MX, NS, PTR, SRV and TXT records have C(data), other records are
+    returned without it.
+  - The zone file of a file backed zone is returned in C(zone_file) by
+    C(zollo.windows.win_dns_info).
+options:
+  _terms:
+    description:
+      - Paths to zone files on the controller.
+    type: list
+    elements: path
+    required: true
+  zone:
+    description:
+      - The name of the zone.
+      - Defaults to the file name without the C(.dns) extension.
+    type: str
+  record_types:
+    description:
+      - Only return records of these types, case insensitive.
+    type: list
+    elements: str
+'''
+
+EXAMPLES = r'''
+- name: Fetch the zone file of a file backed zone
+  ansible.builtin.fetch:
+    src: C:\Windows\System32\dns\legacy.contoso.com.dns
+    dest: zones/
+    flat: true
+  delegate_to: dns01
+
+- name: Read the A and CNAME records of the zone
+  ansible.builtin.set_fact:
+    records: "{{ query('zollo.windows.dns_zone_file', 'zones/legacy.contoso.com.dns', record_types=['A', 'CNAME']) }}"
+
+- name: Read a zone file saved under another name
+  ansible.builtin.debug:
+    msg: "{{ query('zollo.windows.dns_zone_file', 'zones/legacy.txt', zone='legacy.contoso.com') }}"
+'''
+
+RETURN = r'''
+_raw:
+  description:
+    - The records of the zone files, in file order.
+  type: list
+  elements: dict
+'''
+
+import os
+
+from ansible.errors import AnsibleLookupError
+from ansible.module_utils._text import to_native
+from ansible.plugins.lookup import LookupBase
+from ansible_collections.zollo.windows.plugins.module_utils.dns_zone_file import iter_zone_file
+
+
+class LookupModule(LookupBase):
+
+    def run(self, terms, variables=None, **kwargs):
+        self.set_options(var_options=variables, direct=kwargs)
+        zone = self.get_option('zone')
+        record_types = self.get_option('record_types')
+
+        ret = []
+        for term in terms:
+            path = self.find_file_in_search_path(variables, 'files', term)
+            if not path:
+                raise AnsibleLookupError("Unable to find the zone file %s" % term)
+            name = zone or os.path.basename(path)
+            if not zone and name.lower().endswith('.dns'):
+                name = name[:-4]
+            try:
+                with open(path, 'rb') as stream:
+                    ret.extend(iter_zone_file(stream, name, record_types))
+            except (IOError, OSError, ValueError) as e:
+                raise AnsibleLookupError("Unable to read the zone file %s: %s" % (path, to_native(e)))
+        return ret
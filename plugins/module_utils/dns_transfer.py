@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+''' AXFR and IXFR zone transfer client, records are returned in the win_dns_info format '''
+
+import itertools
+import json
+import os
+import random
+import re
+import socket
+import struct
+import tempfile
+
+TYPES = {1: 'a', 2: 'ns', 5: 'cname', 6: 'soa', 12: 'ptr', 15: 'mx', 16: 'txt', 28: 'aaaa', 33: 'srv'}
+TYPE_SOA = 6
+TYPE_IXFR = 251
+TYPE_AXFR = 252
+CLASS_IN = 1
+RCODES = {1: 'FORMERR', 2: 'SERVFAIL', 3: 'NXDOMAIN', 4: 'NOTIMP', 5: 'REFUSED', 9: 'NOTAUTH'}
+
+
+class ZoneTransferError(Exception):
+    pass
+
+
+def _encode_name(name):
+    labels = [label for label in name.rstrip('.').split('.') if label]
+    return b''.join(struct.pack('!B', len(label)) + label.encode('ascii') for label in labels) + b'\x00'
+
+
+def build_query(zone, serial=None, query_id=None):
+    ''' Builds an AXFR query, or an IXFR query when the serial of the held copy is given '''
+    query_id = random.randint(0, 0xFFFF) if query_id is None else query_id
+    qtype = TYPE_AXFR if serial is None else TYPE_IXFR
+    header = struct.pack('!HHHHHH', query_id, 0, 1, 0, 0 if serial is None else 1, 0)
+    message = header + _encode_name(zone) + struct.pack('!HH', qtype, CLASS_IN)
+    if serial is not None:
+        # the authority section holds the SOA of the held copy, only the serial is used
+        rdata = b'\x00\x00' + struct.pack('!IIIII', serial, 0, 0, 0, 0)
+        message += _encode_name(zone) + struct.pack('!HHIH', TYPE_SOA, CLASS_IN, 0, len(rdata)) + rdata
+    return message
+
+
+def _read_name(message, offset):
+    labels = []
+    end = None
+    jumps = 0
+    while True:
+        if offset >= len(message):
+            raise ZoneTransferError("truncated name in message")
+        length = message[offset]
+        if length & 0xC0 == 0xC0:
+            if jumps > 64:
+                raise ZoneTransferError("name compression loop in message")
+            if end is None:
+                end = offset + 2
+            offset = struct.unpack('!H', message[offset:offset + 2])[0] & 0x3FFF
+            jumps += 1
+        elif length == 0:
+            offset += 1
+            break
+        else:
+            labels.append(message[offset + 1:offset + 1 + length].decode('ascii', 'replace').lower())
+            offset += 1 + length
+    return '.'.join(labels) + '.', end if end is not None else offset
+
+
+def _rdata(rtype, message, offset, length):
+    end = offset + length
+    if rtype == 1:
+        return socket.inet_ntop(socket.AF_INET, message[offset:end])
+    if rtype == 28:
+        return socket.inet_ntop(socket.AF_INET6, message[offset:end])
+    if rtype in (2, 5, 12):
+        return _read_name(message, offset)[0]
+    if rtype == 15:
+        return {'mail_exchange': _read_name(message, offset + 2)[0],
+                'priority': struct.unpack('!H', message[offset:offset + 2])[0]}
+    if rtype == 33:
+        priority, weight, port = struct.unpack('!HHH', message[offset:offset + 6])
+        return {'domain_name': _read_name(message, offset + 6)[0], 'port': port, 'priority': priority, 'weight': weight}
+    if rtype == 16:
+        strings = []
+        while offset < end:
+            size = message[offset]
+            strings.append(message[offset + 1:offset + 1 + size].decode('utf-8', 'replace'))
+            offset += 1 + size
+        return ''.join(strings)
+    if rtype == TYPE_SOA:
+        offset = _read_name(message, _read_name(message, offset)[1])[1]
+        return struct.unpack('!I', message[offset:offset + 4])[0]
+    return None
+
+
+def parse_answers(message, query_id=None):
+    ''' Yields (owner, type, ttl, data) for the answers of a response, data is the serial of a SOA '''
+    message = bytearray(message)
+    if len(message) < 12:
+        raise ZoneTransferError("truncated message")
+    response_id, flags, qdcount, ancount = struct.unpack('!HHHH', bytes(message[:8]))
+    if query_id is not None and response_id != query_id:
+        raise ZoneTransferError("unexpected response id %d" % response_id)
+    if flags & 0x000F:
+        rcode = flags & 0x000F
+        raise ZoneTransferError("the server answered %s" % RCODES.get(rcode, rcode))
+    offset = 12
+    for dummy in range(qdcount):
+        offset = _read_name(message, offset)[1] + 4
+    for dummy in range(ancount):
+        owner, offset = _read_name(message, offset)
+        rtype, rclass, ttl, length = struct.unpack('!HHIH', bytes(message[offset:offset + 10]))
+        offset += 10
+        if offset + length > len(message):
+            raise ZoneTransferError("truncated record in message")
+        yield owner, rtype, ttl, _rdata(rtype, message, offset, length)
+        offset += length
+
+
+def _recv_exact(sock, size):
+    data = b''
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ZoneTransferError("the server closed the connection during the transfer")
+        data += chunk
+    return data
+
+
+def iter_transfer(server, zone, serial=None, port=53, timeout=10):
+    ''' Yields the answer records of each message of an AXFR or IXFR over TCP '''
+    query_id = random.randint(0, 0xFFFF)
+    query = build_query(zone, serial, query_id)
+    sock = socket.create_connection((server, port), timeout=timeout)
+    try:
+        sock.sendall(struct.pack('!H', len(query)) + query)
+        while True:
+            size = struct.unpack('!H', _recv_exact(sock, 2))[0]
+            yield list(parse_answers(_recv_exact(sock, size), query_id))
+    finally:
+        sock.close()
+
+
+def _record(owner, rtype, ttl, data, zone):
+    if owner == zone:
+        name = '@'
+    elif owner.endswith('.' + zone):
+        name = owner[:-len(zone) - 1]
+    else:
+        name = owner.rstrip('.')
+    record = {
+        'name': name,
+        'fqdn': '%s.%s' % (name, zone.rstrip('.')),
+        'type': TYPES.get(rtype, 'type%d' % rtype),
+        'ttl': ttl,
+    }
+    if data is not None and rtype != TYPE_SOA:
+        record['data'] = data
+    return record
+
+
+def record_key(record):
+    ''' Identifies a record by name, type and data, the TTL is not part of the key '''
+    return record['name'], record['type'], json.dumps(record.get('data'), sort_keys=True)
+
+
+def transfer_zone(server, zone, state=None, port=53, timeout=10):
+    '''Transfers a zone and returns a dict with serial, mode and records.
+
+    state is the result of a previous transfer, its serial is sent in an
+    IXFR query and the changes are applied to its records. mode is axfr,
+    ixfr or unchanged.
+    '''
+    zone = zone.rstrip('.').lower() + '.'
+    serial = state.get('serial') if state else None
+    messages = iter_transfer(server, zone, serial, port, timeout)
+    try:
+        return _read_transfer(messages, zone, state)
+    finally:
+        # closes the connection
+        messages.close()
+
+
+def _serial_newer(serial, other):
+    ''' Compares serials with RFC 1982 arithmetic '''
+    return serial != other and (serial - other) % 0x100000000 < 0x80000000
+
+
+def _read_transfer(messages, zone, state):
+    serial = state.get('serial') if state else None
+    first_message = next(messages, None)
+    if not first_message or first_message[0][1] != TYPE_SOA:
+        raise ZoneTransferError("the transfer of %s does not start with a SOA record" % zone)
+    new_serial = first_message[0][3]
+    if serial is not None and len(first_message) == 1 and not _serial_newer(new_serial, serial):
+        # a single SOA, the held copy is current
+        return {'serial': serial, 'mode': 'unchanged', 'records': list(state['records'])}
+
+    answers = itertools.chain(first_message, (answer for message in messages for answer in message))
+    first = next(answers)
+    second = next(answers, None)
+    if second is None:
+        raise ZoneTransferError("the transfer of %s ended after the SOA record" % zone)
+
+    if serial is not None and second[1] == TYPE_SOA:
+        # deletions then additions per version, each section starts with a SOA
+        records = dict((record_key(r), r) for r in state['records'])
+        deleting = True
+        records.pop(record_key(_record(*second + (zone,))), None)
+        for answer in answers:
+            record = _record(*answer + (zone,))
+            if answer[1] == TYPE_SOA:
+                if deleting:
+                    deleting = False
+                elif answer[3] == new_serial:
+                    break
+                else:
+                    deleting = True
+                    records.pop(record_key(record), None)
+                    continue
+            if deleting:
+                records.pop(record_key(record), None)
+            else:
+                records[record_key(record)] = record
+        else:
+            raise ZoneTransferError("the incremental transfer of %s ended early" % zone)
+        return {'serial': new_serial, 'mode': 'ixfr', 'records': list(records.values())}
+
+    records = [_record(*first + (zone,))]
+    if second[1] != TYPE_SOA:
+        records.append(_record(*second + (zone,)))
+        for answer in answers:
+            if answer[1] == TYPE_SOA:
+                break
+            records.append(_record(*answer + (zone,)))
+        else:
+            raise ZoneTransferError("the transfer of %s ended before the closing SOA record" % zone)
+    return {'serial': new_serial, 'mode': 'axfr', 'records': records}
+
+
+def _file_name_part(name):
+    ''' Percent encodes the characters of a name that are not safe in a file name, such as / and : '''
+    return re.sub(r'[^A-Za-z0-9.-]', lambda m: ''.join('%%%02X' % b for b in bytearray(m.group(0).encode('utf-8'))), name)
+
+
+def state_file(state_dir, server, zone):
+    ''' Returns the state file of a zone, classless reverse zones hold a / and IPv6 servers a : '''
+    return os.path.join(state_dir, '%s_%s.json' % (_file_name_part(server), _file_name_part(zone.rstrip('.').lower())))
+
+
+def load_state(path):
+    ''' Returns the stored transfer of a zone, None when it was never stored '''
+    if not path or not os.path.exists(path):
+        return None
+    with open(path) as stream:
+        return json.load(stream)
+
+
+def save_state(path, result):
+    ''' Stores a transfer atomically, for the IXFR of the next read '''
+    directory = os.path.dirname(path) or '.'
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix='.dns_transfer')
+    with os.fdopen(fd, 'w') as stream:
+        json.dump({'serial': result['serial'], 'records': result['records']}, stream)
+    os.rename(tmp, path)
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+''' Streaming parser for BIND style zone files, as written by the Windows DNS server '''
+
+import ipaddress
+import re
+
+CLASSES = ('IN', 'CH', 'HS', 'CS')
+NAME_TYPES = ('CNAME', 'PTR', 'NS')
+TTL_UNITS = {'': 1, 's': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+
+class _Quoted(str):
+    ''' A token read from a quoted string, never a parenthesis or directive '''
+
+
+def parse_ttl(value):
+    ''' Converts a TTL in seconds or in BIND units, such as 1h30m, to seconds '''
+    parts = re.findall(r'(\d+)([smhdw]?)', value.lower())
+    if not parts or ''.join(n + u for n, u in parts) != value.lower():
+        raise ValueError("%s is not a valid TTL" % value)
+    return sum(int(n) * TTL_UNITS[u] for n, u in parts)
+
+
+def _unescape(value):
+    return re.sub(r'\\(\d{3}|.)', lambda m: chr(int(m.group(1))) if m.group(1).isdigit() else m.group(1), value)
+
+
+def _tokenize(line):
+    tokens = []
+    i, length = 0, len(line)
+    while i < length:
+        char = line[i]
+        if char in ' \t\r\n':
+            i += 1
+        elif char == ';':
+            break
+        elif char in '()':
+            tokens.append(char)
+            i += 1
+        elif char == '"':
+            start = i = i + 1
+            while i < length and line[i] != '"':
+                i += 2 if line[i] == '\\' else 1
+            if i >= length:
+                raise ValueError("unterminated quoted string")
+            tokens.append(_Quoted(line[start:i]))
+            i += 1
+        else:
+            start = i
+            while i < length and line[i] not in ' \t\r\n;()"':
+                i += 2 if line[i] == '\\' else 1
+            tokens.append(line[start:i])
+    return tokens
+
+
+def absolute_name(name, origin):
+    ''' Expands a relative owner or target name, absolute names end with a dot '''
+    if name == '@':
+        return origin
+    if name.endswith('.'):
+        return name.lower()
+    return ('%s.%s' % (name, origin)).lower()
+
+
+def _record_data(rtype, rdata, origin):
+    if rtype == 'A':
+        return rdata[0]
+    if rtype == 'AAAA':
+        return str(ipaddress.ip_address(u'%s' % rdata[0]))
+    if rtype in NAME_TYPES:
+        return absolute_name(rdata[0], origin)
+    if rtype == 'MX':
+        return {'mail_exchange': absolute_name(rdata[1], origin), 'priority': int(rdata[0])}
+    if rtype == 'SRV':
+        return {
+            'domain_name': absolute_name(rdata[3], origin),
+            'port': int(rdata[2]),
+            'priority': int(rdata[0]),
+            'weight': int(rdata[1]),
+        }
+    if rtype == 'TXT':
+        return ''.join(_unescape(token) for token in rdata)
+    return None
+
+
+def _logical_lines(lines):
+    ''' Yields (line number, owner omitted, tokens) with parentheses joined '''
+    tokens, depth, blank_owner, start = [], 0, False, 0
+    for lineno, line in enumerate(lines, 1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', 'replace')
+        try:
+            line_tokens = _tokenize(line)
+        except ValueError as e:
+            raise ValueError("line %d: %s" % (lineno, e))
+        if depth == 0:
+            if not line_tokens:
+                continue
+            blank_owner, start = line[:1] in (' ', '\t'), lineno
+        for token in line_tokens:
+            if token == '(' and not isinstance(token, _Quoted):
+                depth += 1
+            elif token == ')' and not isinstance(token, _Quoted):
+                depth -= 1
+                if depth < 0:
+                    raise ValueError("line %d: unbalanced parentheses" % lineno)
+            else:
+                tokens.append(token)
+        if depth == 0 and tokens:
+            yield start, blank_owner, tokens
+            tokens = []
+    if depth:
+        raise ValueError("line %d: unbalanced parentheses" % start)
+
+
+def iter_zone_file(lines, zone, record_types=None):
+    '''Yields the records of a zone file in the shape returned by win_dns_info.
+
+    lines is any iterable of text or byte lines, such as an open file, and is
+    read once. Names are lower cased and relative to zone, the zone apex is
+    named @ like on the DNS server. Records without a TTL use $TTL, then the
+    SOA minimum, then the last explicit TTL. Only the A, AAAA, CNAME, MX, NS,
+    PTR, SRV and TXT types have data.
+    '''
+    zone = zone.rstrip('.').lower() + '.'
+    origin = zone
+    types = set(t.upper() for t in record_types) if record_types else None
+    owner = default_ttl = soa_ttl = last_ttl = None
+
+    for lineno, blank_owner, tokens in _logical_lines(lines):
+        try:
+            if not blank_owner and tokens[0].startswith('$') and not isinstance(tokens[0], _Quoted):
+                directive = tokens[0].upper()
+                if directive == '$ORIGIN':
+                    origin = absolute_name(tokens[1], origin)
+                elif directive == '$TTL':
+                    default_ttl = parse_ttl(tokens[1])
+                else:
+                    raise ValueError("the %s directive is not supported" % directive)
+                continue
+
+            if not blank_owner:
+                owner = absolute_name(tokens.pop(0), origin)
+            elif owner is None:
+                raise ValueError("the first record has no owner name")
+
+            ttl = rtype = None
+            while tokens:
+                token = tokens.pop(0)
+                if token[:1].isdigit():
+                    ttl = last_ttl = parse_ttl(token)
+                elif token.upper() in CLASSES:
+                    continue
+                elif token.upper().startswith('[AGE:'):
+                    # aging timestamp of dynamically registered records
+                    continue
+                else:
+                    rtype = token.upper()
+                    break
+            if rtype is None:
+                raise ValueError("the record has no type")
+
+            if rtype == 'SOA' and len(tokens) >= 7:
+                soa_ttl = parse_ttl(tokens[6])
+            if ttl is None:
+                for fallback in (default_ttl, soa_ttl, last_ttl):
+                    if fallback is not None:
+                        ttl = fallback
+                        break
+                else:
+                    raise ValueError("the record has no TTL and no default TTL is set")
+
+            if types is not None and rtype not in types:
+                continue
+
+            if owner == zone:
+                name = '@'
+            elif owner.endswith('.' + zone):
+                name = owner[:-len(zone) - 1]
+            else:
+                name = owner.rstrip('.')
+            record = {
+                'name': name,
+                'fqdn': '%s.%s' % (name, zone.rstrip('.')),
+                'type': rtype.lower(),
+                'ttl': ttl,
+            }
+            data = _record_data(rtype, tokens, origin)
+            if data is not None:
+                record['data'] = data
+        except IndexError:
+            raise ValueError("line %d: the record data is incomplete" % lineno)
+        except ValueError as e:
+            if str(e).startswith('line '):
+                raise
+            raise ValueError("line %d: %s" % (lineno, e))
+        yield record
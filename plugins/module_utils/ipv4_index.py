@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+''' IPv4 interval index used to validate DHCP scopes, pools and exclusions '''
+
+MAX_IPV4 = 0xFFFFFFFF
+
+
+def ip_to_int(address):
+    ''' Converts a dotted quad IPv4 address to an integer '''
+    parts = str(address).strip().split('.')
+    if len(parts) != 4:
+        raise ValueError("%s is not a valid IPv4 address" % address)
+    value = 0
+    for part in parts:
+        if not part.isdigit() or int(part) > 255:
+            raise ValueError("%s is not a valid IPv4 address" % address)
+        value = (value << 8) | int(part)
+    return value
+
+
+def int_to_ip(value):
+    ''' Converts an integer to a dotted quad IPv4 address '''
+    return '.'.join(str((value >> shift) & 0xFF) for shift in (24, 16, 8, 0))
+
+
+def mask_to_int(mask):
+    ''' Converts a dotted subnet mask or a prefix length to an integer mask '''
+    if isinstance(mask, int) or str(mask).isdigit():
+        length = int(mask)
+        if length < 0 or length > 32:
+            raise ValueError("%s is not a valid prefix length" % mask)
+        return (MAX_IPV4 << (32 - length)) & MAX_IPV4
+    value = ip_to_int(mask)
+    inverted = ~value & MAX_IPV4
+    if inverted & (inverted + 1):
+        raise ValueError("%s is not a valid subnet mask" % mask)
+    return value
+
+
+def subnet_range(address, mask):
+    ''' Returns the (network, broadcast) integers of the subnet holding address '''
+    mask = mask_to_int(mask)
+    network = ip_to_int(address) & mask
+    return network, network | (~mask & MAX_IPV4)
+
+
+def parse_range(value):
+    ''' Parses a range as a start/end dict, start-end string, CIDR block or address '''
+    if isinstance(value, dict):
+        start = ip_to_int(value['start'])
+        end = ip_to_int(value.get('end') or value['start'])
+    elif '/' in value:
+        address, length = value.split('/', 1)
+        start, end = subnet_range(address, length)
+    elif '-' in value:
+        first, last = value.split('-', 1)
+        start, end = ip_to_int(first), ip_to_int(last)
+    else:
+        start = end = ip_to_int(value)
+    if start > end:
+        raise ValueError("%s does not describe a valid range, the start is after the end" % (value,))
+    return start, end
+
+
+class IPv4IntervalIndex(object):
+    '''Static index of closed integer intervals.
+
+    Intervals are sorted once by the bulk constructor and laid out as an
+    implicit balanced tree, each node storing the largest end in its
+    subtree. Point and overlap queries are O(log n + k) for k matches.
+    '''
+
+    def __init__(self, intervals=()):
+        items = sorted(intervals, key=lambda i: (i[0], i[1]))
+        self._starts = [i[0] for i in items]
+        self._ends = [i[1] for i in items]
+        self._data = [i[2] if len(i) > 2 else None for i in items]
+        self._max_end = list(self._ends)
+        self._build(0, len(items) - 1)
+
+    def _build(self, lo, hi):
+        if lo > hi:
+            return -1
+        mid = (lo + hi) // 2
+        self._max_end[mid] = max(self._ends[mid], self._build(lo, mid - 1), self._build(mid + 1, hi))
+        return self._max_end[mid]
+
+    def __len__(self):
+        return len(self._starts)
+
+    def overlaps(self, start, end=None):
+        ''' Returns (start, end, data) of every interval intersecting [start, end] '''
+        if end is None:
+            end = start
+        found = []
+        stack = [(0, len(self._starts) - 1)]
+        while stack:
+            lo, hi = stack.pop()
+            if lo > hi:
+                continue
+            mid = (lo + hi) // 2
+            if self._max_end[mid] < start:
+                continue
+            stack.append((lo, mid - 1))
+            if self._starts[mid] <= end:
+                if self._ends[mid] >= start:
+                    found.append(mid)
+                stack.append((mid + 1, hi))
+        return [(self._starts[i], self._ends[i], self._data[i]) for i in sorted(found)]
+
+    def find(self, address):
+        ''' Returns (start, end, data) of every interval containing address '''
+        return self.overlaps(address, address)
+
+
+class DhcpScopeIndex(object):
+    '''Subnet, pool and exclusion indexes over a list of DHCP scopes.
+
+    Scopes use the shape returned by win_dhcp_info, with an optional
+    exclusion_list of ranges accepted by parse_range.
+    '''
+
+    def __init__(self, scopes=()):
+        subnets = []
+        pools = []
+        exclusions = []
+        for scope in scopes:
+            network, broadcast = subnet_range(scope['scope_id'], scope['subnet_mask'])
+            subnets.append((network, broadcast, scope))
+            if scope.get('start_range') and scope.get('end_range'):
+                pools.append((ip_to_int(scope['start_range']), ip_to_int(scope['end_range']), scope))
+            for item in scope.get('exclusion_list') or []:
+                start, end = parse_range(item)
+                exclusions.append((start, end, scope))
+        self.subnets = IPv4IntervalIndex(subnets)
+        self.pools = IPv4IntervalIndex(pools)
+        self.exclusions = IPv4IntervalIndex(exclusions)
+
+    def scope_for(self, address):
+        ''' Returns the scopes whose subnet contains address '''
+        return [i[2] for i in self.subnets.find(ip_to_int(address))]
+
+    def validate_scope(self, name, pool_start, pool_end, subnet_mask, exclusion_list=None):
+        ''' Returns a list of errors for a scope definition '''
+        errors = []
+        start, end = ip_to_int(pool_start), ip_to_int(pool_end)
+        if start > end:
+            return ["pool_start %s is after pool_end %s" % (pool_start, pool_end)]
+
+        network, broadcast = subnet_range(pool_start, subnet_mask)
+        if end > broadcast:
+            errors.append("pool_end %s is outside of the subnet %s/%s" % (pool_end, int_to_ip(network), subnet_mask))
+
+        ranges = []
+        seen = set()
+        for item in exclusion_list or []:
+            ex_start, ex_end = parse_range(item)
+            # a range listed twice is added once by the module
+            if (ex_start, ex_end) in seen:
+                continue
+            seen.add((ex_start, ex_end))
+            if ex_start < start or ex_end > end:
+                errors.append("exclusion range %s-%s is outside of the pool %s-%s" % (
+                    int_to_ip(ex_start), int_to_ip(ex_end), pool_start, pool_end))
+            ranges.append((ex_start, ex_end, item))
+        exclusions = IPv4IntervalIndex(ranges)
+        for ex_start, ex_end, item in ranges:
+            if len(exclusions.overlaps(ex_start, ex_end)) > 1:
+                errors.append("exclusion range %s-%s overlaps another exclusion range" % (
+                    int_to_ip(ex_start), int_to_ip(ex_end)))
+
+        for other_start, other_end, other in self.subnets.overlaps(network, broadcast):
+            if other.get('name') != name and other_start != network:
+                errors.append("the subnet %s/%s overlaps the scope %s (%s)" % (
+                    int_to_ip(network), subnet_mask, other.get('name'), other['scope_id']))
+
+        return errors
+
+    def validate_lease(self, ip, scope_id=None, lease_type='reservation'):
+        ''' Returns a list of errors for a lease/reservation address '''
+        address = ip_to_int(ip)
+        scopes = self.scope_for(ip)
+        if not scopes:
+            return ["%s is not within the subnet of any known scope" % ip]
+        if scope_id and scope_id not in [s['scope_id'] for s in scopes]:
+            return ["%s is not within the subnet of the scope %s" % (ip, scope_id)]
+
+        errors = []
+        if not any(s is p[2] for s in scopes for p in self.pools.find(address)):
+            errors.append("%s is outside of the address range of the scope %s" % (ip, scopes[0]['scope_id']))
+        # reservations may sit inside an exclusion range, leases may not
+        if lease_type == 'lease' and self.exclusions.find(address):
+            errors.append("%s is within an exclusion range of the scope %s" % (ip, scopes[0]['scope_id']))
+        return errors
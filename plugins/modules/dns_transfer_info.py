@@ -0,0 +1,133 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: dns_transfer_info
+short_description: Reads DNS zones with a zone transfer
+author: Joe Zollo (@joezollo)
+description:
+  - Reads DNS zones from a DNS server with a zone transfer (AXFR), from the
+    host the task runs on, usually the controller.
+  - When l(state_dir) is set, the serial and records of each zone are stored
+    and the next run asks for an incremental transfer (IXFR) of the changes
+    since the stored serial.
+  - Returns the zones in the format of C(zollo.windows.win_dns_info) with
+    l(type=all).
+  - The C(zollo.windows.dns_transfer) lookup reads zones the same way.
+options:
+  zones:
+    description:
+      - The names of the zones to read.
+    type: list
+    elements: str
+    required: true
+  server:
+    description:
+      - The DNS server to transfer the zones from.
+    type: str
+    required: true
+  port:
+    description:
+      - The TCP port of the DNS server.
+    type: int
+    default: 53
+  timeout:
+    description:
+      - The timeout of each network operation, in seconds.
+    type: int
+    default: 10
+  state_dir:
+    description:
+      - A directory where the serial and records of each zone are stored
+        after a transfer.
+      - When not set, every run is a full transfer.
+    type: path
+notes:
+  - The Windows DNS server only allows zone transfers to the servers listed
+    on the Zone Transfers tab of the zone.
+  - TSIG signed transfers are not supported.
+'''
+
+EXAMPLES = r'''
+- name: Read two zones, only the changes are transferred after the first run
+  zollo.windows.dns_transfer_info:
+    server: dns01.contoso.com
+    zones:
+      - contoso.com
+      - 1.0.10.in-addr.arpa
+    state_dir: ~/.ansible/dns_transfer
+  delegate_to: localhost
+  register: dns
+
+- name: Audit the forward and reverse records
+  ansible.builtin.debug:
+    msg: "{{ dns.zones | zollo.windows.dns_ptr_audit }}"
+'''
+
+RETURN = r'''
+zones:
+  description: The transferred zones with their records.
+  returned: always
+  type: list
+  elements: dict
+  sample:
+    - name: contoso.com
+      serial: 1207
+      transfer: ixfr
+      dns_records:
+        - name: web01
+          fqdn: web01.contoso.com
+          type: a
+          data: 10.0.1.10
+          ttl: 3600
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils._text import to_native
+from ansible_collections.zollo.windows.plugins.module_utils.dns_transfer import (
+    ZoneTransferError, load_state, save_state, state_file, transfer_zone)
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            zones=dict(type='list', elements='str', required=True),
+            server=dict(type='str', required=True),
+            port=dict(type='int', default=53),
+            timeout=dict(type='int', default=10),
+            state_dir=dict(type='path'),
+        ),
+        supports_check_mode=True,
+    )
+    server = module.params['server']
+    state_dir = module.params['state_dir']
+
+    zones = []
+    for zone in module.params['zones']:
+        path = state_file(state_dir, server, zone) if state_dir else None
+        try:
+            result = transfer_zone(server, zone, load_state(path), module.params['port'], module.params['timeout'])
+            if path and result['mode'] != 'unchanged' and not module.check_mode:
+                save_state(path, result)
+        except (ZoneTransferError, IOError, OSError, ValueError) as e:
+            module.fail_json(msg="Unable to transfer the zone %s from %s: %s" % (zone, server, to_native(e)))
+        zones.append({
+            'name': zone.rstrip('.').lower(),
+            'serial': result['serial'],
+            'transfer': result['mode'],
+            'dns_records': result['records'],
+        })
+
+    module.exit_json(changed=False, zones=zones)
+
+
+if __name__ == '__main__':
+    main()
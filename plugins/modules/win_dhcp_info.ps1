@@ -5,6 +5,7 @@
 # GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
 
 #AnsibleRequires -CSharpUtil Ansible.Basic
+#AnsibleRequires -PowerShell ansible_collections.zollo.windows.plugins.module_utils.DhcpClientId
 
 $spec = @{
     options = @{
@@ -12,51 +13,46 @@ $spec = @{
         scope_id = @{ type = "str" }
         ip = @{ type = "str" }
         mac = @{ type = "str" }
+        limit = @{ type = "int" }
+        offset = @{ type = "int" }
+        page_token = @{ type = "str"; no_log = $false }
+        count_only = @{ type = "bool"; default = $false }
+        export_path = @{ type = "path" }
+        since_digests = @{ type = "dict" }
+        filters = @{
+            type = "dict"
+            options = @{
+                address_state = @{ type = "list"; elements = "str" }
+                hostname = @{ type = "list"; elements = "str" }
+                ip_range = @{ type = "list"; elements = "str" }
+                mac = @{ type = "list"; elements = "str" }
+                expires_after = @{ type = "str" }
+                expires_before = @{ type = "str" }
+            }
+        }
     }
+    mutually_exclusive = @(
+        @("offset", "page_token"),
+        @("since_digests", "limit"),
+        @("since_digests", "offset"),
+        @("since_digests", "page_token"),
+        @("since_digests", "count_only")
+    )
 }
 
 $module = [Ansible.Basic.AnsibleModule]::Create($args, $spec)
-$parms = @{}
 
 $type = $module.Params.type
 $ip = $module.Params.ip
 $scope_id = $module.Params.scope_id
 $mac = $module.Params.mac
-
-Function Get-DhcpScopeLeasesObject {
-    Param(
-        [String]$LeaseName,
-        [String]$RecordName
-    )
-
-    $parms = @{ZoneName = $ZoneName }
-
-    if ($RRType) { $parms.RRType = $RRType }
-    if ($RecordName) { $parms.Name = $RecordName }
-    Get-DhcpServerv4Lease @parms
-    $leases = Get-DnsServerResourceRecord @parms
-
-    if ($FilterAd) { 
-        $records = $records | Where-Object {
-            ($_.HostName -notlike '_kerberos*') -and 
-            ($_.HostName -notlike '_ldap*') -and 
-            ($_.HostName -notlike '_kpasswd*') -and 
-            ($_.HostName -notlike '_gc*') -and 
-            ($_.HostName -notlike '*._msdcs*') -and
-            ($_.HostName -notlike 'gc._msdcs') -and
-            ($_.HostName -notlike '*_ldap._tcp*') -and
-            ($_.HostName -notlike '*forestdnszones*') -and
-            ($_.HostName -notlike '*domaindnszones*')
-        }
-    }
-
-    $lease_list = @()
-    foreach ($item in $records) {
-        $record_list += Get-DnsRecordObject -ZoneName $ZoneName -Object $item
-    }
-
-    return $record_list
-}
+$limit = $module.Params.limit
+$offset = $module.Params.offset
+$page_token = $module.Params.page_token
+$count_only = $module.Params.count_only
+$filters = $module.Params.filters
+$export_path = $module.Params.export_path
+$since_digests = $module.Params.since_digests
 
 Function Get-DhcpScopeObject {
     Param(
@@ -92,149 +88,356 @@ Function Get-DhcpLeaseObject {
     }
 }
 
-Function Get-AllDhcpLeaseObjects {
-    param(
-        [Parameter(Mandatory=$true)]$Type,
-        [Parameter(Mandatory=$false)]$ClientId,
-        [Parameter(Mandatory=$false)]$Scope
+Function ConvertTo-IPv4Range {
+    Param(
+        [String]$Range
     )
 
-    Switch($Type) {
-        "lease" { $query = 'Active' }
-        "reservation" { $query = '*Reservation*' }
-        "all" { $query = '*' }
+    # accepts a CIDR block, a start-end range or a single address
+    if ($Range -like '*/*') {
+        $network, $length = $Range.Split('/')
+        $length = [int]$length
+        if ($length -lt 0 -or $length -gt 32) { throw "Invalid prefix length in $Range" }
+        $size = [uint64][Math]::Pow(2, 32 - $length)
+        $start = [uint64](Convert-IPv4ToUInt32 -IPAddress $network) -band ([uint64]4294967296 - $size)
+        return @{ start = $start; end = $start + $size - 1 }
+    }
+    if ($Range -like '*-*') {
+        $first, $last = $Range.Split('-')
+        return @{
+            start = [uint64](Convert-IPv4ToUInt32 -IPAddress $first.Trim())
+            end = [uint64](Convert-IPv4ToUInt32 -IPAddress $last.Trim())
+        }
     }
+    $address = [uint64](Convert-IPv4ToUInt32 -IPAddress $Range)
+    return @{ start = $address; end = $address }
+}
 
-    # Limit/Filter to Defined Scope(s)
-    if($Scope) {
-        $leases = $Scope | Get-DhcpServerv4Lease
-    } else {
-        $leases = Get-DhcpServerv4Scope | Get-DhcpServerv4Lease
+Function New-DhcpLeaseFilter {
+    Param(
+        [String]$Type,
+        $Spec,
+        [String]$IPAddress,
+        [String]$ClientId
+    )
+
+    # compile the filter spec once, Test-DhcpLeaseFilter applies it per lease
+    $filter = @{
+        type_pattern = $null
+        ip_address = $null
+        ip = $null
+        mac = $null
+        states = $null
+        macs = $null
+        ranges = $null
+        hostnames = $null
+        expires_after = $null
+        expires_before = $null
+    }
+
+    Switch($Type) {
+        "lease" { $filter.type_pattern = 'Active' }
+        "reservation" { $filter.type_pattern = '*Reservation*' }
     }
 
-    # Limit/Filter by Defined Type
-    $leases = $leases | Where-Object {
-        $_.AddressState -like $query
+    if ($IPAddress) {
+        $filter.ip_address = $IPAddress
+        $filter.ip = [uint64](Convert-IPv4ToUInt32 -IPAddress $IPAddress)
     }
+    if ($ClientId) { $filter.mac = Get-ClientIdKey -ClientId $ClientId }
+    if (-not $Spec) { return $filter }
 
-    # Limit/Filter by Defined ClientId
-    if($ClientId) {
-        $leases = $leases | Where-Object {
-            (Convert-MacAddress -mac $_.ClientId) -like $ClientId
+    if ($Spec.address_state) {
+        $filter.states = New-Object -TypeName 'System.Collections.Generic.HashSet[String]' -ArgumentList ([StringComparer]::OrdinalIgnoreCase)
+        foreach ($state in $Spec.address_state) { [void]$filter.states.Add($state) }
+    }
+    if ($Spec.mac) {
+        $filter.macs = New-Object -TypeName 'System.Collections.Generic.HashSet[String]'
+        foreach ($item in $Spec.mac) { [void]$filter.macs.Add((Get-ClientIdKey -ClientId $item)) }
+    }
+    if ($Spec.ip_range) {
+        $filter.ranges = @(foreach ($range in $Spec.ip_range) { ConvertTo-IPv4Range -Range $range })
+    }
+    if ($Spec.hostname) {
+        # globs are merged into a single case insensitive regex
+        $patterns = foreach ($glob in $Spec.hostname) {
+            [Regex]::Escape($glob).Replace('\*', '.*').Replace('\?', '.')
         }
+        $filter.hostnames = New-Object -TypeName Regex -ArgumentList "^(?:$($patterns -join '|'))$", 'IgnoreCase, Compiled'
     }
+    if ($Spec.expires_after) { $filter.expires_after = [DateTime]::Parse($Spec.expires_after, [Globalization.CultureInfo]::InvariantCulture) }
+    if ($Spec.expires_before) { $filter.expires_before = [DateTime]::Parse($Spec.expires_before, [Globalization.CultureInfo]::InvariantCulture) }
 
-    # Return the Filtered List
-    return $leases
+    return $filter
 }
 
-Function Convert-IPAddressToMac {
-    param(
-        [String]$IPAddress
+Function Test-DhcpLeaseFilter {
+    Param(
+        [Hashtable]$Filter,
+        $Lease
     )
 
-    Try { $lease = Get-AllDhcpLeaseObjects -Type "all" | Where-Object { $_.IPAddress -like $IPAddress } }
-    Catch { return $false }
-    return $lease.ClientId
+    if ($Filter.type_pattern -and ($Lease.AddressState -notlike $Filter.type_pattern)) { return $false }
+    if ($Filter.states -and -not $Filter.states.Contains([String]$Lease.AddressState)) { return $false }
+
+    if ($Filter.mac -or $Filter.macs) {
+        $key = Get-ClientIdKey -ClientId $Lease.ClientId
+        if ($Filter.mac -and $key -ne $Filter.mac) { return $false }
+        if ($Filter.macs -and -not $Filter.macs.Contains($key)) { return $false }
+    }
+
+    if (($null -ne $Filter.ip) -or $Filter.ranges) {
+        $address = [uint64](Convert-IPv4ToUInt32 -IPAddress $Lease.IPAddress.IPAddressToString)
+        if (($null -ne $Filter.ip) -and $address -ne $Filter.ip) { return $false }
+        if ($Filter.ranges) {
+            $in_range = $false
+            foreach ($range in $Filter.ranges) {
+                if ($address -ge $range.start -and $address -le $range.end) { $in_range = $true; break }
+            }
+            if (-not $in_range) { return $false }
+        }
+    }
+
+    if ($Filter.hostnames -and -not $Filter.hostnames.IsMatch([String]$Lease.HostName)) { return $false }
+
+    if ($Filter.expires_after -or $Filter.expires_before) {
+        if ($null -eq $Lease.LeaseExpiryTime) { return $false }
+        if ($Filter.expires_after -and $Lease.LeaseExpiryTime -lt $Filter.expires_after) { return $false }
+        if ($Filter.expires_before -and $Lease.LeaseExpiryTime -gt $Filter.expires_before) { return $false }
+    }
+
+    return $true
 }
 
-Function Convert-MacAddress {
+Function Test-DhcpScopeFilter {
     Param(
-        [string]$mac
+        [Hashtable]$Filter,
+        $Scope
     )
 
-    # Evaluate Length
-    if ($mac.Length -eq 12) {
-        return $mac.Insert(2, "-").Insert(5, "-").Insert(8, "-").Insert(11, "-").Insert(14, "-")
-    } elseif ($mac.Length -eq 17) {
-        if($mac -like "*:*:*:*:*:*") { return ($mac -replace ':') }
-        if ($mac -like "*-*-*-*-*-*") { return ($mac -replace '-') }
-    } else {
+    # skip scopes whose subnet cannot contain a matching address
+    if (($null -eq $Filter.ip) -and -not $Filter.ranges) { return $true }
+
+    $mask = [uint64](Convert-IPv4ToUInt32 -IPAddress $Scope.SubnetMask.IPAddressToString)
+    $first = [uint64](Convert-IPv4ToUInt32 -IPAddress $Scope.ScopeId.IPAddressToString) -band $mask
+    $last = $first + (4294967295 - $mask)
+
+    if (($null -ne $Filter.ip) -and ($Filter.ip -lt $first -or $Filter.ip -gt $last)) { return $false }
+    if ($Filter.ranges) {
+        foreach ($range in $Filter.ranges) {
+            if ($range.start -le $last -and $range.end -ge $first) { return $true }
+        }
         return $false
     }
-}
 
-# attempt import of module
-Try { Import-Module DhcpServer }
-Catch { $module.FailJson("The DhcpServer module failed to load properly: $($_.Exception.Message)", $_) }
+    return $true
+}
 
-# determine data struct
-if ($type -in @('lease','reservation')) { $module.Result.leases = @() } 
-else { $module.Result.scopes = @() }
-$scopes_tmp = @()
+Function Get-DhcpLeaseObjects {
+    param(
+        [Parameter(Mandatory=$true)][Hashtable]$Filter,
+        [Parameter(Mandatory=$true)]$Scope
+    )
 
-# convert ip to mac address/client id if needed
-if ($ip) { $mac = Convert-IPAddressToMac -IPAddress $ip }
+    # a single address is fetched directly instead of listing the scope
+    if ($null -ne $Filter.ip) {
+        $leases = Get-DhcpServerv4Lease -IPAddress $Filter.ip_address -ErrorAction SilentlyContinue
+    } else {
+        $leases = $Scope | Get-DhcpServerv4Lease
+    }
 
-Try {
-    # determine current scopes
-    if ($scope_id) { $scopes_tmp += Get-DhcpServerv4Scope -ScopeId $scope_id }
-    else { $scopes_tmp = Get-DhcpServerv4Scope }
-}
-Catch {
-    $module.FailJson("Unable to retrive scope(s) from DHCP server: $($_.Exception.Message)", $_)
+    # single pass over the lease stream
+    foreach ($lease in $leases) {
+        if (Test-DhcpLeaseFilter -Filter $Filter -Lease $lease) { $lease }
+    }
 }
 
-# determine leases
-if ($mac) {
-    Try { $current_lease = Get-AllDhcpLeaseObjects -Type $type -ClientId (Convert-MacAddress -mac $mac) }
-    Catch { $module.FailJson("Unable to retrive lease/reservation from DHCP server", $_) }
+Function Convert-IPv4ToUInt32 {
+    Param(
+        [string]$IPAddress
+    )
+
+    $bytes = ([System.Net.IPAddress]$IPAddress).GetAddressBytes()
+    [Array]::Reverse($bytes)
+    return [BitConverter]::ToUInt32($bytes, 0)
 }
 
+Function Get-DhcpLeaseDigest {
+    Param(
+        $Leases
+    )
 
+    # leases are hashed in address order so the digest is stable between runs
+    $sha = [System.Security.Cryptography.SHA256]::Create()
+    foreach ($lease in $Leases) {
+        $expiry = ""
+        if ($lease.LeaseExpiryTime) { $expiry = $lease.LeaseExpiryTime.ToUniversalTime().ToString("o") }
+        $line = "$($lease.IPAddress.IPAddressToString)|$($lease.AddressState)|$(Get-ClientIdKey -ClientId $lease.ClientId)|$expiry`n"
+        $bytes = [System.Text.Encoding]::UTF8.GetBytes($line)
+        [void]$sha.TransformBlock($bytes, 0, $bytes.Length, $null, 0)
+    }
+    [void]$sha.TransformFinalBlock([byte[]]@(), 0, 0)
+    $digest = [BitConverter]::ToString($sha.Hash).Replace("-", "").ToLower()
+    $sha.Dispose()
 
+    return $digest
+}
 
+Function ConvertTo-PageToken {
+    Param(
+        [String]$ScopeId,
+        [String]$IPAddress
+    )
 
+    # opaque cursor pointing at the last returned scope/lease
+    return [Convert]::ToBase64String([System.Text.Encoding]::UTF8.GetBytes("$ScopeId|$IPAddress"))
+}
 
-Try {
-    foreach ($scope in $scopes_tmp) {
+Function ConvertFrom-PageToken {
+    Param(
+        [String]$Token
+    )
 
-        $scope_parsed = Get-DhcpScopeObject -Object $scope
+    $scope_part, $ip_part = [System.Text.Encoding]::UTF8.GetString([Convert]::FromBase64String($Token)).Split('|')
+    $cursor = @{ scope = Convert-IPv4ToUInt32 -IPAddress $scope_part; ip = $null }
+    if ($ip_part) { $cursor.ip = Convert-IPv4ToUInt32 -IPAddress $ip_part }
 
-        if ($type -eq "scope") { $module.Result.scopes += $scope_parsed }
+    return $cursor
+}
 
-        $lease_tmp = Get-DnsScopeLeasesObject -RecordName $record_name -ZoneName $zone.ZoneName -FilterAd $filter_ad -RRType $record_type
+# attempt import of module
+Try { Import-Module DhcpServer }
+Catch { $module.FailJson("The DhcpServer module failed to load properly: $($_.Exception.Message)", $_) }
 
-        if ($type -eq "record") { $module.Result.records += $dns_tmp }
+# export mode: a single XML dump instead of per-scope enumeration
+if ($export_path) {
+    $export_params = @{ File = $export_path; Leases = $true; Force = $true }
+    if ($scope_id) { $export_params.ScopeId = $scope_id }
+    Try { Export-DhcpServer @export_params }
+    Catch { $module.FailJson("Unable to export the DHCP server to $($export_path): $($_.Exception.Message)", $_) }
 
-        if ($type -eq "all") {
-            $zone_parsed.dns_records = $dns_tmp
-            $module.Result.zones += $zone_parsed
-        }
-    }
-}
-Catch {
-    $module.FailJson("Unable to retreive lease(s) from DHCP server: $($_.Exception.Message)", $_)
+    $module.Result.export_path = $export_path
+    $module.Result.export_size = (Get-Item -LiteralPath $export_path).Length
+    $module.ExitJson()
 }
 
+# validate paging params
+if ($null -ne $limit -and $limit -lt 1) { $module.FailJson("The limit parameter must be greater than 0") }
+if ($null -ne $offset -and $offset -lt 0) { $module.FailJson("The offset parameter must not be negative") }
+if ($page_token) {
+    Try { $cursor = ConvertFrom-PageToken -Token $page_token }
+    Catch { $module.FailJson("The page_token parameter is not valid: $($_.Exception.Message)", $_) }
+}
+$skip = 0
+if ($offset) { $skip = $offset }
 
+# compile the lease filter once
+Try { $lease_filter = New-DhcpLeaseFilter -Type $type -Spec $filters -IPAddress $ip -ClientId $mac }
+Catch { $module.FailJson("Unable to parse the lease filters: $($_.Exception.Message)", $_) }
 
+Try {
+    # determine current scopes, sorted by scope id
+    if ($scope_id) { $scopes_tmp = @(Get-DhcpServerv4Scope -ScopeId $scope_id) }
+    else { $scopes_tmp = @(Get-DhcpServerv4Scope) }
+    $scopes_tmp = @($scopes_tmp | Sort-Object { Convert-IPv4ToUInt32 -IPAddress $_.ScopeId.IPAddressToString })
+}
+Catch {
+    $module.FailJson("Unable to retrive scope(s) from DHCP server: $($_.Exception.Message)", $_)
+}
 
+# type: scope/all
+if (($type -eq "scope") -or ($type -eq "all")) {
+    $module.Result.scope_count = $scopes_tmp.Count
+    if (-not $count_only) {
+        $scope_list = [System.Collections.ArrayList]@()
+        $more = $false
+        foreach ($scope in $scopes_tmp) {
+            # only the scope list is paged when type=scope
+            if ($type -eq "scope") {
+                if ($cursor -and (Convert-IPv4ToUInt32 -IPAddress $scope.ScopeId.IPAddressToString) -le $cursor.scope) { continue }
+                if ($skip -gt 0) { $skip--; continue }
+                if ($limit -and $scope_list.Count -ge $limit) { $more = $true; break }
+                $last_scope = $scope
+            }
+            [void]$scope_list.Add((Get-DhcpScopeObject -Object $scope))
+        }
+        $module.Result.scopes = $scope_list
+        if ($more) {
+            $module.Result.next_page_token = ConvertTo-PageToken -ScopeId $last_scope.ScopeId.IPAddressToString
+        }
+    }
+}
 
+# watermark mode: only scopes whose lease digest changed return leases
+if ($null -ne $since_digests) {
+    if ($type -eq "scope") { $module.FailJson("The since_digests parameter requires type lease, reservation or all") }
 
+    $digests = @{}
+    $changed_scopes = [System.Collections.ArrayList]@()
+    $lease_list = [System.Collections.ArrayList]@()
 
+    Try {
+        foreach ($scope in $scopes_tmp) {
+            if (-not (Test-DhcpScopeFilter -Filter $lease_filter -Scope $scope)) { continue }
 
+            $id = $scope.ScopeId.IPAddressToString
+            $scope_leases = @(Get-DhcpLeaseObjects -Filter $lease_filter -Scope $scope |
+                Sort-Object { Convert-IPv4ToUInt32 -IPAddress $_.IPAddress.IPAddressToString })
+            $digests[$id] = Get-DhcpLeaseDigest -Leases $scope_leases
+            if ($since_digests[$id] -eq $digests[$id]) { continue }
 
+            [void]$changed_scopes.Add($id)
+            foreach ($lease in $scope_leases) { [void]$lease_list.Add((Get-DhcpLeaseObject -Object $lease)) }
+        }
+    } Catch { $module.FailJson("Unable to retrive leases/reservations from DHCP server: $($_.Exception.Message)", $_) }
 
+    # scopes of the previous run that no longer exist or are filtered out
+    $removed_scopes = @($since_digests.Keys | Where-Object { -not $digests.ContainsKey($_) } | Sort-Object)
+    if ($scope_id) { $removed_scopes = @($removed_scopes | Where-Object { $_ -eq $scope_id }) }
 
-
-# type: scope/all
-if (($type -eq "scope") -or ($type -eq "all")) {
-    Try { $current_scope | ForEach-Object { $module.Result.scopes += Get-DhcpScopeReturnObject -Object $_ } }
-    Catch { $module.FailJson("Unable to retrive scope(s) from DHCP server", $_) }
+    $module.Result.digests = $digests
+    $module.Result.changed_scopes = $changed_scopes
+    $module.Result.removed_scopes = $removed_scopes
+    $module.Result.leases = $lease_list
+    $module.ExitJson()
 }
 
 # type: lease/reservation/all
-if (($type -ne "scope") -or ($type -eq "all")) {
+if ($type -ne "scope") {
+    $lease_list = [System.Collections.ArrayList]@()
+    $lease_count = 0
+    $more = $false
+
     Try {
-        if ((-not $mac) -and (-not $ip)) {
-            (Get-AllDhcpLeaseObjects -Type $type -Scope $current_scope) | ForEach-Object { 
-                $module.Result.leases += Get-DhcpLeaseReturnObject -Object $_ 
+        # walk scopes and leases in (scope, ip) order, stopping once the page is full
+        :scopes foreach ($scope in $scopes_tmp) {
+            $scope_key = Convert-IPv4ToUInt32 -IPAddress $scope.ScopeId.IPAddressToString
+            if ($cursor -and $scope_key -lt $cursor.scope) { continue }
+            if (-not (Test-DhcpScopeFilter -Filter $lease_filter -Scope $scope)) { continue }
+
+            $scope_leases = Get-DhcpLeaseObjects -Filter $lease_filter -Scope $scope |
+                Sort-Object { Convert-IPv4ToUInt32 -IPAddress $_.IPAddress.IPAddressToString }
+
+            foreach ($lease in $scope_leases) {
+                if ($cursor -and $scope_key -eq $cursor.scope -and
+                    (Convert-IPv4ToUInt32 -IPAddress $lease.IPAddress.IPAddressToString) -le $cursor.ip) { continue }
+                if ($count_only) { $lease_count++; continue }
+                if ($skip -gt 0) { $skip--; continue }
+                if ($limit -and $lease_list.Count -ge $limit) { $more = $true; break scopes }
+                [void]$lease_list.Add((Get-DhcpLeaseObject -Object $lease))
+                $last_lease = $lease
             }
-        } else { 
-            $module.Result.leases += (Get-DhcpLeaseReturnObject -Object $current_lease -Scope $current_scope) 
         }
-    } Catch { $module.FailJson("Unable to retrive leases/reservations from DHCP server", $_) }
+    } Catch { $module.FailJson("Unable to retrive leases/reservations from DHCP server: $($_.Exception.Message)", $_) }
+
+    if ($count_only) {
+        $module.Result.lease_count = $lease_count
+    } else {
+        $module.Result.leases = $lease_list
+        if ($more) {
+            $module.Result.next_page_token = ConvertTo-PageToken -ScopeId $last_lease.ScopeId.IPAddressToString -IPAddress $last_lease.IPAddress.IPAddressToString
+        }
+    }
 }
 
-$module.ExitJson()
\ No newline at end of file
+$module.ExitJson()
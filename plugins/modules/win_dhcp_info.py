@@ -49,6 +49,104 @@ options:
       - Windows clients use the MAC address as the client ID, Linux and other 
         operating systems can use other types of identifiers.
     type: str
+  limit:
+    description:
+      - The maximum number of leases/reservations to return.
+      - When l(type=scope), limits the number of scopes returned instead.
+      - Results are sorted by scope ID and then by IP address, so pages are
+        stable between runs.
+      - When more results are available, l(next_page_token) is returned and
+        can be passed as l(page_token) to retrieve the next page.
+    type: int
+  offset:
+    description:
+      - The number of leases/reservations (or scopes when l(type=scope)) to
+        skip before returning results.
+      - Mutually exclusive with l(page_token).
+    type: int
+  page_token:
+    description:
+      - An opaque token returned as l(next_page_token) by a previous run.
+      - Results resume directly after the last lease/scope of the previous
+        page. Scopes before the token are not enumerated.
+      - Mutually exclusive with l(offset).
+    type: str
+  count_only:
+    description:
+      - When set to l(true), only the number of matching scopes and
+        leases/reservations is returned, as l(scope_count) and l(lease_count).
+    type: bool
+    default: false
+  filters:
+    description:
+      - Additional filters applied to leases/reservations on the DHCP server.
+      - The filters are parsed once and applied in a single pass over each
+        scope, all specified filters must match.
+      - When l(ip_range) or l(ip) are set, scopes that cannot contain a
+        matching address are not enumerated.
+    type: dict
+    suboptions:
+      address_state:
+        description:
+          - A list of address states to match, for example l(Active),
+            l(ActiveReservation), l(InactiveReservation) or l(Declined).
+        type: list
+        elements: str
+      hostname:
+        description:
+          - A list of case insensitive glob patterns matched against the
+            hostname of the lease, for example l(web-*.contoso.com).
+        type: list
+        elements: str
+      ip_range:
+        description:
+          - A list of IPv4 address ranges to match.
+          - Each entry is a CIDR block (l(10.0.1.0/24)), a range
+            (l(10.0.1.10-10.0.1.50)) or a single address.
+        type: list
+        elements: str
+      mac:
+        description:
+          - A list of client IDs to match.
+          - Separators and case are ignored, l(00-AA-BB-C3-E4-F5) and
+            l(00:aa:bb:c3:e4:f5) are equivalent.
+        type: list
+        elements: str
+      expires_after:
+        description:
+          - Only match leases expiring at or after this date/time, for example
+            l(2020-06-01T00:00:00).
+          - Reservations have no expiry and never match.
+        type: str
+      expires_before:
+        description:
+          - Only match leases expiring at or before this date/time.
+          - Reservations have no expiry and never match.
+        type: str
+  since_digests:
+    description:
+      - Enables the change watermark mode, a dict of scope ids to the
+        digests returned as C(digests) by a previous run.
+      - A digest is computed on the DHCP server for each scope over the IP
+        address, address state, client ID and expiry of its matching leases.
+        Only the leases of scopes whose digest differs from
+        l(since_digests) are returned, unchanged scopes are not serialized.
+      - Pass an empty dict on the first run to return every scope.
+      - Requires l(type=lease), l(type=reservation) or l(type=all), and is
+        mutually exclusive with l(limit), l(offset), l(page_token) and
+        l(count_only).
+    type: dict
+  export_path:
+    description:
+      - Path on the DHCP server to write a C(Export-DhcpServer -Leases) XML
+        dump of the server, or of l(scope_id) when set.
+      - A single export is much faster than enumerating every scope for
+        full-server audits. Fetch the file and read it on the controller with
+        the C(zollo.windows.dhcp_export) lookup, which streams it and returns
+        the same scope and lease shape as this module.
+      - When set, no scopes or leases are returned and the other options are
+        ignored.
+    type: path
 '''
 
 EXAMPLES = r'''
@@ -89,6 +187,58 @@ EXAMPLES = r'''
     type: lease
     mac: '00:AA:BB:C3:E4:F5'
   register: dhcp
+
+- name: Gather info on active leases for web servers in two subnets
+  community.windows.win_dhcp_info:
+    type: lease
+    filters:
+      hostname:
+        - web-*
+      ip_range:
+        - 10.0.1.0/24
+        - 10.0.2.10-10.0.2.50
+  register: dhcp
+
+- name: Gather info on leases expiring in the next day
+  community.windows.win_dhcp_info:
+    type: lease
+    filters:
+      expires_before: "{{ '%Y-%m-%dT%H:%M:%S' | strftime(ansible_date_time.epoch | int + 86400) }}"
+  register: dhcp
+
+- name: Count the DHCP reservations on the server
+  community.windows.win_dhcp_info:
+    type: reservation
+    count_only: true
+  register: dhcp
+
+- name: Walk all DHCP leases 500 at a time
+  community.windows.win_dhcp_info:
+    type: lease
+    limit: 500
+    page_token: "{{ dhcp.next_page_token | default(omit) }}"
+  register: dhcp
+
+- name: Return only the leases of scopes that changed since the last run
+  community.windows.win_dhcp_info:
+    type: lease
+    since_digests: "{{ dhcp_watermark.digests | default({}) }}"
+  register: dhcp_watermark
+
+- name: Export the whole DHCP server for an audit
+  community.windows.win_dhcp_info:
+    export_path: C:\Windows\Temp\dhcp_export.xml
+  register: dhcp_export
+
+- name: Fetch the export to the controller
+  ansible.builtin.fetch:
+    src: '{{ dhcp_export.export_path }}'
+    dest: exports/dhcp.xml
+    flat: yes
+
+- name: Read the active leases of a scope from the export
+  ansible.builtin.set_fact:
+    leases: "{{ lookup('zollo.windows.dhcp_export', 'exports/dhcp.xml', type='lease', scope_id='10.0.1.0', wantlist=True) }}"
 '''
 
 RETURN = r'''
@@ -133,4 +283,56 @@ scopes:
     lease_duration:
       days: 0
       hours: 3
+
+next_page_token:
+  description:
+    - Opaque token to pass as l(page_token) to retrieve the next page.
+  returned: When l(limit) is set and more results are available
+  type: str
+  sample: MTAuMC4xLjB8MTAuMC4xLjE1MA==
+
+lease_count:
+  description: Number of matching leases/reservations
+  returned: When l(count_only=true) and l(type) is not l(scope)
+  type: int
+  sample: 4231
+
+scope_count:
+  description: Number of matching scopes
+  returned: When l(type=scope) or l(type=all)
+  type: int
+  sample: 60
+
+export_path:
+  description: The path of the XML export on the DHCP server
+  returned: When l(export_path) is set
+  type: str
+  sample: C:\Windows\Temp\dhcp_export.xml
+
+export_size:
+  description: The size of the XML export in bytes
+  returned: When l(export_path) is set
+  type: int
+  sample: 18874368
+
+digests:
+  description: The new digest of every selected scope, pass it as l(since_digests) on the next run
+  returned: When l(since_digests) is set
+  type: dict
+  sample:
+    10.0.1.0: 5d41402abc4b2a76b9719d911017c592c8f0f7b1e2c7d3b6b6d0a0a2f5c1e7a4
+    10.0.2.0: 2cf24dba5fb0a30e26e83b2ac5b9e29e1b161e5c1fa7425e73043362938b9824
+
+changed_scopes:
+  description: The scopes whose digest changed, their leases are returned in C(leases)
+  returned: When l(since_digests) is set
+  type: list
+  sample:
+  - 10.0.2.0
+
+removed_scopes:
+  description: Scopes of l(since_digests) that no longer exist or are no longer selected
+  returned: When l(since_digests) is set
+  type: list
+  sample: []
 '''
@@ -5,6 +5,7 @@
 # GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
 
 #AnsibleRequires -CSharpUtil Ansible.Basic
+#AnsibleRequires -PowerShell ansible_collections.zollo.windows.plugins.module_utils.DhcpClientId
 
 $spec = @{
     options = @{
@@ -18,10 +19,29 @@ $spec = @{
         reservation_name = @{ type = "str"; }
         description = @{ type = "str"; }
         state = @{ type = "str"; choices = "absent", "present"; default = "present" }
+        known_scopes = @{ type = "list"; elements = "dict" }
+        leases = @{
+            type = "list"
+            elements = "dict"
+            options = @{
+                type = @{ type = "str"; choices = "reservation", "lease" }
+                ip = @{ type = "str" }
+                scope_id = @{ type = "str" }
+                mac = @{ type = "str" }
+                duration = @{ type = "int" }
+                dns_hostname = @{ type = "str"; }
+                dns_regtype = @{ type = "str"; choices = "aptr", "a", "noreg" }
+                reservation_name = @{ type = "str"; }
+                description = @{ type = "str"; }
+                state = @{ type = "str"; choices = "absent", "present" }
+            }
+            required_one_of = @(, @("mac", "ip"))
+        }
     }
-    required_if = @(
-        @("state", "present", @("mac", "ip"), $true),
-        @("state", "absent", @("mac", "ip"), $true)
+    required_one_of = @(, @("mac", "ip", "leases"))
+    mutually_exclusive = @(
+        @("leases", "ip"),
+        @("leases", "mac")
     )
     supports_check_mode = $true
 }
@@ -29,42 +49,11 @@ $spec = @{
 $module = [Ansible.Basic.AnsibleModule]::Create($args, $spec)
 $check_mode = $module.CheckMode
 
-$type = $module.Params.type
-$ip = $module.Params.ip
-$scope_id = $module.Params.scope_id
-$mac = $module.Params.mac
-$duration = $module.Params.duration
-$dns_hostname = $module.Params.dns_hostname
-$dns_regtype = $module.Params.dns_regtype
-$reservation_name = $module.Params.reservation_name
-$description = $module.Params.description
-$state = $module.Params.state
-
-Function Convert-MacAddress {
-    Param(
-        [string]$mac
-    )
+$leases = $module.Params.leases
 
-    # Evaluate Length
-    if ($mac.Length -eq 12) {
-        # Insert Dashes
-        $mac = $mac.Insert(2, "-").Insert(5, "-").Insert(8, "-").Insert(11, "-").Insert(14, "-")
-        return $mac
-    }
-    elseif ($mac.Length -eq 17) {
-        # Remove Colons
-        if($mac -like "*:*:*:*:*:*") {
-            return ($mac -replace ':')
-        }
-        # Remove Dashes
-        if ($mac -like "*-*-*-*-*-*") {
-            return ($mac -replace '-')
-        }
-    }
-    else {
-        return $false
-    }
-}
+# options shared by a single lease and each entry of leases
+$lease_options = @('type', 'ip', 'scope_id', 'mac', 'duration', 'dns_hostname',
+                    'dns_regtype', 'reservation_name', 'description', 'state')
 
 Function Compare-DhcpLease {
     Param(
@@ -97,176 +86,294 @@ Function Convert-ReturnValue {
     }
 }
 
-# Parse Regtype
-if ($dns_regtype) {
-    Switch ($dns_regtype) {
-        "aptr" { $dns_regtype = "AandPTR"; break }
-        "a" { $dns_regtype = "A"; break }
-        "noreg" { $dns_regtype = "NoRegistration"; break }
-        default { $dns_regtype = "NoRegistration"; break }
+Function Get-DhcpLeaseItem {
+    Param(
+        $Item
+    )
+
+    # Unset values fall back to the top level module options
+    $lease = @{}
+    foreach ($key in $lease_options) {
+        if ($null -ne $Item.$key) { $lease.$key = $Item.$key }
+        else { $lease.$key = $module.Params.$key }
     }
-}
 
-Try {
-    # Import DHCP Server PS Module
-    Import-Module DhcpServer
+    # Parse Regtype
+    Switch ($lease.dns_regtype) {
+        "aptr" { $lease.dns_regtype = "AandPTR"; break }
+        "a" { $lease.dns_regtype = "A"; break }
+        "noreg" { $lease.dns_regtype = "NoRegistration"; break }
+        default { $lease.dns_regtype = "NoRegistration"; break }
+    }
+
+    # MacAddress was specified
+    if ($lease.mac) {
+        $lease.mac_key = Get-ClientIdKey -ClientId $lease.mac
+        if ($lease.mac_key -notmatch '^[0-9A-F]+$') {
+            $module.FailJson("The MAC Address $($lease.mac) is not properly formatted")
+        }
+        if ($lease.mac_key.Length -eq 12) {
+            $lease.client_id = Convert-MacAddress -mac $lease.mac_key
+            $lease.mac = $lease.mac_key
+        }
+        else {
+            $lease.client_id = $lease.mac
+        }
+    }
+
+    if ($lease.ip) { $lease.label = $lease.ip } else { $lease.label = $lease.mac }
+
+    return $lease
 }
-Catch {
-    # Couldn't load the DhcpServer Module
-    $module.FailJson("The DhcpServer module failed to load properly: $($_.Exception.Message)", $_)
+
+Function Get-DhcpLeaseIndex {
+    Param(
+        $Leases
+    )
+
+    # In-memory lookup tables keyed by IP address and client id
+    $index = @{ ip = @{}; client_id = @{} }
+    foreach ($lease in $Leases) {
+        Add-DhcpLeaseIndexEntry -Index $index -Lease $lease
+    }
+
+    return $index
 }
 
-# Determine if there is an existing lease
-if ($ip) {
-    $current_lease = Get-DhcpServerv4Scope | Get-DhcpServerv4Lease | Where-Object IPAddress -eq $ip
+Function Add-DhcpLeaseIndexEntry {
+    Param(
+        [Hashtable]$Index,
+        $Lease
+    )
+
+    if ($null -eq $Lease) { return }
+    $Index.ip[$Lease.IPAddress.IPAddressToString] = $Lease
+    $Index.client_id[(Get-ClientIdKey -ClientId $Lease.ClientId)] = $Lease
 }
 
-# MacAddress was specified
-if ($mac) {
-    if ($mac -like "*-*") {
-        $mac_original = $mac
-        $mac = Convert-MacAddress -mac $mac
-    }
+Function Remove-DhcpLeaseIndexEntry {
+    Param(
+        [Hashtable]$Index,
+        $Lease
+    )
 
-    if ($mac -eq $false) {
-        $module.FailJson("The MAC Address is not properly formatted")
-    }
-    else {
-        $current_lease = Get-DhcpServerv4Scope | Get-DhcpServerv4Lease | Where-Object ClientId -eq $mac_original
-    }
+    $Index.ip.Remove($Lease.IPAddress.IPAddressToString)
+    $Index.client_id.Remove((Get-ClientIdKey -ClientId $Lease.ClientId))
 }
 
-# Did we find a lease/reservation
-if ($current_lease) {
-    $current_lease_exists = $true
-    $original_lease = $current_lease
-    $module.Diff.before = Convert-ReturnValue -Object $original_lease
+Function Find-DhcpLease {
+    Param(
+        [Hashtable]$Lease,
+        [Hashtable]$Index
+    )
+
+    # A MAC address takes precedence over the IP address
+    if ($Lease.mac) { return $Index.client_id[$Lease.mac_key] }
+    if ($Lease.ip) { return $Index.ip[$Lease.ip] }
 }
-else {
-    $current_lease_exists = $false
+
+Function Convert-IPv4ToUInt32 {
+    Param(
+        [string]$IPAddress
+    )
+
+    $bytes = ([System.Net.IPAddress]$IPAddress).GetAddressBytes()
+    [Array]::Reverse($bytes)
+    return [BitConverter]::ToUInt32($bytes, 0)
 }
 
-# If we found a lease, is it a reservation?
-if ($current_lease_exists -eq $true -and ($current_lease.AddressState -like "*Reservation*")) {
-    $current_lease_reservation = $true
+Function Get-DhcpScopeTable {
+    Param(
+        $Scopes
+    )
+
+    # Network/mask pairs used to resolve the scope that owns an address
+    $table = [System.Collections.ArrayList]@()
+    foreach ($scope in $Scopes) {
+        $mask = Convert-IPv4ToUInt32 -IPAddress $scope.SubnetMask.IPAddressToString
+        [void]$table.Add(@{
+            scope_id = $scope.ScopeId.IPAddressToString
+            network = (Convert-IPv4ToUInt32 -IPAddress $scope.ScopeId.IPAddressToString) -band $mask
+            mask = $mask
+        })
+    }
+
+    return ,$table
 }
-else {
-    $current_lease_reservation = $false
+
+Function Find-DhcpLeaseScope {
+    Param(
+        $Table,
+        [string]$IPAddress
+    )
+
+    # Returns every scope whose subnet contains the address
+    $address = Convert-IPv4ToUInt32 -IPAddress $IPAddress
+    return @($Table | Where-Object { ($address -band $_.mask) -eq $_.network } | ForEach-Object { $_.scope_id })
 }
 
-# State: Absent
-# Ensure the DHCP Lease/Reservation is not present
-if ($state -eq "absent") {
-    # If the lease doesn't exist, our work here is done
-    if ($current_lease_exists -eq $false) {
-        $module.Result.msg = "The lease doesn't exist."
-    } else {
-        # If the lease exists, we need to destroy it
-        if ($current_lease_reservation -eq $true) {
-            # Try to remove reservation
-            Try {
-                $current_lease | Remove-DhcpServerv4Reservation -WhatIf:$check_mode
-                $state_absent_removed = $true
-            }
-            Catch {
-                $state_absent_removed = $false
-                $remove_err = $_
-            }
-        }
-        else {
-            # Try to remove lease
-            Try {
-                $current_lease | Remove-DhcpServerv4Lease -WhatIf:$check_mode
-                $state_absent_removed = $true
-            }
-            Catch {
-                $state_absent_removed = $false
-                $remove_err = $_
-            }
-        }
+Function Get-DhcpLeaseDirect {
+    Param(
+        [Hashtable]$Lease,
+        [String]$ScopeId
+    )
 
-        # See if we removed the lease/reservation
-        if ($state_absent_removed) {
-            $module.Result.changed = $true
+    # Query the DHCP server for a single lease, missing leases return $null, other
+    # errors such as RPC or access denied are thrown to the caller
+    Try {
+        if ($Lease.mac) {
+            return Get-DhcpServerv4Lease -ClientId $Lease.client_id -ScopeId $ScopeId -ErrorAction Stop
         }
-        else {
-            $module.Result.lease = Convert-ReturnValue -Object $current_lease
-            $module.FailJson("Unable to remove lease/reservation: $($remove_err.Exception.Message)", $remove_err)
+        elseif ($Lease.ip) {
+            return Get-DhcpServerv4Lease -IPAddress $Lease.ip -ErrorAction Stop
+        }
+    }
+    Catch {
+        # DHCP 20013 is the record not found error of the DHCP server database
+        if ($_.CategoryInfo.Category -eq 'ObjectNotFound' -or $_.FullyQualifiedErrorId -like 'DHCP 20013,*') {
+            return $null
         }
+        throw
     }
 }
 
-# State: Present
-# Ensure the DHCP Lease/Reservation is present, and consistent
-if ($state -eq "present") {
-    # Current lease exists, and is not a reservation
-    if (($current_lease_reservation -eq $false) -and ($current_lease_exists -eq $true)) {
-        if ($type -eq "reservation") {
-            Try {
-                # Update parameters
-                $params = @{ }
+Function Get-DhcpReservationParams {
+    Param(
+        [Hashtable]$Lease,
+        $Current
+    )
 
-                if ($mac) {
-                    $params.ClientId = $mac
-                } else {
-                    $params.ClientId = $current_lease.ClientId
-                }
+    $params = @{ }
 
-                if ($description) {
-                    $params.Description = $description
-                } else {
-                    $params.Description = $current_lease.Description
-                }
+    if ($Lease.mac) {
+        $params.ClientId = $Lease.mac
+    } else {
+        $params.ClientId = $Current.ClientId
+    }
 
-                if ($reservation_name) {
-                    $params.Name = $reservation_name
-                } else {
-                    $params.Name = "reservation-" + $params.ClientId
-                }
+    if ($Lease.description) {
+        $params.Description = $Lease.description
+    } else {
+        $params.Description = $Current.Description
+    }
 
-                # Desired type is reservation
-                $current_lease | Add-DhcpServerv4Reservation -WhatIf:$check_mode
+    if ($Lease.reservation_name) {
+        $params.Name = $Lease.reservation_name
+    } elseif ($Current.AddressState -notlike "*Reservation*") {
+        # Converted leases get a generated name
+        $params.Name = "reservation-" + $params.ClientId
+    } elseif ($null -eq $Current.Name) {
+        # Original lease had a null name so let's generate one
+        $params.Name = "reservation-" + $Current.ClientId
+    } else {
+        $params.Name = $Current.Name
+    }
 
-                if(-not $check_mode) {
-                    $current_reservation = Get-DhcpServerv4Lease -ClientId $params.ClientId -ScopeId $current_lease.ScopeId
-                }
+    return $params
+}
 
-                # Update the reservation with new values
-                $current_reservation | Set-DhcpServerv4Reservation @params -WhatIf:$check_mode
+Function Set-DhcpLeaseState {
+    Param(
+        [Hashtable]$Lease,
+        $Current,
+        [Hashtable]$Index
+    )
 
-                if(-not $check_mode) {
-                    $updated_reservation = Get-DhcpServerv4Lease -ClientId $params.ClientId -ScopeId $current_reservation.ScopeId
-                }
+    $result = @{ changed = $false; before = ""; after = "" }
+    $current_lease_exists = $null -ne $Current
+    $current_lease_reservation = $current_lease_exists -and ($Current.AddressState -like "*Reservation*")
 
-                if(-not $check_mode) {
-                    # Compare Values
-                    $module.Result.changed = Compare-DhcpLease -Original $original_lease -Updated $updated_reservation
-                    $module.Result.lease = Convert-ReturnValue -Object $updated_reservation
-                } else {
-                    $module.Result.changed = $true
-                }
+    if ($current_lease_exists) {
+        $result.before = Convert-ReturnValue -Object $Current
+    }
 
-                $module.ExitJson()
+    # State: Absent
+    # Ensure the DHCP Lease/Reservation is not present
+    if ($Lease.state -eq "absent") {
+        # If the lease doesn't exist, our work here is done
+        if (-not $current_lease_exists) {
+            $result.msg = "The lease doesn't exist."
+            return $result
+        }
+
+        # If the lease exists, we need to destroy it
+        Try {
+            if ($current_lease_reservation) {
+                $Current | Remove-DhcpServerv4Reservation -WhatIf:$check_mode
             }
-            Catch {
-                $module.FailJson("Could not convert lease to a reservation",$_)
+            else {
+                $Current | Remove-DhcpServerv4Lease -WhatIf:$check_mode
             }
         }
+        Catch {
+            $module.Result.lease = Convert-ReturnValue -Object $Current
+            $module.FailJson("Unable to remove lease/reservation $($Lease.label): $($_.Exception.Message)", $_)
+        }
+
+        if (-not $check_mode) {
+            Remove-DhcpLeaseIndexEntry -Index $Index -Lease $Current
+        }
+
+        $result.changed = $true
+        return $result
+    }
+
+    # State: Present
+    # Current lease exists, and is not a reservation
+    if ($current_lease_exists -and -not $current_lease_reservation) {
+        # Already in the desired state
+        if ($Lease.type -eq "lease") {
+            $result.lease = $result.before
+            $result.after = $result.before
+            return $result
+        }
+
+        # Desired type is reservation
+        $params = Get-DhcpReservationParams -Lease $Lease -Current $Current
+        Try {
+            $Current | Add-DhcpServerv4Reservation -WhatIf:$check_mode
+
+            if(-not $check_mode) {
+                $current_reservation = Get-DhcpServerv4Lease -ClientId $params.ClientId -ScopeId $Current.ScopeId
+
+                # Update the reservation with new values
+                $current_reservation | Set-DhcpServerv4Reservation @params
+                $updated_reservation = Get-DhcpServerv4Lease -ClientId $params.ClientId -ScopeId $current_reservation.ScopeId
+
+                # Compare Values
+                $result.changed = Compare-DhcpLease -Original $Current -Updated $updated_reservation
+                $result.lease = Convert-ReturnValue -Object $updated_reservation
+                $result.after = $result.lease
+                Remove-DhcpLeaseIndexEntry -Index $Index -Lease $Current
+                Add-DhcpLeaseIndexEntry -Index $Index -Lease $updated_reservation
+            } else {
+                $result.changed = $true
+                $result.after = $result.before.Clone()
+                $result.after.address_state = "ActiveReservation"
+                $result.after.name = $params.Name
+                $result.after.description = $params.Description
+            }
+        }
+        Catch {
+            $module.FailJson("Could not convert lease $($Lease.label) to a reservation", $_)
+        }
+
+        return $result
     }
 
     # Current lease exists, and is a reservation
-    if (($current_lease_reservation -eq $true) -and ($current_lease_exists -eq $true)) {
-        if ($type -eq "lease") {
+    if ($current_lease_exists -and $current_lease_reservation) {
+        if ($Lease.type -eq "lease") {
             Try {
                 # Desired type is a lease, remove the reservation
-                $current_lease | Remove-DhcpServerv4Reservation -WhatIf:$check_mode
+                $Current | Remove-DhcpServerv4Reservation -WhatIf:$check_mode
 
                 # Build a new lease object with remnants of the reservation
                 $lease_params = @{
-                    ClientId = $original_lease.ClientId
-                    IPAddress = $original_lease.IPAddress.IPAddressToString
-                    ScopeId = $original_lease.ScopeId.IPAddressToString
-                    HostName = $original_lease.HostName
+                    ClientId = $Current.ClientId
+                    IPAddress = $Current.IPAddress.IPAddressToString
+                    ScopeId = $Current.ScopeId.IPAddressToString
+                    HostName = $Current.HostName
                     AddressState = 'Active'
                 }
 
@@ -275,7 +382,7 @@ if ($state -eq "present") {
                     Add-DhcpServerv4Lease @lease_params -WhatIf:$check_mode
                 }
                 Catch {
-                    $module.FailJson("Unable to convert the reservation to a lease",$_)
+                    $module.FailJson("Unable to convert the reservation $($Lease.label) to a lease", $_)
                 }
 
                 # Get the lease we just created
@@ -284,161 +391,248 @@ if ($state -eq "present") {
                         $new_lease = Get-DhcpServerv4Lease -ClientId $lease_params.ClientId -ScopeId $lease_params.ScopeId
                     }
                     Catch {
-                        $module.FailJson("Unable to retreive the newly created lease",$_)
+                        $module.FailJson("Unable to retreive the newly created lease $($Lease.label)", $_)
                     }
-                }
 
-                if(-not $check_mode) {
-                    $module.Result.lease = Convert-ReturnValue -Object $new_lease
+                    $result.lease = Convert-ReturnValue -Object $new_lease
+                    $result.after = $result.lease
+                    Remove-DhcpLeaseIndexEntry -Index $Index -Lease $Current
+                    Add-DhcpLeaseIndexEntry -Index $Index -Lease $new_lease
+                } else {
+                    $result.after = $result.before.Clone()
+                    $result.after.address_state = "Active"
                 }
 
-                $module.Result.changed = $true
-                $module.ExitJson()
+                $result.changed = $true
             }
             Catch {
-                $module.FailJson("Could not convert reservation to lease",$_)
+                $module.FailJson("Could not convert reservation $($Lease.label) to lease", $_)
             }
-        }
 
-        # Already in the desired state
-        if ($type -eq "reservation") {
+            return $result
+        }
 
-            # Update parameters
-            $params = @{ }
+        # Already a reservation, update it only when the values differ
+        $params = Get-DhcpReservationParams -Lease $Lease -Current $Current
+        $needs_update = ($params.Name -ne $Current.Name) -or
+            ($params.Description -ne $Current.Description) -or
+            ((Get-ClientIdKey -ClientId $params.ClientId) -ne (Get-ClientIdKey -ClientId $Current.ClientId))
 
-            if ($mac) {
-                $params.ClientId = $mac
-            } else {
-                $params.ClientId = $current_lease.ClientId
-            }
+        if (-not $needs_update) {
+            $result.lease = $result.before
+            $result.after = $result.before
+            return $result
+        }
 
-            if ($description) {
-                $params.Description = $description
-            } else {
-                $params.Description = $current_lease.Description
-            }
+        if(-not $check_mode) {
+            # Update the reservation with new values
+            $Current | Set-DhcpServerv4Reservation @params
+
+            $reservation = Get-DhcpServerv4Lease -ClientId $params.ClientId -ScopeId $Current.ScopeId
+            $result.changed = Compare-DhcpLease -Original $Current -Updated $reservation
+            $result.lease = Convert-ReturnValue -Object $reservation
+            $result.after = $result.lease
+            Remove-DhcpLeaseIndexEntry -Index $Index -Lease $Current
+            Add-DhcpLeaseIndexEntry -Index $Index -Lease $reservation
+        } else {
+            $result.changed = $true
+            $result.after = $result.before.Clone()
+            $result.after.name = $params.Name
+            $result.after.description = $params.Description
+        }
 
-            if ($reservation_name) {
-                $params.Name = $reservation_name
-            } else {
-                # Original lease had a null name so let's generate one
-                if ($null -eq $original_lease.Name) {
-                    $params.Name = "reservation-" + $original_lease.ClientId
-                } else {
-                    $params.Name = $original_lease.Name
-                }
-            }
+        return $result
+    }
 
-            # Update the reservation with new values
-            $current_lease | Set-DhcpServerv4Reservation @params -WhatIf:$check_mode
+    # Lease Doesn't Exist - Create
+    # Required: Scope ID
+    if (-not $Lease.scope_id) {
+        $module.FailJson("The scope_id parameter is required for state=present when a lease or reservation doesn't already exist ($($Lease.label))")
+    }
 
-            if(-not $check_mode) {
-                $reservation = Get-DhcpServerv4Lease -ClientId $current_lease.ClientId -ScopeId $current_lease.ScopeId
-                $module.Result.changed = Compare-DhcpLease -Original $original_lease -Updated $reservation
-                $module.Result.lease = Convert-ReturnValue -Object $reservation
-            } else {
-                $module.Result.changed = $true
-            }
+    # Required: MAC Address
+    if (-not $Lease.mac) {
+        $module.FailJson("The mac parameter is required for state=present when a lease or reservation doesn't already exist ($($Lease.label))")
+    }
 
-            # Return values
-            $module.ExitJson()
-        }
+    # Required Parameters
+    $lease_params = @{
+        ClientId = $Lease.mac
+        IPAddress = $Lease.ip
+        ScopeId = $Lease.scope_id
+        AddressState = 'Active'
+        Confirm = $false
     }
 
-    # Lease Doesn't Exist - Create
-    if ($current_lease_exists -eq $false) {
-        # Required: Scope ID
-        if (-not $scope_id) {
-            $module.Result.changed = $false
-            $module.FailJson("The scope_id parameter is required for state=present when a lease or reservation doesn't already exist")
-        }
+    if ($Lease.duration) {
+        $lease_params.LeaseExpiryTime = (Get-Date).AddDays($Lease.duration)
+    }
 
-        # Required Parameters
-        $lease_params = @{
-            ClientId = $mac
-            IPAddress = $ip
-            ScopeId = $scope_id
-            AddressState = 'Active'
-            Confirm = $false
-        }
+    if ($Lease.dns_hostname) {
+        $lease_params.HostName = $Lease.dns_hostname
+    }
 
-        if ($duration) {
-            $lease_params.LeaseExpiryTime = (Get-Date).AddDays($duration)
-        }
+    if ($Lease.dns_regtype) {
+        $lease_params.DnsRR = $Lease.dns_regtype
+    }
 
-        if ($dns_hostname) {
-            $lease_params.HostName = $dns_hostname
-        }
+    if ($Lease.description) {
+        $lease_params.Description = $Lease.description
+    }
 
-        if ($dns_regtype) {
-            $lease_params.DnsRR = $dns_regtype
-        }
+    # Create Lease
+    Try {
+        # Create lease based on parameters
+        Add-DhcpServerv4Lease @lease_params -WhatIf:$check_mode
 
-        if ($description) {
-            $lease_params.Description = $description
+        # Retreive the lease
+        if(-not $check_mode) {
+            $new_lease = Get-DhcpServerv4Lease -ClientId $Lease.mac -ScopeId $Lease.scope_id
+            $result.lease = Convert-ReturnValue -Object $new_lease
         }
+    }
+    Catch {
+        # Failed to create lease
+        $module.FailJson("Could not create DHCP lease $($Lease.label): $($_.Exception.Message)", $_)
+    }
 
-        # Create Lease
+    # Create Reservation
+    if ($Lease.type -eq "reservation") {
         Try {
-            # Create lease based on parameters
-            Add-DhcpServerv4Lease @lease_params -WhatIf:$check_mode
-
-            # Retreive the lease
-            if(-not $check_mode) {
-                $new_lease = Get-DhcpServerv4Lease -ClientId $mac -ScopeId $scope_id
-                $module.Result.lease = Convert-ReturnValue -Object $new_lease
-            }
+            if($check_mode) {
+                # In check mode, a lease won't exist for conversion, make one manually
+                Add-DhcpServerv4Reservation -ScopeId $Lease.scope_id -ClientId $Lease.client_id -IPAddress $Lease.ip -WhatIf:$check_mode
+            } else {
+                # Convert to Reservation
+                $new_lease | Add-DhcpServerv4Reservation
 
-            # If lease is the desired type
-            if ($type -eq "lease") {
-                $module.Result.changed = $true
-                $module.ExitJson()
+                # Get DHCP reservation object
+                $new_lease = Get-DhcpServerv4Reservation -ClientId $Lease.client_id -ScopeId $Lease.scope_id
+                $result.lease = Convert-ReturnValue -Object $new_lease
             }
         }
         Catch {
-            # Failed to create lease
-            $module.FailJson("Could not create DHCP lease: $($_.Exception.Message)",$_)
+            # Failed to create reservation
+            $module.FailJson("Could not create DHCP reservation $($Lease.label): $($_.Exception.Message)", $_)
         }
+    }
 
-        # Create Reservation
-        Try {
-            # If reservation is the desired type
-            if ($type -eq "reservation") {
-                if ($reservation_name) {
-                    $lease_params.Name = $reservation_name
-                }
-                else {
-                    $lease_params.Name = "reservation-" + $mac
-                }
+    if(-not $check_mode) {
+        $result.after = $result.lease
+        Add-DhcpLeaseIndexEntry -Index $Index -Lease $new_lease
+    } else {
+        $result.after = @{
+            address_state = "Active"
+            client_id = $Lease.client_id
+            ip_address = $Lease.ip
+            scope_id = $Lease.scope_id
+            name = $Lease.reservation_name
+            description = $Lease.description
+        }
+        if ($Lease.type -eq "reservation") { $result.after.address_state = "ActiveReservation" }
+    }
 
-                Try {
-                    if($check_mode) {
-                        # In check mode, a lease won't exist for conversion, make one manually
-                        Add-DhcpServerv4Reservation -ScopeId $scope_id -ClientId $mac_original -IPAddress $ip -WhatIf:$check_mode
-                    } else {
-                        # Convert to Reservation
-                        $new_lease | Add-DhcpServerv4Reservation -WhatIf:$check_mode
-                    }
-                }
-                Catch {
-                    # Failed to create reservation
-                    $module.FailJson("Could not create DHCP reservation: $($_.Exception.Message)", $_)
-                }
+    $result.changed = $true
+    return $result
+}
 
-                if(-not $check_mode) {
-                    # Get DHCP reservation object
-                    $new_lease = Get-DhcpServerv4Reservation -ClientId $mac_original -ScopeId $scope_id
-                    $module.Result.lease = Convert-ReturnValue -Object $new_lease
-                }
+Try {
+    # Import DHCP Server PS Module
+    Import-Module DhcpServer
+}
+Catch {
+    # Couldn't load the DhcpServer Module
+    $module.FailJson("The DhcpServer module failed to load properly: $($_.Exception.Message)", $_)
+}
 
-                $module.Result.changed = $true
-            }
+# Determine the lease(s) to converge
+if ($leases) {
+    $lease_items = @(foreach ($item in $leases) { Get-DhcpLeaseItem -Item $item })
+}
+else {
+    $lease_items = @(Get-DhcpLeaseItem -Item $module.Params)
+}
+
+# Single lease/reservation
+if (-not $leases) {
+    $lease_item = $lease_items[0]
+
+    Try {
+        # Resolve the owning scope from the address, or the given scope_id
+        $scope_table = Get-DhcpScopeTable -Scopes (Get-DhcpServerv4Scope)
+        # A mac only lookup with scope_id is limited to that scope
+        $scope_limited = $lease_item.scope_id -and -not $lease_item.ip
+        if ($lease_item.ip) {
+            $owning_scope = Find-DhcpLeaseScope -Table $scope_table -IPAddress $lease_item.ip
         }
-        Catch {
-            # Failed to create reservation
-            $module.FailJson("Could not create DHCP reservation: $($_.Exception.Message)", $_)
+        elseif ($lease_item.scope_id) {
+            $owning_scope = @($lease_item.scope_id)
+        }
+        else {
+            $owning_scope = @()
+        }
+
+        $current_lease = $null
+        $lease_index = $null
+        if ($owning_scope.Count -eq 1) {
+            $current_lease = Get-DhcpLeaseDirect -Lease $lease_item -ScopeId $owning_scope[0]
+            if ($lease_item.ip -and -not $lease_item.scope_id) { $lease_item.scope_id = $owning_scope[0] }
+            $lease_index = Get-DhcpLeaseIndex -Leases $current_lease
+        }
+
+        # The owning scope is unknown or ambiguous, or the client id may hold a lease
+        # in another scope, fall back to a single full scan as the batch index does
+        if ($owning_scope.Count -ne 1 -or ($lease_item.mac -and -not $current_lease -and -not $scope_limited)) {
+            $lease_index = Get-DhcpLeaseIndex -Leases (Get-DhcpServerv4Scope | Get-DhcpServerv4Lease)
+            $current_lease = Find-DhcpLease -Lease $lease_item -Index $lease_index
         }
     }
+    Catch {
+        $module.FailJson("Unable to retrieve lease from DHCP server: $($_.Exception.Message)", $_)
+    }
+
+    $lease_result = Set-DhcpLeaseState -Lease $lease_item -Current $current_lease -Index $lease_index
+
+    $module.Result.changed = $lease_result.changed
+    if ($lease_result.lease) { $module.Result.lease = $lease_result.lease }
+    if ($lease_result.msg) { $module.Result.msg = $lease_result.msg }
+    $module.Diff.before = $lease_result.before
+    $module.Diff.after = $lease_result.after
+    $module.ExitJson()
+}
+
+# Enumerate the server once and index existing leases/reservations
+Try {
+    $lease_index = Get-DhcpLeaseIndex -Leases (Get-DhcpServerv4Scope | Get-DhcpServerv4Lease)
+}
+Catch {
+    $module.FailJson("Unable to retrieve leases from DHCP server: $($_.Exception.Message)", $_)
+}
+
+# Batch of leases/reservations, converged against the same index
+$module.Result.results = [System.Collections.ArrayList]@()
+$module.Diff.before = @{}
+$module.Diff.after = @{}
+
+foreach ($lease_item in $lease_items) {
+    $current_lease = Find-DhcpLease -Lease $lease_item -Index $lease_index
+    $lease_result = Set-DhcpLeaseState -Lease $lease_item -Current $current_lease -Index $lease_index
+
+    $item_result = @{
+        ip = $lease_item.ip
+        mac = $lease_item.client_id
+        state = $lease_item.state
+        changed = $lease_result.changed
+    }
+    if ($lease_result.lease) { $item_result.lease = $lease_result.lease }
+    if ($lease_result.msg) { $item_result.msg = $lease_result.msg }
+    [void]$module.Result.results.Add($item_result)
+
+    if ($lease_result.changed) {
+        $module.Result.changed = $true
+        $module.Diff.before[$lease_item.label] = $lease_result.before
+        $module.Diff.after[$lease_item.label] = $lease_result.after
+    }
 }
 
-$module.ExitJson()
\ No newline at end of file
+$module.ExitJson()
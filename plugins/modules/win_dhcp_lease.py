@@ -20,6 +20,8 @@ description:
   - Manage Windows Server DHCP Leases (IPv4 Only)
   - Adds, Removes and Modifies DHCP Leases and Reservations
   - Task should be delegated to a Windows DHCP Server
+  - A single lease is looked up directly in the scope that owns l(ip), the
+    full lease table is only scanned when that scope is ambiguous.
 options:
   type:
     description:
@@ -39,7 +41,7 @@ options:
   ip:
     description:
       - The IPv4 address of the client server/computer.
-      - This is a required parameter, if l(mac) is not set.
+      - This is a required parameter, if l(mac) or l(leases) is not set.
       - Can be used to identify an existing lease/reservation, instead of l(mac).
     type: str
     required: no
@@ -48,11 +50,15 @@ options:
       - Specifies the scope identifier as defined by the DHCP server.
       - This is a required parameter, if l(state=present) and the reservation or lease
         doesn't already exist. Not required if updating an existing lease or reservation.
+      - When l(ip) falls within exactly one scope on the server, that scope is
+        used when l(scope_id) is not set.
+      - When looking up a single lease by l(mac) only, setting l(scope_id) limits
+        the lookup to that scope instead of reading the leases of every scope.
     type: str
   mac:
     description:
       - Specifies the client identifier to be set on the IPv4 address.
-      - This is a required parameter, if l(ip) is not set.
+      - This is a required parameter, if l(ip) or l(leases) is not set.
       - Windows clients use the MAC address as the client ID.
       - Linux and other operating systems can use other types of identifiers.
       - Can be used to identify an existing lease/reservation, instead of l(ip).
@@ -90,6 +96,81 @@ options:
       - Specifies the description for reservation being created.
       - Only applicable to l(type=reservation).
     type: str
+  leases:
+    description:
+      - A list of leases/reservations to converge in a single invocation.
+      - The DHCP server is enumerated once and each entry is evaluated
+        against an in-memory index keyed by IP address and client ID.
+      - Each entry accepts the same options as a single lease. Options not
+        set on an entry fall back to the top level value, such as l(state)
+        or l(type).
+      - Entries are processed in order, later entries see the changes made
+        by earlier entries.
+      - Mutually exclusive with l(ip) and l(mac).
+    type: list
+    elements: dict
+    suboptions:
+      type:
+        description:
+          - The type of DHCP address.
+        type: str
+        choices: [ reservation, lease ]
+      state:
+        description:
+          - Specifies the desired state of the DHCP lease or reservation.
+        type: str
+        choices: [ present, absent ]
+      ip:
+        description:
+          - The IPv4 address of the client server/computer.
+          - This is a required parameter, if l(mac) is not set.
+        type: str
+      scope_id:
+        description:
+          - Specifies the scope identifier as defined by the DHCP server.
+        type: str
+      mac:
+        description:
+          - Specifies the client identifier to be set on the IPv4 address.
+          - This is a required parameter, if l(ip) is not set.
+        type: str
+      duration:
+        description:
+          - Specifies the duration of the DHCP lease in days.
+        type: int
+      dns_hostname:
+        description:
+          - Specifies the DNS hostname of the client.
+        type: str
+      dns_regtype:
+        description:
+          - Indicates the type of DNS record to be registered by the DHCP
+            server service for this lease.
+        type: str
+        choices: [ aptr, a, noreg ]
+      reservation_name:
+        description:
+          - Specifies the name of the reservation being created.
+        type: str
+      description:
+        description:
+          - Specifies the description for reservation being created.
+        type: str
+  known_scopes:
+    description:
+      - A list of scopes known to exist on the DHCP server, in the format
+        returned by the C(scopes) key of C(win_dhcp_info).
+      - Each scope may also set C(exclusion_list), a list of excluded ranges.
+      - When set, every requested address is validated on the controller
+        before the DHCP server is contacted. Addresses outside of a known
+        scope, outside of the scope address range, or leases inside an
+        exclusion range fail the task.
+      - Duplicate IP addresses and MAC addresses within l(leases) are always
+        rejected.
+      - This option is consumed by the action plugin and is not sent to the
+        DHCP server.
+    type: list
+    elements: dict
 '''
 
 EXAMPLES = r'''
@@ -122,6 +203,34 @@ EXAMPLES = r'''
   win_dhcp_lease:
     type: lease
     ip: 192.168.100.205
+
+- name: Ensure a set of DHCP reservations exist in a single task
+  win_dhcp_lease:
+    type: reservation
+    scope_id: 192.168.100.0
+    leases:
+      - ip: 192.168.100.205
+        mac: 00:B1:8A:D1:5A:1F
+        description: Testing Server
+      - ip: 192.168.100.206
+        mac: 00:B1:8A:D1:5A:20
+        reservation_name: build-agent-01
+      - ip: 192.168.100.207
+        state: absent
+
+- name: Gather the DHCP scopes once
+  win_dhcp_info:
+    type: scope
+  register: dhcp_scopes
+
+- name: Validate reservations against the known scopes before applying them
+  win_dhcp_lease:
+    known_scopes: "{{ dhcp_scopes.scopes }}"
+    leases:
+      - ip: 192.168.100.10
+        mac: 00:B1:8A:D1:5A:1F
+      - ip: 192.168.100.11
+        mac: 00:B1:8A:D1:5A:2F
 '''
 
 RETURN = r'''
@@ -136,4 +245,21 @@ lease:
     ip_address: 172.16.98.230
     name: null
     scope_id: 172.16.98.0
+
+results:
+  description: Per-entry results when l(leases) is used, in input order
+  returned: When l(leases) is set
+  type: list
+  sample:
+  - ip: 172.16.98.230
+    mac: 0A-0B-0C-04-05-AA
+    state: present
+    changed: true
+    lease:
+      address_state: InactiveReservation
+      client_id: 0a-0b-0c-04-05-aa
+      description: Really Fancy
+      ip_address: 172.16.98.230
+      name: reservation-0A0B0C0405AA
+      scope_id: 172.16.98.0
 '''
@@ -0,0 +1,325 @@
+#!powershell
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+#AnsibleRequires -CSharpUtil Ansible.Basic
+#AnsibleRequires -PowerShell ansible_collections.zollo.windows.plugins.module_utils.DhcpClientId
+
+$ErrorActionPreference = "Stop"
+
+$spec = @{
+    options = @{
+        scopes = @{
+            type = "list"
+            elements = "dict"
+            required = $true
+            options = @{
+                scope_id = @{ type = "str"; required = $true }
+                purge = @{ type = "bool" }
+                reservations = @{
+                    type = "list"
+                    elements = "dict"
+                    default = @()
+                    options = @{
+                        ip = @{ type = "str"; required = $true }
+                        mac = @{ type = "str"; required = $true }
+                        name = @{ type = "str" }
+                        description = @{ type = "str" }
+                    }
+                }
+            }
+        }
+        purge = @{ type = "bool"; default = $false }
+        replicate = @{ type = "bool"; default = $true }
+    }
+    supports_check_mode = $true
+}
+
+$module = [Ansible.Basic.AnsibleModule]::Create($args, $spec)
+$check_mode = $module.CheckMode
+
+$scopes = $module.Params.scopes
+$purge = $module.Params.purge
+$replicate = $module.Params.replicate
+
+Function Convert-ReturnValue {
+    Param(
+        $Object
+    )
+
+    return @{
+        client_id   = $Object.ClientId
+        ip_address  = $Object.IPAddress.IPAddressToString
+        scope_id    = $Object.ScopeId.IPAddressToString
+        name        = $Object.Name
+        description = $Object.Description
+    }
+}
+
+Function Get-DesiredReservation {
+    Param(
+        $Item,
+        [string]$ScopeId
+    )
+
+    $key = Get-ClientIdKey -ClientId $Item.mac
+    if ($key -notmatch '^[0-9A-F]+$') {
+        $module.FailJson("The MAC Address $($Item.mac) of $($Item.ip) is not properly formatted")
+    }
+    $client_id = $Item.mac
+    if ($key.Length -eq 12) {
+        $client_id = Convert-MacAddress -mac $key
+    }
+
+    return @{
+        ip = ([System.Net.IPAddress]::Parse($Item.ip)).IPAddressToString
+        key = $key
+        client_id = $client_id
+        name = $Item.name
+        description = $Item.description
+        scope_id = $ScopeId
+    }
+}
+
+Function Get-ReservationDelta {
+    Param(
+        [Hashtable]$Desired,
+        $Current,
+        [bool]$Purge
+    )
+
+    # Index the current reservations by IP address and client id
+    $by_ip = @{}
+    $by_key = @{}
+    foreach ($reservation in $Current) {
+        $by_ip[$reservation.IPAddress.IPAddressToString] = $reservation
+        $by_key[(Get-ClientIdKey -ClientId $reservation.ClientId)] = $reservation
+    }
+
+    $delta = @{
+        add = [System.Collections.ArrayList]@()
+        update = [System.Collections.ArrayList]@()
+        remove = [System.Collections.ArrayList]@()
+    }
+    $kept = @{}
+    $removed = @{}
+
+    # A client id reserved at another address is freed first, the other
+    # address is then re-added if it is part of the desired set
+    foreach ($item in $Desired.Values) {
+        $holder = $by_key[$item.key]
+        if ($holder) {
+            $holder_ip = $holder.IPAddress.IPAddressToString
+            if ($holder_ip -ne $item.ip -and -not $removed.ContainsKey($holder_ip)) {
+                [void]$delta.remove.Add($holder)
+                $removed[$holder_ip] = $true
+            }
+        }
+    }
+
+    foreach ($item in $Desired.Values) {
+        $existing = $by_ip[$item.ip]
+        if ((-not $existing) -or $removed.ContainsKey($item.ip)) {
+            [void]$delta.add.Add($item)
+            continue
+        }
+
+        $kept[$item.ip] = $true
+        $params = @{}
+        if ((Get-ClientIdKey -ClientId $existing.ClientId) -ne $item.key) {
+            $params.ClientId = $item.client_id
+        }
+        if ($null -ne $item.name -and $existing.Name -cne $item.name) {
+            $params.Name = $item.name
+        }
+        if ($null -ne $item.description -and $existing.Description -cne $item.description) {
+            $params.Description = $item.description
+        }
+        if ($params.Count -gt 0) {
+            [void]$delta.update.Add(@{ item = $item; params = $params; before = $existing })
+        }
+    }
+
+    if ($Purge) {
+        foreach ($reservation in $Current) {
+            $ip = $reservation.IPAddress.IPAddressToString
+            if (-not $kept.ContainsKey($ip) -and -not $removed.ContainsKey($ip)) {
+                [void]$delta.remove.Add($reservation)
+                $removed[$ip] = $true
+            }
+        }
+    }
+
+    return $delta
+}
+
+Try {
+    # Import DHCP Server PS Module
+    Import-Module DhcpServer
+}
+Catch {
+    # Couldn't load the DhcpServer Module
+    $module.FailJson("The DhcpServer module failed to load properly: $($_.Exception.Message)", $_)
+}
+
+$results = [System.Collections.ArrayList]@()
+$changed_scopes = [System.Collections.ArrayList]@()
+$diff_before = @{}
+$diff_after = @{}
+
+foreach ($scope in $scopes) {
+    $scope_id = ([System.Net.IPAddress]::Parse($scope.scope_id)).IPAddressToString
+    $scope_purge = $purge
+    if ($null -ne $scope.purge) {
+        $scope_purge = $scope.purge
+    }
+
+    # Desired set keyed by IP address, duplicates are rejected up front
+    $desired = [ordered]@{}
+    $desired_keys = @{}
+    foreach ($entry in $scope.reservations) {
+        $item = Get-DesiredReservation -Item $entry -ScopeId $scope_id
+        if ($desired.Contains($item.ip)) {
+            $module.FailJson("The address $($item.ip) is listed more than once in scope $scope_id")
+        }
+        if ($desired_keys.ContainsKey($item.key)) {
+            $module.FailJson("The MAC Address $($entry.mac) is listed more than once in scope $scope_id")
+        }
+        $desired[$item.ip] = $item
+        $desired_keys[$item.key] = $true
+    }
+
+    # One enumeration per scope
+    Try {
+        $current = @(Get-DhcpServerv4Reservation -ScopeId $scope_id)
+    }
+    Catch {
+        $module.FailJson("Unable to read the reservations of scope $($scope_id): $($_.Exception.Message)", $_)
+    }
+
+    $delta = Get-ReservationDelta -Desired $desired -Current $current -Purge $scope_purge
+
+    # Removals first so addresses and client ids are free for the additions
+    foreach ($reservation in $delta.remove) {
+        Try {
+            Remove-DhcpServerv4Reservation -IPAddress $reservation.IPAddress -WhatIf:$check_mode
+        }
+        Catch {
+            $module.FailJson("Unable to remove reservation $($reservation.IPAddress.IPAddressToString): $($_.Exception.Message)", $_)
+        }
+    }
+    foreach ($update in $delta.update) {
+        $params = $update.params
+        Try {
+            Set-DhcpServerv4Reservation -IPAddress $update.item.ip @params -WhatIf:$check_mode
+        }
+        Catch {
+            $module.FailJson("Unable to update reservation $($update.item.ip): $($_.Exception.Message)", $_)
+        }
+    }
+    foreach ($item in $delta.add) {
+        # Reservations without a name get the name win_dhcp_lease generates
+        if (-not $item.name) {
+            $item.name = "reservation-" + $item.key
+        }
+        $params = @{
+            ScopeId = $scope_id
+            IPAddress = $item.ip
+            ClientId = $item.client_id
+            Name = $item.name
+        }
+        if ($null -ne $item.description) {
+            $params.Description = $item.description
+        }
+        Try {
+            Add-DhcpServerv4Reservation @params -WhatIf:$check_mode
+        }
+        Catch {
+            $module.FailJson("Unable to add reservation $($item.ip): $($_.Exception.Message)", $_)
+        }
+    }
+
+    $scope_changed = ($delta.add.Count + $delta.update.Count + $delta.remove.Count) -gt 0
+    if ($scope_changed) {
+        [void]$changed_scopes.Add($scope_id)
+    }
+
+    [void]$results.Add(@{
+        scope_id = $scope_id
+        changed = $scope_changed
+        added = @($delta.add | ForEach-Object { $_.ip })
+        updated = @($delta.update | ForEach-Object { $_.item.ip })
+        removed = @($delta.remove | ForEach-Object { $_.IPAddress.IPAddressToString })
+        unchanged = $desired.Count - $delta.add.Count - $delta.update.Count
+    })
+
+    if ($scope_changed) {
+        $before = @{}
+        foreach ($reservation in $delta.remove) {
+            $before[$reservation.IPAddress.IPAddressToString] = Convert-ReturnValue -Object $reservation
+        }
+        $after = @{}
+        foreach ($update in $delta.update) {
+            $before[$update.item.ip] = Convert-ReturnValue -Object $update.before
+            $after[$update.item.ip] = Convert-ReturnValue -Object $update.before
+            $after[$update.item.ip].client_id = $update.item.client_id
+            if ($update.params.ContainsKey('Name')) {
+                $after[$update.item.ip].name = $update.params.Name
+            }
+            if ($update.params.ContainsKey('Description')) {
+                $after[$update.item.ip].description = $update.params.Description
+            }
+        }
+        foreach ($item in $delta.add) {
+            $after[$item.ip] = @{
+                client_id = $item.client_id
+                ip_address = $item.ip
+                scope_id = $scope_id
+                name = $item.name
+                description = $item.description
+            }
+        }
+        $diff_before[$scope_id] = $before
+        $diff_after[$scope_id] = $after
+    }
+}
+
+# Replicate every changed scope to its failover partner in a single call
+$replicated = [System.Collections.ArrayList]@()
+if ($replicate -and $changed_scopes.Count -gt 0) {
+    Try {
+        $failover_scopes = @{}
+        foreach ($failover in @(Get-DhcpServerv4Failover -ErrorAction SilentlyContinue)) {
+            foreach ($id in $failover.ScopeId) {
+                $failover_scopes[$id.IPAddressToString] = $true
+            }
+        }
+    }
+    Catch {
+        $failover_scopes = @{}
+    }
+
+    foreach ($id in $changed_scopes) {
+        if ($failover_scopes.ContainsKey($id)) {
+            [void]$replicated.Add($id)
+        }
+    }
+
+    if ($replicated.Count -gt 0) {
+        Try {
+            Invoke-DhcpServerv4FailoverReplication -ScopeId $replicated.ToArray() -Force -WhatIf:$check_mode | Out-Null
+        }
+        Catch {
+            $module.FailJson("Unable to replicate scopes $($replicated -join ', ') to the failover partner: $($_.Exception.Message)", $_)
+        }
+    }
+}
+
+$module.Result.changed = $changed_scopes.Count -gt 0
+$module.Result.results = $results
+$module.Result.replicated = $replicated
+$module.Diff.before = $diff_before
+$module.Diff.after = $diff_after
+$module.ExitJson()
@@ -0,0 +1,132 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+ANSIBLE_METADATA = {'status': ['preview'],
+                    'supported_by': 'community',
+                    'metadata_version': '1.1'}
+
+DOCUMENTATION = r'''
+---
+module: win_dhcp_reservation_sync
+short_description: Synchronize Windows Server DHCP Reservations
+author: Joe Zollo (@joezollo)
+requirements:
+  - This module requires Windows Server 2012 or Newer
+description:
+  - Synchronizes the reservations of one or more DHCP scopes with a
+    desired list (IPv4 Only)
+  - The reservations of each scope are read once, the additions, updates
+    and removals are computed in a single pass and only those are written.
+  - Changed scopes that are part of a failover relationship are replicated
+    to the partner server once, at the end of the run.
+  - Task should be delegated to a Windows DHCP Server
+  - Use M(win_dhcp_lease) to manage individual leases.
+options:
+  scopes:
+    description:
+      - The scopes to synchronize, each with its desired reservations.
+    type: list
+    elements: dict
+    required: yes
+    suboptions:
+      scope_id:
+        description:
+          - The scope identifier as defined by the DHCP server.
+        type: str
+        required: yes
+      purge:
+        description:
+          - Overrides l(purge) for this scope.
+        type: bool
+      reservations:
+        description:
+          - The desired reservations of the scope.
+          - Each IP address and MAC address may only be listed once.
+        type: list
+        elements: dict
+        default: []
+        suboptions:
+          ip:
+            description:
+              - The reserved IPv4 address.
+            type: str
+            required: yes
+          mac:
+            description:
+              - The client identifier of the reservation, usually the MAC
+                address of the client.
+              - A client identifier reserved at another address of the scope
+                is moved to l(ip).
+            type: str
+            required: yes
+          name:
+            description:
+              - The name of the reservation.
+              - New reservations without a name are named
+                C(reservation-<mac>), the name of an existing reservation is
+                left untouched when not set.
+            type: str
+          description:
+            description:
+              - The description of the reservation.
+              - Left untouched when not set.
+            type: str
+  purge:
+    description:
+      - Removes the reservations of each scope that are not listed in
+        l(reservations).
+    type: bool
+    default: no
+  replicate:
+    description:
+      - Replicates the changed scopes to the failover partner with a single
+        C(Invoke-DhcpServerv4FailoverReplication) call.
+      - Scopes without a failover relationship are not replicated.
+    type: bool
+    default: yes
+'''
+
+EXAMPLES = r'''
+- name: Ensure the reservations of two scopes match the CMDB export
+  win_dhcp_reservation_sync:
+    purge: true
+    scopes:
+      - scope_id: 172.16.98.0
+        reservations:
+          - ip: 172.16.98.230
+            mac: 0A-0B-0C-04-05-AA
+            name: build-agent-01
+          - ip: 172.16.98.231
+            mac: 0a:0b:0c:04:05:ab
+            description: Printer
+      - scope_id: 172.16.99.0
+        purge: false
+        reservations: "{{ vlan99_reservations }}"
+'''
+
+RETURN = r'''
+results:
+  description: Per-scope summary of the synchronization, in input order
+  returned: always
+  type: list
+  sample:
+  - scope_id: 172.16.98.0
+    changed: true
+    added:
+    - 172.16.98.231
+    updated:
+    - 172.16.98.230
+    removed:
+    - 172.16.98.240
+    unchanged: 0
+replicated:
+  description: The changed scopes replicated to their failover partner
+  returned: always
+  type: list
+  sample:
+  - 172.16.98.0
+'''
@@ -5,81 +5,36 @@
 # GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
 
 #AnsibleRequires -CSharpUtil Ansible.Basic
-#Requires -Module Ansible.ModuleUtils.CamelConversion
-#Requires -Module Ansible.ModuleUtils.FileUtil
-#Requires -Module Ansible.ModuleUtils.Legacy
 
 $ErrorActionPreference = "Stop"
 
-Function Convert-MacAddress {
-    Param(
-        [string]$mac
-    )
-
-    # Evaluate Length
-    if ($mac.Length -eq 12) {
-        # Insert Dashes
-        $mac = $mac.Insert(2, "-").Insert(5, "-").Insert(8, "-").Insert(11, "-").Insert(14, "-")
-        return $mac
-    }
-    elseif ($mac.Length -eq 17) {
-        # Remove Dashes
-        $mac = $mac -replace '-'
-        return $mac
-    }
-    else {
-        return $false
-    }
-}
-
-Function Compare-DhcpLease {
-    Param(
-        [PSObject]$Original,
-        [PSObject]$Updated
-    )
-
-    # Compare values that we care about
-    if (($Original.AddressState -eq $Updated.AddressState) -and ($Original.IPAddress -eq $Updated.IPAddress) -and ($Original.ScopeId -eq $Updated.ScopeId) -and ($Original.Name -eq $Updated.Name) -and ($Original.Description -eq $Updated.Description)) {
-        # changed = false
-        return $false
-    }
-    else {
-        # changed = true
-        return $true
-    }
-}
-
-Function Convert-ReturnValue {
-    Param(
-        $Object
-    )
-
-    return @{
-        address_state = $Object.AddressState
-        client_id     = $Object.ClientId
-        ip_address    = $Object.IPAddress.IPAddressToString
-        scope_id      = $Object.ScopeId.IPAddressToString
-        name          = $Object.Name
-        description   = $Object.Description
-    }
-}
-
 $spec = @{
     options = @{
         state = @{ type = "str"; choices = "absent", "present"; default = "present" }
         active = @{ type = "bool" }
         name = @{ type = "str"; required = $true }
+        scope_id = @{ type = "str" }
         pool_start = @{ type = "str" }
         pool_end = @{ type = "str" }
-        subnet_mask = @{ type = "int" }
+        subnet_mask = @{ type = "str" }
         subnet_length = @{ type = "int" }
-        subnet_delay = @{ type = "str" }
+        subnet_delay = @{ type = "int" }
         exclusion_list = @{ type = "list" }
         lease_duration = @{ type = "str" }
         description = @{ type = "str" }
-        scope_options = @{ type = "list" }
-        value = @{ type = "list"; elements = "str"; default = @() ; aliases=@( 'values' )}
+        scope_options = @{
+            type = "list"
+            elements = "dict"
+            options = @{
+                option_id = @{ type = "int"; required = $true }
+                value = @{ type = "list"; elements = "str"; required = $true; aliases = @( 'values' ) }
+            }
+        }
+        purge_options = @{ type = "bool"; default = $false }
+        known_scopes = @{ type = "list"; elements = "dict" }
     }
+    mutually_exclusive = @(, @("subnet_mask", "subnet_length"))
+    required_together = @(, @("pool_start", "pool_end"))
     supports_check_mode = $true
 }
 
@@ -89,6 +44,7 @@ $check_mode = $module.CheckMode
 $state = $module.Params.state
 $active = $module.Params.active
 $name = $module.Params.name
+$scope_id = $module.Params.scope_id
 $pool_start = $module.Params.pool_start
 $pool_end = $module.Params.pool_end
 $subnet_mask = $module.Params.subnet_mask
@@ -98,892 +54,410 @@ $exclusion_list = $module.Params.exclusion_list
 $lease_duration = $module.Params.lease_duration
 $description = $module.Params.description
 $scope_options = $module.Params.scope_options
+$purge_options = $module.Params.purge_options
 
-<#
-
-# option ID special values DnsServer, DnsDomain, Router, Wpad
-6 = DNS Servers
-1 = Subnet Mask
-3 = Router
-252 = Web Proxy Auto Discover 
-
-#>
-
-<#
-
-Set-DhcpServerv4OptionValue -OptionId 6 -Value "192.168.1.1"
-
-Set-DhcpServerv4OptionValue -DnsServer 192.168.1.2 -WinsServer 192.168.1.3 -DnsDomain "contoso.com" -Router 192.168.1.1 -Wpad "http://proxy.contoso.com/wpad.dat"
-
-Set-DhcpServerv4OptionValue -ScopeId 10.10.10.0 -DnsServer 192.168.1.2 -WinsServer 192.168.1.3 -DnsDomain "contoso.com" -Router 192.168.1.1 -Wpad "http://proxy.contoso.com/wpad.dat"
-Set-DhcpServerv4OptionValue -ReservedIP 10.10.10.5 -DnsServer 192.168.1.2 -WinsServer 192.168.1.3 -DnsDomain "contoso.com" -Router 192.168.1.1 -Wpad "http://proxy.contoso.com/wpad.dat"
-Set-DhcpServerv4OptionValue -ReservedIP 10.10.10.5 -DnsServer 192.168.1.2 -WinsServer 192.168.1.3 -DnsDomain "contoso.com" -Router 192.168.1.1 -Wpad "http://proxy.contoso.com/wpad.dat"
-Set-DhcpServerv4OptionValue -ScopeId 10.10.10.0 -PolicyName "LabComputers" -DnsServer 192.168.1.2 -WinsServer 192.168.1.3 -DnsDomain "contoso.com" -Router 192.168.1.1 -Wpad "http://proxy.contoso.com/wpad.dat"
-
-Add-DhcpServerv4OptionDefinition -Name "UCIdentifier" -OptionId 1 -Type "BinaryData" -VendorClass "MS-UC-Client" -Description "UC Identifier"
-
-#>
-
-
-
+Function Get-DhcpScopeObject {
+    Param(
+        $Object
+    )
 
-# Parse Regtype
-if ($dns_regtype) {
-    Switch ($dns_regtype) {
-        "aptr" { $dns_regtype = "AandPTR"; break }
-        "a" { $dns_regtype = "A"; break }
-        "noreg" { $dns_regtype = "NoRegistration"; break }
-        default { $dns_regtype = "NoRegistration"; break }
+    return @{
+        name = $Object.name
+        scope_id = $Object.ScopeId.IPAddressToString
+        subnet_mask = $Object.SubnetMask.IPAddressToString
+        address_state = $Object.State
+        description = $Object.Description
+        start_range = $Object.StartRange.IPAddressToString
+        end_range = $Object.EndRange.IPAddressToString
+        delay = $Object.Delay
+        lease_duration = @{
+            days = $Object.LeaseDuration.Days
+            hours = $Object.LeaseDuration.Hours
+        }
     }
 }
 
-Try {
-    # Import DHCP Server PS Module
-    Import-Module DhcpServer
-}
-Catch {
-    # Couldn't load the DhcpServer Module
-    $module.FailJson("The DhcpServer module failed to load properly")
-}
-
-# Determine if there is an existing lease
-if ($ip) {
-    $current_lease = Get-DhcpServerv4Scope | Get-DhcpServerv4Lease | Where-Object IPAddress -eq $ip
-}
-
-# MacAddress was specified
-if ($mac) {
-    if ($mac -like "*-*") {
-        $mac_original = $mac
-        $mac = Convert-MacAddress -mac $mac
-    }
+Function Convert-IPv4ToUInt32 {
+    Param(
+        [string]$IPAddress
+    )
 
-    if ($mac -eq $false) {
-        $module.FailJson("The MAC Address is not properly formatted")
-    }
-    else {
-        $current_lease = Get-DhcpServerv4Scope | Get-DhcpServerv4Lease | Where-Object ClientId -eq $mac_original
-    }
+    $bytes = ([System.Net.IPAddress]::Parse($IPAddress)).GetAddressBytes()
+    [Array]::Reverse($bytes)
+    return [System.BitConverter]::ToUInt32($bytes, 0)
 }
 
-# Did we find a lease/reservation
-if ($current_lease) {
-    $current_lease_exists = $true
-    $original_lease = $current_lease
-    $module.Diff.before = Convert-ReturnValue -Object $original_lease
-}
-else {
-    $current_lease_exists = $false
-}
+Function Convert-UInt32ToIPv4 {
+    Param(
+        [uint32]$Value
+    )
 
-# If we found a lease, is it a reservation?
-if ($current_lease_exists -eq $true -and ($current_lease.AddressState -like "*Reservation*")) {
-    $current_lease_reservation = $true
-}
-else {
-    $current_lease_reservation = $false
+    $bytes = [System.BitConverter]::GetBytes($Value)
+    [Array]::Reverse($bytes)
+    return ([System.Net.IPAddress]$bytes).IPAddressToString
 }
 
-# State: Absent
-# Ensure the DHCP Lease/Reservation is not present
-if ($state -eq "absent") {
+Function Get-SubnetMask {
+    Param(
+        $Mask,
+        $Length
+    )
 
-    # Required: MAC or IP address
-    if ((-not $mac) -and (-not $ip)) {
-        $module.Result.changed = $false
-        $module.FailJson("The ip or mac parameter is required for state=absent")
+    if ($Mask) {
+        return ([System.Net.IPAddress]::Parse($Mask)).IPAddressToString
     }
-
-    # If the lease exists, we need to destroy it
-    if ($current_lease_reservation -eq $true) {
-        # Try to remove reservation
-        Try {
-            $current_lease | Remove-DhcpServerv4Reservation -WhatIf:$check_mode
-            $state_absent_removed = $true
+    if ($null -ne $Length) {
+        if ($Length -lt 0 -or $Length -gt 32) {
+            $module.FailJson("subnet_length must be between 0 and 32")
         }
-        Catch {
-            $state_absent_removed = $false
-        }
-    }
-    else {
-        # Try to remove lease
-        Try {
-            $current_lease | Remove-DhcpServerv4Lease -WhatIf:$check_mode
-            $state_absent_removed = $true
-        }
-        Catch {
-            $state_absent_removed = $false
-        }
-    }
-
-    # If the lease doesn't exist, our work here is done
-    if ($current_lease_exists -eq $false) {
-        $module.Result.skipped = $true
-        $module.Result.msg = "The lease or reservation doesn't exist."
-        $module.ExitJson()
-    }
-
-    # See if we removed the lease/reservation
-    if ($state_absent_removed) {
-        $module.Result.changed = $true
-        $module.ExitJson()
-    }
-    else {
-        $module.Result.lease = Convert-ReturnValue -Object $current_lease
-        $module.FailJson("Unable to remove lease/reservation")
+        # 0xFFFFFFFF is parsed as the Int32 -1, MaxValue keeps the mask unsigned
+        $value = [uint32](([uint64][uint32]::MaxValue -shl (32 - $Length)) -band [uint32]::MaxValue)
+        return Convert-UInt32ToIPv4 -Value $value
     }
+    return $null
 }
 
-# State: Present
-# Ensure the DHCP Lease/Reservation is present, and consistent
-if ($state -eq "present") {
-
-    # Current lease exists, and is not a reservation
-    if (($current_lease_reservation -eq $false) -and ($current_lease_exists -eq $true)) {
-        if ($type -eq "reservation") {
-            Try {
-                # Update parameters
-                $params = @{ }
-                if ($mac) {
-                    $params.ClientId = $mac
-                }
-                else {
-                    $params.ClientId = $current_lease.ClientId
-                }
-
-                if ($description) {
-                    $params.Description = $description
-                }
-                else {
-                    $params.Description = $current_lease.Description
-                }
-
-                if ($reservation_name) {
-                    $params.Name = $reservation_name
-                }
-                else {
-                    $params.Name = "reservation-" + $params.ClientId
-                }
-
-                # Desired type is reservation
-                $current_lease | Add-DhcpServerv4Reservation -WhatIf:$check_mode
-                $current_reservation = Get-DhcpServerv4Lease -ClientId $params.ClientId -ScopeId $current_lease.ScopeId
-
-                # Update the reservation with new values
-                $current_reservation | Set-DhcpServerv4Reservation @params -WhatIf:$check_mode
-                $updated_reservation = Get-DhcpServerv4Lease -ClientId $params.ClientId -ScopeId $current_reservation.ScopeId
-
-                # Successful, compare values
-                $module.Result.changed = Compare-DhcpLease -Original $original_lease -Updated $reservation
-
-                # Return values
-                $module.Result.lease = Convert-ReturnValue -Object $updated_reservation
-                $module.ExitJson()
-            }
-            Catch {
-                $module.Result.changed = $false
-                $module.FailJson("Could not convert lease to a reservation")
-            }
-        }
-
-        # Nothing needs to be done, already in the desired state
-        if ($type -eq "lease") {
-            $module.Result.skipped = $true
-            $module.msg = "The lease is already in it's desired state"
-            $module.ExitJson()
-        }
-    }
-
-    # Current lease exists, and is a reservation
-    if (($current_lease_reservation -eq $true) -and ($current_lease_exists -eq $true)) {
-        if ($type -eq "lease") {
-            Try {
-                # Desired type is a lease, remove the reservation
-                $current_lease | Remove-DhcpServerv4Reservation -WhatIf:$check_mode
-
-                # Build a new lease object with remnants of the reservation
-                $lease_params = @{
-                    ClientId = $original_lease.ClientId
-                    IPAddress = $original_lease.IPAddress.IPAddressToString
-                    ScopeId = $original_lease.ScopeId.IPAddressToString
-                    HostName = $original_lease.HostName
-                    AddressState = 'Active'
-                }
-
-                # Create new lease
-                Try {
-                    Add-DhcpServerv4Lease @lease_params -WhatIf:$check_mode
-                }
-                Catch {
-                    $module.Result.changed = $false
-                    $module.Result.params = $lease_params
-                    $module.FailJson("Unable to convert the reservation to a lease")
-                }
-
-                # Get the lease we just created
-                Try {
-                    $new_lease = Get-DhcpServerv4Lease -ClientId $lease_params.ClientId -ScopeId $lease_params.ScopeId
-                }
-                Catch {
-                    $module.Result.changed = $false
-                    $module.FailJson("Unable to retreive the newly created lease")
-                }
-
-                # Successful
-                $module.Result.changed = $true
-                $module.Diff.after = Convert-ReturnValue -Object $new_lease
-                $module.Result.lease = Convert-ReturnValue -Object $new_lease
-                $module.ExitJson()
-            }
-            Catch {
-                $module.Result.changed = $false
-                $module.FailJson("Could not convert reservation to lease")
-            }
-        }
-
-        # Already in the desired state
-        if ($type -eq "reservation") {
-
-            # Update parameters
-            $params = @{ }
-            if ($mac) {
-                $params.ClientId = $mac
-            }
-            else {
-                $params.ClientId = $current_lease.ClientId
-            }
-
-            if ($description) {
-                $params.Description = $description
-            }
-            else {
-                $params.Description = $current_lease.Description
-            }
-
-            if ($reservation_name) {
-                $params.Name = $reservation_name
-            }
-            else {
-                if ($null -eq $original_lease.Name) {
-                    $params.Name = "reservation-" + $original_lease.ClientId
-                }
-                else {
-                    $params.Name = $original_lease.Name
-                }
-            }
-
-            # Update the reservation with new values
-            $current_lease | Set-DhcpServerv4Reservation @params -WhatIf:$check_mode
-            $reservation = Get-DhcpServerv4Lease -ClientId $current_lease.ClientId -ScopeId $current_lease.ScopeId
-
-            # Successful
-            $module.Result.changed = Compare-DhcpLease -Original $original_lease -Updated $reservation
+Function ConvertTo-ExclusionKey {
+    Param(
+        $Range
+    )
 
-            # Return values
-            $module.Result.lease = Convert-ReturnValue -Object $reservation
-            $module.ExitJson()
+    # Accepts "start-end", a CIDR block, a single address or a dict with start/end
+    if ($Range -is [System.Collections.IDictionary]) {
+        $start = $Range.start
+        $end = $Range.start
+        if ($Range.end) {
+            $end = $Range.end
         }
     }
-
-    # Lease Doesn't Exist - Create
-    if ($current_lease_exists -eq $false) {
-
-        # Required: MAC and IP address
-        if ((-not $mac) -or (-not $ip)) {
-            $module.Result.changed = $false
-            $module.FailJson("The ip and mac parameters are required for state=present")
-        }
-
-        # Required: Scope ID
-        if (-not $scope_id) {
-            $module.Result.changed = $false
-            $module.FailJson("The scope_id parameter is required for state=present")
-        }
-
-        # Required Parameters
-        $lease_params = @{
-            ClientId     = $mac
-            IPAddress    = $ip
-            ScopeId      = $scope_id
-            AddressState = 'Active'
-            Confirm      = $false
-        }
-
-        if ($duration) {
-            $lease_params.LeaseExpiryTime = (Get-Date).AddDays($duration)
-        }
-
-        if ($dns_hostname) {
-            $lease_params.HostName = $dns_hostname
-        }
-
-        if ($dns_regtype) {
-            $lease_params.DnsRR = $dns_regtype
-        }
-
-        if ($description) {
-            $lease_params.Description = $description
-        }
-
-        # Create Lease
+    elseif ("$Range" -like "*/*") {
+        # The whole block is excluded, as the action plugin validates it
+        $address, $length = "$Range".Split('/', 2)
         Try {
-            # Create lease based on parameters
-            Add-DhcpServerv4Lease @lease_params -WhatIf:$check_mode
-
-            # Retreive the lease
-            $new_lease = Get-DhcpServerv4Lease -ClientId $mac -ScopeId $scope_id
-
-            # If lease is the desired type
-            if ($type -eq "lease") {
-                $module.Result.changed = $true
-                $module.Diff.after = Convert-ReturnValue -Object $new_lease
-                $module.Result.lease = Convert-ReturnValue -Object $new_lease
-                $module.ExitJson()
-            }
-        }
-        Catch {
-            # Failed to create lease
-            $module.Result.changed = $false
-            $module.FailJson("Could not create DHCP lease")
-        }
-
-        # Create Reservation
-        Try {
-            # If reservation is the desired type
-            if ($type -eq "reservation") {
-                if ($reservation_name) {
-                    $lease_params.Name = $reservation_name
-                }
-                else {
-                    $lease_params.Name = "reservation-" + $mac
-                }
-
-                # Convert to Reservation
-                $lease | Add-DhcpServerv4Reservation -WhatIf:$check_mode
-                # Get DHCP reservation object
-                $new_lease = Get-DhcpServerv4Reservation -ClientId $mac -ScopeId $scope_id
-                $module.Result.changed = $true
-                $module.Diff.after = Convert-ReturnValue -Object $new_lease
-                $module.Result.lease = Convert-ReturnValue -Object $new_lease
-                $module.ExitJson()
-            }
+            $mask = Convert-IPv4ToUInt32 -IPAddress (Get-SubnetMask -Length ([int]$length.Trim()))
+            $network = (Convert-IPv4ToUInt32 -IPAddress $address.Trim()) -band $mask
+            $start = Convert-UInt32ToIPv4 -Value $network
+            $end = Convert-UInt32ToIPv4 -Value ($network -bor ([uint32]::MaxValue -bxor $mask))
         }
         Catch {
-            # Failed to create reservation
-            $module.Result.changed = $false
-            $module.FailJson("Could not create DHCP reservation")
+            $module.FailJson("Invalid exclusion range $($Range): $($_.Exception.Message)", $_)
         }
     }
-}
-
-$module.ExitJson()
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-#!powershell
-
-# Copyright © 2019 VMware, Inc. All Rights Reserved.
-# SPDX-License-Identifier: GPL-3.0-only
-# Ansible Module by Joseph Zollo (jzollo@vmware.com)
-
-#AnsibleRequires -CSharpUtil Ansible.Basic
-#Requires -Module Ansible.ModuleUtils.CamelConversion
-#Requires -Module Ansible.ModuleUtils.FileUtil
-#Requires -Module Ansible.ModuleUtils.Legacy
-
-$ErrorActionPreference = "Stop"
-
-Function Convert-MacAddress {
-    Param(
-        [string]$mac
-    )
-
-    # Evaluate Length
-    if ($mac.Length -eq 12) {
-        # Insert Dashes
-        $mac = $mac.Insert(2, "-").Insert(5, "-").Insert(8, "-").Insert(11, "-").Insert(14, "-")
-        return $mac
-    }
-    elseif ($mac.Length -eq 17) {
-        # Remove Dashes
-        $mac = $mac -replace '-'
-        return $mac
+    elseif ("$Range" -like "*-*") {
+        $start, $end = "$Range".Split('-', 2)
     }
     else {
-        return $false
+        $start = $end = "$Range"
     }
-}
 
-Function Convert-ReturnValues {
-    Param(
-        $Object
-    )
-
-    $data = @{
-        AddressState = $Object.AddressState
-        ClientId     = $Object.ClientId
-        IPAddress    = $Object.IPAddress.IPAddressToString
-        ScopeId      = $Object.ScopeId.IPAddressToString
-        Name         = $Object.Name
-        Description  = $Object.Description
+    Try {
+        $start = ([System.Net.IPAddress]::Parse($start.Trim())).IPAddressToString
+        $end = ([System.Net.IPAddress]::Parse($end.Trim())).IPAddressToString
     }
-
-    return $data
+    Catch {
+        $module.FailJson("Invalid exclusion range $($Range): $($_.Exception.Message)", $_)
+    }
+    return "$start-$end"
 }
 
-# option ID special values DnsServer, DnsDomain, Router, Wpad
-
-<#
-
-6 = DNS Servers
-1 = Subnet Mask
-3 = Router
-252 = Web Proxy Auto Discover 
-
-#>
-
-
-Function Convert-SpecialType {
+Function Compare-ValueSet {
     Param(
-        [string]$id
+        [string[]]$Reference,
+        [string[]]$Difference
     )
 
-    Switch ($id) {
-        "dnsserver" { $return_id = 6; break }
-        "dnsdomain" { $return_id = 1; break }
-        "router" { $return_id = 3; break }
-        "subnetmask" { $return_id = 1; break }
-        "wpad" { $return_id = 252; break } 
+    # Returns the items of Difference missing from Reference, order preserved
+    $set = New-Object -TypeName 'System.Collections.Generic.HashSet[string]'
+    foreach ($item in $Reference) {
+        [void]$set.Add($item)
     }
-
-    return $return_id
+    $missing = [System.Collections.ArrayList]@()
+    foreach ($item in $Difference) {
+        if (-not $set.Contains($item)) {
+            [void]$missing.Add($item)
+        }
+    }
+    return , $missing
 }
 
-Function Get-DhcpOption {
+Function Get-ScopeOptionTable {
     Param(
-        [string]$id,
-        [string]$name,
-        [string]$state,
-        [string]$data
+        [string]$ScopeId
     )
 
-    Switch ($state) {
-
-        "present" { 
-            $options = Get-DhcpServerv4OptionValue
-            break 
-        }
-    
-        "server" { 
-            $options = Get-DhcpServerv4OptionValue
-            break
-        }
-
-        "scope" { 
-            $options = Get-DhcpServerv4OptionValue -ScopeId $data
-            break
-        }
-
-        "reservation" { 
-            $options = Get-DhcpServerv4OptionValue -ReservedIP $data
-            break
+    $table = @{}
+    Try {
+        foreach ($option in (Get-DhcpServerv4OptionValue -ScopeId $ScopeId)) {
+            $table[[int]$option.OptionId] = [string[]]@($option.Value)
         }
     }
-
-    Get-DhcpServerv4OptionValue -ScopeId
-
-}
-
-# Doesn't Support Check or Diff Mode
-$params = Parse-Args -arguments $args -supports_check_mode $false
-$check_mode = Get-AnsibleParam -obj $params -name "_ansible_check_mode" -type "bool" -default $false
-$diff_mode = Get-AnsibleParam -obj $params -name "_ansible_diff" -type "bool" -default $false
-
-# Client Config Params
-$id = Get-AnsibleParam -obj $params -name "id" -type "str"
-
-
-
-
-$type = Get-AnsibleParam -obj $params -name "type" -type "str"
-$name = Get-AnsibleParam -obj $params -name "name" -type "str"
-$default_value = Get-AnsibleParam -obj $params -name "default_value" -type "str"
-$description = Get-AnsibleParam -obj $params -name "description" -type "str"
-$state = Get-AnsibleParam -obj $params -name "state" -type "str" -default "present" -validateset ("absent", "present", "server", "scope", "reservation")
-$value = Get-AnsibleParam -obj $params -name "value" -type "str"
-
-# State = Scope
-$scope_id = Get-AnsibleParam -obj $params -name "scope_id" -type "str"
-
-# State = Reservation
-$reservation_ip = Get-AnsibleParam -obj $params -name "reservation_ip" -type "str"
-
-$dns_domain = Get-AnsibleParam -obj $params -name "dns_domain" -type "str"
-$dns_server = Get-AnsibleParam -obj $params -name "dns_server" -type "str"
-
-
-
-# Result KVP
-$result = @{
-    changed = $false
+    Catch {
+        $module.FailJson("Unable to read the options of scope $($ScopeId): $($_.Exception.Message)", $_)
+    }
+    return $table
 }
 
-# Import DHCP Server PS Module
 Try {
+    # Import DHCP Server PS Module
     Import-Module DhcpServer
 }
 Catch {
     # Couldn't load the DhcpServer Module
-    Fail-Json -obj $result -message "The DhcpServer module failed to load properly."
+    $module.FailJson("The DhcpServer module failed to load properly: $($_.Exception.Message)", $_)
 }
 
+$mask = Get-SubnetMask -Mask $subnet_mask -Length $subnet_length
 
+# Derive the scope id from the pool, fall back to a lookup by name
+if ((-not $scope_id) -and $pool_start -and $mask) {
+    $network = (Convert-IPv4ToUInt32 -IPAddress $pool_start) -band (Convert-IPv4ToUInt32 -IPAddress $mask)
+    $scope_id = Convert-UInt32ToIPv4 -Value $network
+}
 
-<#
-
-// Server wide
-Set-DhcpServerv4OptionValue -OptionId 6 -Value "192.168.1.1"
-
-// 
-Set-DhcpServerv4OptionValue -DnsServer 192.168.1.2 -WinsServer 192.168.1.3 -DnsDomain "contoso.com" -Router 192.168.1.1 -Wpad "http://proxy.contoso.com/wpad.dat"
-
-Set-DhcpServerv4OptionValue -ScopeId 10.10.10.0 -DnsServer 192.168.1.2 -WinsServer 192.168.1.3 -DnsDomain "contoso.com" -Router 192.168.1.1 -Wpad "http://proxy.contoso.com/wpad.dat"
-Set-DhcpServerv4OptionValue -ReservedIP 10.10.10.5 -DnsServer 192.168.1.2 -WinsServer 192.168.1.3 -DnsDomain "contoso.com" -Router 192.168.1.1 -Wpad "http://proxy.contoso.com/wpad.dat"
-Set-DhcpServerv4OptionValue -ReservedIP 10.10.10.5 -DnsServer 192.168.1.2 -WinsServer 192.168.1.3 -DnsDomain "contoso.com" -Router 192.168.1.1 -Wpad "http://proxy.contoso.com/wpad.dat"
-Set-DhcpServerv4OptionValue -ScopeId 10.10.10.0 -PolicyName "LabComputers" -DnsServer 192.168.1.2 -WinsServer 192.168.1.3 -DnsDomain "contoso.com" -Router 192.168.1.1 -Wpad "http://proxy.contoso.com/wpad.dat"
-
-Add-DhcpServerv4OptionDefinition -Name "UCIdentifier" -OptionId 1 -Type "BinaryData" -VendorClass "MS-UC-Client" -Description "UC Identifier"
-
-#>
-
-
-
-# Determine if the option is present
-
-Switch ($state) {
-
-
-    "absent" { 
-        Get-DhcpOption
-        break 
+Try {
+    if ($scope_id) {
+        $current_scope = Get-DhcpServerv4Scope -ScopeId $scope_id -ErrorAction SilentlyContinue
     }
-
-
-    "present" { 
-
-        break 
+    else {
+        $current_scope = Get-DhcpServerv4Scope | Where-Object Name -eq $name | Select-Object -First 1
     }
+}
+Catch {
+    $current_scope = $null
+}
 
+$module.Diff.before = ""
+if ($current_scope) {
+    $scope_id = $current_scope.ScopeId.IPAddressToString
+    $module.Diff.before = Get-DhcpScopeObject -Object $current_scope
+}
 
-    "server" { 
-
-        break 
+# State: Absent
+if ($state -eq "absent") {
+    if (-not $current_scope) {
+        $module.Result.msg = "The scope doesn't exist."
+        $module.ExitJson()
     }
 
-
-    "scope" { 
-
-        break 
+    Try {
+        Remove-DhcpServerv4Scope -ScopeId $scope_id -Force -WhatIf:$check_mode
     }
-
-
-    "reservation" { 
-
-        break 
+    Catch {
+        $module.FailJson("Unable to remove scope $($scope_id): $($_.Exception.Message)", $_)
     }
 
-
+    $module.Result.changed = $true
+    $module.Diff.after = ""
+    $module.ExitJson()
 }
 
-
-
-
-
-
-
-# Did we find a lease/reservation
-if ($current_lease) {
-    $current_lease_exists = $true
+# State: Present
+$scope_params = @{}
+if ($null -ne $description) {
+    $scope_params.Description = $description
 }
-else {
-    $current_lease_exists = $false
+if ($null -ne $active) {
+    $scope_params.State = "InActive"
+    if ($active) {
+        $scope_params.State = "Active"
+    }
 }
-
-# If we found a lease, is it a reservation
-if ($current_lease_exists -eq $true -and ($current_lease.AddressState -like "*Reservation*")) {
-    $current_lease_reservation = $true
+if ($null -ne $subnet_delay) {
+    $scope_params.Delay = $subnet_delay
 }
-else {
-    $current_lease_reservation = $false
+if ($lease_duration) {
+    Try {
+        $scope_params.LeaseDuration = [TimeSpan]::Parse($lease_duration)
+    }
+    Catch {
+        $module.FailJson("lease_duration must be a timespan such as 8.00:00:00: $($_.Exception.Message)", $_)
+    }
 }
 
-# State: Absent
-# Ensure the DHCP Lease/Reservation is not present
-if ($state -eq "absent") {
-
-    # Required: MAC or IP address
-    if ((-not $mac) -and (-not $ip)) {
-        $result.changed = $false
-        Fail-Json -obj $result -message "The ip or mac parameter is required for state=absent"
+$scope_created = $false
+if (-not $current_scope) {
+    if (-not ($pool_start -and $mask)) {
+        $module.FailJson("pool_start, pool_end and subnet_mask or subnet_length are required to create a scope")
     }
 
-    # If the lease exists, we need to destroy it
-    if ($current_lease_reservation -eq $true) {
-        # Try to remove reservation
-        Try {
-            $current_lease | Remove-DhcpServerv4Reservation 
-            $state_absent_removed = $true
-        }
-        Catch {
-            $state_absent_removed = $false
-        }
+    Try {
+        $current_scope = Add-DhcpServerv4Scope -Name $name -StartRange $pool_start -EndRange $pool_end `
+            -SubnetMask $mask @scope_params -PassThru -WhatIf:$check_mode
     }
-    else {
-        # Try to remove lease
-        Try {
-            $current_lease | Remove-DhcpServerv4Lease 
-            $state_absent_removed = $true
-        }
-        Catch { 
-            $state_absent_removed = $false
-        }
+    Catch {
+        $module.FailJson("Unable to create scope $($name): $($_.Exception.Message)", $_)
     }
-
-    # If the lease doesn't exist, our work here is done
-    if ($current_lease_exists -eq $false) {
-        $result.changed = $false
-        Exit-Json -obj $result
+    $module.Result.changed = $true
+    $scope_created = $true
+}
+else {
+    if ($mask -and ($current_scope.SubnetMask.IPAddressToString -ne $mask)) {
+        $module.FailJson("The subnet mask of scope $scope_id is $($current_scope.SubnetMask.IPAddressToString), it can't be changed to $mask")
     }
 
-    # See if we removed the lease/reservation
-    if ($state_absent_removed) {
-        $result.changed = $true
-        Exit-Json -obj $result
+    # Only pass the properties that differ from the current scope
+    $set_params = @{}
+    if ($current_scope.Name -ne $name) {
+        $set_params.Name = $name
     }
-    else {
-        $result.lease = Convert-ReturnValues -Object $current_lease
-        Fail-Json -obj $result -message "Could not remove lease/reservation"
+    if ($pool_start -and ($current_scope.StartRange.IPAddressToString -ne $pool_start)) {
+        $set_params.StartRange = $pool_start
     }
-} 
-
-# State: Present
-# Ensure the DHCP Lease/Reservation is present, and consistent
-if ($state -eq "present") {
-
-    # Current lease exists, and is not a reservation
-    if (($current_lease_reservation -eq $false) -and ($current_lease_exists -eq $true)) {
-        if ($type -eq "reservation") {
-            Try {
-                # Update parameters
-                $params = @{ }
-                if ($mac) {
-                    $params.ClientId = $mac
-                }
-                else {
-                    $params.ClientId = $current_lease.ClientId
-                }
-
-                if ($description) {
-                    $params.Description = $description
-                }
-                else {
-                    $params.Description = $current_lease.Description
-                }
-
-                if ($reservation_name) {
-                    $params.Name = $reservation_name
-                }
-                else {
-                    $params.Name = $current_lease.ClientId + "-" + "res"
-                }
-    
-                # Desired type is reservation
-                $current_lease | Add-DhcpServerv4Reservation
-                $current_reservation = Get-DhcpServerv4Reservation -ClientId $current_lease.ClientId -ScopeId $current_lease.ScopeId
-                # Update the reservation with new values
-                $current_reservation | Set-DhcpServerv4Reservation @params
-                $reservation = Get-DhcpServerv4Reservation -ClientId $current_reservation.ClientId -ScopeId $current_reservation.ScopeId
-                # Successful
-                $result.changed = $true
-                $result.lease = Convert-ReturnValues -Object $reservation
-                Exit-Json -obj $result
-            }
-            Catch {
-                $result.changed = $false
-                Fail-Json -obj $result -message "Could not convert lease to a reservation"
-            }
-        }
-
-        # Nothing needs to be done, already in the desired state
-        if ($type -eq "lease") {
-            $result.changed = $false
-            $result.lease = Convert-ReturnValues -Object $current_lease
-            Exit-Json -obj $result
+    if ($pool_end -and ($current_scope.EndRange.IPAddressToString -ne $pool_end)) {
+        $set_params.EndRange = $pool_end
+    }
+    foreach ($key in $scope_params.Keys) {
+        if ("$($current_scope.$key)" -ne "$($scope_params.$key)") {
+            $set_params.$key = $scope_params.$key
         }
     }
 
-    # Current lease exists, and is a reservation
-    if (($current_lease_reservation -eq $true) -and ($current_lease_exists -eq $true)) {
-        if ($type -eq "lease") {
-            Try {
-                # Save Lease Data
-                $lease = $current_lease
-                # Desired type is a lease, remove & recreate
-                $current_lease | Remove-DhcpServerv4Reservation
-                # Create new lease
-                Add-DhcpServerv4Lease -Name $lease.Name -IPAddress $lease.IPAddress -ClientId $lease.ClientId -Description $lease.Description -ScopeId $lease.ScopeId
-                # Get the lease we just created
-                $new_lease = Get-DhcpServerv4Lease -ClientId $lease.ClientId -ScopeId $lease.ScopeId
-                # Successful
-                $result.changed = $true
-                $result.lease = Convert-ReturnValues -Object $new_lease
-                Exit-Json -obj $result
-            }
-            Catch {
-                $result.changed = $false
-                Fail-Json -obj $result -message "Could not convert reservation to lease"
-            }
+    if ($set_params.Count -gt 0) {
+        Try {
+            Set-DhcpServerv4Scope -ScopeId $scope_id @set_params -WhatIf:$check_mode
         }
+        Catch {
+            $module.FailJson("Unable to update scope $($scope_id): $($_.Exception.Message)", $_)
+        }
+        $module.Result.changed = $true
+    }
+}
 
-        # Already in the desired state
-        if ($type -eq "reservation") {
-
-            # Update parameters
-            $params = @{ }
-            if ($mac) {
-                $params.ClientId = $mac
-            }
-            else {
-                $params.ClientId = $current_lease.ClientId
-            }
-
-            if ($description) {
-                $params.Description = $description
-            }
-            else {
-                $params.Description = $current_lease.Description
-            }
+# Exclusions: exclusion_list is the complete set of ranges
+if ($null -ne $exclusion_list) {
+    $desired = [System.Collections.ArrayList]@()
+    foreach ($range in $exclusion_list) {
+        [void]$desired.Add((ConvertTo-ExclusionKey -Range $range))
+    }
+    # A range listed twice, in any notation, is added once
+    $desired = @($desired | Select-Object -Unique)
 
-            if ($reservation_name) {
-                $params.Name = $reservation_name
+    $current = [System.Collections.ArrayList]@()
+    if (-not $scope_created) {
+        Try {
+            foreach ($range in (Get-DhcpServerv4ExclusionRange -ScopeId $scope_id)) {
+                [void]$current.Add("$($range.StartRange.IPAddressToString)-$($range.EndRange.IPAddressToString)")
             }
-
-            # Update the reservation with new values
-            $current_lease | Set-DhcpServerv4Reservation @params
-            $reservation = Get-DhcpServerv4Reservation -ClientId $current_lease.ClientId -ScopeId $current_lease.ScopeId
-            # Successful
-            $result.changed = $true
-            $result.lease = Convert-ReturnValues -Object $reservation
-            Exit-Json -obj $result
+        }
+        Catch {
+            $module.FailJson("Unable to read the exclusion ranges of scope $($scope_id): $($_.Exception.Message)", $_)
         }
     }
 
-    # Lease Doesn't Exist - Create
-    if ($current_lease_exists -eq $false) {
+    $exclusions_removed = Compare-ValueSet -Reference $desired -Difference $current
+    $exclusions_added = Compare-ValueSet -Reference $current -Difference $desired
 
-        # Required: MAC and IP address
-        if ((-not $mac) -or (-not $ip)) {
-            $result.changed = $false
-            Fail-Json -obj $result -message "The ip and mac parameters are required for state=present"
+    # Remove first, so a resized range doesn't overlap its old bounds
+    foreach ($range in $exclusions_removed) {
+        $start, $end = $range.Split('-')
+        Try {
+            Remove-DhcpServerv4ExclusionRange -ScopeId $scope_id -StartRange $start -EndRange $end -WhatIf:$check_mode
         }
-
-        # Required: Scope ID
-        if (-not $scope_id) {
-            $result.changed = $false
-            Fail-Json -obj $result -message "The scope_id parameter is required for state=present"
+        Catch {
+            $module.FailJson("Unable to remove exclusion range $($range): $($_.Exception.Message)", $_)
         }
-
-        # Required Parameters
-        $lease_params = @{
-            ClientId     = $mac
-            IPAddress    = $ip
-            ScopeId      = $scope_id
-            AddressState = 'Active'
-            Confirm      = $false
+    }
+    foreach ($range in $exclusions_added) {
+        $start, $end = $range.Split('-')
+        Try {
+            Add-DhcpServerv4ExclusionRange -ScopeId $scope_id -StartRange $start -EndRange $end -WhatIf:$check_mode
         }
-
-        if ($duration) {
-            $lease_params.LeaseExpiryTime = (Get-Date).AddDays($duration)
+        Catch {
+            $module.FailJson("Unable to add exclusion range $($range): $($_.Exception.Message)", $_)
         }
+    }
 
-        if ($dns_hostname) {
-            $lease_params.HostName = $dns_hostname
-        }
+    if ($exclusions_removed.Count -gt 0 -or $exclusions_added.Count -gt 0) {
+        $module.Result.changed = $true
+    }
+    $module.Result.exclusions_added = $exclusions_added
+    $module.Result.exclusions_removed = $exclusions_removed
+    if ($module.Diff.before) {
+        $module.Diff.before.exclusion_list = @($current | Sort-Object)
+    }
+    $exclusions_after = @($desired | Sort-Object -Unique)
+}
 
-        if ($dns_regtype) {
-            $lease_params.DnsRR = $dns_regtype
-        }
+# Options: listed option ids are set, the rest are only removed with purge_options
+if ($null -ne $scope_options) {
+    $current = @{}
+    if (-not $scope_created) {
+        $current = Get-ScopeOptionTable -ScopeId $scope_id
+    }
+    $desired = @{}
+    foreach ($option in $scope_options) {
+        $desired[[int]$option.option_id] = [string[]]@($option.value)
+    }
 
-        if ($description) {
-            $lease_params.Description = $description
+    # Option values are ordered, clients try routers and dns servers in order
+    $options_set = [System.Collections.ArrayList]@()
+    foreach ($option_id in ($desired.Keys | Sort-Object)) {
+        $value = $desired[$option_id]
+        if ($current.ContainsKey($option_id) -and (($current[$option_id] -join ',') -ceq ($value -join ','))) {
+            continue
         }
-
-        # Create Lease
         Try {
-            # Create lease based on parameters
-            Add-DhcpServerv4Lease @lease_params
-            # Retreive the lease
-            $lease = Get-DhcpServerv4Lease -ClientId $mac -ScopeId $scope_id
-
-            # If lease is the desired type
-            if ($type -eq "lease") {
-                $result.changed = $true
-                $result.lease = Convert-ReturnValues -Object $lease
-                Exit-Json -obj $result
-            }
+            Set-DhcpServerv4OptionValue -ScopeId $scope_id -OptionId $option_id -Value $value -WhatIf:$check_mode
         }
         Catch {
-            # Failed to create lease
-            $result.changed = $false
-            Fail-Json -obj $result -message "Could not create DHCP lease"
+            $module.FailJson("Unable to set option $option_id on scope $($scope_id): $($_.Exception.Message)", $_)
         }
+        [void]$options_set.Add($option_id)
+    }
 
-        # Create Reservation
-        Try {
-            # If reservation is the desired type
-            if ($type -eq "reservation") {
-                if ($reservation_name) {
-                    $lease_params.Name = $reservation_name
-                }
-                else {
-                    $lease_params.Name = $mac + "_" + "pc"
-                }
-
-                # Convert to Reservation
-                $lease | Add-DhcpServerv4Reservation
-                # Get DHCP reservation object
-                $reservation = Get-DhcpServerv4Reservation -ClientId $mac -ScopeId $scope_id
-                $result.changed = $true
-                $result.lease = Convert-ReturnValues -Object $reservation
-                Exit-Json -obj $result
+    $options_removed = [System.Collections.ArrayList]@()
+    if ($purge_options) {
+        # Option 51 is the lease time, managed by lease_duration
+        foreach ($option_id in ($current.Keys | Where-Object { $_ -ne 51 -and -not $desired.ContainsKey($_) } | Sort-Object)) {
+            Try {
+                Remove-DhcpServerv4OptionValue -ScopeId $scope_id -OptionId $option_id -WhatIf:$check_mode
             }
+            Catch {
+                $module.FailJson("Unable to remove option $option_id from scope $($scope_id): $($_.Exception.Message)", $_)
+            }
+            [void]$options_removed.Add($option_id)
         }
-        Catch {
-            # Failed to create reservation
-            $result.changed = $false
-            Fail-Json -obj $result -message "Could not create DHCP reservation"
+    }
+
+    if ($options_set.Count -gt 0 -or $options_removed.Count -gt 0) {
+        $module.Result.changed = $true
+    }
+    $module.Result.options_set = $options_set
+    $module.Result.options_removed = $options_removed
+
+    $options_before = @{}
+    $options_after = @{}
+    foreach ($option_id in $current.Keys) {
+        $options_before["$option_id"] = $current[$option_id]
+        if (-not $purge_options -or $option_id -eq 51) {
+            $options_after["$option_id"] = $current[$option_id]
         }
     }
+    foreach ($option_id in $desired.Keys) {
+        $options_after["$option_id"] = $desired[$option_id]
+    }
+    if ($module.Diff.before) {
+        $module.Diff.before.scope_options = $options_before
+    }
+}
+
+# Return values
+if ($current_scope -and -not $check_mode) {
+    $scope = Get-DhcpScopeObject -Object (Get-DhcpServerv4Scope -ScopeId $scope_id)
+}
+elseif ($current_scope) {
+    $scope = Get-DhcpScopeObject -Object $current_scope
+}
+else {
+    $scope = @{ name = $name; scope_id = $scope_id }
+}
+if ($null -ne $exclusion_list) {
+    $scope.exclusion_list = $exclusions_after
+}
+if ($null -ne $scope_options) {
+    $scope.scope_options = $options_after
 }
 
-# Exit, Return Result
-Exit-Json -obj $result
\ No newline at end of file
+$module.Result.scope = $scope
+$module.Diff.after = $scope
+$module.ExitJson()
@@ -19,76 +19,119 @@ requirements:
 description:
   - Manage Windows DHCP Server Scopes
   - Task should be delegated to a Windows DHCP Server
+  - Exclusion ranges and option values are compared against the current
+    scope and only the differences are written, an unchanged scope makes
+    no writes.
 options:
-  type:
-    description:
-      - The type of DHCP address.
-      - Leases expire as defined by l(duration).
-      - When l(duration) is not specified, the server default is used.
-      - Reservations are permanent.
-    type: str
-    default: reservation
-    choices: [ reservation, lease ]
   state:
     description:
-      - Specifies the desired state of the DHCP lease or reservation.
+      - Specifies the desired state of the DHCP scope.
     type: str
     default: present
     choices: [ present, absent ]
-  ip:
+  name:
     description:
-      - The IPv4 address of the client server/computer.
-      - This is a required parameter, if l(mac) is not set.
-      - Can be used to identify an existing lease/reservation, instead of l(mac).
+      - The name of the DHCP scope.
+      - Used to find an existing scope when l(scope_id) can't be determined.
     type: str
-    required: no
+    required: yes
   scope_id:
     description:
-      - Specifies the scope identifier as defined by the DHCP server.
-      - This is a required parameter, if l(state=present) and the reservation or lease
-        doesn't already exist. Not required if updating an existing lease or reservation.
+      - The scope identifier, the network address of the scope.
+      - Derived from l(pool_start) and the subnet mask when not set.
     type: str
-  mac:
+  active:
     description:
-      - Specifies the client identifier to be set on the IPv4 address.
-      - This is a required parameter, if l(ip) is not set.
-      - Windows clients use the MAC address as the client ID.
-      - Linux and other operating systems can use other types of identifiers.
-      - Can be used to identify an existing lease/reservation, instead of l(ip).
-    type: str
-  duration:
+      - Whether the scope is active.
+    type: bool
+  pool_start:
     description:
-      - Specifies the duration of the DHCP lease in days.
-      - The duration value only applies to l(type=lease).
-      - Defaults to the duration specified by the DHCP server
-        configuration.
-      - Only applicable to l(type=lease).
-    type: int
-  dns_hostname:
+      - The first IPv4 address of the scope address range.
+      - Required, with l(pool_end), to create a scope.
+    type: str
+  pool_end:
     description:
-      - Specifies the DNS hostname of the client for which the IP address
-        lease is to be added.
+      - The last IPv4 address of the scope address range.
     type: str
-  dns_regtype:
+  subnet_mask:
     description:
-      - Indicates the type of DNS record to be registered by the DHCP.
-        server service for this lease.
-      - l(a) results in an A record being registered.
-      - l(aptr) results in both A and PTR records to be registered.
-      - l(noreg) results in no DNS records being registered.
+      - The subnet mask of the scope, such as C(255.255.255.0).
+      - Mutually exclusive with l(subnet_length).
+      - The subnet mask of an existing scope can't be changed.
     type: str
-    default: aptr
-    choices: [ aptr, a, noreg ]
-  reservation_name:
+  subnet_length:
     description:
-      - Specifies the name of the reservation being created.
-      - Only applicable to l(type=reservation).
+      - The prefix length of the scope, such as C(24).
+      - Mutually exclusive with l(subnet_mask).
+    type: int
+  subnet_delay:
+    description:
+      - The number of milliseconds the DHCP server waits before responding
+        to a client.
+    type: int
+  lease_duration:
+    description:
+      - The lease duration of the scope, as a timespan in the format
+        C(days.hours:minutes:seconds).
     type: str
   description:
     description:
-      - Specifies the description for reservation being created.
-      - Only applicable to l(type=reservation).
+      - The description of the scope.
     type: str
+  exclusion_list:
+    description:
+      - The complete list of exclusion ranges of the scope.
+      - Each entry is a C(start-end) range, a CIDR block such as
+        C(192.168.100.0/28), a single address or a dict with C(start) and
+        C(end) keys. A CIDR block excludes every address of the block.
+      - The current ranges are read once and only the missing ranges are
+        added and the unlisted ranges removed. An empty list removes every
+        exclusion range.
+      - When not set, the exclusion ranges are left untouched.
+    type: list
+  scope_options:
+    description:
+      - DHCP option values to set on the scope.
+      - The current option values are read once, only the options with a
+        different value are set.
+      - Options not listed are left untouched, unless l(purge_options=true).
+    type: list
+    elements: dict
+    suboptions:
+      option_id:
+        description:
+          - The DHCP option id, such as C(3) for the router or C(6) for the
+            DNS servers.
+        type: int
+        required: yes
+      value:
+        description:
+          - The ordered list of values of the option.
+        type: list
+        elements: str
+        required: yes
+        aliases: [ values ]
+  purge_options:
+    description:
+      - Removes the scope option values not listed in l(scope_options).
+      - Option C(51), the lease time, is never removed, it is set with
+        l(lease_duration).
+    type: bool
+    default: no
+  known_scopes:
+    description:
+      - A list of scopes known to exist on the DHCP server, in the format
+        returned by the C(scopes) key of C(win_dhcp_info).
+      - The requested pool and exclusion ranges are validated on the
+        controller before the DHCP server is contacted, against l(subnet_mask)
+        or l(subnet_length), or the mask of the known scope with the same
+        l(name) or l(scope_id). Without a mask the pool is left to the module.
+      - When set, a subnet overlapping a known scope with another name also
+        fails the task.
+      - This option is consumed by the action plugin and is not sent to the
+        DHCP server.
+    type: list
+    elements: dict
 
 author:
 - Joseph Zollo (@joezollo)
@@ -104,37 +147,78 @@ EXAMPLES = r'''
     pool_start: 192.168.100.10
     pool_end: 192.168.100.254
     subnet_mask: 255.255.255.0
-    subnet_length: 24
+    lease_duration: 8.00:00:00
     exclusion_list:
-    subnet_delay:
-    lease_duration:
+      - 192.168.100.10-192.168.100.49
+      - 192.168.100.100
     scope_options:
-    - router: 192.168.100.1
-      parent_domain: home.zollo.net
-      dns_servers:
-      - 8.8.8.8
-      - 8.8.4.4
+      - option_id: 3
+        value: [ 192.168.100.1 ]
+      - option_id: 6
+        value: [ 8.8.8.8, 8.8.4.4 ]
+      - option_id: 15
+        value: [ home.zollo.net ]
 
-- name: 
+- name: Remove every exclusion range and unlisted option of a scope
   win_dhcp_scope:
+    name: ZolloVLAN10
+    scope_id: 192.168.100.0
+    exclusion_list: []
+    scope_options:
+      - option_id: 3
+        value: [ 192.168.100.1 ]
+    purge_options: true
 
-- name: 
+- name: Ensure DHCP scope is absent
   win_dhcp_scope:
+    state: absent
+    name: ZolloVLAN10
+    scope_id: 192.168.100.0
 '''
 
 RETURN = r'''
 scope:
-  description: DHCP Scope
-  returned: 
+  description: The DHCP scope, including the exclusion ranges and option values when managed.
+  returned: When l(state=present)
   type: dict
-  sample: 
+  sample:
     name: 10.0.1.0-vlan1
     scope_id: 10.0.1.0
     subnet_mask: 255.255.255.0
-    state: Active
+    address_state: Active
+    description: VLAN 1
     start_range: 10.0.1.100
     end_range: 10.0.1.199
+    delay: 0
     lease_duration:
       days: 2
-      hours: 48
-'''
\ No newline at end of file
+      hours: 0
+    exclusion_list:
+      - 10.0.1.100-10.0.1.109
+    scope_options:
+      "3": [ 10.0.1.1 ]
+exclusions_added:
+  description: The exclusion ranges added to the scope.
+  returned: When l(exclusion_list) is set
+  type: list
+  elements: str
+  sample: [ 10.0.1.100-10.0.1.109 ]
+exclusions_removed:
+  description: The exclusion ranges removed from the scope.
+  returned: When l(exclusion_list) is set
+  type: list
+  elements: str
+  sample: [ 10.0.1.150-10.0.1.159 ]
+options_set:
+  description: The option ids set on the scope.
+  returned: When l(scope_options) is set
+  type: list
+  elements: int
+  sample: [ 3, 6 ]
+options_removed:
+  description: The option ids removed from the scope.
+  returned: When l(scope_options) is set
+  type: list
+  elements: int
+  sample: [ 44 ]
+'''
@@ -5,15 +5,29 @@
 # GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
 
 #AnsibleRequires -CSharpUtil Ansible.Basic
+#AnsibleRequires -PowerShell ansible_collections.zollo.windows.plugins.module_utils.DnsRecord
 
 $spec = @{
     options = @{
-        type = @{ type = "str"; choices = "zone", "record", "all"; default = "all" }
+        type = @{ type = "str"; choices = "zone", "record", "all", "summary"; default = "all" }
         zone_name = @{ type = "str"; }
         zone_type = @{ type = "str"; choices = "primary", "secondary", "forwarder", "stub"; }
         record_name = @{ type = "str"; }
-        record_type = @{ type = "str"; choices = "A", "AAAA", "MX", "CNAME", "PTR", "NS", "TXT"; }
+        record_type = @{ type = "str"; choices = "A", "AAAA", "MX", "CNAME", "PTR", "NS", "TXT", "SRV"; }
+        record_types = @{ type = "list"; elements = "str"; choices = "A", "AAAA", "MX", "CNAME", "PTR", "NS", "TXT", "SRV"; }
+        include_patterns = @{ type = "list"; elements = "str"; }
+        exclude_patterns = @{ type = "list"; elements = "str"; }
         filter_ad = @{ type = "bool"; default = $true }
+        output_format = @{ type = "str"; choices = "records", "columnar"; default = "records" }
+        throttle = @{ type = "int"; default = 1 }
+        top_names = @{ type = "int"; default = 10 }
+        known_serials = @{ type = "dict" }
+        # consumed by the action plugin
+        cache = @{ type = "bool"; default = $false }
+        cache_plugin = @{ type = "str"; default = "ansible.builtin.jsonfile" }
+        cache_connection = @{ type = "str" }
+        cache_timeout = @{ type = "int"; default = 0 }
+        cache_prefix = @{ type = "str"; default = "zollo_windows_dns_" }
     }
 }
 
@@ -26,73 +40,271 @@ $zone_type = $module.Params.zone_type
 $record_name = $module.Params.record_name
 $record_type = $module.Params.record_type
 $filter_ad = $module.Params.filter_ad
+$output_format = $module.Params.output_format
+$record_types = $module.Params.record_types
+$include_patterns = $module.Params.include_patterns
+$exclude_patterns = $module.Params.exclude_patterns
+$throttle = $module.Params.throttle
+$top_names = $module.Params.top_names
+$known_serials = $module.Params.known_serials
+
+# host name globs excluded by filter_ad
+$ad_patterns = @('_kerberos*', '_ldap*', '_kpasswd*', '_gc*', '*._msdcs*', 'gc._msdcs',
+    '*_ldap._tcp*', '*forestdnszones*', '*domaindnszones*')
+
+Function ConvertTo-GlobRegex {
+    Param([String[]]$Patterns)
+    # globs are merged into a single case insensitive regex
+    if (-not $Patterns) { return $null }
+    $parts = foreach ($glob in $Patterns) { [Regex]::Escape($glob).Replace('\*', '.*').Replace('\?', '.') }
+    return New-Object -TypeName Regex -ArgumentList "^(?:$($parts -join '|'))$", 'IgnoreCase, Compiled'
+}
+
+Function New-DnsRecordFilter {
+    Param(
+        [String[]]$Types,
+        [String[]]$Include,
+        [String[]]$Exclude,
+        [Boolean]$FilterAd
+    )
+
+    # compile the filter once, Select-DnsRecord applies it per record
+    $filter = @{ types = $null; rrtype = $null; include = $null; exclude = $null }
+    if ($Types) {
+        $filter.types = New-Object -TypeName 'System.Collections.Generic.HashSet[String]' -ArgumentList ([StringComparer]::OrdinalIgnoreCase)
+        foreach ($item in $Types) { [void]$filter.types.Add($item) }
+        # a single type is filtered by the DNS server
+        if ($filter.types.Count -eq 1) { $filter.rrtype = @($Types)[0]; $filter.types = $null }
+    }
+    if ($FilterAd) { $Exclude = @($Exclude) + $ad_patterns | Where-Object { $_ } }
+    $filter.include = ConvertTo-GlobRegex -Patterns $Include
+    $filter.exclude = ConvertTo-GlobRegex -Patterns $Exclude
+
+    return $filter
+}
+
+Function Select-DnsRecord {
+    Param(
+        [Hashtable]$Filter,
+        $Records
+    )
+
+    # single pass, matching records are collected into a growable list
+    $selected = New-Object -TypeName System.Collections.Generic.List[Object]
+    $types = $Filter.types
+    $include = $Filter.include
+    $exclude = $Filter.exclude
+    foreach ($record in $Records) {
+        if ($types -and -not $types.Contains([String]$record.RecordType)) { continue }
+        if ($include -and -not $include.IsMatch($record.HostName)) { continue }
+        if ($exclude -and $exclude.IsMatch($record.HostName)) { continue }
+        $selected.Add($record)
+    }
+
+    return , $selected
+}
 
 Function Get-DnsZoneRecordsObject {
     Param(
         [String]$ZoneName,
-        [String]$RRType,
-        [Boolean]$FilterAd,
+        [Hashtable]$Filter,
         [String]$RecordName
     )
 
     $parms = @{ZoneName = $ZoneName }
-    if ($RRType) { $parms.RRType = $RRType }
+    if ($Filter.rrtype) { $parms.RRType = $Filter.rrtype }
     if ($RecordName) { $parms.Name = $RecordName }
-    $records = Get-DnsServerResourceRecord @parms
-    if ($FilterAd) { 
-        $records = $records | Where-Object {
-            ($_.HostName -notlike '_kerberos*') -and 
-            ($_.HostName -notlike '_ldap*') -and 
-            ($_.HostName -notlike '_kpasswd*') -and 
-            ($_.HostName -notlike '_gc*') -and 
-            ($_.HostName -notlike '*._msdcs*') -and
-            ($_.HostName -notlike 'gc._msdcs') -and
-            ($_.HostName -notlike '*_ldap._tcp*') -and
-            ($_.HostName -notlike '*forestdnszones*') -and
-            ($_.HostName -notlike '*domaindnszones*')
-        }
-    }
+    $records = Select-DnsRecord -Filter $Filter -Records (Get-DnsServerResourceRecord @parms)
 
-    $record_list = @()
+    $record_list = New-Object -TypeName System.Collections.Generic.List[Object]
     foreach ($item in $records) {
-        $record_list += Get-DnsRecordObject -ZoneName $ZoneName -Object $item
+        $record_list.Add((Get-DnsRecordObject -ZoneName $ZoneName -Object $item))
     }
 
-    return $record_list
+    return , $record_list
 }
 
-Function Get-DnsRecordObject {
+Function Get-DnsZoneSummaryObject {
     Param(
-        [PSObject]$Object,
-        [String]$ZoneName
+        [String]$ZoneName,
+        [Hashtable]$Filter,
+        [String]$RecordName,
+        [Int]$Top = 10
     )
 
-    $parms = @{
-        name = $Object.HostName.toLower()
-        fqdn = $Object.HostName.toLower() + '.' + $ZoneName.toLower()
-        type = $Object.RecordType.toLower()
-        ttl = $Object.TimeToLive.TotalSeconds
+    $parms = @{ZoneName = $ZoneName }
+    if ($Filter.rrtype) { $parms.RRType = $Filter.rrtype }
+    if ($RecordName) { $parms.Name = $RecordName }
+
+    # counted while the records are enumerated from the pipeline, no record is kept or projected
+    $bounds = @(60, 300, 900, 3600, 86400)
+    $ttl = [Ordered]@{}
+    foreach ($bound in $bounds) { $ttl["$bound"] = 0 }
+    $ttl.inf = 0
+    $types = @{}
+    $names = New-Object -TypeName 'System.Collections.Generic.Dictionary[String,Int]' -ArgumentList ([StringComparer]::OrdinalIgnoreCase)
+    $record_count = 0
+    $type_filter = $Filter.types
+    $include = $Filter.include
+    $exclude = $Filter.exclude
+    Get-DnsServerResourceRecord @parms | ForEach-Object {
+        # the checks of Select-DnsRecord
+        if ($type_filter -and -not $type_filter.Contains([String]$_.RecordType)) { return }
+        if ($include -and -not $include.IsMatch($_.HostName)) { return }
+        if ($exclude -and $exclude.IsMatch($_.HostName)) { return }
+        $record_count++
+        $record_type = $_.RecordType.ToLower()
+        $types[$record_type] = 1 + $types[$record_type]
+        $names[$_.HostName] = 1 + $(if ($names.ContainsKey($_.HostName)) { $names[$_.HostName] } else { 0 })
+        $seconds = $_.TimeToLive.TotalSeconds
+        $bucket = 'inf'
+        foreach ($bound in $bounds) { if ($seconds -le $bound) { $bucket = "$bound"; break } }
+        $ttl[$bucket] += 1
+    }
+
+    $largest = New-Object -TypeName System.Collections.Generic.List[Object]
+    $sorted = $names.GetEnumerator() | Sort-Object -Property @{ Expression = 'Value'; Descending = $true }, @{ Expression = 'Key' } | Select-Object -First $Top
+    foreach ($item in $sorted) { $largest.Add(@{ name = $item.Key.ToLower(); count = $item.Value }) }
+
+    return @{
+        record_count = $record_count
+        name_count = $names.Count
+        types = $types
+        ttl = $ttl
+        top_names = $largest
     }
+}
+
+Function Get-DnsZoneSerial {
+    Param([String]$ZoneName)
+    $soa = Get-DnsServerResourceRecord -ZoneName $ZoneName -RRType SOA | Select-Object -First 1
+    return [Int64]$soa.RecordData.SerialNumber
+}
 
-    if($Object.RecordType -like 'aaaa') { $parms.data = $Object.RecordData.IPv6Address.IPAddressToString }
-    if($Object.RecordType -like 'a') { $parms.data = $Object.RecordData.IPv4Address.IPAddressToString }
-    if($Object.RecordType -like 'cname') { $parms.data = $Object.RecordData.HostNameAlias }
-    if($Object.RecordType -like 'mx') {
-        $parms.data = @{
-            mail_exchange = $Object.RecordData.MailExchange
-            priority = $Object.RecordData.Priority
+Function Get-DnsZoneRecordsParallel {
+    Param(
+        [String[]]$ZoneNames,
+        [String]$Command,
+        [Hashtable]$Parameters,
+        [Int]$Throttle
+    )
+
+    # the runspaces share the compiled filter and the record functions
+    $state = [System.Management.Automation.Runspaces.InitialSessionState]::CreateDefault()
+    [void]$state.ImportPSModule('DnsServer')
+    foreach ($name in @('Select-DnsRecord', 'Get-DnsRecordData', 'Get-DnsRecordObject', 'Get-DnsZoneRecordsObject', 'New-DnsRecordColumns', 'Get-DnsZoneRecordsColumns', 'Get-DnsZoneSummaryObject')) {
+        $definition = (Get-Item -LiteralPath "function:$name").Definition
+        $state.Commands.Add((New-Object -TypeName System.Management.Automation.Runspaces.SessionStateFunctionEntry -ArgumentList $name, $definition))
+    }
+
+    $pool = [RunspaceFactory]::CreateRunspacePool(1, $Throttle, $state, $Host)
+    $pool.Open()
+    $script = 'Param($Command, $Parameters) $ErrorActionPreference = "Stop"; & $Command @Parameters'
+    $jobs = New-Object -TypeName System.Collections.Generic.List[Object]
+    $result = @{ records = @{}; errors = @{} }
+    Try {
+        foreach ($zone_name in $ZoneNames) {
+            $shell = [PowerShell]::Create()
+            $shell.RunspacePool = $pool
+            $zone_parms = $Parameters.Clone()
+            $zone_parms.ZoneName = $zone_name
+            [void]$shell.AddScript($script).AddArgument($Command).AddArgument($zone_parms)
+            $jobs.Add(@{ zone = $zone_name; shell = $shell; handle = $shell.BeginInvoke() })
         }
+        # collected in zone order, a failed zone doesn't stop the others
+        foreach ($job in $jobs) {
+            Try {
+                $output = $job.shell.EndInvoke($job.handle)
+                if ($output.Count) { $result.records[$job.zone] = $output[0] }
+                else { $result.records[$job.zone] = @() }
+            }
+            Catch {
+                $exception = $_.Exception
+                if ($exception.InnerException) { $exception = $exception.InnerException }
+                $result.errors[$job.zone] = $exception.Message
+            }
+        }
+    }
+    Finally {
+        foreach ($job in $jobs) { $job.shell.Dispose() }
+        $pool.Close()
+        $pool.Dispose()
+    }
+
+    return $result
+}
+
+Function New-DnsRecordColumns {
+    # parallel arrays, zone names and types are interned and referenced by index
+    return @{
+        format = 'columnar'
+        zones = New-Object -TypeName System.Collections.Generic.List[String]
+        types = New-Object -TypeName System.Collections.Generic.List[String]
+        zone = New-Object -TypeName System.Collections.Generic.List[Int]
+        name = New-Object -TypeName System.Collections.Generic.List[String]
+        type = New-Object -TypeName System.Collections.Generic.List[Int]
+        ttl = New-Object -TypeName System.Collections.Generic.List[Object]
+        data = New-Object -TypeName System.Collections.Generic.List[Object]
     }
-    if($Object.RecordType -like 'srv') {
-        $parms.data = @{
-            domain_name = $Object.RecordData.DomainName
-            port = $Object.RecordData.Port
-            priority = $Object.RecordData.Priority
-            weight = $Object.RecordData.Weight
+}
+
+Function Get-DnsZoneRecordsColumns {
+    Param(
+        [String]$ZoneName,
+        [Hashtable]$Filter,
+        [String]$RecordName
+    )
+
+    $parms = @{ZoneName = $ZoneName }
+    if ($Filter.rrtype) { $parms.RRType = $Filter.rrtype }
+    if ($RecordName) { $parms.Name = $RecordName }
+    $records = Select-DnsRecord -Filter $Filter -Records (Get-DnsServerResourceRecord @parms)
+
+    $columns = New-DnsRecordColumns
+    $columns.zones.Add($ZoneName.toLower())
+    $type_index = @{}
+    foreach ($item in $records) {
+        $record_type = $item.RecordType.toLower()
+        if (-not $type_index.ContainsKey($record_type)) {
+            $type_index[$record_type] = $columns.types.Count
+            $columns.types.Add($record_type)
         }
+        $columns.name.Add($item.HostName.toLower())
+        $columns.type.Add($type_index[$record_type])
+        $columns.ttl.Add($item.TimeToLive.TotalSeconds)
+        $columns.data.Add((Get-DnsRecordData -Object $item))
     }
+    # every record of a single zone has zone index 0
+    $columns.Remove('zone')
 
-    return $parms | Sort-Object
+    return $columns
+}
+
+Function Add-DnsRecordColumns {
+    Param(
+        [Hashtable]$Columns,
+        [Hashtable]$Zone
+    )
+
+    # appends the columns of a zone, re-indexing its zone name and types
+    $zone_index = $Columns.zones.Count
+    $Columns.zones.Add($Zone.zones[0])
+    $type_map = @{}
+    foreach ($record_type in $Zone.types) {
+        $index = $Columns.types.IndexOf($record_type)
+        if ($index -lt 0) {
+            $index = $Columns.types.Count
+            $Columns.types.Add($record_type)
+        }
+        $type_map[$type_map.Count] = $index
+    }
+    for ($i = 0; $i -lt $Zone.name.Count; $i++) {
+        $Columns.zone.Add($zone_index)
+        $Columns.name.Add($Zone.name[$i])
+        $Columns.type.Add($type_map[$Zone.type[$i]])
+        $Columns.ttl.Add($Zone.ttl[$i])
+        $Columns.data.Add($Zone.data[$i])
+    }
 }
 
 Function Get-DnsZoneObject {
@@ -121,13 +333,20 @@ Function Get-DnsZoneObject {
 Try { Import-Module DnsServer }
 Catch { $module.FailJson("The DnsServer module failed to load properly: $($_.Exception.Message)", $_) }
 
+if ($throttle -lt 1) { $module.FailJson("throttle must be 1 or greater, got $throttle") }
+
+# compile the record filter once, record_type is merged into record_types
+$types = @($record_types) + @($record_type) | Where-Object { $_ } | Select-Object -Unique
+$record_filter = New-DnsRecordFilter -Types $types -Include $include_patterns -Exclude $exclude_patterns -FilterAd $filter_ad
+
 # determine zone type
 if (-not $zone_type) { $zone_type = '*' }
 $zones_tmp = @()
 
-# determine data struct
-if ($type -eq "record") { $module.Result.records = @() } 
-else { $module.Result.zones = @() }
+# determine data struct, zones and records are collected in lists and assigned after the last zone
+$zone_list = New-Object -TypeName System.Collections.Generic.List[Object]
+$record_list = New-Object -TypeName System.Collections.Generic.List[Object]
+if ($type -eq "record" -and $output_format -eq "columnar") { $module.Result.records = New-DnsRecordColumns }
 
 Try {
     # determine current zones
@@ -138,22 +357,76 @@ Catch {
     $module.FailJson("Unable to retreive zone(s) from DNS server: $($_.Exception.Message)", $_)
 }
 
-Try {
-    foreach ($zone in $zones_tmp) {
-        $zone_parsed = Get-DnsZoneObject -Object $zone
-        if ($type -eq "zone") { $module.Result.zones += $zone_parsed }
-        if ($zone.ZoneType -in @('primary', 'secondary')) {
-            $dns_tmp = Get-DnsZoneRecordsObject -RecordName $record_name -ZoneName $zone.ZoneName -FilterAd $filter_ad -RRType $record_type
-        }
-        if ($type -eq "record") { $module.Result.records += $dns_tmp }
-        if ($type -eq "all") {
-            $zone_parsed.dns_records = $dns_tmp
-            $module.Result.zones += $zone_parsed
+# read the SOA serial of primary and secondary zones
+$serial_zones = @($zones_tmp | Where-Object { $_.ZoneType -in @('primary', 'secondary') } | ForEach-Object { $_.ZoneName })
+$zone_serials = @{}
+foreach ($name in $serial_zones) {
+    # a zone without a readable serial is enumerated and reports its own error
+    Try { $zone_serials[$name] = Get-DnsZoneSerial -ZoneName $name }
+    Catch { }
+}
+
+# zones whose serial matches known_serials are not enumerated again
+$known = @{}
+if ($known_serials) { foreach ($item in $known_serials.GetEnumerator()) { $known[$item.Key.TrimEnd('.')] = [String]$item.Value } }
+$unchanged_zones = New-Object -TypeName System.Collections.Generic.List[String]
+$record_zones = New-Object -TypeName System.Collections.Generic.List[String]
+foreach ($name in $serial_zones) {
+    if ($zone_serials.ContainsKey($name) -and $known[$name] -eq [String]$zone_serials[$name]) { $unchanged_zones.Add($name.ToLower()) }
+    else { $record_zones.Add($name) }
+}
+
+# gather the records of primary and secondary zones
+$zone_records = @{ records = @{}; errors = @{} }
+$zone_command = 'Get-DnsZoneRecordsObject'
+$zone_parms = @{ Filter = $record_filter; RecordName = $record_name }
+if ($type -eq "summary") {
+    $zone_command = 'Get-DnsZoneSummaryObject'
+    $zone_parms.Top = $top_names
+}
+elseif ($output_format -eq "columnar") { $zone_command = 'Get-DnsZoneRecordsColumns' }
+if ($type -ne "zone" -and $record_zones.Count -gt 0) {
+    if ($throttle -gt 1 -and $record_zones.Count -gt 1) {
+        Try { $zone_records = Get-DnsZoneRecordsParallel -ZoneNames $record_zones -Command $zone_command -Parameters $zone_parms -Throttle $throttle }
+        Catch { $module.FailJson("Unable to retreive record(s) from DNS server: $($_.Exception.Message)", $_) }
+    }
+    else {
+        foreach ($name in $record_zones) {
+            Try { $zone_records.records[$name] = & $zone_command -ZoneName $name @zone_parms }
+            Catch { $zone_records.errors[$name] = $_.Exception.Message }
         }
     }
 }
-Catch {
-    $module.FailJson("Unable to retreive record(s) from DNS server: $($_.Exception.Message)", $_)
+
+# merge in zone order, failed zones are reported instead of failing the task
+$zone_errors = New-Object -TypeName System.Collections.Generic.List[Object]
+foreach ($zone in $zones_tmp) {
+    $zone_parsed = Get-DnsZoneObject -Object $zone
+    if ($zone_serials.ContainsKey($zone.ZoneName)) { $zone_parsed.serial = $zone_serials[$zone.ZoneName] }
+    if ($unchanged_zones.Contains($zone_parsed.name)) { $zone_parsed.unchanged = $true }
+    $dns_tmp = $zone_records.records[$zone.ZoneName]
+    if ($zone_records.errors.ContainsKey($zone.ZoneName)) {
+        $msg = $zone_records.errors[$zone.ZoneName]
+        $zone_errors.Add(@{ zone = $zone_parsed.name; msg = $msg })
+        $module.Warn("Unable to retreive record(s) of zone $($zone.ZoneName): $msg")
+    }
+    if ($type -eq "zone") { $zone_list.Add($zone_parsed) }
+    if ($type -eq "record" -and $dns_tmp) {
+        if ($output_format -eq "columnar") { Add-DnsRecordColumns -Columns $module.Result.records -Zone $dns_tmp }
+        else { foreach ($item in $dns_tmp) { $record_list.Add($item) } }
+    }
+    if ($type -eq "all") {
+        $zone_parsed.dns_records = $dns_tmp
+        $zone_list.Add($zone_parsed)
+    }
+    if ($type -eq "summary") {
+        $zone_parsed.summary = $dns_tmp
+        $zone_list.Add($zone_parsed)
+    }
 }
+if ($type -eq "record" -and $output_format -ne "columnar") { $module.Result.records = $record_list }
+elseif ($type -ne "record") { $module.Result.zones = $zone_list }
+$module.Result.zone_errors = $zone_errors
+$module.Result.unchanged_zones = $unchanged_zones
 
 $module.ExitJson()
\ No newline at end of file
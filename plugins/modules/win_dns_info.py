@@ -25,9 +25,12 @@ options:
         on l(zone_type) and l(zone_name)
       - Specifying l(record) will retreive just the matched records based on
         l(record_type) and l(record_name)
+      - Specifying l(summary) will retrieve the zone objects with statistics
+        on their matched records instead of the records, see C(summary) in
+        the return values of C(zones).
     type: str
     default: all
-    choices: [ zone, record, all ]
+    choices: [ zone, record, all, summary ]
   zone_name:
     description:
       - Specifies the DNS zone name to query for.
@@ -43,20 +46,117 @@ options:
     description:
       - Specifies the DNS record type to query for.
       - Omitting this parameter will retreive all types of records.
+      - Merged with l(record_types).
     type: str
-    choices: [ A, AAAA, MX, CNAME, PTR, NS, TXT ]
+    choices: [ A, AAAA, MX, CNAME, PTR, NS, TXT, SRV ]
+  record_types:
+    description:
+      - Specifies a list of DNS record types to query for.
+      - A single type is filtered by the DNS server, several types are
+        matched against each record.
+    type: list
+    elements: str
+    choices: [ A, AAAA, MX, CNAME, PTR, NS, TXT, SRV ]
   record_name:
     description:
       - Specifies the DNS record name to query for.
     type: str
+  include_patterns:
+    description:
+      - Only return records with a name matching one of these wildcard
+        patterns, such as C(web*).
+      - Patterns are case insensitive and compiled once into a single
+        matcher.
+    type: list
+    elements: str
+  exclude_patterns:
+    description:
+      - Do not return records with a name matching one of these wildcard
+        patterns.
+      - Exclusions take precedence over l(include_patterns).
+    type: list
+    elements: str
   filter_ad:
     description:
       - When set to l(true), Active Directory related records
         are filtered out. These are mostly records related to
         LDAP and kerberos functions. Nodes that start with l(_msdcs),
         l(_sites), l(_tcp), l(_udp), l(DomainDnsZones), l(ForestDnsZones).
+      - A preset which adds the Active Directory patterns to
+        l(exclude_patterns).
     type: bool
     default: true
+  output_format:
+    description:
+      - The format of the returned records.
+      - C(records) returns a dict per record.
+      - C(columnar) returns the records of each zone, or of all zones with
+        l(type=record), as a dict of parallel lists. The zone names and record
+        types are listed once in C(zones) and C(types) and the C(zone) and
+        C(type) lists hold their index, C(fqdn) is not returned. This
+        reduces the size of the result for large zones.
+      - Use the C(zollo.windows.dns_rows) filter to read columnar records as
+        record dicts.
+      - Ignored when l(type=zone) or l(type=summary).
+    type: str
+    choices: [ records, columnar ]
+    default: records
+  throttle:
+    description:
+      - The number of zones whose records are retrieved at the same time.
+      - When greater than C(1), the zones are enumerated in a runspace pool
+        of this size and the results are merged in zone order.
+      - A zone whose records can't be retrieved is reported in
+        C(zone_errors) and doesn't fail the task.
+    type: int
+    default: 1
+  top_names:
+    description:
+      - The number of record names with the most records to return per zone
+        when l(type=summary).
+    type: int
+    default: 10
+  known_serials:
+    description:
+      - A dict of zone names and the SOA serial of the zone when its records
+        were last retrieved, in the format of the C(serial) return value.
+      - The records of a zone whose serial has not changed are not
+        retrieved, the zone is returned with C(unchanged=true) and without
+        records.
+    type: dict
+  cache:
+    description:
+      - Keeps the records of each zone, with its serial, in a controller side
+        cache and sends the cached serials as l(known_serials).
+      - The records of the unchanged zones are filled in from the cache, the
+        task returns the same records as without a cache.
+      - Requires l(type=all) or l(type=summary).
+      - This option and the other C(cache) options are consumed by the action
+        plugin and are not sent to the DNS server.
+    type: bool
+    default: no
+  cache_plugin:
+    description:
+      - The Ansible cache plugin used when l(cache=true), such as
+        C(ansible.builtin.jsonfile).
+    type: str
+    default: ansible.builtin.jsonfile
+  cache_connection:
+    description:
+      - The connection of the cache plugin, the directory of the
+        C(ansible.builtin.jsonfile) plugin.
+    type: str
+  cache_timeout:
+    description:
+      - The number of seconds the cached records are kept, C(0) keeps them
+        until the zone serial changes.
+    type: int
+    default: 0
+  cache_prefix:
+    description:
+      - The prefix of the cache keys.
+    type: str
+    default: zollo_windows_dns_
 '''
 
 EXAMPLES = r'''
@@ -95,16 +195,64 @@ EXAMPLES = r'''
     type: record
     zone_name: sde.vmware.com
     record_name: shri
+
+- name: Gather info on the web and mail A and CNAME records of a zone
+  community.windows.win_dns_info:
+    type: record
+    zone_name: sde.vmware.com
+    record_types: [ A, CNAME ]
+    include_patterns: [ 'web*', 'mail*' ]
+    exclude_patterns: [ '*-old' ]
+
+- name: Gather info on all primary DNS zones, eight zones at a time
+  community.windows.win_dns_info:
+    type: all
+    zone_type: primary
+    throttle: 8
+
+- name: Gather record statistics of all primary DNS zones
+  community.windows.win_dns_info:
+    type: summary
+    zone_type: primary
+    top_names: 5
+
+- name: Gather info on all primary DNS zones, unchanged zones are read from the cache
+  community.windows.win_dns_info:
+    type: all
+    zone_type: primary
+    cache: true
+    cache_connection: ~/.ansible/dns_cache
+
+- name: Gather all records of the primary zones in columnar format
+  community.windows.win_dns_info:
+    type: record
+    zone_type: primary
+    output_format: columnar
+  register: dns
+
+- name: Read the columnar records as record dicts
+  ansible.builtin.debug:
+    msg: "{{ dns.records | zollo.windows.dns_rows | map(attribute='fqdn') | list }}"
 '''
 
 RETURN = r'''
 zones:
-  description: DNS zone(s) with record(s)
-  returned: When l(type=zone) or l(type=all)
+  description:
+    - DNS zone(s) with record(s)
+    - With l(type=summary), each primary and secondary zone has a C(summary)
+      key instead of C(dns_records). It holds the C(record_count) and
+      C(name_count) of the zone, the record count per type in C(types), the
+      names with the most records in C(top_names), and the record count per
+      TTL bucket in C(ttl). Each TTL bucket is keyed by its upper bound in
+      seconds, C(inf) counts the TTLs over one day.
+    - Primary and secondary zones have the SOA serial of the zone in
+      C(serial).
+  returned: When l(type=zone), l(type=all) or l(type=summary)
   type: dict
   sample:
     - name: rds.vmware.com
       type: primary
+      serial: 1207
       dynamic_update: secure
       replication: forest
       nameservers:
@@ -136,9 +284,40 @@ zones:
           type: CNAME
           data: chall-prod.sde.vmware.com
           ttl: 3600
+    - name: euc.vmware.com
+      type: primary
+      dynamic_update: secure
+      replication: forest
+      summary:
+        record_count: 1524
+        name_count: 1391
+        types:
+          a: 1310
+          cname: 180
+          mx: 4
+          ns: 2
+          soa: 1
+          txt: 27
+        top_names:
+          - name: '@'
+            count: 14
+          - name: mail
+            count: 3
+        ttl:
+          "60": 0
+          "300": 12
+          "900": 96
+          "3600": 1402
+          "86400": 14
+          inf: 0
 
 records:
-  description: DNS record(s)
+  description:
+    - DNS record(s)
+    - With l(output_format=columnar), a dict of parallel lists with the
+      C(format), C(zones), C(types), C(zone), C(name), C(type), C(ttl) and
+      C(data) keys, the C(dns_records) of each zone have the same keys
+      without C(zone).
   returned: When l(type=record) or l(type=all)
   type: dict
   sample:
@@ -154,4 +333,23 @@ records:
         mail_exchange: tech-proposals.euc.vmware.com
         priority: 0
       ttl: 900
+
+unchanged_zones:
+  description:
+    - The zones whose serial matches l(known_serials), their records were not
+      retrieved.
+    - The zone objects of these zones have C(unchanged=true).
+  returned: always
+  type: list
+  elements: str
+  sample: [ rds.vmware.com ]
+
+zone_errors:
+  description: The zones whose records could not be retrieved.
+  returned: always
+  type: list
+  elements: dict
+  sample:
+    - zone: 0.10.in-addr.arpa
+      msg: Failed to enumerate records of zone 0.10.in-addr.arpa.
 '''
\ No newline at end of file
@@ -0,0 +1,260 @@
+#!powershell
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+#AnsibleRequires -CSharpUtil Ansible.Basic
+#AnsibleRequires -PowerShell ansible_collections.zollo.windows.plugins.module_utils.DnsRecord
+
+$record_types = "A", "AAAA", "CNAME", "MX", "NS", "PTR", "SRV", "TXT"
+
+$spec = @{
+    options = @{
+        records = @{
+            type = "list"
+            elements = "dict"
+            required = $true
+            options = @{
+                zone = @{ type = "str"; required = $true }
+                name = @{ type = "str"; required = $true }
+                type = @{ type = "str"; required = $true; choices = $record_types }
+                value = @{ type = "str" }
+                ttl = @{ type = "int" }
+                priority = @{ type = "int" }
+                weight = @{ type = "int" }
+                port = @{ type = "int" }
+                state = @{ type = "str"; choices = "absent", "present" }
+            }
+        }
+        ttl = @{ type = "int" }
+        state = @{ type = "str"; choices = "absent", "present"; default = "present" }
+    }
+    supports_check_mode = $true
+}
+
+$module = [Ansible.Basic.AnsibleModule]::Create($args, $spec)
+$check_mode = $module.CheckMode
+
+$records = $module.Params.records
+$ttl = $module.Params.ttl
+$state = $module.Params.state
+
+Function ConvertTo-DnsName {
+    Param([String]$Name)
+    # host names are compared lower case and fully qualified
+    $Name = $Name.toLower()
+    if (-not $Name.EndsWith('.')) { $Name += '.' }
+    return $Name
+}
+
+Function Get-DnsRecordKey {
+    Param([PSObject]$Object)
+    # data portion of the index key of an existing record
+    $data = $Object.RecordData
+    switch ($Object.RecordType) {
+        "A" { return $data.IPv4Address.IPAddressToString }
+        "AAAA" { return $data.IPv6Address.IPAddressToString }
+        "CNAME" { return ConvertTo-DnsName -Name $data.HostNameAlias }
+        "PTR" { return ConvertTo-DnsName -Name $data.PtrDomainName }
+        "NS" { return ConvertTo-DnsName -Name $data.NameServer }
+        "TXT" { return $data.DescriptiveText }
+        "MX" { return "$($data.Preference) $(ConvertTo-DnsName -Name $data.MailExchange)" }
+        "SRV" { return "$($data.Priority) $($data.Weight) $($data.Port) $(ConvertTo-DnsName -Name $data.DomainName)" }
+    }
+}
+
+Function Get-DnsRecordItem {
+    Param($Item)
+    # unset values fall back to the top level module options
+    $record = @{
+        zone = $Item.zone.toLower().TrimEnd('.')
+        type = $Item.type.toUpper()
+        value = $Item.value
+        ttl = $Item.ttl
+        state = $Item.state
+    }
+    if ($null -eq $record.ttl) { $record.ttl = $ttl }
+    if ($null -eq $record.state) { $record.state = $state }
+
+    # names are relative to the zone, the zone apex is @
+    $record.name = $Item.name.toLower().TrimEnd('.')
+    if ($record.name -eq $record.zone) { $record.name = '@' }
+    elseif ($record.name.EndsWith(".$($record.zone)")) { $record.name = $record.name.Substring(0, $record.name.Length - $record.zone.Length - 1) }
+
+    if ($record.state -eq 'present' -and -not $record.value) {
+        $module.FailJson("The value option is required for present $($record.type) record $($record.name) in zone $($record.zone)")
+    }
+    if ($record.type -eq 'MX' -and $record.value -and $null -eq $Item.priority) {
+        $module.FailJson("The priority option is required for MX record $($record.name) in zone $($record.zone)")
+    }
+    if ($record.type -eq 'SRV' -and $record.value -and (($null -eq $Item.priority) -or ($null -eq $Item.weight) -or ($null -eq $Item.port))) {
+        $module.FailJson("The priority, weight and port options are required for SRV record $($record.name) in zone $($record.zone)")
+    }
+
+    $record.data = $null
+    if ($record.value) {
+        switch ($record.type) {
+            "A" { $record.data = ([System.Net.IPAddress]::Parse($record.value)).IPAddressToString }
+            "AAAA" { $record.data = ([System.Net.IPAddress]::Parse($record.value)).IPAddressToString }
+            "TXT" { $record.data = $record.value }
+            "MX" { $record.data = "$($Item.priority) $(ConvertTo-DnsName -Name $record.value)" }
+            "SRV" { $record.data = "$($Item.priority) $($Item.weight) $($Item.port) $(ConvertTo-DnsName -Name $record.value)" }
+            default { $record.data = ConvertTo-DnsName -Name $record.value }
+        }
+    }
+    $record.priority = $Item.priority
+    $record.weight = $Item.weight
+    $record.port = $Item.port
+    $record.label = "$($record.zone)/$($record.name)/$($record.type)/$($record.data)"
+
+    return $record
+}
+
+Function Get-DnsRecordIndex {
+    Param([String]$ZoneName)
+    # records of a zone keyed by name|type|data, and by name|type
+    $index = @{ data = @{}; rrset = @{} }
+    foreach ($object in (Get-DnsServerResourceRecord -ZoneName $ZoneName)) {
+        if ($object.RecordType -notin $record_types) { continue }
+        Add-DnsRecordIndexEntry -Index $index -Object $object
+    }
+    return $index
+}
+
+Function Add-DnsRecordIndexEntry {
+    Param([Hashtable]$Index, [PSObject]$Object)
+    $rrset = "$($Object.HostName.toLower())|$($Object.RecordType)"
+    $Index.data["$rrset|$(Get-DnsRecordKey -Object $Object)"] = $Object
+    if (-not $Index.rrset.ContainsKey($rrset)) { $Index.rrset[$rrset] = [System.Collections.ArrayList]@() }
+    [void]$Index.rrset[$rrset].Add($Object)
+}
+
+Function Remove-DnsRecordIndexEntry {
+    Param([Hashtable]$Index, [PSObject]$Object)
+    $rrset = "$($Object.HostName.toLower())|$($Object.RecordType)"
+    $Index.data.Remove("$rrset|$(Get-DnsRecordKey -Object $Object)")
+    if ($Index.rrset.ContainsKey($rrset)) { $Index.rrset[$rrset].Remove($Object) }
+}
+
+Function New-DnsRecordSimulation {
+    Param([Hashtable]$Record)
+    # stand-in for a record added in check mode, with the properties read by
+    # Get-DnsRecordKey and Get-DnsRecordObject
+    $data = @{}
+    switch ($Record.type) {
+        "A" { $data.IPv4Address = [System.Net.IPAddress]::Parse($Record.value) }
+        "AAAA" { $data.IPv6Address = [System.Net.IPAddress]::Parse($Record.value) }
+        "CNAME" { $data.HostNameAlias = $Record.value }
+        "PTR" { $data.PtrDomainName = $Record.value }
+        "NS" { $data.NameServer = $Record.value }
+        "TXT" { $data.DescriptiveText = $Record.value }
+        "MX" { $data.MailExchange = $Record.value; $data.Preference = $Record.priority }
+        "SRV" { $data.DomainName = $Record.value; $data.Priority = $Record.priority; $data.Weight = $Record.weight; $data.Port = $Record.port }
+    }
+    $object = [PSCustomObject]@{
+        HostName = $Record.name
+        RecordType = $Record.type
+        TimeToLive = $null
+        RecordData = [PSCustomObject]$data
+        Simulated = $true
+    }
+    if ($Record.ttl) { $object.TimeToLive = [TimeSpan]::FromSeconds($Record.ttl) }
+    return $object
+}
+
+Function Add-DnsRecord {
+    Param([Hashtable]$Record)
+    $parms = @{ ZoneName = $Record.zone; Name = $Record.name }
+    if ($Record.ttl) { $parms.TimeToLive = [TimeSpan]::FromSeconds($Record.ttl) }
+    switch ($Record.type) {
+        "A" { $parms.A = $true; $parms.IPv4Address = $Record.value }
+        "AAAA" { $parms.AAAA = $true; $parms.IPv6Address = $Record.value }
+        "CNAME" { $parms.CName = $true; $parms.HostNameAlias = $Record.value }
+        "PTR" { $parms.Ptr = $true; $parms.PtrDomainName = $Record.value }
+        "NS" { $parms.NS = $true; $parms.NameServer = $Record.value }
+        "TXT" { $parms.Txt = $true; $parms.DescriptiveText = $Record.value }
+        "MX" { $parms.MX = $true; $parms.MailExchange = $Record.value; $parms.Preference = $Record.priority }
+        "SRV" {
+            $parms.Srv = $true; $parms.DomainName = $Record.value
+            $parms.Priority = $Record.priority; $parms.Weight = $Record.weight; $parms.Port = $Record.port
+        }
+    }
+    Add-DnsServerResourceRecord @parms -PassThru -WhatIf:$check_mode
+}
+
+# attempt import of module
+Try { Import-Module DnsServer }
+Catch { $module.FailJson("The DnsServer module failed to load properly: $($_.Exception.Message)", $_) }
+
+$items = foreach ($item in $records) { Get-DnsRecordItem -Item $item }
+$indexes = @{}
+$results = [System.Collections.ArrayList]@()
+$diff_before = @{}
+$diff_after = @{}
+
+foreach ($record in $items) {
+    # each zone is read once, on first use
+    if (-not $indexes.ContainsKey($record.zone)) {
+        Try { $indexes[$record.zone] = Get-DnsRecordIndex -ZoneName $record.zone }
+        Catch { $module.FailJson("Unable to retreive records of zone $($record.zone): $($_.Exception.Message)", $_) }
+    }
+    $index = $indexes[$record.zone]
+    $rrset = "$($record.name)|$($record.type)"
+    $result = @{ zone = $record.zone; name = $record.name; type = $record.type; value = $record.value; state = $record.state; changed = $false; action = "none" }
+
+    if ($record.state -eq 'absent') {
+        # without a value the whole name/type set is removed
+        if ($record.data) { $existing = @($index.data["$rrset|$($record.data)"] | Where-Object { $_ }) }
+        elseif ($index.rrset.ContainsKey($rrset)) { $existing = @($index.rrset[$rrset]) }
+        else { $existing = @() }
+
+        foreach ($object in $existing) {
+            if (-not $object.Simulated) {
+                Try { Remove-DnsServerResourceRecord -ZoneName $record.zone -InputObject $object -Force -WhatIf:$check_mode }
+                Catch { $module.FailJson("Unable to remove record $($record.label): $($_.Exception.Message)", $_) }
+            }
+            $diff_before["$($record.zone)/$($record.name)/$($record.type)/$(Get-DnsRecordKey -Object $object)"] = Get-DnsRecordObject -ZoneName $record.zone -Object $object
+            Remove-DnsRecordIndexEntry -Index $index -Object $object
+        }
+        if ($existing.Count -gt 0) { $result.changed = $true; $result.action = "remove" }
+    } else {
+        $existing = $index.data["$rrset|$($record.data)"]
+        if (-not $existing) {
+            Try { $added = Add-DnsRecord -Record $record }
+            Catch { $module.FailJson("Unable to add record $($record.label): $($_.Exception.Message)", $_) }
+            # check mode adds nothing, the later items of the batch see the simulated record
+            if (-not $added) { $added = New-DnsRecordSimulation -Record $record }
+            Add-DnsRecordIndexEntry -Index $index -Object $added
+            $result.record = Get-DnsRecordObject -ZoneName $record.zone -Object $added
+            $diff_after[$record.label] = $result.record
+            $result.changed = $true
+            $result.action = "add"
+        } elseif ($record.ttl -and $existing.TimeToLive.TotalSeconds -ne $record.ttl) {
+            if ($existing.Simulated) { $updated = $existing.PSObject.Copy() }
+            else { $updated = $existing.Clone() }
+            $updated.TimeToLive = [TimeSpan]::FromSeconds($record.ttl)
+            if (-not $existing.Simulated) {
+                Try { Set-DnsServerResourceRecord -ZoneName $record.zone -OldInputObject $existing -NewInputObject $updated -WhatIf:$check_mode }
+                Catch { $module.FailJson("Unable to set the ttl of record $($record.label): $($_.Exception.Message)", $_) }
+            }
+            $diff_before[$record.label] = Get-DnsRecordObject -ZoneName $record.zone -Object $existing
+            $result.record = Get-DnsRecordObject -ZoneName $record.zone -Object $updated
+            $diff_after[$record.label] = $result.record
+            Remove-DnsRecordIndexEntry -Index $index -Object $existing
+            Add-DnsRecordIndexEntry -Index $index -Object $updated
+            $result.changed = $true
+            $result.action = "update"
+        } else {
+            $result.record = Get-DnsRecordObject -ZoneName $record.zone -Object $existing
+        }
+    }
+
+    if ($result.changed) { $module.Result.changed = $true }
+    [void]$results.Add($result)
+}
+
+$module.Result.results = $results
+$module.Diff.before = $diff_before
+$module.Diff.after = $diff_after
+$module.ExitJson()
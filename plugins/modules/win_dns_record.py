@@ -0,0 +1,150 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+DOCUMENTATION = r'''
+---
+module: win_dns_record
+short_description: Manage Windows Server DNS Records
+author: Joe Zollo (@joezollo)
+requirements:
+  - This module requires Windows Server 2012 or Newer
+description:
+  - Adds, Removes and Modifies DNS records in one or more zones in a single
+    invocation.
+  - The records of each zone are read once and indexed by name, type and
+    data. Only the missing records are added, the absent ones removed and
+    the records with a different TTL updated.
+  - Task should be delegated to a Windows DNS Server
+options:
+  records:
+    description:
+      - The DNS records to manage, they are processed in order.
+    type: list
+    elements: dict
+    required: yes
+    suboptions:
+      zone:
+        description:
+          - The name of the zone holding the record.
+        type: str
+        required: yes
+      name:
+        description:
+          - The name of the record, relative to l(zone).
+          - Use C(@) for the zone apex. Names ending with the zone name are
+            made relative.
+        type: str
+        required: yes
+      type:
+        description:
+          - The record type.
+        type: str
+        required: yes
+        choices: [ A, AAAA, CNAME, MX, NS, PTR, SRV, TXT ]
+      value:
+        description:
+          - The data of the record, an address for l(type=A) and
+            l(type=AAAA), the text for l(type=TXT) and a host name for the
+            other types.
+          - Required when l(state=present).
+          - When omitted with l(state=absent), every record of this name and
+            type is removed.
+        type: str
+      ttl:
+        description:
+          - The time to live of the record, in seconds.
+          - Defaults to the top level l(ttl). When neither is set, new records
+            use the zone default and the TTL of existing records is left
+            untouched.
+        type: int
+      priority:
+        description:
+          - The preference of a l(type=MX) record or the priority of a
+            l(type=SRV) record.
+        type: int
+      weight:
+        description:
+          - The weight of a l(type=SRV) record.
+        type: int
+      port:
+        description:
+          - The port of a l(type=SRV) record.
+        type: int
+      state:
+        description:
+          - Whether the record should exist, defaults to the top level
+            l(state).
+        type: str
+        choices: [ absent, present ]
+  ttl:
+    description:
+      - The default time to live of the records, in seconds.
+    type: int
+  state:
+    description:
+      - The default state of the records.
+    type: str
+    choices: [ absent, present ]
+    default: present
+'''
+
+EXAMPLES = r'''
+- name: Ensure a set of DNS records exist in two zones
+  win_dns_record:
+    ttl: 3600
+    records:
+      - zone: sde.vmware.com
+        name: web01
+        type: A
+        value: 10.100.100.85
+      - zone: sde.vmware.com
+        name: www
+        type: CNAME
+        value: web01.sde.vmware.com
+      - zone: sde.vmware.com
+        name: '@'
+        type: MX
+        value: mail.sde.vmware.com
+        priority: 10
+      - zone: 100.100.10.in-addr.arpa
+        name: '85'
+        type: PTR
+        value: web01.sde.vmware.com
+
+- name: Remove every A record of a host and a single TXT record
+  win_dns_record:
+    state: absent
+    records:
+      - zone: sde.vmware.com
+        name: web02
+        type: A
+      - zone: sde.vmware.com
+        name: '@'
+        type: TXT
+        value: v=spf1 -all
+'''
+
+RETURN = r'''
+results:
+  description: Per-record results, in input order
+  returned: always
+  type: list
+  sample:
+    - zone: sde.vmware.com
+      name: web01
+      type: A
+      value: 10.100.100.85
+      state: present
+      changed: true
+      action: add
+      record:
+        name: web01
+        fqdn: web01.sde.vmware.com
+        type: a
+        data: 10.100.100.85
+        ttl: 3600
+'''
@@ -8,14 +8,29 @@
 
 $spec = @{
     options = @{
-        name = @{ type = "str"; required = $true }
+        name = @{ type = "str" }
         type = @{ type = "str"; choices = "primary", "secondary", "forwarder", "stub" }
         replication = @{ type = "str"; choices = "forest", "domain", "legacy", "none" }
         dynamic_update = @{ type = "str"; choices = "secure", "none", "nonsecureandsecure" }
         state = @{ type = "str"; choices = "absent", "present"; default = "present" }
         forwarder_timeout = @{ type = "int" }
         dns_servers = @{ type = "list"; elements = "str" }
+        zones = @{
+            type = "list"
+            elements = "dict"
+            options = @{
+                name = @{ type = "str"; required = $true }
+                type = @{ type = "str"; choices = "primary", "secondary", "forwarder", "stub" }
+                replication = @{ type = "str"; choices = "forest", "domain", "legacy", "none" }
+                dynamic_update = @{ type = "str"; choices = "secure", "none", "nonsecureandsecure" }
+                state = @{ type = "str"; choices = "absent", "present" }
+                forwarder_timeout = @{ type = "int" }
+                dns_servers = @{ type = "list"; elements = "str" }
+            }
+        }
     }
+    mutually_exclusive = @(, @('name', 'zones'))
+    required_one_of = @(, @('name', 'zones'))
     supports_check_mode = $true
 }
 
@@ -23,14 +38,7 @@ $module = [Ansible.Basic.AnsibleModule]::Create($args, $spec)
 $check_mode = $module.CheckMode
 
 $name = $module.Params.name
-$type = $module.Params.type
-$replication = $module.Params.replication
-$dynamic_update = $module.Params.dynamic_update
-$state = $module.Params.state
-$dns_servers = $module.Params.dns_servers
-$forwarder_timeout = $module.Params.forwarder_timeout
-
-$parms = @{ name = $name }
+$zones = $module.Params.zones
 
 Function Get-DnsZoneObject {
     Param([PSObject]$Object)
@@ -60,188 +68,303 @@ Function Compare-DnsZone {
         [PSObject]$Original,
         [PSObject]$Updated)
 
-    if ($Original -eq $false) { return $false }
+    # a zone that did not exist is read as $null, not $false
+    if (-not $Original) { return $false }
     $props = @('ZoneType', 'DynamicUpdate', 'IsDsIntegrated', 'MasterServers', 'ForwarderTimeout', 'ReplicationScope')
     $x = Compare-Object $Original $Updated -Property $props
     $x.Count -eq 0
 }
 
-# attempt import of module
-Try { Import-Module DnsServer }
-Catch { $module.FailJson("The DnsServer module failed to load properly: $($_.Exception.Message)", $_) }
+Function Set-DnsZoneState {
+    Param(
+        [Hashtable]$Zone,
+        [PSObject]$Current
+    )
 
-Try {
-    # determine current zone state
-    $current_zone = Get-DnsServerZone -name $name
-    $module.Diff.before = Get-DnsZoneObject -Object $current_zone
-    if (-not $type) { $type = $current_zone.ZoneType.toLower() }
-    if ($current_zone.ZoneType -like $type) { $current_zone_type_match = $true }
-    # check for fast fails
-    if ($current_zone.ReplicationScope -like 'none' -and $replication -in @('legacy', 'forest', 'domain')) {
-        $module.FailJson("Converting a file backed DNS zone to Active Directory integrated zone is unsupported")
-    }
-    if ($current_zone.ReplicationScope -in @('legacy', 'forest', 'domain') -and $replication -like 'none') {
-        $module.FailJson("Converting Active Directory integrated zone to a file backed DNS zone is unsupported")
-    }
-    if ($current_zone.IsDsIntegrated -eq $false -and $parms.DynamicUpdate -eq 'secure') {
-        $module.FailJson("The secure dynamic update option is only available for Active Directory integrated zones")
-    }
-} Catch {
-    $module.Diff.before = ""
-    $current_zone = $false
-}
+    # converges one zone against its current state, returns the requested parameters
+    $name = $Zone.name
+    $type = $Zone.type
+    $replication = $Zone.replication
+    $dynamic_update = $Zone.dynamic_update
+    $state = $Zone.state
+    $dns_servers = $Zone.dns_servers
+    $forwarder_timeout = $Zone.forwarder_timeout
+    $parms = @{ name = $name }
 
-if ($state -eq "present") {
-    # parse replication/zonefile
-    if (-not $replication -and $current_zone) {
-        $parms.ReplicationScope = $current_zone.ReplicationScope
-    } elseif ((($replication -eq 'none') -or (-not $replication)) -and (-not $current_zone)) {
-        $parms.ZoneFile = "$name.dns"
-    } elseif (($replication -eq 'none') -and ($current_zone)) {
-        $parms.ZoneFile = "$name.dns"
-    } else {
-        $parms.ReplicationScope = $replication
-    }
-    # parse param
-    if ($dynamic_update) { $parms.DynamicUpdate = $dynamic_update }
-    if ($dns_servers) { $parms.MasterServers = $dns_servers }
-    if ($type -in @('stub','forwarder','secondary') -and -not $current_zone -and -not $dns_servers) {
-        $module.FailJson("The dns_servers param is required when creating new stub, forwarder or secondary zones")
-    }
-    switch ($type) {
-        "primary" {
-            # remove irrelevant params
-            $parms.Remove('MasterServers')
-            if ($parms.ZoneFile -and ($dynamic_update -in @('secure','nonsecureandsecure'))) {
-                $parms.Remove('DynamicUpdate')
-                $module.Warn("Secure DNS updates are available only for Active Directory-integrated zones")
+    $current_zone = $false
+    $current_zone_type_match = $false
+    if ($Current) {
+        $current_zone = $Current
+        if (-not $type) { $type = $current_zone.ZoneType.toLower() }
+        if ($current_zone.ZoneType -like $type) { $current_zone_type_match = $true }
+        # check for fast fails
+        if ($state -eq "present") {
+            if ($current_zone.ReplicationScope -like 'none' -and $replication -in @('legacy', 'forest', 'domain')) {
+                $module.FailJson("Converting a file backed DNS zone $name to Active Directory integrated zone is unsupported")
+            }
+            if ($current_zone.ReplicationScope -in @('legacy', 'forest', 'domain') -and $replication -like 'none') {
+                $module.FailJson("Converting Active Directory integrated zone $name to a file backed DNS zone is unsupported")
+            }
+            if ($current_zone.IsDsIntegrated -eq $false -and $parms.DynamicUpdate -eq 'secure') {
+                $module.FailJson("The secure dynamic update option is only available for Active Directory integrated zones")
             }
-            if (-not $current_zone) {
-                # create zone
-                Try { Add-DnsServerPrimaryZone @parms -WhatIf:$check_mode }
-                Catch { $module.FailJson("Failed to add $type zone $($name): $($_.Exception.Message)", $_) }
-            } else {
-                # update zone
-                if (-not $current_zone_type_match) {
+        }
+    }
+
+    if ($state -eq "present") {
+        # parse replication/zonefile
+        if (-not $replication -and $current_zone) {
+            $parms.ReplicationScope = $current_zone.ReplicationScope
+        } elseif ((($replication -eq 'none') -or (-not $replication)) -and (-not $current_zone)) {
+            $parms.ZoneFile = "$name.dns"
+        } elseif (($replication -eq 'none') -and ($current_zone)) {
+            $parms.ZoneFile = "$name.dns"
+        } else {
+            $parms.ReplicationScope = $replication
+        }
+        # parse param
+        if ($dynamic_update) { $parms.DynamicUpdate = $dynamic_update }
+        if ($dns_servers) { $parms.MasterServers = $dns_servers }
+        if ($type -in @('stub','forwarder','secondary') -and -not $current_zone -and -not $dns_servers) {
+            $module.FailJson("The dns_servers param is required when creating new stub, forwarder or secondary zones")
+        }
+        switch ($type) {
+            "primary" {
+                # remove irrelevant params
+                $parms.Remove('MasterServers')
+                if ($parms.ZoneFile -and ($dynamic_update -in @('secure','nonsecureandsecure'))) {
+                    $parms.Remove('DynamicUpdate')
+                    $module.Warn("Secure DNS updates are available only for Active Directory-integrated zones")
+                }
+                if (-not $current_zone) {
+                    # create zone
+                    Try { Add-DnsServerPrimaryZone @parms -WhatIf:$check_mode }
+                    Catch { $module.FailJson("Failed to add $type zone $($name): $($_.Exception.Message)", $_) }
+                } else {
+                    # update zone
+                    if (-not $current_zone_type_match) {
+                        Try {
+                            if ($current_zone.ReplicationScope) { $parms.ReplicationScope = $current_zone.ReplicationScope } else { $parms.Remove('ReplicationScope') }
+                            if ($current_zone.ZoneFile) { $parms.ZoneFile = $current_zone.ZoneFile } else { $parms.Remove('ReplicationScope') }
+                            if ($current_zone.IsShutdown) { $module.FailJson("Failed to convert DNS zone $($name): this zone is shutdown and cannot be modified") }
+                            ConvertTo-DnsServerPrimaryZone @parms -Force -WhatIf:$check_mode
+                        }
+                        Catch { $module.FailJson("Failed to convert DNS zone $($name): $($_.Exception.Message)", $_) }
+                    }
                     Try {
-                        if ($current_zone.ReplicationScope) { $parms.ReplicationScope = $current_zone.ReplicationScope } else { $parms.Remove('ReplicationScope') }
-                        if ($current_zone.ZoneFile) { $parms.ZoneFile = $current_zone.ZoneFile } else { $parms.Remove('ReplicationScope') }
-                        if ($current_zone.IsShutdown) { $module.FailJson("Failed to convert DNS zone $($name): this zone is shutdown and cannot be modified") }
-                        ConvertTo-DnsServerPrimaryZone @parms -Force -WhatIf:$check_mode
+                        if (-not $parms.ZoneFile) { Set-DnsServerPrimaryZone -Name $name -ReplicationScope $parms.ReplicationScope -WhatIf:$check_mode }
+                        if ($dynamic_update) { Set-DnsServerPrimaryZone -Name $name -DynamicUpdate $parms.DynamicUpdate -WhatIf:$check_mode }
                     }
-                    Catch { $module.FailJson("Failed to convert DNS zone $($name): $($_.Exception.Message)", $_) }
-                }
-                Try {
-                    if (-not $parms.ZoneFile) { Set-DnsServerPrimaryZone -Name $name -ReplicationScope $parms.ReplicationScope -WhatIf:$check_mode }
-                    if ($dynamic_update) { Set-DnsServerPrimaryZone -Name $name -DynamicUpdate $parms.DynamicUpdate -WhatIf:$check_mode }
+                    Catch { $module.FailJson("Failed to set properties on the zone $($name): $($_.Exception.Message)", $_) }
                 }
-                Catch { $module.FailJson("Failed to set properties on the zone $($name): $($_.Exception.Message)", $_) }
             }
-        }
-        "secondary" {
-            # remove irrelevant params
-            $parms.Remove('ReplicationScope')
-            $parms.Remove('DynamicUpdate')
-            if (-not $current_zone) {
-                # enforce param
-                $parms.ZoneFile = "$name.dns"
-                # create zone
-                Try { Add-DnsServerSecondaryZone @parms -WhatIf:$check_mode }
-                Catch { $module.FailJson("Failed to add $type zone $($name): $($_.Exception.Message)", $_) }
-            } else {
-                # update zone
-                if (-not $current_zone_type_match) {
-                    $parms.MasterServers = $current_zone.MasterServers
-                    $parms.ZoneFile = $current_zone.ZoneFile
-                    if ($current_zone.IsShutdown) { $module.FailJson("Failed to convert DNS zone $($name): this zone is shutdown and cannot be modified") }
-                    Try { ConvertTo-DnsServerSecondaryZone @parms -Force -WhatIf:$check_mode }
-                    Catch { $module.FailJson("Failed to convert DNS zone $($name): $($_.Exception.Message)", $_) }
+            "secondary" {
+                # remove irrelevant params
+                $parms.Remove('ReplicationScope')
+                $parms.Remove('DynamicUpdate')
+                if (-not $current_zone) {
+                    # enforce param
+                    $parms.ZoneFile = "$name.dns"
+                    # create zone
+                    Try { Add-DnsServerSecondaryZone @parms -WhatIf:$check_mode }
+                    Catch { $module.FailJson("Failed to add $type zone $($name): $($_.Exception.Message)", $_) }
+                } else {
+                    # update zone
+                    if (-not $current_zone_type_match) {
+                        $parms.MasterServers = $current_zone.MasterServers
+                        $parms.ZoneFile = $current_zone.ZoneFile
+                        if ($current_zone.IsShutdown) { $module.FailJson("Failed to convert DNS zone $($name): this zone is shutdown and cannot be modified") }
+                        Try { ConvertTo-DnsServerSecondaryZone @parms -Force -WhatIf:$check_mode }
+                        Catch { $module.FailJson("Failed to convert DNS zone $($name): $($_.Exception.Message)", $_) }
+                    }
+                    Try { if ($dns_servers) { Set-DnsServerSecondaryZone -Name $name -MasterServers $dns_servers -WhatIf:$check_mode } }
+                    Catch { $module.FailJson("Failed to set properties on the zone $($name): $($_.Exception.Message)", $_) }
                 }
-                Try { if ($dns_servers) { Set-DnsServerSecondaryZone -Name $name -MasterServers $dns_servers -WhatIf:$check_mode } }
-                Catch { $module.FailJson("Failed to set properties on the zone $($name): $($_.Exception.Message)", $_) }
             }
-        }
-        "stub" {
-            $parms.Remove('DynamicUpdate')
-            if (-not $current_zone) {
-                # create zone
-                Try { Add-DnsServerStubZone @parms -WhatIf:$check_mode }
-                Catch { $module.FailJson("Failed to add $type zone $($name): $($_.Exception.Message)", $_) }
-            } else {
-                # update zone
-                if (-not $current_zone_type_match) { $module.FailJson("Failed to convert DNS zone $($name) to $type, unsupported conversion") }
-                Try {
-                    if ($parms.ReplicationScope) { Set-DnsServerStubZone -Name $name -ReplicationScope $parms.ReplicationScope -WhatIf:$check_mode }
-                    if ($forwarder_timeout) { Set-DnsServerStubZone -Name $name -ForwarderTimeout $forwarder_timeout -WhatIf:$check_mode }
-                    if ($dns_servers) { Set-DnsServerStubZone -Name $name -MasterServers $dns_servers -WhatIf:$check_mode }
+            "stub" {
+                $parms.Remove('DynamicUpdate')
+                if (-not $current_zone) {
+                    # create zone
+                    Try { Add-DnsServerStubZone @parms -WhatIf:$check_mode }
+                    Catch { $module.FailJson("Failed to add $type zone $($name): $($_.Exception.Message)", $_) }
+                } else {
+                    # update zone
+                    if (-not $current_zone_type_match) { $module.FailJson("Failed to convert DNS zone $($name) to $type, unsupported conversion") }
+                    Try {
+                        if ($parms.ReplicationScope) { Set-DnsServerStubZone -Name $name -ReplicationScope $parms.ReplicationScope -WhatIf:$check_mode }
+                        if ($forwarder_timeout) { Set-DnsServerStubZone -Name $name -ForwarderTimeout $forwarder_timeout -WhatIf:$check_mode }
+                        if ($dns_servers) { Set-DnsServerStubZone -Name $name -MasterServers $dns_servers -WhatIf:$check_mode }
+                    }
+                    Catch { $module.FailJson("Failed to set properties on the zone $($name): $($_.Exception.Message)", $_) }
                 }
-                Catch { $module.FailJson("Failed to set properties on the zone $($name): $($_.Exception.Message)", $_) }
-            }
-        }
-        "forwarder" {
-            # remove irrelevant params
-            $parms.Remove('DynamicUpdate')
-            $parms.Remove('ZoneFile')
-            if ($forwarder_timeout -and ($forwarder_timeout -in 0..15)) {
-                $parms.ForwarderTimeout = $forwarder_timeout
-            }
-            if ($forwarder_timeout -and -not ($forwarder_timeout -in 0..15)) {
-                $module.Warn("The forwarder_timeout param must be an integer value between 0 and 15")
             }
-            if (-not $current_zone) {
-                # create zone
-                Try { Add-DnsServerConditionalForwarderZone @parms -WhatIf:$check_mode }
-                Catch { $module.FailJson("Failed to add $type zone $($name): $($_.Exception.Message)", $_) }
-            } else {
-                # update zone
-                if (-not $current_zone_type_match) { $module.FailJson("Failed to convert DNS zone $($name) to $type, unsupported conversion") }
-                Try {
-                    if ($parms.ReplicationScope) { Set-DnsServerConditionalForwarderZone -Name $name -ReplicationScope $parms.ReplicationScope -WhatIf:$check_mode }
-                    if ($forwarder_timeout) { Set-DnsServerConditionalForwarderZone -Name $name -ForwarderTimeout $forwarder_timeout -WhatIf:$check_mode }
-                    if ($dns_servers) { Set-DnsServerConditionalForwarderZone -Name $name -MasterServers $dns_servers -WhatIf:$check_mode }
+            "forwarder" {
+                # remove irrelevant params
+                $parms.Remove('DynamicUpdate')
+                $parms.Remove('ZoneFile')
+                if ($forwarder_timeout -and ($forwarder_timeout -in 0..15)) {
+                    $parms.ForwarderTimeout = $forwarder_timeout
+                }
+                if ($forwarder_timeout -and -not ($forwarder_timeout -in 0..15)) {
+                    $module.Warn("The forwarder_timeout param must be an integer value between 0 and 15")
+                }
+                if (-not $current_zone) {
+                    # create zone
+                    Try { Add-DnsServerConditionalForwarderZone @parms -WhatIf:$check_mode }
+                    Catch { $module.FailJson("Failed to add $type zone $($name): $($_.Exception.Message)", $_) }
+                } else {
+                    # update zone
+                    if (-not $current_zone_type_match) { $module.FailJson("Failed to convert DNS zone $($name) to $type, unsupported conversion") }
+                    Try {
+                        if ($parms.ReplicationScope) { Set-DnsServerConditionalForwarderZone -Name $name -ReplicationScope $parms.ReplicationScope -WhatIf:$check_mode }
+                        if ($forwarder_timeout) { Set-DnsServerConditionalForwarderZone -Name $name -ForwarderTimeout $forwarder_timeout -WhatIf:$check_mode }
+                        if ($dns_servers) { Set-DnsServerConditionalForwarderZone -Name $name -MasterServers $dns_servers -WhatIf:$check_mode }
+                    }
+                    Catch { $module.FailJson("Failed to set properties on the zone $($name): $($_.Exception.Message)", $_) }
                 }
-                Catch { $module.FailJson("Failed to set properties on the zone $($name): $($_.Exception.Message)", $_) }
             }
         }
     }
+
+    if ($state -eq "absent" -and $current_zone -and -not $check_mode) {
+        Try { Remove-DnsServerZone -Name $name -Force -WhatIf:$check_mode }
+        Catch { $module.FailJson("Failed to remove DNS zone $($name): $($_.Exception.Message)", $_) }
+    }
+
+    return $parms
 }
 
-if ($state -eq "absent") {
-    if ($current_zone -and -not $check_mode) {
-        Try {
-            Remove-DnsServerZone -Name $name -Force -WhatIf:$check_mode
-            $module.Result.changed = $true
-            $module.Diff.after = ""
-        } Catch {
-            $module.FailJson("Failed to remove DNS zone: $($_.Exception.Message)", $_)
+Function Get-DnsZoneCheckObject {
+    Param(
+        [PSObject]$Current,
+        [Hashtable]$Parms,
+        [String]$Type
+    )
+
+    # simulate changes if check mode
+    $new_zone = @{}
+    $Current.PSObject.Properties | ForEach-Object {
+        if($Parms[$_.Name]) {
+            $new_zone[$_.Name] = $Parms[$_.Name]
+        } else {
+            $new_zone[$_.Name] = $_.Value
         }
     }
-    $module.ExitJson()
+    if ($Type) { $new_zone.ZoneType = $Type }
+    $after = Get-DnsZoneObject -Object $new_zone
+    if ($Parms.MasterServers) { $after.dns_servers = $Parms.MasterServers }
+    return $after
+}
+
+Function ConvertTo-DnsZoneKey {
+    Param([Hashtable]$Object)
+    ($Object.Keys | Sort-Object | ForEach-Object { "$_=$($Object[$_] -join ',')" }) -join ';'
 }
 
-# determine if a change was made
-Try {
-    $new_zone = Get-DnsServerZone -Name $name
-    if (-not (Compare-DnsZone -Original $current_zone -Updated $new_zone)) {
-        $module.Result.changed = $true
-        $module.Result.zone = Get-DnsZoneObject -Object $new_zone
-        $module.Diff.after = Get-DnsZoneObject -Object $new_zone
+Function Get-DnsZoneMap {
+    Param([String[]]$Names)
+    # a single zone is read by name, several zones with one call
+    $map = @{}
+    if ($Names.Count -eq 1) {
+        Try { $map[$Names[0]] = Get-DnsServerZone -Name $Names[0] -ErrorAction Stop }
+        Catch { }
+    } else {
+        foreach ($item in Get-DnsServerZone) { $map[$item.ZoneName] = $item }
     }
+    return $map
+}
 
-    # simulate changes if check mode
-    if ($check_mode) {
-        $new_zone = @{}
-        $current_zone.PSObject.Properties | ForEach-Object {
-            if($parms[$_.Name]) {
-                $new_zone[$_.Name] = $parms[$_.Name]
-            } else {
-                $new_zone[$_.Name] = $_.Value
-            }
+# attempt import of module
+Try { Import-Module DnsServer }
+Catch { $module.FailJson("The DnsServer module failed to load properly: $($_.Exception.Message)", $_) }
+
+# build the requested zones, zone entries inherit the top level options
+$requests = New-Object -TypeName System.Collections.ArrayList
+if ($zones) {
+    $seen = @{}
+    foreach ($item in $zones) {
+        if ($seen.ContainsKey($item.name)) { $module.FailJson("The zone $($item.name) is listed more than once in zones") }
+        $seen[$item.name] = $true
+        $request = @{ name = $item.name }
+        foreach ($key in @('type', 'replication', 'dynamic_update', 'state', 'forwarder_timeout', 'dns_servers')) {
+            if ($null -ne $item.$key) { $request.$key = $item.$key } else { $request.$key = $module.Params.$key }
+        }
+        [void]$requests.Add($request)
+    }
+} else {
+    $request = @{ name = $name }
+    foreach ($key in @('type', 'replication', 'dynamic_update', 'state', 'forwarder_timeout', 'dns_servers')) {
+        $request.$key = $module.Params.$key
+    }
+    [void]$requests.Add($request)
+}
+
+# determine current zone state, read once for every zone
+$names = @($requests | ForEach-Object { $_.name })
+Try { $zone_map = Get-DnsZoneMap -Names $names }
+Catch { $module.FailJson("Unable to retreive zone(s) from DNS server: $($_.Exception.Message)", $_) }
+
+$outcomes = New-Object -TypeName System.Collections.ArrayList
+foreach ($request in $requests) {
+    $current = $zone_map[$request.name]
+    $before = ""
+    if ($current) { $before = Get-DnsZoneObject -Object $current }
+    $parms = Set-DnsZoneState -Zone $request -Current $current
+    [void]$outcomes.Add(@{ request = $request; current = $current; before = $before; parms = $parms })
+}
+
+# determine if a change was made, zones are read again once
+if (-not $check_mode) {
+    Try { $zone_map = Get-DnsZoneMap -Names $names }
+    Catch { $module.FailJson("Failed to lookup new zone(s): $($_.Exception.Message)", $_) }
+}
+
+$results = New-Object -TypeName System.Collections.ArrayList
+$diff_before = @{}
+$diff_after = @{}
+foreach ($outcome in $outcomes) {
+    $zone_name = $outcome.request.name
+    $result = @{ name = $zone_name; state = $outcome.request.state; changed = $false }
+    $after = ""
+    $differs = $false
+    if ($outcome.request.state -eq "absent") {
+        $result.changed = [bool]$outcome.current -and -not $check_mode
+        $differs = [bool]$outcome.current
+    } elseif ($check_mode) {
+        # changes are only simulated in the diff, as for a single zone
+        if ($outcome.current) {
+            $after = Get-DnsZoneCheckObject -Current $outcome.current -Parms $outcome.parms -Type $outcome.request.type
+            $differs = (ConvertTo-DnsZoneKey -Object $outcome.before) -ne (ConvertTo-DnsZoneKey -Object $after)
+        } else {
+            $after = @{ name = $zone_name.toLower(); type = $outcome.request.type }
+            $differs = $true
         }
-        $module.Diff.after = Get-DnsZoneObject -Object $new_zone
+    } else {
+        $new_zone = $zone_map[$zone_name]
+        if (-not $new_zone) { $module.FailJson("Failed to lookup new zone $($zone_name)") }
+        $after = Get-DnsZoneObject -Object $new_zone
+        $result.changed = -not (Compare-DnsZone -Original $outcome.current -Updated $new_zone)
+        $differs = $result.changed
+    }
+    if ($outcome.request.state -eq "present") { $result.zone = $after }
+    if ($result.changed) { $module.Result.changed = $true }
+    if ($differs) {
+        $diff_before[$zone_name] = $outcome.before
+        $diff_after[$zone_name] = $after
     }
-} Catch {
-    $module.FailJson("Failed to lookup new zone $($name): $($_.Exception.Message)", $_)
+    [void]$results.Add($result)
+}
+
+if ($zones) {
+    $module.Result.results = $results
+    $module.Diff.before = $diff_before
+    $module.Diff.after = $diff_after
+} else {
+    $result = $results[0]
+    if ($result.changed -and $result.zone) { $module.Result.zone = $result.zone }
+    $module.Diff.before = $outcomes[0].before
+    $module.Diff.after = $result.zone
+    if ($result.state -eq "absent") { $module.Diff.after = "" }
 }
 
-$module.ExitJson()
\ No newline at end of file
+$module.ExitJson()
@@ -20,8 +20,8 @@ options:
   name:
     description:
       - Fully qualified name of the DNS zone.
+      - One of l(name) or l(zones) is required.
     type: str
-    required: true
   type:
     description:
       - Specifies the type of DNS zone.
@@ -80,6 +80,52 @@ options:
       - At least one server is required.
     elements: str
     type: list
+  zones:
+    description:
+      - A list of DNS zones to converge in a single task, mutually exclusive
+        with l(name).
+      - The zones of the DNS server are read once before and once after the
+        changes, instead of once per zone.
+      - Each entry accepts the zone options, an option not set on an entry
+        is taken from the top level option of the same name.
+    type: list
+    elements: dict
+    suboptions:
+      name:
+        description:
+          - Fully qualified name of the DNS zone.
+        type: str
+        required: true
+      type:
+        description:
+          - Specifies the type of DNS zone, see l(type).
+        type: str
+        choices: [ primary, secondary, stub, forwarder ]
+      dynamic_update:
+        description:
+          - Specifies how the zone handles dynamic updates, see
+            l(dynamic_update).
+        type: str
+        choices: [ secure, none, nonsecureandsecure ]
+      state:
+        description:
+          - Specifies the desired state of the DNS zone, see l(state).
+        type: str
+        choices: [ present, absent ]
+      forwarder_timeout:
+        description:
+          - Specifies the forwarder timeout, see l(forwarder_timeout).
+        type: int
+      replication:
+        description:
+          - Specifies the replication scope, see l(replication).
+        type: str
+        choices: [ forest, domain, legacy, none ]
+      dns_servers:
+        description:
+          - Specifies the master servers of the zone, see l(dns_servers).
+        type: list
+        elements: str
 '''
 
 EXAMPLES = r'''
@@ -161,6 +207,23 @@ EXAMPLES = r'''
     - wpinner.euc.vmware.com
     - marshallb.euc.vmware.com
     - basavaraju.euc.vmware.com
+
+- name: Ensure conditional forwarders are present in a single task
+  community.windows.win_dns_zone:
+    type: forwarder
+    replication: forest
+    dns_servers:
+      - 10.245.51.100
+      - 10.245.51.101
+    zones:
+      - name: partner1.example.com
+      - name: partner2.example.com
+        forwarder_timeout: 10
+      - name: partner3.example.com
+        dns_servers:
+          - 10.100.1.53
+      - name: retired.example.com
+        state: absent
 '''
 
 RETURN = r'''
@@ -179,4 +242,24 @@ zone:
     zone_file:
     replication:
     dns_servers:
+results:
+  description: The result of each zone of l(zones), in the order of l(zones).
+  returned: When l(zones) is set
+  type: list
+  elements: dict
+  sample:
+    - name: partner1.example.com
+      state: present
+      changed: true
+      zone:
+        name: partner1.example.com
+        type: forwarder
+        forwarder_timeout: 3
+        replication: forest
+        dns_servers:
+          - 10.245.51.100
+          - 10.245.51.101
+    - name: retired.example.com
+      state: absent
+      changed: false
 '''
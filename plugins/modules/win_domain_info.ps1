@@ -6,56 +6,118 @@
 
 #AnsibleRequires -CSharpUtil Ansible.Basic
 
+$valid_services = @('PrimaryDC',"GlobalCatalog","KDC","TimeService","ReliableTimeService","ADWS")
+
 $spec = @{
     options = @{
         site = @{ type = "str" }
         discover = @{ type = "bool"; default=$true }
+        next_closest_site = @{ type = "bool"; default = $false }
+        force_discover = @{ type = "bool"; default = $false }
         filter = @{ type = "str" }
         identity = @{ type = "str" }
-        service = @{ type = "list"; }
+        service = @{ type = "list"; elements = "str"; choices = $valid_services }
         domain_name = @{type = "str" }
         domain_username = @{ type = "str" }
-        domain_password = @{ type = "str" }
+        domain_password = @{ type = "str"; no_log = $true }
         domain_server = @{ type = "str" }
+        # consumed by the action plugin
+        cache = @{ type = "bool"; default = $false }
+        cache_plugin = @{ type = "str"; default = "ansible.builtin.jsonfile" }
+        cache_connection = @{ type = "str" }
+        cache_timeout = @{ type = "int"; default = 3600 }
+        cache_prefix = @{ type = "str"; default = "zollo_windows_domain_" }
     }
+    mutually_exclusive = @(, @('filter', 'identity'))
     supports_check_mode = $true
 }
 
 $module = [Ansible.Basic.AnsibleModule]::Create($args, $spec)
-$check_mode = $module.CheckMode
 
 $site = $module.Params.site
 $discover = $module.Params.discover
+$next_closest_site = $module.Params.next_closest_site
+$force_discover = $module.Params.force_discover
 $filter = $module.Params.filter
 $identity = $module.Params.identity
+$service = $module.Params.service
+$domain_name = $module.Params.domain_name
 $domain_username = $module.Params.domain_username
 $domain_password = $module.Params.domain_password
 $domain_server  = $module.Params.domain_server
 
-# create blank parm map
-$parms = @{
-    Discover = $discover
-}
+Function Get-DomainControllerObject {
+    # converts a domain controller, roles are in the order of $valid_services
+    Param(
+        $DomainController,
+        [String[]]$Services
+    )
 
-$valid_services = @('PrimaryDC',"GlobalCatalog","KDC","TimeService","ReliableTimeService","ADWS")
+    $roles = [System.Collections.Generic.List[String]]@()
+    foreach ($role in $valid_services) {
+        if (($role -eq 'PrimaryDC' -and $DomainController.OperationMasterRoles -contains 'PDCEmulator') -or
+            ($role -eq 'GlobalCatalog' -and $DomainController.IsGlobalCatalog) -or
+            ($Services -contains $role)) {
+            $roles.Add($role)
+        }
+    }
+
+    @{
+        name = $DomainController.Name
+        # discovery returns the host name as a collection
+        hostname = @($DomainController.HostName)[0]
+        site = $DomainController.Site
+        domain = $DomainController.Domain
+        forest = $DomainController.Forest
+        address = $DomainController.IPv4Address
+        ipv6_address = $DomainController.IPv6Address
+        is_global_catalog = [bool]$DomainController.IsGlobalCatalog
+        is_read_only = [bool]$DomainController.IsReadOnly
+        operation_master_roles = @($DomainController.OperationMasterRoles | ForEach-Object { $_.ToString() })
+        roles = $roles
+    }
+}
 
 # attempt import of module
 Try { Import-Module ActiveDirectory }
 Catch { $module.FailJson("The ActiveDirectory module failed to load properly: $($_.Exception.Message)", $_) }
 
-# generate credential
-if ($null -ne $domain_username) {
-    $domain_password = ConvertTo-SecureString $domain_password -AsPlainText -Force
-    $credential = New-Object -TypeName System.Management.Automation.PSCredential -ArgumentList $domain_username, $domain_password
-    $parms.Credential = $credential
+$parms = @{}
+$discovered = $discover -and $null -eq $identity -and $null -eq $filter
+if ($discovered) {
+    # the discovery parameter set takes no server or credential
+    $parms.Discover = $true
+    if ($null -ne $domain_name) { $parms.DomainName = $domain_name }
+    if ($null -ne $site) { $parms.SiteName = $site }
+    if ($null -ne $service) { $parms.Service = [String[]]$service }
+    if ($next_closest_site) { $parms.NextClosestSite = $true }
+    if ($force_discover) { $parms.ForceDiscover = $true }
+} else {
+    # generate credential
+    if ($null -ne $domain_username) {
+        $domain_password = ConvertTo-SecureString $domain_password -AsPlainText -Force
+        $credential = New-Object -TypeName System.Management.Automation.PSCredential -ArgumentList $domain_username, $domain_password
+        $parms.Credential = $credential
+    }
+    if ($null -ne $domain_server) { $parms.Server = $domain_server }
+    elseif ($null -ne $domain_name) { $parms.Server = $domain_name }
+    if ($null -ne $identity) { $parms.Identity = $identity }
+    else {
+        if ($null -eq $filter) { $filter = "*" }
+        $parms.Filter = $filter
+    }
 }
 
-if ($null -ne $domain_server) { $parms.Server = $domain_server }
-if ($null -ne $site) { $parms.SiteName = $site }
-if ($null -ne $identity) { $parms.Identity = $identity }
-if ($null -ne $filter) { $parms.Filter = $filter }
-if ($null -ne $service) { $parms.Service = $($service -join ',') }
+Try { $domain_controllers = @(Get-ADDomainController @parms) }
+Catch { $module.FailJson("Failed to find a domain controller: $($_.Exception.Message)", $_) }
+
+if (-not $discovered -and $null -ne $site) {
+    $domain_controllers = @($domain_controllers | Where-Object { $_.Site -eq $site })
+}
 
-$current_domain_info = Get-ADDomainController @parms
+$services = if ($discovered) { [String[]]$service } else { [String[]]@() }
+$module.Result.domain_controllers = @($domain_controllers | ForEach-Object { Get-DomainControllerObject -DomainController $_ -Services $services })
+$module.Result.domain_controller = $null
+if ($module.Result.domain_controllers.Count -gt 0) { $module.Result.domain_controller = $module.Result.domain_controllers[0] }
 
-$module.ExitJson()
\ No newline at end of file
+$module.ExitJson()
@@ -11,56 +11,77 @@ __metaclass__ = type
 DOCUMENTATION = r'''
 ---
 module: win_domain_info
-short_description: Gathers info on Active Directory Domain
+short_description: Gathers info on Active Directory Domain Controllers
 author: Joe Zollo (@zollo)
 requirements:
   - This module requires Windows Server 2012 or Newer
 description:
-  - Manage Active Directory Organizational Units
-  - Adds, Removes and Modifies Active Directory Organizational Units
-  - Task should be delegated to a Windows Active Directory Domain Controller
+  - Discovers a domain controller with C(Get-ADDomainController -Discover),
+    or lists the domain controllers of a domain.
+  - Returns the domain controllers with their site, roles and addresses, the
+    chosen domain controller can be passed as the C(domain_server) of other
+    Active Directory tasks.
+  - With l(cache=true) the result is kept in a controller side cache for
+    l(cache_timeout) seconds, later tasks for the same domain and site
+    return it without running the discovery again.
+  - Task should be delegated to a domain joined Windows host.
 options:
   site:
     description:
-      - abc
+      - The site to discover a domain controller in, or to filter the listed
+        domain controllers by.
+      - When not set, discovery uses the site of the host.
     type: str
-    required: true
-
   discover:
     description:
-      - abc
-    type: str
-    required: true
-
+      - Discovers one domain controller with the DC locator.
+      - When l(discover=false), or when l(identity) or l(filter) is set,
+        the domain controllers are listed from the directory instead.
+    type: bool
+    default: true
+  next_closest_site:
+    description:
+      - Discovers a domain controller in the next closest site when l(site)
+        has none.
+    type: bool
+    default: false
+  force_discover:
+    description:
+      - Ignores the domain controller cached by the DC locator of the host.
+      - With l(cache=true), the controller side cache is not read either, the
+        discovered domain controller replaces the cached one.
+    type: bool
+    default: false
   filter:
     description:
-      - abc
+      - A C(Get-ADDomainController) filter of the domain controllers to
+        list, such as C(IsGlobalCatalog -eq $true).
+      - Defaults to every domain controller when listing.
     type: str
-    required: true
-
   identity:
     description:
-      - abc
+      - The name, host name or GUID of a single domain controller to read.
     type: str
-    required: true
-
   service:
     description:
-      - abc
-    type: str
-    required: true
-
-  xyz:
+      - The services the discovered domain controller must provide.
+      - These services are added to the C(roles) of the discovered domain
+        controller.
+    type: list
+    elements: str
+    choices: [ PrimaryDC, GlobalCatalog, KDC, TimeService, ReliableTimeService, ADWS ]
+  domain_name:
     description:
-      - abc
+      - The DNS name of the domain to discover or list the domain controllers
+        of.
+      - When not set, the domain of the host is used.
     type: str
-    required: true
-
   domain_username:
     description:
       - The username to use when interacting with AD.
       - If this is not set then the user Ansible used to log in with will be
         used instead when using CredSSP or Kerberos with credential delegation.
+      - Not used by discovery.
     type: str
   domain_password:
     description:
@@ -72,44 +93,104 @@ options:
       - Can be in the form of an FQDN or NetBIOS name.
       - If not specified then the value is based on the domain of the computer
         running PowerShell.
+      - Not used by discovery.
     type: str
+  cache:
+    description:
+      - Keeps the result in a controller side cache, a later task with the
+        same query returns the cached result without running on the host.
+      - The cache is keyed by l(domain_name) or l(domain_server), l(site),
+        l(service) and the other query options. Hosts share the cached result
+        when the domain and, for discovery, the site are set, otherwise each
+        host has its own entry.
+      - This option and the other C(cache) options are consumed by the action
+        plugin and are not sent to the host.
+    type: bool
+    default: no
+  cache_plugin:
+    description:
+      - The Ansible cache plugin used when l(cache=true), such as
+        C(ansible.builtin.jsonfile).
+    type: str
+    default: ansible.builtin.jsonfile
+  cache_connection:
+    description:
+      - The connection of the cache plugin, the directory of the
+        C(ansible.builtin.jsonfile) plugin.
+    type: str
+  cache_timeout:
+    description:
+      - The number of seconds a cached result is used, C(0) keeps it until
+        the cache is cleared.
+    type: int
+    default: 3600
+  cache_prefix:
+    description:
+      - The prefix of the cache keys.
+    type: str
+    default: zollo_windows_domain_
 '''
 
 EXAMPLES = r'''
-- name: Ensure OU is present & protected
-  community.windows.win_domain_info:
-    name: EUC Users
+- name: Discover a domain controller in the site of the host
+  zollo.windows.win_domain_info:
+  register: dc
+
+- name: Discover a domain controller with ADWS in a site, once per hour for every host of the site
+  zollo.windows.win_domain_info:
+    domain_name: contoso.com
+    site: Atlanta
     service:
-      - PrimaryDC
       - ADWS
+    next_closest_site: true
+    cache: true
+    cache_connection: ~/.ansible/domain_cache
+  register: dc
 
-- name: Ensure OU is absent
-  community.windows.win_domain_info:
+- name: Use the discovered domain controller
+  zollo.windows.win_domain_ou:
     name: EUC Users
-    state: absent
+    domain_server: "{{ dc.domain_controller.hostname }}"
 
+- name: List the global catalogs of the domain
+  zollo.windows.win_domain_info:
+    discover: false
+    filter: IsGlobalCatalog -eq $true
 '''
 
 RETURN = r'''
-ou:
-  description: New/Updated organizational unit parameters
-  returned: When l(state=present)
+domain_controller:
+  description:
+    - The discovered domain controller, or the first listed domain
+      controller.
+    - C(null) when no domain controller was found.
+  returned: always
   type: dict
   sample:
-    name:
-    guid:
-    distinguished_name:
-    created:
-    modified:
-    protected:
-    display_name:
-    description:
-    managed_by:
-    location:
-      city:
-      state: 
-      street_address:
-      postal_code:
-      country:
-    attributes:
+    name: DC01
+    hostname: dc01.contoso.com
+    site: Atlanta
+    domain: contoso.com
+    forest: contoso.com
+    address: 10.0.1.5
+    ipv6_address:
+    is_global_catalog: true
+    is_read_only: false
+    operation_master_roles: [ PDCEmulator, RIDMaster, InfrastructureMaster ]
+    roles: [ PrimaryDC, GlobalCatalog, ADWS ]
+domain_controllers:
+  description:
+    - The discovered domain controller, or the listed domain controllers,
+      with the keys of C(domain_controller).
+    - C(roles) holds C(PrimaryDC) for the PDC emulator, C(GlobalCatalog) for
+      global catalogs and the l(service) a domain controller was discovered
+      with.
+  returned: always
+  type: list
+  elements: dict
+cached:
+  description: Whether the result was read from the controller side cache.
+  returned: When l(cache=true)
+  type: bool
+  sample: true
 '''
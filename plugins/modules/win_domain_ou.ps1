@@ -9,7 +9,7 @@
 $spec = @{
     options = @{
         state = @{ type = "str"; choices = @("absent", "present"); default = "present" }
-        name = @{ type = "str"; required = $true }
+        name = @{ type = "str" }
         protected = @{ type = "bool"; default = $false }
         path = @{ type = "str" }
         domain_username = @{ type = "str" }
@@ -29,7 +29,10 @@ $spec = @{
             }
         }
         other_attributes = @{ type = "dict" }
+        tree = @{ type = "list"; elements = "dict" }
     }
+    mutually_exclusive = @(, @('name', 'tree'))
+    required_one_of = @(, @('name', 'tree'))
     supports_check_mode = $true
 }
 
@@ -48,6 +51,7 @@ $display_name = $module.Params.display_name
 $description = $module.Params.description
 $location = $module.Params.location
 $other_attributes = $module.Params.other_attributes
+$tree = $module.Params.tree
 
 $primary_props = @('Name', 'ObjectGUID', 'ProtectedFromAccidentalDeletion',
                     'DistinguishedName', 'ManagedBy', 'City', 'Country',
@@ -69,10 +73,6 @@ $x = @('Name', 'ObjectGUID', 'ProtectedFromAccidentalDeletion',
 
 $parms = @{}
 
-if($null -eq $path) {
-    $path = (Get-ADDomain).DistinguishedName
-}
-
 if ($null -ne $domain_username) {
     $domain_password = ConvertTo-SecureString $domain_password -AsPlainText -Force
     $credential = New-Object -TypeName System.Management.Automation.PSCredential -ArgumentList $domain_username, $domain_password
@@ -83,25 +83,183 @@ if ($null -ne $domain_server) {
     $parms.Server = $domain_server
 }
 
+# connection parameters for the lookups, $parms also holds the changes
+$ad_parms = $parms.Clone()
+
+# read only the properties compared and returned by the module
+$ou_props = @($pmap.Keys) + @('Description', 'DisplayName')
+if ($other_attributes) { $ou_props += @($other_attributes.Keys) }
+foreach ($node in $tree) {
+    # nested children are validated when the tree is flattened
+    $stack = [System.Collections.Generic.Stack[Object]]@(, $node)
+    while ($stack.Count -gt 0) {
+        $item = $stack.Pop()
+        if ($item.other_attributes) { $ou_props += @($item.other_attributes.Keys) }
+        foreach ($child in $item.children) { $stack.Push($child) }
+    }
+}
+$ou_props = @($ou_props | Select-Object -Unique)
+
 Function Compare-OuObject {
+    # true when the compared properties of both objects are equal
     Param(
         [PSObject]$Original,
         [PSObject]$Updated
     )
 
-    # loop over original
-    $obj1.PSObject.Properties | foreach-object { if($obj1[$_.Name] -ne $obj2[$_.Name]){write-host "diff" }  }
+    if (-not $Original -or -not $Updated) { return $false }
+
+    foreach ($prop in $ou_props) {
+        # timestamps change on every write
+        if ($prop -in @('Created', 'Modified')) { continue }
+        if (($Original.$prop -join ' ') -ne ($Updated.$prop -join ' ')) { return $false }
+    }
+    return $true
+}
+
+Function Get-OrganizationalUnit {
+    # reads a single OU by distinguished name, $null when it does not exist
+    Param([String]$Identity)
+
+    Try { Get-ADOrganizationalUnit -Identity $Identity -Properties $ou_props @ad_parms }
+    Catch [Microsoft.ActiveDirectory.Management.ADIdentityNotFoundException] { $null }
+}
+
+Function Get-OuChanges {
+    # returns the Set-ADOrganizationalUnit parameters that differ from the current OU
+    Param(
+        [PSObject]$Current,
+        [Hashtable]$Desired
+    )
 
+    $changes = @{}
+    foreach ($key in $Desired.Keys) {
+        if ($key -in @('Credential', 'Server')) { continue }
+        if ($key -eq 'OtherAttributes') {
+            $replace = @{}
+            foreach ($attr in $Desired.OtherAttributes.Keys) {
+                if (($Current.$attr -join ' ') -ne ($Desired.OtherAttributes.$attr -join ' ')) {
+                    $replace.$attr = $Desired.OtherAttributes.$attr
+                }
+            }
+            if ($replace.Count -gt 0) { $changes.Replace = $replace }
+        } elseif (($Current.$key -join ' ') -ne ($Desired.$key -join ' ')) {
+            $changes.$key = $Desired.$key
+        }
+    }
+    return $changes
+}
 
+Function Add-OuTreeNode {
+    # adds a tree entry and its children with their distinguished names
+    Param(
+        $Node,
+        [String]$ParentDN,
+        [System.Collections.Generic.List[Hashtable]]$Nodes
+    )
 
-    $Original.PSObject.Properties | ForEach-Object {
-        if($_.Name)
+    if ($Node -isnot [System.Collections.IDictionary] -or -not $Node.name) {
+        throw "every tree entry must be a dict with a name"
     }
 
-    if ($Original -eq $false) { return $false }
+    # path is a distinguished name, or OU names from the parent separated by /
+    $parent = $ParentDN
+    if ($Node.path -match '=') { $parent = $Node.path }
+    elseif ($Node.path) {
+        foreach ($ou in @($Node.path -split '/' | Where-Object { $_ })) { $parent = "OU=$ou,$parent" }
+    }
+    $node_dn = "OU=$($Node.name),$parent"
+
+    $Nodes.Add(@{
+        node = $Node
+        path = $parent
+        dn = $node_dn
+        depth = ($node_dn -split '(?<!\\),').Count
+        index = $Nodes.Count
+    })
+    foreach ($child in $Node.children) { Add-OuTreeNode -Node $child -ParentDN $node_dn -Nodes $Nodes }
+}
 
-    $x = Compare-Object $Original $Updated
-    $x.Count -eq 0
+Function ConvertTo-OuParameters {
+    # maps the options of a tree entry to New-ADOrganizationalUnit parameters
+    Param($Node)
+
+    # protected of the task only applies on create, see Set-OuTree
+    $node_parms = @{}
+    if ($null -ne $Node.protected) { $node_parms.ProtectedFromAccidentalDeletion = [bool]$Node.protected }
+    if ($Node.description) { $node_parms.Description = $Node.description }
+    if ($Node.display_name) { $node_parms.DisplayName = $Node.display_name }
+    if ($Node.managed_by) { $node_parms.ManagedBy = $Node.managed_by }
+    if ($Node.other_attributes) { $node_parms.OtherAttributes = $Node.other_attributes }
+    if ($Node.location) {
+        if ($Node.location.postal_code) { $node_parms.PostalCode = $Node.location.postal_code }
+        if ($Node.location.street_address) { $node_parms.StreetAddress = $Node.location.street_address }
+        if ($Node.location.state) { $node_parms.State = $Node.location.state }
+        if ($Node.location.country) { $node_parms.Country = $Node.location.country }
+        if ($Node.location.city) { $node_parms.City = $Node.location.city }
+    }
+    return $node_parms
+}
+
+Function Set-OuTree {
+    # creates or updates every node of a tree, with one subtree search under the root
+    Param(
+        [Object[]]$Tree,
+        [String]$Root
+    )
+
+    $nodes = [System.Collections.Generic.List[Hashtable]]@()
+    Try { foreach ($node in $Tree) { Add-OuTreeNode -Node $node -ParentDN $Root -Nodes $nodes } }
+    Catch { $module.FailJson("Invalid tree: $($_.Exception.Message)", $_) }
+
+    $seen = @{}
+    foreach ($entry in $nodes) {
+        if ($seen.ContainsKey($entry.dn.ToLower())) { $module.FailJson("The tree defines $($entry.dn) more than once") }
+        $seen[$entry.dn.ToLower()] = $true
+    }
+
+    # parents first, in tree order within a level
+    $sorted = $nodes | Sort-Object -Property @{ Expression = { $_.depth } }, @{ Expression = { $_.index } }
+
+    $existing = @{}
+    Try {
+        Get-ADOrganizationalUnit -Filter * -SearchBase $Root -SearchScope Subtree -Properties $ou_props @ad_parms | ForEach-Object {
+            $existing[$_.DistinguishedName.ToLower()] = $_
+        }
+    } Catch { $module.FailJson("Failed to read the organizational units under ${Root}: $($_.Exception.Message)", $_) }
+
+    $results = [System.Collections.Generic.List[Hashtable]]@()
+    $module.Diff.before = @{}
+    $module.Diff.after = @{}
+    foreach ($entry in $sorted) {
+        $node_parms = ConvertTo-OuParameters -Node $entry.node
+        $current = $existing[$entry.dn.ToLower()]
+        $ou_result = @{ name = $entry.node.name; distinguished_name = $entry.dn; action = "unchanged"; changed = $false }
+
+        if (-not $current) {
+            if (-not $node_parms.ContainsKey('ProtectedFromAccidentalDeletion')) { $node_parms.ProtectedFromAccidentalDeletion = $protected }
+            Try { New-ADOrganizationalUnit -Name $entry.node.name -Path $entry.path @node_parms @ad_parms -WhatIf:$check_mode }
+            Catch { $module.FailJson("Failed to create organizational unit $($entry.dn): $($_.Exception.Message)", $_) }
+            $ou_result.action = "created"
+            $module.Diff.after[$entry.dn] = $node_parms
+        } else {
+            $changes = Get-OuChanges -Current $current -Desired $node_parms
+            if ($changes.Count -gt 0) {
+                Try { Set-ADOrganizationalUnit -Identity $current.DistinguishedName @changes @ad_parms -WhatIf:$check_mode }
+                Catch { $module.FailJson("Failed to update organizational unit $($entry.dn): $($_.Exception.Message)", $_) }
+                $ou_result.action = "updated"
+                $module.Diff.before[$entry.dn] = Get-OuObject -Object $current
+                $module.Diff.after[$entry.dn] = $changes
+            }
+        }
+
+        if ($ou_result.action -ne "unchanged") {
+            $ou_result.changed = $true
+            $module.Result.changed = $true
+        }
+        $results.Add($ou_result)
+    }
+    return ,$results
 }
 
 Function Get-ParsedAttributes {
@@ -248,17 +406,30 @@ Function Get-OuAttributes {
 Try { Import-Module ActiveDirectory }
 Catch { $module.FailJson("The ActiveDirectory module failed to load properly: $($_.Exception.Message)", $_) }
 
+if ($null -eq $path) {
+    Try { $path = (Get-ADDomain @ad_parms).DistinguishedName }
+    Catch { $module.FailJson("Failed to read the domain: $($_.Exception.Message)", $_) }
+}
+
+if ($tree) {
+    if ($state -ne "present") { $module.FailJson("tree requires state=present") }
+    $module.Result.ous = Set-OuTree -Tree $tree -Root $path
+    $module.ExitJson()
+}
+
+$dn = "OU=$name,$path"
+
 # determine current object state
-Try {
-    $current_ou = Get-ADOrganizationalUnit -Filter * -Properties * | Where-Object {
-        $_.DistinguishedName -eq "OU=$name,$path"
-    }
+Try { $current_ou = Get-OrganizationalUnit -Identity $dn }
+Catch { $module.FailJson("Failed to read organizational unit: $($_.Exception.Message)", $_) }
+if ($current_ou) {
     $module.Diff.before = Get-OuObject -Object $current_ou
     $module.Result.ou = $module.Diff.before
-} Catch {
+} else {
     $module.Diff.before = ""
     $current_ou = $false
 }
+$written = $false
 
 if ($state -eq "present") {
     # parse inputs
@@ -268,10 +439,10 @@ if ($state -eq "present") {
     if ($other_attributes) { $parms.OtherAttributes = $other_attributes }
     if ($location) {
         if ($location.postal_code) { $parms.PostalCode = $location.postal_code }
-        if ($location.street_address) { $parms.StreetAddress = $properties.street_address }
+        if ($location.street_address) { $parms.StreetAddress = $location.street_address }
         if ($location.state) { $parms.State = $location.state }
-        if ($location.country) { $parms.Country = $properties.country }
-        if ($location.city) { $parms.City = $properties.city }
+        if ($location.country) { $parms.Country = $location.country }
+        if ($location.city) { $parms.City = $location.city }
     }
 
     if(-not $current_ou) { # ou does not exist, create object
@@ -279,15 +450,18 @@ if ($state -eq "present") {
         $parms.Path = $path
         Try { New-ADOrganizationalUnit @parms -ProtectedFromAccidentalDeletion $protected -WhatIf:$check_mode }
         Catch { $module.FailJson("Failed to create organizational unit: $($_.Exception.Message)") }
+        $written = $true
     }
 
-    if ($current_ou) { # ou exists, update object
-        # compare object
-        
-        Try { Set-ADOrganizationalUnit -Identity "OU=$name,$path" @parms -WhatIf:$check_mode }
-        Catch {
-            $module.Result.debug = $parms
-            $module.FailJson("Failed to update organizational unit: $($_.Exception.Message)",$_) }
+    if ($current_ou) { # ou exists, update the differing properties only
+        $changes = Get-OuChanges -Current $current_ou -Desired $parms
+        if ($changes.Count -gt 0) {
+            Try { Set-ADOrganizationalUnit -Identity $dn @changes @ad_parms -WhatIf:$check_mode }
+            Catch {
+                $module.Result.debug = $changes
+                $module.FailJson("Failed to update organizational unit: $($_.Exception.Message)",$_) }
+            $written = $true
+        }
     }
 }
 
@@ -296,8 +470,8 @@ if ($state -eq "absent") {
     if ($current_ou -and -not $check_mode) {
         Try {
             # override protected from accidental deletion
-            Set-ADOrganizationalUnit -Identity "OU=$name,$path" -ProtectedFromAccidentalDeletion $false -Confirm:$False -WhatIf:$check_mode
-            Remove-ADOrganizationalUnit -Identity "OU=$name,$path" -Confirm:$False -WhatIf:$check_mode -Recursive
+            Set-ADOrganizationalUnit -Identity $dn -ProtectedFromAccidentalDeletion $false -Confirm:$False -WhatIf:$check_mode @ad_parms
+            Remove-ADOrganizationalUnit -Identity $dn -Confirm:$False -WhatIf:$check_mode -Recursive @ad_parms
             $module.Result.changed = $true
             $module.Diff.after = ""
         } Catch {
@@ -310,9 +484,9 @@ if ($state -eq "absent") {
 # determine if a change was made
 Try {
     if (-not $check_mode) {
-        $new_ou = Get-ADOrganizationalUnit -Filter * -Properties * | Where-Object {
-            $_.DistinguishedName -eq "OU=$name,$path"
-        }
+        # re-read only after a write, otherwise the current object is reused
+        if ($written) { $new_ou = Get-OrganizationalUnit -Identity $dn }
+        else { $new_ou = $current_ou }
         # compare old/new objects
         if (-not (Compare-OuObject -Original $current_ou -Updated $new_ou)) {
             $module.Result.changed = $true
@@ -17,6 +17,9 @@ description:
   - Manage Active Directory Organizational Units
   - Adds, Removes and Modifies Active Directory Organizational Units
   - Task should be delegated to a Windows Active Directory Domain Controller
+  - The OU is read by its distinguished name with only the properties the
+    module manages and the keys of l(other_attributes), and only the
+    properties that differ are written.
 options:
   state:
     description:
@@ -31,8 +34,8 @@ options:
   name:
     description:
       - The name of the Organizational Unit
+      - Either l(name) or l(tree) must be set.
     type: str
-    required: true
   protected:
     description:
       - Indicates whether to prevent the object from being deleted. When this
@@ -125,6 +128,28 @@ options:
       - Defines specific LDAP properties for the organizational unit.
       - Provides enables a one-to-one mapping to LDAP properties (keys) 
         to values.
+  tree:
+    description:
+      - A list of organizational units to create or update under l(path) in
+        one task, mutually exclusive with l(name).
+      - Each entry is a dict with a C(name) and the optional keys
+        C(description), C(display_name), C(managed_by), C(protected),
+        C(location) and C(other_attributes), which take the same values as
+        the options of the same name.
+      - C(protected) of an entry is applied to new and existing organizational
+        units. Without it, new organizational units use l(protected) and the
+        deletion protection of existing ones is left unchanged.
+      - Nested organizational units are listed in the C(children) key of
+        their parent, or as entries of the flat list with a C(path).
+      - C(path) is the parent of the entry, either OU names from the parent
+        of the entry separated by C(/), such as C(Sites/Atlanta), or a
+        distinguished name.
+      - The existing organizational units are read with one subtree search
+        under l(path). Parents are created before their children and only
+        the missing or differing entries are written.
+      - Only l(state=present) is supported.
+    type: list
+    elements: dict
 '''
 
 EXAMPLES = r'''
@@ -157,6 +182,24 @@ EXAMPLES = r'''
         - ansible.com
         - https://ansible.com
 
+- name: Ensure a site structure is present
+  zollo.windows.win_domain_ou:
+    path: "DC=euc,DC=vmware,DC=lan"
+    protected: true
+    tree:
+      - name: Sites
+        children:
+          - name: Atlanta
+            location:
+              city: Sandy Springs
+              state: Georgia
+            children:
+              - name: Computers
+              - name: Users
+      - name: Servers
+        path: Sites/Atlanta
+        description: Atlanta servers
+
 - name: Ensure OU updated with new properties
   community.windows.win_domain_ou:
     name: ws1users
@@ -193,4 +236,16 @@ ou:
       postal_code:
       country:
     attributes:
+ous:
+  description:
+    - The organizational units of l(tree), parents first.
+    - C(action) is C(created), C(updated) or C(unchanged).
+  returned: When l(tree) is set
+  type: list
+  elements: dict
+  sample:
+    - name: Sites
+      distinguished_name: OU=Sites,DC=euc,DC=vmware,DC=lan
+      action: created
+      changed: true
 '''
@@ -0,0 +1,213 @@
+#!powershell
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+#AnsibleRequires -CSharpUtil Ansible.Basic
+
+$spec = @{
+    options = @{
+        search_base = @{ type = "str" }
+        search_scope = @{ type = "str"; choices = @("base", "one_level", "subtree"); default = "subtree" }
+        ldap_filter = @{ type = "str" }
+        properties = @{
+            type = "list"
+            elements = "str"
+            default = @("name", "guid", "created", "modified", "managed_by", "description", "display_name", "location")
+        }
+        page_size = @{ type = "int"; default = 500 }
+        limit = @{ type = "int"; default = 0 }
+        cookie = @{ type = "str" }
+        domain_username = @{ type = "str" }
+        domain_password = @{ type = "str"; no_log = $true }
+        domain_server = @{ type = "str" }
+    }
+    supports_check_mode = $true
+}
+
+$module = [Ansible.Basic.AnsibleModule]::Create($args, $spec)
+
+$search_base = $module.Params.search_base
+$search_scope = $module.Params.search_scope
+$ldap_filter = $module.Params.ldap_filter
+$properties = $module.Params.properties
+$page_size = $module.Params.page_size
+$limit = $module.Params.limit
+$cookie = $module.Params.cookie
+$domain_username = $module.Params.domain_username
+$domain_password = $module.Params.domain_password
+$domain_server  = $module.Params.domain_server
+
+if ($page_size -lt 1 -or $page_size -gt 1000) { $module.FailJson("page_size must be between 1 and 1000") }
+if ($limit -lt 0) { $module.FailJson("limit must be 0 or greater") }
+
+# properties of the Get-OuObject shape of win_domain_ou and their LDAP attributes
+$prop_map = @{
+    name = @('name'); guid = @('objectGUID'); created = @('whenCreated');
+    modified = @('whenChanged'); managed_by = @('managedBy');
+    description = @('description'); display_name = @('displayName');
+    protected = @('nTSecurityDescriptor');
+    location = @('l', 'c', 'postalCode', 'st', 'street')
+}
+$location_map = @{ l = 'city'; c = 'country'; postalCode = 'postal_code'; st = 'state'; street = 'street_address' }
+
+Try { Add-Type -AssemblyName System.DirectoryServices, System.DirectoryServices.Protocols }
+Catch { $module.FailJson("Failed to load System.DirectoryServices.Protocols: $($_.Exception.Message)", $_) }
+
+$scope_map = @{
+    base = [System.DirectoryServices.Protocols.SearchScope]::Base
+    one_level = [System.DirectoryServices.Protocols.SearchScope]::OneLevel
+    subtree = [System.DirectoryServices.Protocols.SearchScope]::Subtree
+}
+
+Function Get-LdapValue {
+    # returns the values of an attribute, a single value is not wrapped in a list
+    Param($Entry, [String]$Attribute)
+
+    if (-not $Entry.Attributes.Contains($Attribute)) { return $null }
+    $values = @($Entry.Attributes[$Attribute].GetValues([String]))
+    if ($values.Count -eq 1) { return $values[0] }
+    return ,$values
+}
+
+Function ConvertFrom-GeneralizedTime {
+    Param([String]$Value)
+
+    if (-not $Value) { return $null }
+    $styles = [System.Globalization.DateTimeStyles]'AssumeUniversal, AdjustToUniversal'
+    [DateTime]::ParseExact($Value, 'yyyyMMddHHmmss.0Z', [System.Globalization.CultureInfo]::InvariantCulture, $styles).ToString('o')
+}
+
+Function Test-OuProtected {
+    # the deny delete ACE for Everyone set by ProtectedFromAccidentalDeletion
+    Param([Byte[]]$Descriptor)
+
+    $security = New-Object -TypeName System.DirectoryServices.ActiveDirectorySecurity
+    $security.SetSecurityDescriptorBinaryForm($Descriptor)
+    $everyone = New-Object -TypeName System.Security.Principal.SecurityIdentifier -ArgumentList 'S-1-1-0'
+    $rights = [System.DirectoryServices.ActiveDirectoryRights]'Delete, DeleteTree'
+    $deny = $security.GetAccessRules($true, $false, [System.Security.Principal.SecurityIdentifier]) | Where-Object {
+        $_.AccessControlType -eq 'Deny' -and $_.IdentityReference -eq $everyone -and ($_.ActiveDirectoryRights -band $rights) -eq $rights
+    }
+    return [bool]$deny
+}
+
+Function ConvertTo-OuObject {
+    # converts a search result entry to the Get-OuObject shape of win_domain_ou
+    Param($Entry)
+
+    $ou = @{ distinguished_name = $Entry.DistinguishedName }
+    foreach ($prop in $properties) {
+        switch ($prop) {
+            distinguished_name { }
+            guid {
+                if ($Entry.Attributes.Contains('objectGUID')) {
+                    $bytes = $Entry.Attributes['objectGUID'].GetValues([Byte[]])[0]
+                    $ou.guid = (New-Object -TypeName System.Guid -ArgumentList (, $bytes)).ToString()
+                }
+            }
+            created { $ou.created = ConvertFrom-GeneralizedTime -Value (Get-LdapValue -Entry $Entry -Attribute 'whenCreated') }
+            modified { $ou.modified = ConvertFrom-GeneralizedTime -Value (Get-LdapValue -Entry $Entry -Attribute 'whenChanged') }
+            protected {
+                $ou.protected = $false
+                if ($Entry.Attributes.Contains('nTSecurityDescriptor')) {
+                    $ou.protected = Test-OuProtected -Descriptor $Entry.Attributes['nTSecurityDescriptor'].GetValues([Byte[]])[0]
+                }
+            }
+            location {
+                $ou.location = @{}
+                foreach ($attr in $location_map.Keys) {
+                    $value = Get-LdapValue -Entry $Entry -Attribute $attr
+                    if ($null -ne $value) { $ou.location.($location_map.$attr) = $value }
+                }
+            }
+            default {
+                if ($prop_map.ContainsKey($prop)) {
+                    $ou.$prop = Get-LdapValue -Entry $Entry -Attribute $prop_map.$prop[0]
+                } else {
+                    # any other LDAP attribute requested by the caller
+                    if (-not $ou.ContainsKey('attributes')) { $ou.attributes = @{} }
+                    $ou.attributes.$prop = Get-LdapValue -Entry $Entry -Attribute $prop
+                }
+            }
+        }
+    }
+    return $ou
+}
+
+# connect to the requested DC, or to the domain of the computer
+Try {
+    if (-not $domain_server) { $domain_server = [System.DirectoryServices.ActiveDirectory.Domain]::GetComputerDomain().Name }
+    $identifier = New-Object -TypeName System.DirectoryServices.Protocols.LdapDirectoryIdentifier -ArgumentList $domain_server
+    $connection = New-Object -TypeName System.DirectoryServices.Protocols.LdapConnection -ArgumentList $identifier
+    $connection.AuthType = [System.DirectoryServices.Protocols.AuthType]::Negotiate
+    $connection.SessionOptions.ProtocolVersion = 3
+    $connection.SessionOptions.Signing = $true
+    $connection.SessionOptions.Sealing = $true
+    if ($null -ne $domain_username) {
+        $connection.Credential = New-Object -TypeName System.Net.NetworkCredential -ArgumentList $domain_username, $domain_password
+    }
+    $connection.Bind()
+} Catch { $module.FailJson("Failed to connect to ${domain_server}: $($_.Exception.Message)", $_) }
+
+# the paging cookie is only valid on the DC that returned it, a domain name
+# can resolve to another DC so the host name of the bound DC is returned
+Try {
+    $rootdse = New-Object -TypeName System.DirectoryServices.Protocols.SearchRequest -ArgumentList '', '(objectClass=*)', ([System.DirectoryServices.Protocols.SearchScope]::Base), @('defaultNamingContext', 'dnsHostName')
+    $rootdse_entry = $connection.SendRequest($rootdse).Entries[0]
+    $domain_server = $rootdse_entry.Attributes['dnsHostName'].GetValues([String])[0]
+    if ($null -eq $search_base) { $search_base = $rootdse_entry.Attributes['defaultNamingContext'].GetValues([String])[0] }
+} Catch { $module.FailJson("Failed to read the rootDSE of ${domain_server}: $($_.Exception.Message)", $_) }
+
+# request only the attributes of the requested properties
+$attributes = [System.Collections.Generic.List[String]]@()
+foreach ($prop in $properties) {
+    if ($prop_map.ContainsKey($prop)) { $attributes.AddRange([String[]]$prop_map.$prop) }
+    elseif ($prop -ne 'distinguished_name') { $attributes.Add($prop) }
+}
+if ($attributes.Count -eq 0) { $attributes.Add('1.1') }
+
+$filter = "(objectClass=organizationalUnit)"
+if ($ldap_filter) {
+    if (-not $ldap_filter.StartsWith('(')) { $ldap_filter = "($ldap_filter)" }
+    $filter = "(&$filter$ldap_filter)"
+}
+
+$request = New-Object -TypeName System.DirectoryServices.Protocols.SearchRequest -ArgumentList $search_base, $filter, $scope_map.$search_scope, $attributes.ToArray()
+$page = New-Object -TypeName System.DirectoryServices.Protocols.PageResultRequestControl -ArgumentList $page_size
+if ($cookie) {
+    Try { $page.Cookie = [Convert]::FromBase64String($cookie) }
+    Catch { $module.FailJson("cookie is not a cookie returned by this module", $_) }
+}
+[void]$request.Controls.Add($page)
+if ($properties -contains 'protected') {
+    # the DACL can be read without the rights to read the owner and SACL
+    $sd_control = New-Object -TypeName System.DirectoryServices.Protocols.SecurityDescriptorFlagControl -ArgumentList ([System.DirectoryServices.Protocols.SecurityMasks]::Dacl)
+    [void]$request.Controls.Add($sd_control)
+}
+
+$ous = [System.Collections.Generic.List[Hashtable]]@()
+Try {
+    do {
+        # the last page stops at the limit, the cookie resumes after it
+        if ($limit -gt 0) { $page.PageSize = [Math]::Min($page_size, $limit - $ous.Count) }
+        $response = $connection.SendRequest($request)
+        foreach ($entry in $response.Entries) { $ous.Add((ConvertTo-OuObject -Entry $entry)) }
+        $page_response = $response.Controls | Where-Object { $_ -is [System.DirectoryServices.Protocols.PageResultResponseControl] }
+        $page.Cookie = if ($page_response) { $page_response.Cookie } else { [Byte[]]@() }
+    } while ($page.Cookie.Length -gt 0 -and ($limit -eq 0 -or $ous.Count -lt $limit))
+} Catch {
+    $module.FailJson("Failed to search organizational units under ${search_base}: $($_.Exception.Message)", $_)
+} Finally {
+    $connection.Dispose()
+}
+
+$module.Result.ous = $ous
+$module.Result.count = $ous.Count
+$module.Result.search_base = $search_base
+$module.Result.domain_server = $domain_server
+$module.Result.cookie = $null
+if ($page.Cookie.Length -gt 0) { $module.Result.cookie = [Convert]::ToBase64String($page.Cookie) }
+
+$module.ExitJson()
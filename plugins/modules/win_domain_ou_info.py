@@ -0,0 +1,167 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+DOCUMENTATION = r'''
+---
+module: win_domain_ou_info
+short_description: Gathers info on Active Directory Organizational Units
+author: Joe Zollo (@joezollo)
+requirements:
+  - This module requires Windows Server 2012 or Newer
+description:
+  - Gathers info on Active Directory Organizational Units with a paged LDAP
+    search.
+  - Only the attributes of l(properties) are read, organizational units are
+    returned in the same shape as the C(ou) return value of
+    C(zollo.windows.win_domain_ou).
+  - A large search can be read in several tasks with l(limit) and
+    l(cookie).
+  - Task should be delegated to a domain joined Windows host.
+options:
+  search_base:
+    description:
+      - The distinguished name of the object to search under.
+      - If not set, the default naming context of the domain is searched.
+    type: str
+  search_scope:
+    description:
+      - The scope of the search under l(search_base).
+      - l(base) reads l(search_base) only, l(one_level) reads its direct
+        children and l(subtree) reads every object under it.
+    type: str
+    default: subtree
+    choices: [ base, one_level, subtree ]
+  ldap_filter:
+    description:
+      - An LDAP filter the organizational units must also match, such as
+        C((description=EUC*)).
+    type: str
+  properties:
+    description:
+      - The properties to return.
+      - C(name), C(guid), C(created), C(modified), C(managed_by),
+        C(description), C(display_name), C(protected) and C(location) are the
+        properties of C(zollo.windows.win_domain_ou). Any other value is read
+        as an LDAP attribute and returned in C(attributes).
+      - C(protected) reads the DACL of every organizational unit, it is not
+        requested by default.
+      - C(distinguished_name) is always returned.
+    type: list
+    elements: str
+    default: [ name, guid, created, modified, managed_by, description, display_name, location ]
+  page_size:
+    description:
+      - The number of results of each LDAP page, between 1 and 1000.
+    type: int
+    default: 500
+  limit:
+    description:
+      - The maximum number of organizational units to return.
+      - When more results are available, C(cookie) is returned to resume the
+        search in another task.
+      - C(0) returns every result.
+    type: int
+    default: 0
+  cookie:
+    description:
+      - The C(cookie) returned by a previous task, the search resumes after
+        the last result of that task.
+      - The search must use the same l(search_base), l(search_scope),
+        l(ldap_filter) and l(properties), and l(domain_server) must be set to
+        the C(domain_server) returned by the previous task.
+    type: str
+  domain_username:
+    description:
+      - The username to use when interacting with AD.
+      - If this is not set then the user Ansible used to log in with will be
+        used instead when using CredSSP or Kerberos with credential delegation.
+    type: str
+  domain_password:
+    description:
+      - The password for I(username).
+    type: str
+  domain_server:
+    description:
+      - Specifies the Active Directory Domain Services instance to connect to.
+      - Can be in the form of an FQDN or NetBIOS name.
+      - If not specified then the value is based on the domain of the computer
+        running PowerShell.
+    type: str
+'''
+
+EXAMPLES = r'''
+- name: Gather the names of the OUs under a site
+  zollo.windows.win_domain_ou_info:
+    search_base: OU=Sites,DC=euc,DC=vmware,DC=lan
+    properties:
+      - name
+  register: site_ous
+
+- name: Gather the first 1000 OUs with a custom attribute
+  zollo.windows.win_domain_ou_info:
+    properties:
+      - name
+      - protected
+      - extensionAttribute1
+    limit: 1000
+  register: page
+
+- name: Gather the next 1000 OUs
+  zollo.windows.win_domain_ou_info:
+    properties:
+      - name
+      - protected
+      - extensionAttribute1
+    limit: 1000
+    cookie: "{{ page.cookie }}"
+    domain_server: "{{ page.domain_server }}"
+  when: page.cookie is not none
+'''
+
+RETURN = r'''
+ous:
+  description: The organizational units found, with the requested properties.
+  returned: always
+  type: list
+  elements: dict
+  sample:
+    - name: Atlanta
+      distinguished_name: OU=Atlanta,OU=Sites,DC=euc,DC=vmware,DC=lan
+      guid: 1a4b4c5e-6c8f-4f8e-9d3e-7d1d0f7c2b10
+      created: "2021-03-02T16:11:09.0000000Z"
+      modified: "2021-03-02T16:11:09.0000000Z"
+      location:
+        city: Sandy Springs
+        state: Georgia
+      attributes:
+        extensionAttribute1: EUC
+count:
+  description: The number of organizational units returned.
+  returned: always
+  type: int
+  sample: 1000
+cookie:
+  description:
+    - The paging cookie to pass to l(cookie) to read the next results.
+    - C(null) when every result was returned.
+  returned: always
+  type: str
+search_base:
+  description: The distinguished name searched under.
+  returned: always
+  type: str
+  sample: DC=euc,DC=vmware,DC=lan
+domain_server:
+  description:
+    - The host name of the domain controller the search was sent to, read
+      from its rootDSE.
+    - Pass it to l(domain_server) with l(cookie), the cookie is only valid on
+      this domain controller.
+  returned: always
+  type: str
+  sample: dc01.euc.vmware.lan
+'''
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+''' A stand-in authoritative DNS server on localhost answering AXFR and IXFR over TCP '''
+
+import socket
+import struct
+import threading
+
+try:
+    import socketserver
+except ImportError:
+    import SocketServer as socketserver
+
+TYPES = {'a': 1, 'ns': 2, 'cname': 5, 'soa': 6, 'ptr': 12, 'mx': 15, 'txt': 16, 'aaaa': 28, 'srv': 33}
+
+
+def encode_name(name):
+    labels = [label for label in name.rstrip('.').split('.') if label]
+    return b''.join(struct.pack('!B', len(label)) + label.encode('ascii') for label in labels) + b'\x00'
+
+
+def soa(zone, serial, ttl=3600):
+    rdata = encode_name('dns01.' + zone) + encode_name('hostmaster.' + zone) + struct.pack('!IIIII', serial, 900, 600, 86400, ttl)
+    return (zone, 'soa', ttl, rdata)
+
+
+def rr(name, rtype, data, ttl=3600):
+    ''' Returns a record with its rdata encoded, data is given in the win_dns_info format '''
+    if rtype == 'a':
+        rdata = socket.inet_pton(socket.AF_INET, data)
+    elif rtype == 'aaaa':
+        rdata = socket.inet_pton(socket.AF_INET6, data)
+    elif rtype in ('ns', 'cname', 'ptr'):
+        rdata = encode_name(data)
+    elif rtype == 'mx':
+        rdata = struct.pack('!H', data['priority']) + encode_name(data['mail_exchange'])
+    elif rtype == 'srv':
+        rdata = struct.pack('!HHH', data['priority'], data['weight'], data['port']) + encode_name(data['domain_name'])
+    elif rtype == 'txt':
+        raw = data.encode('utf-8')
+        rdata = b''.join(struct.pack('!B', len(raw[i:i + 255])) + raw[i:i + 255] for i in range(0, len(raw), 255))
+    else:
+        rdata = data
+    return (name, rtype, ttl, rdata)
+
+
+def encode_message(query_id, question, records, rcode=0, compress=False):
+    ''' Encodes a response, owner names equal to the question name are compressed when asked '''
+    qname, qtype = question
+    message = struct.pack('!HHHHHH', query_id, 0x8400 | rcode, 1, len(records), 0, 0)
+    message += encode_name(qname) + struct.pack('!HH', qtype, 1)
+    for name, rtype, ttl, rdata in records:
+        owner = b'\xc0\x0c' if compress and name.rstrip('.') == qname.rstrip('.') else encode_name(name)
+        message += owner + struct.pack('!HHIH', TYPES[rtype], 1, ttl, len(rdata)) + rdata
+    return message
+
+
+def _read_query(data):
+    query_id, flags, qdcount, ancount, nscount = struct.unpack('!HHHHH', data[:10])
+    offset = 12
+    labels = []
+    while data[offset]:
+        length = data[offset]
+        labels.append(data[offset + 1:offset + 1 + length].decode('ascii'))
+        offset += 1 + length
+    qtype = struct.unpack('!H', data[offset + 1:offset + 3])[0]
+    offset += 5
+    serial = None
+    if nscount:
+        # skip the owner name, type, class, ttl, rdlength and the two root names of the SOA
+        while data[offset]:
+            offset += 1 + data[offset]
+        offset += 1 + 10 + 2
+        serial = struct.unpack('!I', data[offset:offset + 4])[0]
+    return query_id, '.'.join(labels), qtype, serial
+
+
+class DnsServer(object):
+    '''Answers each query with the messages returned by respond(zone, qtype, serial).
+
+    respond returns a list of messages, each a list of records, or an int
+    rcode. The queries received are recorded in queries.
+    '''
+
+    def __init__(self, respond, compress=False):
+        self.queries = []
+        server = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                size = struct.unpack('!H', self.request.recv(2))[0]
+                query_id, zone, qtype, serial = _read_query(bytearray(self.request.recv(size)))
+                server.queries.append((zone, qtype, serial))
+                answer = respond(zone, qtype, serial)
+                if isinstance(answer, int):
+                    messages = [encode_message(query_id, (zone, qtype), [], rcode=answer)]
+                else:
+                    messages = [encode_message(query_id, (zone, qtype), records, compress=compress) for records in answer]
+                for message in messages:
+                    self.request.sendall(struct.pack('!H', len(message)) + message)
+                # like a real server, the connection stays open until the client closes it
+                self.request.settimeout(5)
+                try:
+                    self.request.recv(1)
+                except socket.timeout:
+                    pass
+
+        self._server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+from ansible_collections.zollo.windows.plugins.action.win_dhcp_lease import validate_leases
+from ansible_collections.zollo.windows.plugins.action.win_dhcp_scope import validate_scope
+from ansible_collections.zollo.windows.plugins.module_utils.ipv4_index import DhcpScopeIndex
+
+SCOPES = [
+    {'name': 'vlan1', 'scope_id': '10.0.1.0', 'subnet_mask': '255.255.255.0',
+     'start_range': '10.0.1.100', 'end_range': '10.0.1.199'},
+]
+
+
+def test_leases_without_known_scopes():
+    assert validate_leases({'ip': '10.9.9.9', 'mac': '00-0a-1b-2c-3d-4f'}, None) == []
+
+
+def test_leases_duplicates():
+    args = {'leases': [
+        {'ip': '10.0.1.100', 'mac': '00:0A:1B:2C:3D:4F'},
+        {'ip': '10.0.1.100', 'mac': '000a1b2c3d50'},
+        {'mac': '00-0a-1b-2c-3d-50'},
+        {'ip': '10.0.1.101', 'state': 'absent'},
+        {'ip': '10.0.1.101'},
+    ]}
+    errors = validate_leases(args, None)
+    assert errors == [
+        'ip 10.0.1.100 is requested by more than one lease',
+        'mac 00-0a-1b-2c-3d-50 is requested by more than one lease',
+    ]
+
+
+def test_leases_inherit_top_level_options():
+    index = DhcpScopeIndex(SCOPES)
+    args = {'scope_id': '10.0.1.0', 'state': 'present', 'leases': [{'ip': '10.0.1.150'}, {'ip': '10.0.2.150'}]}
+    assert validate_leases(args, index) == ['10.0.2.150 is not within the subnet of any known scope']
+    args['state'] = 'absent'
+    assert validate_leases(args, index) == []
+
+
+def test_scope_without_mask():
+    # an unknown scope is left to the module, a known scope keeps its mask
+    assert validate_scope({'pool_start': '10.0.3.10', 'pool_end': '10.0.3.20'}, DhcpScopeIndex()) == []
+    args = {'name': 'vlan1', 'pool_start': '10.0.1.50', 'pool_end': '10.0.2.20'}
+    assert validate_scope(args, DhcpScopeIndex(SCOPES)) == ['pool_end 10.0.2.20 is outside of the subnet 10.0.1.0/255.255.255.0']
+
+
+def test_scope_invalid_exclusion():
+    args = {'name': 'vlan3', 'pool_start': '10.0.3.10', 'pool_end': '10.0.3.20', 'subnet_length': 24,
+            'exclusion_list': ['10.0.3.300']}
+    assert validate_scope(args, DhcpScopeIndex()) == ['10.0.3.300 is not a valid IPv4 address']
+
+
+def test_scope_absent_is_not_validated():
+    assert validate_scope({'state': 'absent', 'pool_start': 'junk', 'pool_end': 'junk'}, DhcpScopeIndex()) == []
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+from ansible.playbook.task import Task
+from ansible.plugins.loader import cache_loader
+from ansible_collections.zollo.windows.plugins.action.win_dns_info import ActionModule, cache_key, merge_zones
+from ansible_collections.zollo.windows.tests.unit.compat.mock import MagicMock
+
+RECORDS = [{'name': 'web01', 'fqdn': 'web01.contoso.com', 'type': 'a', 'data': '10.0.1.10', 'ttl': 3600}]
+
+
+def test_cache_key_ignores_serials():
+    args = {'type': 'all', 'zone_type': 'primary'}
+    assert cache_key('dns01', args) == cache_key('dns01', dict(args, known_serials={'contoso.com': 4}, throttle=8))
+    assert cache_key('dns01', args) != cache_key('dns02', args)
+    assert cache_key('dns01', args) != cache_key('dns01', dict(args, record_type='A'))
+
+
+def test_merge_zones():
+    cached = {'contoso.com': {'serial': 4, 'dns_records': RECORDS}}
+    zones = [
+        {'name': 'contoso.com', 'serial': 4, 'unchanged': True, 'dns_records': None},
+        {'name': 'fabrikam.com', 'serial': 9, 'dns_records': []},
+        {'name': 'broken.com', 'serial': 2, 'dns_records': None},
+        {'name': 'stub.com', 'type': 'stub'},
+    ]
+    entries = merge_zones(zones, cached, 'dns_records', [{'zone': 'broken.com', 'msg': 'access denied'}])
+    assert zones[0]['dns_records'] == RECORDS
+    assert entries == {
+        'contoso.com': {'serial': 4, 'dns_records': RECORDS},
+        'fabrikam.com': {'serial': 9, 'dns_records': []},
+    }
+
+
+def test_merge_zones_unchanged_without_cache():
+    zones = [{'name': 'contoso.com', 'serial': 4, 'unchanged': True, 'summary': None}]
+    assert merge_zones(zones, {}, 'summary') == {}
+    assert zones[0]['summary'] is None
+
+
+def test_merge_zones_jsonfile_round_trip(tmp_path):
+    cache = cache_loader.get('jsonfile', _uri=str(tmp_path), _timeout=0, _prefix='zollo_windows_dns_')
+    zones = [{'name': 'contoso.com', 'serial': 4, 'dns_records': RECORDS}]
+    cache.set('query', merge_zones(zones, {}, 'dns_records'))
+
+    cache = cache_loader.get('jsonfile', _uri=str(tmp_path), _timeout=0, _prefix='zollo_windows_dns_')
+    zones = [{'name': 'contoso.com', 'serial': 4, 'unchanged': True}]
+    merge_zones(zones, cache.get('query'), 'dns_records')
+    assert zones[0]['dns_records'] == RECORDS
+
+
+def _action(tmp_path, result, check_mode=False):
+    task = Task()
+    task.action = 'zollo.windows.win_dns_info'
+    task.args = {'type': 'all', 'cache': True, 'cache_plugin': 'jsonfile', 'cache_connection': str(tmp_path)}
+    connection = MagicMock()
+    connection._shell.tmpdir = None
+    play_context = MagicMock(check_mode=check_mode, remote_addr='dns01')
+    action = ActionModule(task, connection, play_context, loader=None, templar=None, shared_loader_obj=None)
+    action._execute_module = MagicMock(return_value=result)
+    return action
+
+
+def test_run_keeps_cache_when_skipped(tmp_path):
+    zones = [{'name': 'contoso.com', 'serial': 4, 'dns_records': RECORDS}]
+    _action(tmp_path, {'changed': False, 'zones': zones}).run(task_vars={})
+
+    action = _action(tmp_path, {'skipped': True, 'msg': 'remote module does not support check mode'}, check_mode=True)
+    assert action.run(task_vars={})['skipped']
+    assert action._execute_module.call_args[1]['module_args']['known_serials'] == {'contoso.com': 4}
+
+    action = _action(tmp_path, {'changed': False, 'zones': [{'name': 'contoso.com', 'serial': 4, 'unchanged': True}]})
+    assert action.run(task_vars={})['zones'][0]['dns_records'] == RECORDS
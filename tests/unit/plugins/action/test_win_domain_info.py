@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+from ansible.playbook.task import Task
+from ansible.plugins.loader import cache_loader
+from ansible_collections.zollo.windows.plugins.action.win_domain_info import ActionModule, cache_key, cached_result
+from ansible_collections.zollo.windows.tests.unit.compat.mock import MagicMock
+
+DC = {'name': 'DC01', 'hostname': 'dc01.contoso.com', 'site': 'Atlanta', 'address': '10.0.1.5',
+      'roles': ['PrimaryDC', 'GlobalCatalog', 'ADWS']}
+
+
+def test_cache_key_shared_by_domain_and_site():
+    args = {'domain_name': 'contoso.com', 'site': 'Atlanta', 'service': ['ADWS', 'KDC']}
+    assert cache_key('web01', args) == cache_key('web02', dict(args, service=['KDC', 'ADWS'], domain_username='x'))
+    assert cache_key('web01', args) != cache_key('web01', dict(args, site='Sandy Springs'))
+    assert cache_key('web01', args) != cache_key('web01', dict(args, domain_name='fabrikam.com'))
+
+
+def test_cache_key_per_host():
+    # discovery without a site uses the site of the host
+    args = {'domain_name': 'contoso.com'}
+    assert cache_key('web01', args) != cache_key('web02', args)
+    # listing does not depend on the host
+    args = {'domain_server': 'dc01.contoso.com', 'discover': False}
+    assert cache_key('web01', args) == cache_key('web02', args)
+    assert cache_key('web01', {'site': 'Atlanta'}) != cache_key('web02', {'site': 'Atlanta'})
+
+
+def test_cached_result_ttl():
+    entry = {'time': 1000, 'result': {'domain_controller': DC, 'domain_controllers': [DC]}}
+    assert cached_result(entry, 3600, now=1000 + 3599) == entry['result']
+    assert cached_result(entry, 3600, now=1000 + 3600) is None
+    assert cached_result(entry, 0, now=1000 + 10 ** 9) == entry['result']
+    assert cached_result(None, 3600) is None
+
+
+def test_cached_result_jsonfile_round_trip(tmp_path):
+    key = cache_key('web01', {'domain_name': 'contoso.com', 'site': 'Atlanta'})
+    cache = cache_loader.get('jsonfile', _uri=str(tmp_path), _timeout=3600, _prefix='zollo_windows_domain_')
+    cache.set(key, {'time': 1000, 'result': {'domain_controller': DC, 'domain_controllers': [DC]}})
+
+    cache = cache_loader.get('jsonfile', _uri=str(tmp_path), _timeout=3600, _prefix='zollo_windows_domain_')
+    assert cached_result(cache.get(key), 3600, now=1200)['domain_controller'] == DC
+
+
+def _run(tmp_path, result, **args):
+    task = Task()
+    task.action = 'zollo.windows.win_domain_info'
+    task.args = dict({'domain_name': 'contoso.com', 'site': 'Atlanta', 'cache': True,
+                      'cache_plugin': 'jsonfile', 'cache_connection': str(tmp_path)}, **args)
+    connection = MagicMock()
+    connection._shell.tmpdir = None
+    action = ActionModule(task, connection, MagicMock(check_mode=False), loader=None, templar=None, shared_loader_obj=None)
+    action._execute_module = MagicMock(return_value=result)
+    return action.run(task_vars={'inventory_hostname': 'web01'}), action._execute_module.called
+
+
+def test_run_miss_then_hit(tmp_path):
+    result, executed = _run(tmp_path, {'changed': False, 'domain_controller': DC, 'domain_controllers': [DC]})
+    assert executed and result['cached'] is False
+
+    result, executed = _run(tmp_path, {})
+    assert not executed
+    assert result['cached'] is True and result['domain_controller'] == DC
+
+
+def test_run_failed_is_not_cached(tmp_path):
+    result, executed = _run(tmp_path, {'failed': True, 'msg': 'no domain controller found'})
+    assert executed and result['failed']
+
+    result, executed = _run(tmp_path, {'changed': False, 'domain_controller': DC, 'domain_controllers': [DC]})
+    assert executed and result['cached'] is False
+
+
+def test_run_force_discover_refreshes(tmp_path):
+    dc02 = dict(DC, name='DC02', hostname='dc02.contoso.com')
+    _run(tmp_path, {'changed': False, 'domain_controller': DC, 'domain_controllers': [DC]})
+
+    result, executed = _run(tmp_path, {'changed': False, 'domain_controller': dc02, 'domain_controllers': [dc02]},
+                            force_discover=True)
+    assert executed and result['cached'] is False
+
+    result, executed = _run(tmp_path, {})
+    assert not executed and result['domain_controller'] == dc02
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import time
+
+import pytest
+
+from ansible.errors import AnsibleFilterError
+from ansible_collections.zollo.windows.plugins.filter.dns_ptr_audit import dns_ptr_audit, reverse_name_to_ip
+
+
+def _record(name, record_type, data, zone=None):
+    record = {'name': name, 'type': record_type, 'data': data, 'ttl': 3600}
+    if zone:
+        record['fqdn'] = '%s.%s' % (name, zone)
+    return record
+
+
+ZONES = [
+    {'name': 'contoso.com', 'type': 'primary', 'dns_records': [
+        _record('@', 'a', '10.0.1.1'),
+        _record('web01', 'a', '10.0.1.10'),
+        _record('www', 'a', '10.0.1.10'),
+        _record('app01', 'a', '10.0.1.20'),
+        _record('db01', 'a', '10.0.2.30'),
+        _record('v6host', 'aaaa', '2001:db8::10'),
+        _record('mail', 'cname', 'web01.contoso.com.'),
+    ]},
+    {'name': '1.0.10.in-addr.arpa', 'type': 'primary', 'reverse_lookup': True, 'dns_records': {
+        'format': 'columnar',
+        'zones': ['1.0.10.in-addr.arpa'],
+        'types': ['ptr', 'soa'],
+        'name': ['@', '1', '10', '20', '99'],
+        'type': [1, 0, 0, 0, 0],
+        'ttl': [3600] * 5,
+        'data': [None, 'contoso.com.', 'WWW.contoso.com.', 'app01-old.contoso.com.', 'old01.contoso.com.'],
+    }},
+    {'name': 'fabrikam.com', 'type': 'forwarder'},
+]
+
+
+def test_dns_ptr_audit():
+    report = dns_ptr_audit(ZONES)
+    assert report['missing_ptr'] == [
+        {'ip': '10.0.2.30', 'names': ['db01.contoso.com'], 'reverse_zone': None},
+        {'ip': '2001:db8::10', 'names': ['v6host.contoso.com'], 'reverse_zone': None},
+    ]
+    assert report['orphan_ptr'] == [{'ip': '10.0.1.99', 'ptr': ['old01.contoso.com']}]
+    assert report['mismatched'] == [{'ip': '10.0.1.20', 'names': ['app01.contoso.com'], 'ptr': ['app01-old.contoso.com']}]
+    assert report['missing_reverse_zones'] == [
+        {'zone': '2.0.10.in-addr.arpa', 'subnet': '10.0.2.0/24', 'addresses': 1},
+        {'zone': '0.0.0.0.0.0.0.0.8.b.d.0.1.0.0.2.ip6.arpa', 'subnet': '2001:db8::/64', 'addresses': 1},
+    ]
+
+
+def test_dns_ptr_audit_records_and_known_reverse_zones():
+    records = [
+        _record('web01', 'a', '10.0.2.10', 'contoso.com'),
+        _record('11', 'ptr', 'gone.contoso.com.', '2.0.10.in-addr.arpa'),
+    ]
+    report = dns_ptr_audit(records, reverse_zones=['0.10.in-addr.arpa.'])
+    assert report['missing_ptr'] == [{'ip': '10.0.2.10', 'names': ['web01.contoso.com'], 'reverse_zone': '0.10.in-addr.arpa'}]
+    assert report['orphan_ptr'] == [{'ip': '10.0.2.11', 'ptr': ['gone.contoso.com']}]
+    assert report['missing_reverse_zones'] == []
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('10.1.0.10.in-addr.arpa.', '10.0.1.10'),
+    ('0/26.1.0.10.in-addr.arpa', None),
+    ('1.0.10.in-addr.arpa', None),
+    ('0.1.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.8.b.d.0.1.0.0.2.ip6.arpa', '2001:db8::10'),
+])
+def test_reverse_name_to_ip(name, expected):
+    address = reverse_name_to_ip(name)
+    assert (str(address) if address else None) == expected
+
+
+def test_dns_ptr_audit_invalid():
+    with pytest.raises(AnsibleFilterError):
+        dns_ptr_audit({'zones': []})
+
+
+def test_dns_ptr_audit_scales_linearly():
+    def elapsed(count):
+        records = []
+        for i in range(count):
+            address = '10.%d.%d.%d' % (i >> 16 & 255, i >> 8 & 255, i & 255)
+            records.append(_record('h%d' % i, 'a', address, 'contoso.com'))
+            records.append(_record('.'.join(reversed(address.split('.'))), 'ptr', 'h%d.contoso.com.' % i, 'in-addr.arpa'))
+        start = time.time()
+        report = dns_ptr_audit(records, reverse_zones=['10.in-addr.arpa'])
+        assert not report['missing_ptr'] and not report['orphan_ptr'] and not report['mismatched']
+        return time.time() - start
+
+    small, large = elapsed(5000), elapsed(50000)
+    assert large < small * 40
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import pytest
+
+from ansible.errors import AnsibleFilterError
+from ansible_collections.zollo.windows.plugins.filter.dns_rows import dns_rows
+
+COLUMNS = {
+    'format': 'columnar',
+    'zones': ['contoso.com', 'fabrikam.com'],
+    'types': ['a', 'mx', 'soa'],
+    'zone': [0, 0, 1],
+    'name': ['web01', '@', '@'],
+    'type': [0, 1, 2],
+    'ttl': [1200, 3600, 3600],
+    'data': ['10.0.1.10', {'mail_exchange': 'mail.contoso.com.', 'priority': 10}, None],
+}
+
+
+def test_dns_rows():
+    rows = dns_rows(COLUMNS)
+    assert len(rows) == 3
+    assert list(rows) == [
+        {'name': 'web01', 'fqdn': 'web01.contoso.com', 'type': 'a', 'ttl': 1200, 'data': '10.0.1.10'},
+        {'name': '@', 'fqdn': '@.contoso.com', 'type': 'mx', 'ttl': 3600,
+         'data': {'mail_exchange': 'mail.contoso.com.', 'priority': 10}},
+        {'name': '@', 'fqdn': '@.fabrikam.com', 'type': 'soa', 'ttl': 3600},
+    ]
+    assert rows[-1]['fqdn'] == '@.fabrikam.com'
+    assert [r['name'] for r in rows[1:]] == ['@', '@']
+
+
+def test_dns_rows_single_zone():
+    columns = dict((k, v) for k, v in COLUMNS.items() if k != 'zone')
+    assert [r['fqdn'] for r in dns_rows(columns)] == ['web01.contoso.com', '@.contoso.com', '@.contoso.com']
+
+
+def test_dns_rows_passthrough():
+    records = [{'name': 'web01'}]
+    assert dns_rows(records) is records
+    assert dns_rows(None) == []
+
+
+@pytest.mark.parametrize('columns, error', [
+    (dict(COLUMNS, ttl=[1]), 'different lengths'),
+    (dict((k, v) for k, v in COLUMNS.items() if k != 'types'), 'types column is missing'),
+])
+def test_dns_rows_invalid(columns, error):
+    with pytest.raises(AnsibleFilterError, match=error):
+        dns_rows(columns)
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import pytest
+
+from ansible.errors import AnsibleFilterError
+from ansible_collections.zollo.windows.plugins.filter.dns_zone_file import dns_zone_file
+
+
+def test_dns_zone_file():
+    content = u'$TTL 300\r\nmail MX ( 10\r\n  mx01 )\r\n'
+    assert dns_zone_file(content, 'contoso.com') == [{
+        'name': 'mail',
+        'fqdn': 'mail.contoso.com',
+        'type': 'mx',
+        'ttl': 300,
+        'data': {'mail_exchange': 'mx01.contoso.com.', 'priority': 10},
+    }]
+
+
+def test_dns_zone_file_invalid():
+    with pytest.raises(AnsibleFilterError, match='line 1'):
+        dns_zone_file(u'mail MX 10 mx01\n', 'contoso.com')
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import uuid
+
+import pytest
+
+from ansible.inventory.data import InventoryData
+from ansible_collections.zollo.windows.plugins.inventory.ad_computers import InventoryModule, ou_path
+
+ldap3 = pytest.importorskip('ldap3')
+
+BASE = 'DC=contoso,DC=com'
+BIND_DN = 'CN=svc-ansible,CN=Users,' + BASE
+
+
+class MockDirectory(object):
+    ''' An in-process LDAP server holding the computers of a domain '''
+
+    def __init__(self):
+        self.server = ldap3.Server('dc01.contoso.com', get_info=ldap3.OFFLINE_AD_2012_R2)
+        self.server.info.other['dsServiceName'] = ['CN=NTDS Settings,CN=DC01,CN=Servers,CN=Atlanta,CN=Sites,CN=Configuration,' + BASE]
+        self.server.info.other['defaultNamingContext'] = [BASE]
+        self.usn = 100
+        self.filters = []
+        self.controls = []
+        self.connection = ldap3.Connection(self.server, user=BIND_DN, password='secret', client_strategy=ldap3.MOCK_SYNC)
+        self.connection.strategy.add_entry(BIND_DN, {'userPassword': 'secret', 'objectClass': ['user']})
+        self.connection.bind()
+
+    def connect(self):
+        connection = ldap3.Connection(self.server, user=BIND_DN, password='secret', client_strategy=ldap3.MOCK_SYNC)
+        connection.bind()
+        self.server.info.other['highestCommittedUSN'] = [str(self.usn)]
+        return connection
+
+    def add(self, index, ou, os='Windows Server 2019 Standard', **attributes):
+        self.usn += 1
+        dn = 'CN=PC%02d,%s%s' % (index, ''.join('OU=%s,' % o for o in reversed(ou)), BASE)
+        values = {
+            'objectClass': ['top', 'computer'],
+            'objectGUID': uuid.UUID(int=index).bytes_le,
+            'name': 'PC%02d' % index,
+            'dNSHostName': 'pc%02d.contoso.com' % index,
+            'operatingSystem': os,
+            'userAccountControl': 4096,
+            'uSNChanged': self.usn,
+        }
+        values.update(attributes)
+        self.connection.strategy.add_entry(dn, values)
+        return dn
+
+    def move(self, dn, container):
+        rdn = dn.split(',')[0]
+        self.usn += 1
+        self.connection.modify_dn(dn, rdn, new_superior=container)
+        self.connection.modify('%s,%s' % (rdn, container), {'uSNChanged': [(ldap3.MODIFY_REPLACE, [self.usn])]})
+
+    def delete(self, dn, index):
+        ''' Replaces a computer with its tombstone '''
+        self.usn += 1
+        self.connection.delete(dn)
+        tombstone = 'CN=PC%02d\\0ADEL:%s,CN=Deleted Objects,%s' % (index, uuid.UUID(int=index), BASE)
+        self.connection.strategy.add_entry(tombstone, {
+            'objectClass': ['top', 'computer'],
+            'objectGUID': uuid.UUID(int=index).bytes_le,
+            'isDeleted': 'TRUE',
+            'uSNChanged': self.usn,
+        })
+
+
+@pytest.fixture
+def directory():
+    directory = MockDirectory()
+    for i in range(1, 5):
+        directory.add(i, ['Atlanta', 'Servers'], location='Atlanta')
+    directory.add(5, ['Workstations'], os='Windows 10 Enterprise', userAccountControl=4098, dNSHostName=[])
+    return directory
+
+
+def run_parse(directory, cache, use_cache=True, **options):
+    settings = {
+        'plugin': 'zollo.windows.ad_computers',
+        'domain_server': 'dc01.contoso.com',
+        'domain_username': BIND_DN,
+        'domain_password': 'secret',
+        'search_base': None,
+        'ldap_filter': None,
+        'page_size': 2,
+        'hostnames': ['dNSHostName', 'name'],
+        'attributes': [],
+        'site_attribute': 'location',
+        'group_prefix': 'ad_',
+        'full_refresh_interval': 86400,
+        'cache': True,
+        'strict': False,
+        'compose': {},
+        'groups': {},
+        'keyed_groups': [],
+    }
+    settings.update(options)
+    plugin = InventoryModule()
+    plugin._cache = cache
+    plugin._read_config_data = lambda path: None
+    plugin.get_option = settings.get
+    plugin._connect = directory.connect
+    search = plugin._search
+
+    def recording_search(connection, base, ldap_filter, attributes, controls=None):
+        directory.filters.append(ldap_filter)
+        # the mock returns tombstones without the show deleted control, and cannot decode a control without a value
+        directory.controls.extend(str(c['controlType']) for c in controls or [])
+        for entry in search(connection, base, ldap_filter, attributes):
+            directory.filters.append(entry['dn'])
+            yield entry
+
+    plugin._search = recording_search
+    plugin.parse(InventoryData(), None, 'test.ad_computers.yml', cache=use_cache)
+    return plugin.inventory
+
+
+def test_ou_path():
+    assert ou_path('CN=PC01,OU=Web,OU=Atlanta,DC=contoso,DC=com') == ['Atlanta', 'Web']
+    assert ou_path('CN=PC01,OU=Smith\\, John,DC=contoso,DC=com') == ['Smith\\, John']
+    assert ou_path('CN=PC01,CN=Computers,DC=contoso,DC=com') == []
+
+
+def test_full_load_groups_and_vars(directory):
+    inventory = run_parse(directory, {})
+    assert sorted(inventory.hosts) == ['PC05', 'pc01.contoso.com', 'pc02.contoso.com', 'pc03.contoso.com', 'pc04.contoso.com']
+
+    host = inventory.get_host('pc01.contoso.com').get_vars()
+    assert host['ad_guid'] == str(uuid.UUID(int=1))
+    assert host['ad_ou_path'] == ['Atlanta', 'Servers']
+    assert host['ad_enabled'] is True
+    assert host['ad_site'] == 'Atlanta'
+    assert inventory.get_host('PC05').get_vars()['ad_enabled'] is False
+
+    groups = inventory.groups
+    assert [g.name for g in groups['ad_ou_atlanta'].child_groups] == ['ad_ou_atlanta_servers']
+    assert len(groups['ad_ou_atlanta_servers'].hosts) == 4
+    assert [h.name for h in groups['ad_ou_workstations'].hosts] == ['PC05']
+    assert len(groups['ad_os_windows_server_2019_standard'].hosts) == 4
+    assert len(groups['ad_site_atlanta'].hosts) == 4
+
+
+def test_incremental_refresh(directory):
+    cache = {}
+    run_parse(directory, cache)
+    state = cache[next(iter(cache))]
+    assert state['usn'] == 105
+
+    directory.add(6, ['Atlanta', 'Servers'])
+    directory.delete('CN=PC02,OU=Servers,OU=Atlanta,' + BASE, 2)
+    directory.filters = []
+
+    inventory = run_parse(directory, cache)
+    assert directory.filters[0] == '(&(&(objectClass=computer)(!(isDeleted=TRUE)))(uSNChanged>=106))'
+    # only the changed computers are read
+    assert sorted(f for f in directory.filters if not f.startswith('(')) == [
+        'CN=PC02\\0ADEL:%s,CN=Deleted Objects,%s' % (uuid.UUID(int=2), BASE),
+        'CN=PC06,OU=Servers,OU=Atlanta,' + BASE,
+        'CN=PC06,OU=Servers,OU=Atlanta,' + BASE,
+    ]
+    assert sorted(inventory.hosts) == ['PC05', 'pc01.contoso.com', 'pc03.contoso.com', 'pc04.contoso.com', 'pc06.contoso.com']
+    assert cache[next(iter(cache))]['usn'] == 107
+    assert directory.controls == ['1.2.840.113556.1.4.417']
+
+
+def test_incremental_refresh_removes_moved_computers(directory):
+    cache = {}
+    run_parse(directory, cache, search_base='OU=Atlanta,' + BASE)
+    directory.move('CN=PC03,OU=Servers,OU=Atlanta,' + BASE, 'CN=Computers,' + BASE)
+    directory.move('CN=PC05,OU=Workstations,' + BASE, 'OU=Servers,OU=Atlanta,' + BASE)
+
+    inventory = run_parse(directory, cache, search_base='OU=Atlanta,' + BASE)
+    assert sorted(inventory.hosts) == ['PC05', 'pc01.contoso.com', 'pc02.contoso.com', 'pc04.contoso.com']
+    assert inventory.get_host('PC05').get_vars()['ad_ou_path'] == ['Atlanta', 'Servers']
+
+
+@pytest.mark.parametrize('change', ['server', 'interval', 'flush'])
+def test_full_reload(directory, change):
+    cache = {}
+    run_parse(directory, cache)
+    options = {}
+    use_cache = True
+    if change == 'server':
+        directory.server.info.other['dsServiceName'] = ['CN=NTDS Settings,CN=DC02']
+    elif change == 'interval':
+        options['full_refresh_interval'] = 0
+    else:
+        use_cache = False
+    directory.filters = []
+    run_parse(directory, cache, use_cache, **options)
+    assert directory.filters[0] == '(&(objectClass=computer)(!(isDeleted=TRUE)))'
+
+
+def test_connection_error(directory):
+    def fail():
+        raise ldap3.core.exceptions.LDAPSocketOpenError('unable to open socket')
+    directory.connect = fail
+    with pytest.raises(Exception, match='Unable to connect to dc01.contoso.com: unable to open socket'):
+        run_parse(directory, {})
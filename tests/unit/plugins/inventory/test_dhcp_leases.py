@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import io
+import json
+
+import pytest
+
+from ansible.inventory.data import InventoryData
+from ansible_collections.zollo.windows.plugins.inventory.dhcp_leases import InventoryModule, iter_leases
+
+LEASES = [
+    {'client_id': '00-0a-1b-2c-3d-4f', 'address_state': 'ActiveReservation', 'ip_address': '10.0.1.10',
+     'scope_id': '10.0.1.0', 'name': 'web01.contoso.com', 'description': 'Web Server'},
+    {'client_id': '00-0a-1b-2c-3d-50', 'address_state': 'Active', 'ip_address': '10.0.1.150',
+     'scope_id': '10.0.1.0', 'name': None, 'description': None},
+    {'client_id': '00-0a-1b-2c-3d-51', 'address_state': 'Active', 'ip_address': '10.0.2.100',
+     'scope_id': '10.0.2.0', 'name': 'laptop42.contoso.com', 'description': None},
+]
+
+
+@pytest.fixture
+def inventory(tmp_path):
+    plugin = InventoryModule()
+    plugin._cache = {}
+    export = tmp_path / 'export.json'
+    export.write_text(json.dumps({'changed': False, 'scope_count': 2, 'leases': LEASES}))
+    config = tmp_path / 'test.dhcp_leases.yml'
+    config.write_text('plugin: zollo.windows.dhcp_leases\npath: export.json\n')
+    return plugin, config, export
+
+
+def run_parse(plugin, config, use_cache=True, **options):
+    settings = {
+        'plugin': 'zollo.windows.dhcp_leases',
+        'path': 'export.json',
+        'hostnames': ['name', 'ip_address'],
+        'group_prefix': 'dhcp_',
+        'set_ansible_host': True,
+        'cache': False,
+        'strict': False,
+        'compose': {},
+        'groups': {},
+        'keyed_groups': [],
+    }
+    settings.update(options)
+    plugin._read_config_data = lambda path: None
+    plugin.get_option = settings.get
+    plugin.parse(InventoryData(), None, str(config), cache=use_cache)
+    return plugin.inventory
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 65536])
+def test_iter_leases_streams_items(chunk_size):
+    document = json.dumps({'scopes': [{'scope_id': '10.0.1.0', 'nested': {'a': [1, 2]}}], 'leases': LEASES,
+                           'lease_count': 3})
+    stream = io.StringIO(document)
+    reader = iter_leases(stream)
+    # the reader is lazy and only needs part of the document for the first lease
+    first = next(reader)
+    assert first['ip_address'] == '10.0.1.10'
+    assert [lease['ip_address'] for lease in reader] == ['10.0.1.150', '10.0.2.100']
+
+
+def test_iter_leases_bare_list():
+    assert len(list(iter_leases(io.StringIO(json.dumps(LEASES))))) == 3
+
+
+def test_iter_leases_no_leases():
+    assert list(iter_leases(io.StringIO('{"scopes": [], "changed": false}'))) == []
+    assert list(iter_leases(io.StringIO('{}'))) == []
+
+
+def test_iter_leases_invalid_document():
+    with pytest.raises(ValueError):
+        list(iter_leases(io.StringIO('{"leases": [{"ip_address": "10.0.1.1"')))
+
+
+def test_verify_file(tmp_path):
+    plugin = InventoryModule()
+    config = tmp_path / 'prod.dhcp_leases.yml'
+    config.write_text('')
+    assert plugin.verify_file(str(config))
+    other = tmp_path / 'hosts.yml'
+    other.write_text('')
+    assert not plugin.verify_file(str(other))
+
+
+def test_populate_hosts_and_groups(inventory):
+    plugin, config, export = inventory
+    inv = run_parse(plugin, config)
+
+    assert sorted(inv.hosts) == ['10.0.1.150', 'laptop42.contoso.com', 'web01.contoso.com']
+    web = inv.get_host('web01.contoso.com')
+    assert web.vars['ansible_host'] == '10.0.1.10'
+    assert web.vars['dhcp_mac'] == '00-0a-1b-2c-3d-4f'
+    assert web.vars['dhcp_description'] == 'Web Server'
+
+    assert sorted(h.name for h in inv.groups['dhcp_scope_10_0_1_0'].get_hosts()) == ['10.0.1.150', 'web01.contoso.com']
+    assert [h.name for h in inv.groups['dhcp_reservations'].get_hosts()] == ['web01.contoso.com']
+    assert len(inv.groups['dhcp_leases'].get_hosts()) == 2
+    assert len(inv.groups['dhcp_state_active'].get_hosts()) == 2
+
+
+def test_cache_hit_skips_export(inventory):
+    plugin, config, export = inventory
+    run_parse(plugin, config, use_cache=False, cache=True)
+    assert len(plugin._cache) == 1
+
+    plugin._load_export = lambda path: pytest.fail('export should not be read on a cache hit')
+    inv = run_parse(plugin, config, use_cache=True, cache=True)
+    assert 'web01.contoso.com' in inv.hosts
+
+
+def test_cache_invalidated_by_newer_export(inventory):
+    plugin, config, export = inventory
+    run_parse(plugin, config, use_cache=False, cache=True)
+
+    export.write_text(json.dumps({'leases': LEASES[:1]}))
+    key = list(plugin._cache)[0]
+    plugin._cache[key]['mtime'] -= 10
+    inv = run_parse(plugin, config, use_cache=True, cache=True)
+    assert list(inv.hosts) == ['web01.contoso.com']
+
+
+def test_export_streamed_without_cache(inventory):
+    plugin, config, export = inventory
+    populated = []
+    plugin._populate = lambda leases: populated.append(leases)
+    run_parse(plugin, config)
+    assert not isinstance(populated[0], list)
+    assert len(list(populated[0])) == 3
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import io
+import tracemalloc
+
+import pytest
+
+from ansible.errors import AnsibleLookupError
+from ansible.parsing.dataloader import DataLoader
+from ansible_collections.zollo.windows.plugins.lookup.dhcp_export import LookupModule, iter_export
+
+EXPORT = b'''<?xml version="1.0" encoding="utf-8"?>
+<DHCPServer>
+  <MajorVersion>6</MajorVersion>
+  <MinorVersion>3</MinorVersion>
+  <IPv4>
+    <ConflictDetectionAttempts>0</ConflictDetectionAttempts>
+    <Scopes>
+      <Scope>
+        <ScopeId>10.0.1.0</ScopeId>
+        <Name>vlan1</Name>
+        <SubnetMask>255.255.255.0</SubnetMask>
+        <StartRange>10.0.1.100</StartRange>
+        <EndRange>10.0.1.199</EndRange>
+        <LeaseDuration>2.06:00:00</LeaseDuration>
+        <State>Active</State>
+        <OptionValues>
+          <OptionValue><OptionId>3</OptionId><Value>10.0.1.1</Value></OptionValue>
+        </OptionValues>
+        <Reservations>
+          <Reservation>
+            <Name>web01</Name>
+            <IPAddress>10.0.1.110</IPAddress>
+            <ClientId>00-0a-1b-2c-3d-4f</ClientId>
+            <Type>Both</Type>
+            <Description>Web Server</Description>
+          </Reservation>
+          <Reservation>
+            <Name>printer</Name>
+            <IPAddress>10.0.1.111</IPAddress>
+            <ClientId>00-0a-1b-2c-3d-50</ClientId>
+            <Type>Both</Type>
+          </Reservation>
+        </Reservations>
+        <Leases>
+          <Lease>
+            <IPAddress>10.0.1.110</IPAddress>
+            <ScopeId>10.0.1.0</ScopeId>
+            <ClientId>00-0a-1b-2c-3d-4f</ClientId>
+            <HostName>web01.contoso.com</HostName>
+            <AddressState>Active</AddressState>
+          </Lease>
+          <Lease>
+            <IPAddress>10.0.1.150</IPAddress>
+            <ScopeId>10.0.1.0</ScopeId>
+            <ClientId>00-0a-1b-2c-3d-51</ClientId>
+            <HostName>laptop42.contoso.com</HostName>
+            <AddressState>Active</AddressState>
+          </Lease>
+        </Leases>
+      </Scope>
+      <Scope>
+        <ScopeId>10.0.2.0</ScopeId>
+        <Name>vlan2</Name>
+        <SubnetMask>255.255.255.0</SubnetMask>
+        <StartRange>10.0.2.10</StartRange>
+        <EndRange>10.0.2.250</EndRange>
+        <LeaseDuration>08:00:00</LeaseDuration>
+        <State>InActive</State>
+        <Leases>
+          <Lease>
+            <IPAddress>10.0.2.20</IPAddress>
+            <ScopeId>10.0.2.0</ScopeId>
+            <ClientId>00-0a-1b-2c-3d-52</ClientId>
+            <AddressState>Declined</AddressState>
+          </Lease>
+        </Leases>
+      </Scope>
+    </Scopes>
+  </IPv4>
+  <IPv6>
+    <Scopes>
+      <Scope>
+        <Prefix>2001:db8::</Prefix>
+        <Name>v6</Name>
+      </Scope>
+    </Scopes>
+  </IPv6>
+</DHCPServer>
+'''
+
+
+@pytest.fixture
+def export(tmp_path):
+    path = tmp_path / 'dhcp.xml'
+    path.write_bytes(EXPORT)
+    return str(path)
+
+
+def _lookup(path, **kwargs):
+    options = {'type': 'lease', 'scope_id': None, 'address_state': None, 'ip': None, 'mac': None}
+    options.update(kwargs)
+    lookup = LookupModule(loader=DataLoader())
+    lookup.set_options = lambda *args, **kw: None
+    lookup.get_option = options.get
+    return lookup.run([path], variables={}, **kwargs)
+
+
+def test_iter_export():
+    items = list(iter_export(io.BytesIO(EXPORT)))
+    scopes = [i for k, i in items if k == 'scope']
+    leases = [i for k, i in items if k == 'lease']
+
+    assert scopes == [
+        {'name': 'vlan1', 'scope_id': '10.0.1.0', 'subnet_mask': '255.255.255.0', 'address_state': 'Active',
+         'start_range': '10.0.1.100', 'end_range': '10.0.1.199', 'lease_duration': {'days': 2, 'hours': 6}},
+        {'name': 'vlan2', 'scope_id': '10.0.2.0', 'subnet_mask': '255.255.255.0', 'address_state': 'InActive',
+         'start_range': '10.0.2.10', 'end_range': '10.0.2.250', 'lease_duration': {'days': 0, 'hours': 8}},
+    ]
+    assert [(i['ip_address'], i['address_state'], i['name']) for i in leases] == [
+        ('10.0.1.110', 'ActiveReservation', 'web01'),
+        ('10.0.1.150', 'Active', 'laptop42.contoso.com'),
+        ('10.0.1.111', 'InactiveReservation', 'printer'),
+        ('10.0.2.20', 'Declined', None),
+    ]
+    assert leases[0] == {'client_id': '00-0a-1b-2c-3d-4f', 'address_state': 'ActiveReservation',
+                         'ip_address': '10.0.1.110', 'scope_id': '10.0.1.0', 'name': 'web01',
+                         'description': 'Web Server'}
+    assert leases[2]['scope_id'] == '10.0.1.0'
+
+
+@pytest.mark.parametrize('kwargs, expected', [
+    ({}, ['10.0.1.110', '10.0.1.150', '10.0.1.111', '10.0.2.20']),
+    ({'type': 'reservation'}, ['10.0.1.110', '10.0.1.111']),
+    ({'scope_id': '10.0.2.0'}, ['10.0.2.20']),
+    ({'address_state': ['active']}, ['10.0.1.150']),
+    ({'ip': '10.0.1.150'}, ['10.0.1.150']),
+    ({'mac': '00:0A:1B:2C:3D:50'}, ['10.0.1.111']),
+])
+def test_lookup_leases(export, kwargs, expected):
+    assert [i['ip_address'] for i in _lookup(export, **kwargs)] == expected
+
+
+def test_lookup_scopes(export):
+    assert [i['name'] for i in _lookup(export, type='scope')] == ['vlan1', 'vlan2']
+    assert [i['name'] for i in _lookup(export, type='scope', scope_id='10.0.2.0')] == ['vlan2']
+
+
+def test_lookup_missing_file(tmp_path):
+    with pytest.raises(AnsibleLookupError, match='Unable to find'):
+        _lookup(str(tmp_path / 'missing.xml'))
+
+
+def test_lookup_invalid_file(tmp_path):
+    path = tmp_path / 'dhcp.xml'
+    path.write_bytes(b'<DHCPServer><IPv4>')
+    with pytest.raises(AnsibleLookupError, match='Unable to read'):
+        _lookup(str(path))
+
+
+def _large_export(count):
+    yield b'<DHCPServer><IPv4><Scopes><Scope><ScopeId>10.0.0.0</ScopeId><Name>big</Name><Leases>'
+    for i in range(count):
+        yield (b'<Lease><IPAddress>10.0.%d.%d</IPAddress><ClientId>00-00-00-00-%02x-%02x</ClientId>'
+               b'<AddressState>Active</AddressState></Lease>' % (i // 256, i % 256, i // 256 % 256, i % 256))
+    yield b'</Leases></Scope></Scopes></IPv4></DHCPServer>'
+
+
+class _Stream(object):
+    ''' File-like object producing the export on demand '''
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def read(self, size=-1):
+        return next(self.chunks, b'')
+
+
+def test_iter_export_constant_memory():
+    def peak(count):
+        tracemalloc.start()
+        total = sum(1 for kind, item in iter_export(_Stream(_large_export(count))) if kind == 'lease')
+        size = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        assert total == count
+        return size
+
+    # ten times the leases must not need ten times the memory
+    assert peak(50000) < peak(5000) * 2
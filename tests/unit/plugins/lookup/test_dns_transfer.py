@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import pytest
+
+from ansible.errors import AnsibleLookupError
+from ansible.parsing.dataloader import DataLoader
+from ansible_collections.zollo.windows.plugins.lookup.dns_transfer import LookupModule
+from ansible_collections.zollo.windows.plugins.module_utils.dns_transfer import TYPE_AXFR, TYPE_IXFR
+from ansible_collections.zollo.windows.tests.unit.mock.dns_server import DnsServer, rr, soa
+
+ZONE = 'contoso.com.'
+
+
+def _lookup(terms, **kwargs):
+    options = {'port': 53, 'timeout': 5, 'state_dir': None}
+    options.update(kwargs)
+    lookup = LookupModule(loader=DataLoader())
+    lookup.set_options = lambda *args, **kw: None
+    lookup.get_option = options.get
+    return lookup.run(terms, variables={}, **kwargs)
+
+
+def _respond(zone, qtype, serial):
+    if qtype == TYPE_IXFR and serial == 7:
+        return [[soa(ZONE, 7)]]
+    return [[soa(ZONE, 7), rr('web01.contoso.com', 'a', '10.0.1.10'), soa(ZONE, 7)]]
+
+
+def test_lookup_state_dir(tmp_path):
+    with DnsServer(_respond) as server:
+        first = _lookup(['contoso.com'], server='127.0.0.1', port=server.port, state_dir=str(tmp_path))
+        second = _lookup(['contoso.com'], server='127.0.0.1', port=server.port, state_dir=str(tmp_path))
+    assert [q[1:] for q in server.queries] == [(TYPE_AXFR, None), (TYPE_IXFR, 7)]
+    assert first == second
+    assert [r['fqdn'] for r in first] == ['@.contoso.com', 'web01.contoso.com']
+    assert (tmp_path / '127.0.0.1_contoso.com.json').exists()
+
+
+def test_lookup_refused():
+    with DnsServer(lambda zone, qtype, serial: 5) as server:
+        with pytest.raises(AnsibleLookupError, match='Unable to transfer the zone contoso.com from 127.0.0.1: the server answered REFUSED'):
+            _lookup(['contoso.com'], server='127.0.0.1', port=server.port)
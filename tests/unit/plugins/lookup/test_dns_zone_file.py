@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import pytest
+
+from ansible.errors import AnsibleLookupError
+from ansible.parsing.dataloader import DataLoader
+from ansible_collections.zollo.windows.plugins.lookup.dns_zone_file import LookupModule
+
+ZONE = b'''$TTL 3600
+@       NS     dns01.contoso.com.
+web01   1200   A      10.0.1.10
+www            CNAME  web01
+'''
+
+
+def _lookup(path, **kwargs):
+    options = {'zone': None, 'record_types': None}
+    options.update(kwargs)
+    lookup = LookupModule(loader=DataLoader())
+    lookup.set_options = lambda *args, **kw: None
+    lookup.get_option = options.get
+    return lookup.run([path], variables={}, **kwargs)
+
+
+def test_lookup_zone_from_file_name(tmp_path):
+    path = tmp_path / 'legacy.contoso.com.dns'
+    path.write_bytes(ZONE)
+    records = _lookup(str(path))
+    assert [r['fqdn'] for r in records] == ['@.legacy.contoso.com', 'web01.legacy.contoso.com', 'www.legacy.contoso.com']
+    assert records[2]['data'] == 'web01.legacy.contoso.com.'
+
+
+def test_lookup_zone_and_types(tmp_path):
+    path = tmp_path / 'zone.txt'
+    path.write_bytes(ZONE)
+    records = _lookup(str(path), zone='contoso.com', record_types=['A'])
+    assert records == [{'name': 'web01', 'fqdn': 'web01.contoso.com', 'type': 'a', 'ttl': 1200, 'data': '10.0.1.10'}]
+
+
+def test_lookup_missing_file(tmp_path):
+    with pytest.raises(AnsibleLookupError, match='Unable to find'):
+        _lookup(str(tmp_path / 'missing.dns'))
+
+
+def test_lookup_invalid_file(tmp_path):
+    path = tmp_path / 'broken.dns'
+    path.write_bytes(b'web01 A 10.0.1.10\n')
+    with pytest.raises(AnsibleLookupError, match='line 1: the record has no TTL'):
+        _lookup(str(path))
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.zollo.windows.plugins.module_utils.dns_transfer import (
+    TYPE_AXFR, TYPE_IXFR, ZoneTransferError, load_state, save_state, state_file, transfer_zone)
+from ansible_collections.zollo.windows.tests.unit.mock.dns_server import DnsServer, rr, soa
+
+ZONE = 'contoso.com.'
+RECORDS = [
+    rr('contoso.com', 'ns', 'dns01.contoso.com.'),
+    rr('contoso.com', 'mx', {'mail_exchange': 'mail.contoso.com.', 'priority': 10}),
+    rr('web01.contoso.com', 'a', '10.0.1.10', ttl=1200),
+    rr('web01.contoso.com', 'aaaa', '2001:db8::10'),
+    rr('www.contoso.com', 'cname', 'web01.contoso.com.'),
+    rr('_ldap._tcp.contoso.com', 'srv', {'domain_name': 'dc01.contoso.com.', 'port': 389, 'priority': 0, 'weight': 100}),
+    rr('spf.contoso.com', 'txt', 'v=spf1 -all'),
+]
+
+
+def _axfr(zone, qtype, serial):
+    # split over two messages like a large zone
+    return [[soa(ZONE, 7)] + RECORDS[:3], RECORDS[3:] + [soa(ZONE, 7)]]
+
+
+def test_axfr():
+    with DnsServer(_axfr, compress=True) as server:
+        result = transfer_zone('127.0.0.1', 'Contoso.com', port=server.port, timeout=5)
+    assert server.queries == [('contoso.com', TYPE_AXFR, None)]
+    assert result['serial'] == 7
+    assert result['mode'] == 'axfr'
+    assert result['records'] == [
+        {'name': '@', 'fqdn': '@.contoso.com', 'type': 'soa', 'ttl': 3600},
+        {'name': '@', 'fqdn': '@.contoso.com', 'type': 'ns', 'ttl': 3600, 'data': 'dns01.contoso.com.'},
+        {'name': '@', 'fqdn': '@.contoso.com', 'type': 'mx', 'ttl': 3600,
+         'data': {'mail_exchange': 'mail.contoso.com.', 'priority': 10}},
+        {'name': 'web01', 'fqdn': 'web01.contoso.com', 'type': 'a', 'ttl': 1200, 'data': '10.0.1.10'},
+        {'name': 'web01', 'fqdn': 'web01.contoso.com', 'type': 'aaaa', 'ttl': 3600, 'data': '2001:db8::10'},
+        {'name': 'www', 'fqdn': 'www.contoso.com', 'type': 'cname', 'ttl': 3600, 'data': 'web01.contoso.com.'},
+        {'name': '_ldap._tcp', 'fqdn': '_ldap._tcp.contoso.com', 'type': 'srv', 'ttl': 3600,
+         'data': {'domain_name': 'dc01.contoso.com.', 'port': 389, 'priority': 0, 'weight': 100}},
+        {'name': 'spf', 'fqdn': 'spf.contoso.com', 'type': 'txt', 'ttl': 3600, 'data': 'v=spf1 -all'},
+    ]
+
+
+def test_ixfr(tmp_path):
+    def respond(zone, qtype, serial):
+        if qtype == TYPE_AXFR:
+            return _axfr(zone, qtype, serial)
+        assert serial == 7
+        # 7 -> 8 moves web01, 8 -> 9 adds web02
+        return [[
+            soa(ZONE, 9),
+            soa(ZONE, 7), rr('web01.contoso.com', 'a', '10.0.1.10', ttl=1200),
+            soa(ZONE, 8), rr('web01.contoso.com', 'a', '10.0.1.11'),
+            soa(ZONE, 8),
+            soa(ZONE, 9), rr('web02.contoso.com', 'a', '10.0.1.12'),
+            soa(ZONE, 9),
+        ]]
+
+    path = str(tmp_path / 'state' / 'contoso.com.json')
+    with DnsServer(respond) as server:
+        save_state(path, transfer_zone('127.0.0.1', ZONE, port=server.port, timeout=5))
+        result = transfer_zone('127.0.0.1', ZONE, load_state(path), port=server.port, timeout=5)
+    assert server.queries[1] == ('contoso.com', TYPE_IXFR, 7)
+    assert result['mode'] == 'ixfr'
+    assert result['serial'] == 9
+    addresses = [(r['name'], r['data']) for r in result['records'] if r['type'] == 'a']
+    assert addresses == [('web01', '10.0.1.11'), ('web02', '10.0.1.12')]
+    assert len([r for r in result['records'] if r['type'] == 'soa']) == 1
+
+
+def test_ixfr_unchanged():
+    state = {'serial': 7, 'records': [{'name': '@', 'fqdn': '@.contoso.com', 'type': 'soa', 'ttl': 3600}]}
+    with DnsServer(lambda zone, qtype, serial: [[soa(ZONE, 7)]]) as server:
+        result = transfer_zone('127.0.0.1', ZONE, state, port=server.port, timeout=5)
+    assert result == dict(state, mode='unchanged')
+
+
+def test_ixfr_falls_back_to_axfr():
+    state = {'serial': 3, 'records': []}
+    with DnsServer(_axfr) as server:
+        result = transfer_zone('127.0.0.1', ZONE, state, port=server.port, timeout=5)
+    assert result['mode'] == 'axfr'
+    assert len(result['records']) == 8
+
+
+@pytest.mark.parametrize('respond, error', [
+    (lambda zone, qtype, serial: 5, 'the server answered REFUSED'),
+    (lambda zone, qtype, serial: [[RECORDS[0]]], 'does not start with a SOA record'),
+    (lambda zone, qtype, serial: [[soa(ZONE, 7)] + RECORDS], 'the server closed the connection|timed out'),
+])
+def test_transfer_errors(respond, error):
+    with DnsServer(respond) as server:
+        with pytest.raises((ZoneTransferError, OSError), match=error):
+            transfer_zone('127.0.0.1', ZONE, port=server.port, timeout=1)
+
+
+def test_state_file_escapes_names(tmp_path):
+    path = state_file(str(tmp_path), '2001:db8::53', '0/26.2.0.192.in-addr.arpa.')
+    assert path == str(tmp_path / '2001%3Adb8%3A%3A53_0%2F26.2.0.192.in-addr.arpa.json')
+    save_state(path, {'serial': 3, 'records': []})
+    assert load_state(path) == {'serial': 3, 'records': []}
+    assert state_file('', 'dns_01', 'contoso.com') != state_file('', 'dns', '01_contoso.com')
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import io
+
+import pytest
+
+from ansible_collections.zollo.windows.plugins.module_utils.dns_zone_file import iter_zone_file, parse_ttl
+
+ZONE = b''';
+;  Database file legacy.contoso.com.dns for legacy.contoso.com zone.
+;      Zone version:  27
+;
+
+@                       IN  SOA dns01.contoso.com.  hostmaster.contoso.com. (
+                                27           ; serial number
+                                900          ; refresh
+                                600          ; retry
+                                86400        ; expire
+                                3600       ) ; default TTL
+
+;
+;  Zone NS records
+;
+
+@                       NS  dns01.contoso.com.
+
+;
+;  Zone records
+;
+
+@                       MX  10  mail
+WEB01                   [AGE:3711234] 1200  A  10.0.1.10
+                        AAAA  2001:0db8:0000:0000:0000:0000:0000:0010
+www                     CNAME  web01.legacy.contoso.com.
+_ldap._tcp              600 SRV  0 100 389 dc01
+txt                     TXT  ( "v=spf1 include:contoso.com"
+                               " -all" )
+quoted                  TXT  "semi;colon \\"quoted\\" \\065"
+$ORIGIN 1.0.10.in-addr.arpa.
+10                      PTR  web01.legacy.contoso.com.
+$TTL 1h
+$ORIGIN sub.legacy.contoso.com.
+host                    A  10.0.2.20
+'''
+
+
+def test_iter_zone_file():
+    records = list(iter_zone_file(io.BytesIO(ZONE), 'legacy.contoso.com'))
+    assert [(r['name'], r['type'], r['ttl']) for r in records] == [
+        ('@', 'soa', 3600),
+        ('@', 'ns', 3600),
+        ('@', 'mx', 3600),
+        ('web01', 'a', 1200),
+        ('web01', 'aaaa', 3600),
+        ('www', 'cname', 3600),
+        ('_ldap._tcp', 'srv', 600),
+        ('txt', 'txt', 3600),
+        ('quoted', 'txt', 3600),
+        ('10.1.0.10.in-addr.arpa', 'ptr', 3600),
+        ('host.sub', 'a', 3600),
+    ]
+    by_name = dict(((r['name'], r['type']), r) for r in records)
+    assert 'data' not in by_name[('@', 'soa')]
+    assert by_name[('@', 'ns')]['data'] == 'dns01.contoso.com.'
+    assert by_name[('@', 'mx')]['data'] == {'mail_exchange': 'mail.legacy.contoso.com.', 'priority': 10}
+    assert by_name[('web01', 'a')] == {'name': 'web01', 'fqdn': 'web01.legacy.contoso.com', 'type': 'a', 'ttl': 1200, 'data': '10.0.1.10'}
+    assert by_name[('web01', 'aaaa')]['data'] == '2001:db8::10'
+    assert by_name[('_ldap._tcp', 'srv')]['data'] == {
+        'domain_name': 'dc01.legacy.contoso.com.', 'port': 389, 'priority': 0, 'weight': 100}
+    assert by_name[('txt', 'txt')]['data'] == 'v=spf1 include:contoso.com -all'
+    assert by_name[('quoted', 'txt')]['data'] == 'semi;colon "quoted" A'
+    assert by_name[('host.sub', 'a')]['fqdn'] == 'host.sub.legacy.contoso.com'
+
+
+def test_iter_zone_file_record_types():
+    records = iter_zone_file(io.BytesIO(ZONE), 'legacy.contoso.com.', record_types=['a', 'CNAME'])
+    assert [(r['name'], r['type']) for r in records] == [('web01', 'a'), ('www', 'cname'), ('host.sub', 'a')]
+
+
+def test_iter_zone_file_is_lazy():
+    def lines():
+        yield '$TTL 300\n'
+        yield 'a A 10.0.0.1\n'
+        raise AssertionError('read past the first record')
+
+    assert next(iter_zone_file(lines(), 'example.com'))['data'] == '10.0.0.1'
+
+
+@pytest.mark.parametrize('content, error', [
+    ('a A 10.0.0.1\n', 'line 1: the record has no TTL'),
+    ('$TTL 60\n\n  A 10.0.0.1\n', 'line 3: the first record has no owner'),
+    ('$TTL 60\na MX 10\n', 'line 2: the record data is incomplete'),
+    ('$TTL 60\na TXT "open\n', 'line 2: unterminated quoted string'),
+    ('$TTL 60\na TXT ( "x"\n', 'line 2: unbalanced parentheses'),
+    ('$INCLUDE other.dns\n', 'line 1: the $INCLUDE directive is not supported'),
+])
+def test_iter_zone_file_invalid(content, error):
+    with pytest.raises(ValueError, match=r'^%s' % error.replace('$', r'\$').replace('(', r'\(')):
+        list(iter_zone_file(content.splitlines(), 'example.com'))
+
+
+@pytest.mark.parametrize('value, expected', [('3600', 3600), ('1h30m', 5400), ('1W', 604800), ('2d', 172800)])
+def test_parse_ttl(value, expected):
+    assert parse_ttl(value) == expected
+
+
+def test_parse_ttl_invalid():
+    with pytest.raises(ValueError):
+        parse_ttl('1x')
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import random
+
+import pytest
+
+from ansible_collections.zollo.windows.plugins.module_utils.ipv4_index import (
+    DhcpScopeIndex, IPv4IntervalIndex, int_to_ip, ip_to_int, mask_to_int, parse_range, subnet_range)
+
+SCOPES = [
+    {'name': 'vlan1', 'scope_id': '10.0.1.0', 'subnet_mask': '255.255.255.0',
+     'start_range': '10.0.1.100', 'end_range': '10.0.1.199', 'exclusion_list': ['10.0.1.150-10.0.1.159']},
+    {'name': 'vlan2', 'scope_id': '10.0.2.0', 'subnet_mask': '255.255.255.0',
+     'start_range': '10.0.2.10', 'end_range': '10.0.2.250'},
+]
+
+
+def test_address_conversion():
+    assert ip_to_int('10.0.1.1') == 0x0A000101
+    assert int_to_ip(0x0A000101) == '10.0.1.1'
+    assert mask_to_int('255.255.255.0') == mask_to_int(24) == mask_to_int('24') == 0xFFFFFF00
+    assert subnet_range('10.0.1.77', 24) == (ip_to_int('10.0.1.0'), ip_to_int('10.0.1.255'))
+
+
+@pytest.mark.parametrize('value', ['10.0.1', '10.0.1.256', '10.0.1.a', ''])
+def test_invalid_address(value):
+    with pytest.raises(ValueError):
+        ip_to_int(value)
+
+
+def test_invalid_mask():
+    with pytest.raises(ValueError):
+        mask_to_int('255.0.255.0')
+    with pytest.raises(ValueError):
+        mask_to_int(33)
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('10.0.0.5', ('10.0.0.5', '10.0.0.5')),
+    ('10.0.0.5-10.0.0.9', ('10.0.0.5', '10.0.0.9')),
+    ('10.0.0.0/30', ('10.0.0.0', '10.0.0.3')),
+    ({'start': '10.0.0.5', 'end': '10.0.0.6'}, ('10.0.0.5', '10.0.0.6')),
+])
+def test_parse_range(value, expected):
+    assert parse_range(value) == tuple(ip_to_int(i) for i in expected)
+
+
+def test_parse_range_reversed():
+    with pytest.raises(ValueError):
+        parse_range('10.0.0.9-10.0.0.5')
+
+
+def test_index_matches_linear_scan():
+    rng = random.Random(42)
+    intervals = []
+    for i in range(500):
+        start = rng.randint(0, 10000)
+        intervals.append((start, start + rng.randint(0, 300), i))
+    index = IPv4IntervalIndex(intervals)
+    assert len(index) == 500
+
+    for dummy in range(300):
+        start = rng.randint(-50, 10400)
+        end = start + rng.randint(0, 100)
+        expected = sorted(i[2] for i in intervals if i[0] <= end and i[1] >= start)
+        assert sorted(i[2] for i in index.overlaps(start, end)) == expected
+        expected = sorted(i[2] for i in intervals if i[0] <= start <= i[1])
+        assert sorted(i[2] for i in index.find(start)) == expected
+
+
+def test_empty_index():
+    index = IPv4IntervalIndex()
+    assert len(index) == 0
+    assert index.find(1) == []
+
+
+def test_scope_for():
+    index = DhcpScopeIndex(SCOPES)
+    assert [s['name'] for s in index.scope_for('10.0.2.5')] == ['vlan2']
+    assert index.scope_for('10.0.3.5') == []
+
+
+@pytest.mark.parametrize('ip, scope_id, lease_type, error', [
+    ('10.0.1.120', None, 'reservation', None),
+    ('10.0.1.120', '10.0.1.0', 'lease', None),
+    ('10.0.1.155', None, 'reservation', None),
+    ('10.0.1.155', None, 'lease', 'within an exclusion range'),
+    ('10.0.1.20', None, 'reservation', 'outside of the address range'),
+    ('10.0.1.120', '10.0.2.0', 'reservation', 'not within the subnet of the scope 10.0.2.0'),
+    ('10.9.9.9', None, 'reservation', 'not within the subnet of any known scope'),
+])
+def test_validate_lease(ip, scope_id, lease_type, error):
+    errors = DhcpScopeIndex(SCOPES).validate_lease(ip, scope_id, lease_type)
+    if error is None:
+        assert errors == []
+    else:
+        assert len(errors) == 1
+        assert error in errors[0]
+
+
+@pytest.mark.parametrize('kwargs, error', [
+    ({'name': 'vlan3', 'pool_start': '10.0.3.10', 'pool_end': '10.0.3.200', 'subnet_mask': 24,
+      'exclusion_list': ['10.0.3.20-10.0.3.29', {'start': '10.0.3.40'}]}, None),
+    ({'name': 'vlan1', 'pool_start': '10.0.1.10', 'pool_end': '10.0.1.200', 'subnet_mask': '255.255.255.0'}, None),
+    ({'name': 'vlan3', 'pool_start': '10.0.3.10', 'pool_end': '10.0.3.200', 'subnet_mask': 24,
+      'exclusion_list': ['10.0.3.20-10.0.3.29', {'start': '10.0.3.20', 'end': '10.0.3.29'}]}, None),
+    ({'name': 'vlan3', 'pool_start': '10.0.3.200', 'pool_end': '10.0.3.10', 'subnet_mask': 24}, 'is after pool_end'),
+    ({'name': 'vlan3', 'pool_start': '10.0.3.10', 'pool_end': '10.0.4.10', 'subnet_mask': 24}, 'outside of the subnet'),
+    ({'name': 'vlan3', 'pool_start': '10.0.3.10', 'pool_end': '10.0.3.200', 'subnet_mask': 24,
+      'exclusion_list': ['10.0.3.1-10.0.3.20']}, 'outside of the pool'),
+    ({'name': 'vlan3', 'pool_start': '10.0.3.10', 'pool_end': '10.0.3.200', 'subnet_mask': 24,
+      'exclusion_list': ['10.0.3.20-10.0.3.29', '10.0.3.25']}, 'overlaps another exclusion range'),
+    ({'name': 'wide', 'pool_start': '10.0.0.10', 'pool_end': '10.0.0.200', 'subnet_mask': 16}, 'overlaps the scope vlan1'),
+])
+def test_validate_scope(kwargs, error):
+    errors = DhcpScopeIndex(SCOPES).validate_scope(**kwargs)
+    if error is None:
+        assert errors == []
+    else:
+        assert errors
+        assert error in errors[0]
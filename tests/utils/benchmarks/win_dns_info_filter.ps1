@@ -0,0 +1,72 @@
+# Copyright: (c) 2021 VMware, Inc. All Rights Reserved.
+# SPDX-License-Identifier: GPL-3.0-only
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+# Compares the legacy filter_ad pipeline of win_dns_info with the compiled
+# record filter on a synthetic zone. Runs on any PowerShell 5.1+ host, the
+# DnsServer module is not required.
+#
+#   pwsh -File tests/utils/benchmarks/win_dns_info_filter.ps1 -Count 300000
+
+Param(
+    [int]$Count = 100000,
+    [int]$AdPercent = 20
+)
+
+$ErrorActionPreference = "Stop"
+
+# load the filter functions straight from the module source
+$module_path = Join-Path $PSScriptRoot '../../../plugins/modules/win_dns_info.ps1'
+$ast = [System.Management.Automation.Language.Parser]::ParseFile((Resolve-Path $module_path), [ref]$null, [ref]$null)
+$wanted = @('ConvertTo-GlobRegex', 'New-DnsRecordFilter', 'Select-DnsRecord')
+foreach ($function in $ast.FindAll({ $args[0] -is [System.Management.Automation.Language.FunctionDefinitionAst] }, $false)) {
+    if ($function.Name -in $wanted) { . ([ScriptBlock]::Create($function.Extent.Text)) }
+}
+$assignment = $ast.FindAll({
+    $args[0] -is [System.Management.Automation.Language.AssignmentStatementAst] -and $args[0].Left.Extent.Text -eq '$ad_patterns'
+}, $false) | Select-Object -First 1
+. ([ScriptBlock]::Create($assignment.Extent.Text))
+
+# synthetic zone, a share of the records are AD service records
+$ad_names = @('_kerberos._tcp', '_ldap._tcp.dc._msdcs', '_kpasswd._udp', '_gc._tcp', 'x._msdcs', 'DomainDnsZones', 'ForestDnsZones')
+$types = @('A', 'AAAA', 'CNAME', 'MX', 'TXT')
+$random = New-Object -TypeName System.Random -ArgumentList 42
+$records = New-Object -TypeName System.Collections.Generic.List[Object]
+for ($i = 0; $i -lt $Count; $i++) {
+    if ($random.Next(100) -lt $AdPercent) { $name = $ad_names[$random.Next($ad_names.Count)] }
+    else { $name = "host$i" }
+    $records.Add([PSCustomObject]@{ HostName = $name; RecordType = $types[$random.Next($types.Count)] })
+}
+
+$legacy = Measure-Command {
+    $matched = $records | Where-Object {
+        ($_.HostName -notlike '_kerberos*') -and
+        ($_.HostName -notlike '_ldap*') -and
+        ($_.HostName -notlike '_kpasswd*') -and
+        ($_.HostName -notlike '_gc*') -and
+        ($_.HostName -notlike '*._msdcs*') -and
+        ($_.HostName -notlike 'gc._msdcs') -and
+        ($_.HostName -notlike '*_ldap._tcp*') -and
+        ($_.HostName -notlike '*forestdnszones*') -and
+        ($_.HostName -notlike '*domaindnszones*')
+    }
+    $legacy_list = @()
+    foreach ($item in $matched) { $legacy_list += $item }
+}
+
+$compiled = Measure-Command {
+    $filter = New-DnsRecordFilter -FilterAd $true
+    $compiled_list = Select-DnsRecord -Filter $filter -Records $records
+}
+
+if ($legacy_list.Count -ne $compiled_list.Count) {
+    throw "Result mismatch: legacy matched $($legacy_list.Count) records, compiled matched $($compiled_list.Count)"
+}
+
+[PSCustomObject]@{
+    records = $Count
+    matched = $compiled_list.Count
+    legacy_seconds = [Math]::Round($legacy.TotalSeconds, 2)
+    compiled_seconds = [Math]::Round($compiled.TotalSeconds, 2)
+    speedup = [Math]::Round($legacy.TotalSeconds / [Math]::Max($compiled.TotalSeconds, 0.001), 1)
+} | Format-List